@@ -42,6 +42,18 @@ def create_app(config_name='default'):
     from .services import socket_service
     socket_service.init_socket_events(socketio)
 
+    # Pick up background jobs interrupted by a restart
+    from backend.utils.job_queue import get_job_queue
+    get_job_queue().resume_pending()
+
+    # Load shared ML models ahead of the first upload / recording (MODEL_WARMUP, off by default)
+    from backend.audio.models import register_audio_models
+    from backend.config import Settings
+    registry = register_audio_models()
+    warmup = [name.strip() for name in Settings.MODEL_WARMUP.split(',') if name.strip()]
+    if warmup:
+        registry.warm_up(warmup)
+
     # Global Context Processor for Localization
     from app.translations import get_translations
     from flask import request
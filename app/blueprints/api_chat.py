@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from backend.handlers.meeting_processing import chat_with_ai, refresh_history, load_history
-from backend.rag.chroma_manager import ChromaManager
+import time
+from backend.rag.chroma_manager import get_chroma_manager
 
 chat_bp = Blueprint('chat', __name__)
 
@@ -28,13 +29,24 @@ def chat():
         return jsonify({'error': '⚠️ Quá nhiều câu hỏi. Vui lòng đợi 1 phút.'}), 429
     
     try:
-        chroma_manager = ChromaManager()
+        start = time.perf_counter()
+        chroma_manager = get_chroma_manager()
         response_text = chroma_manager.retrieve(message)
+        latency_ms = (time.perf_counter() - start) * 1000
         
-        return jsonify({'response': response_text, 'answer': response_text})
+        return jsonify({'response': response_text, 'answer': response_text, 'latency_ms': round(latency_ms, 1)})
     except Exception as e:
         return jsonify({'error': f'Lỗi: {str(e)}'}), 500
 
+@chat_bp.route('/health', methods=['GET'])
+def chat_health():
+    """Health of the shared ChromaManager used by /ask"""
+    try:
+        health = get_chroma_manager().health_check()
+        return jsonify(health), (200 if health['ok'] else 503)
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 503
+
 @chat_bp.route('/history/list', methods=['GET'])
 def list_history():
     try:
@@ -1,4 +1,3 @@
-import os
 from flask import Blueprint, request, jsonify
 from pathlib import Path
 import json
@@ -6,7 +5,7 @@ from datetime import datetime
 
 # Import HistorySearcher for semantic search
 try:
-    from backend.data.history_searcher import HistorySearcher
+    from backend.data.history_searcher import AGGREGATIONS, HistorySearcher
     # Initialize searcher (singleton pattern)
     _history_searcher = None
     
@@ -19,6 +18,7 @@ try:
         return _history_searcher
 except ImportError:
     HistorySearcher = None
+    AGGREGATIONS = ()
     def get_history_searcher():
         return None
 
@@ -36,6 +36,16 @@ except ImportError:
     RAGEngine = None
     def get_rag_engine(): return None
 
+from backend.data.history_manager import HistoryManager
+
+_history_manager = None
+
+def get_history_manager():
+    global _history_manager
+    if _history_manager is None:
+        _history_manager = HistoryManager()
+    return _history_manager
+
 history_bp = Blueprint('history', __name__)
 
 @history_bp.route('/search', methods=['POST'])
@@ -51,136 +61,48 @@ def search_history():
         if not filename:
             return jsonify({'found': False})
         
-        # Search in history directory
-        history_dir = Path('data/history')
-        if not history_dir.exists():
+        # Indexed catalog lookup (most recent analysis of this file)
+        manager = get_history_manager()
+        entry = manager.find_by_filename(filename)
+        analysis = manager.load_analysis(entry['id']) if entry else None
+        if not analysis:
             return jsonify({'found': False})
         
-        # Get filename without extension for matching
-        file_stem = Path(filename).stem.lower()
-        
-        # Search through history files
-        history_files = sorted(
-            history_dir.glob('*.json'),
-            key=lambda x: x.stat().st_mtime,
-            reverse=True  # Most recent first
-        )
-        
-        for history_file in history_files:
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    analysis = json.load(f)
-                
-                # Check if filename matches
-                original_file = analysis.get('original_file', '')
-                if file_stem in original_file.lower():
-                    # Found matching analysis
-                    return jsonify({
-                        'found': True,
-                        'analysis': {
-                            'summary': analysis.get('summary', ''),
-                            'topics': analysis.get('topics', []),
-                            'actions': analysis.get('action_items', []),
-                            'decisions': analysis.get('decisions', []),
-                            'transcript': analysis.get('metadata', {}).get('transcript', ''),
-                            'timestamp': analysis.get('timestamp', ''),
-                            'original_file': original_file
-                        }
-                    })
-            except Exception as e:
-                print(f"Error reading history file {history_file}: {e}")
-                continue
-        
-        # No matching analysis found
-        return jsonify({'found': False})
+        return jsonify({
+            'found': True,
+            'analysis': {
+                'summary': analysis.get('summary', ''),
+                'topics': analysis.get('topics', []),
+                'actions': analysis.get('action_items', []),
+                'decisions': analysis.get('decisions', []),
+                'transcript': analysis.get('metadata', {}).get('transcript', ''),
+                'timestamp': analysis.get('timestamp', ''),
+                'original_file': analysis.get('original_file', '')
+            }
+        })
         
     except Exception as e:
         print(f"Error searching history: {e}")
         return jsonify({'found': False, 'error': str(e)}), 500
 
 
-# Simple in-memory cache for history files
-# Format: {filename: {'mtime': float, 'data': dict}}
-_HISTORY_CACHE = {}
-
 @history_bp.route('/list', methods=['GET'])
 def list_history():
     """List all analysis history with filtering and sorting.
     
-    Optimized with caching to avoid re-reading all JSON files.
+    Served from the SQLite history catalog (indexed on type, timestamp and name).
     """
-    global _HISTORY_CACHE
     try:
         # Get query parameters
         filter_type = request.args.get('filter_type', 'all')
         sort_by = request.args.get('sort_by', 'newest')
         limit = int(request.args.get('limit', 20))
         
-        history_dir = Path('data/history')
-        if not history_dir.exists():
-            return jsonify({'history': []})
-        
-        # 1. Update Cache
-        # Get current files and mtimes
-        current_files = {}
-        try:
-            for entry in os.scandir(history_dir):
-                if entry.name.endswith('.json') and entry.is_file():
-                    current_files[entry.name] = entry.stat().st_mtime
-        except Exception as e:
-            # Fallback if scandir fails
-            history_files = list(history_dir.glob('*.json'))
-            for f in history_files:
-                current_files[f.name] = f.stat().st_mtime
-                
-        # Remove deleted files from cache
-        keys_to_remove = [k for k in _HISTORY_CACHE if k not in current_files]
-        for k in keys_to_remove:
-            del _HISTORY_CACHE[k]
-            
-        # Update cache for new/modified files
-        for filename, mtime in current_files.items():
-            # If not in cache or modified
-            if filename not in _HISTORY_CACHE or _HISTORY_CACHE[filename]['mtime'] != mtime:
-                try:
-                    file_path = history_dir / filename
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        analysis = json.load(f)
-                    
-                    # Extract only needed fields for list view to save memory
-                    compact_data = {
-                        'id': analysis.get('id', ''),
-                        'timestamp': analysis.get('timestamp', ''),
-                        'original_file': analysis.get('original_file', ''),
-                        'summary_preview': analysis.get('summary', '')[:100] + '...',
-                        'meeting_type': analysis.get('metadata', {}).get('meeting_type', 'meeting')
-                    }
-                    
-                    _HISTORY_CACHE[filename] = {
-                        'mtime': mtime,
-                        'data': compact_data
-                    }
-                except Exception as e:
-                    print(f"Error reading history file {filename}: {e}")
-                    continue
-
-        # 2. Filter and Sort using Cache (Memory Speed!)
-        history_list = [item['data'] for item in _HISTORY_CACHE.values()]
-        
-        # Filter by type
-        if filter_type != 'all':
-            history_list = [h for h in history_list if h.get('meeting_type') == filter_type]
-            
-        # Sort
-        if sort_by == 'newest':
-            history_list.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        elif sort_by == 'oldest':
-            history_list.sort(key=lambda x: x.get('timestamp', ''))
-        elif sort_by == 'name':
-            history_list.sort(key=lambda x: x.get('original_file', '').lower())
-        
-        # Apply limit
-        history_list = history_list[:limit]
+        history_list = get_history_manager().list_history(
+            limit=limit,
+            meeting_type=filter_type,
+            sort_by=sort_by
+        )
         
         return jsonify({
             'history': history_list,
@@ -232,7 +154,8 @@ def semantic_search():
     {
         "query": "budget planning meetings",
         "top_k": 5,
-        "filters": {"meeting_type": "meeting"}  // optional
+        "filters": {"meeting_type": "meeting"},  // optional
+        "aggregate": "max"                       // optional, "max" or "sum"
     }
     
     Response:
@@ -241,11 +164,9 @@ def semantic_search():
             {
                 "id": "...",
                 "score": 0.85,
-                "title": "...",
-                "summary": "...",
-                "timestamp": "...",
-                "meeting_type": "...",
-                "matched_text": "..."
+                "matched_text": "...",   // best matching chunk
+                "metadata": {...},
+                "chunks": [{"id": "...", "section": "decisions", "chunk_index": 0, "text": "...", "score": 0.85}]
             }
         ]
     }
@@ -264,6 +185,7 @@ def semantic_search():
         query = data.get('query', '').strip()
         top_k = data.get('top_k', 5)
         filters = data.get('filters', None)
+        aggregate = data.get('aggregate', 'max')
         
         # Validate
         if not query:
@@ -272,11 +194,15 @@ def semantic_search():
         if not isinstance(top_k, int) or top_k < 1 or top_k > 50:
             return jsonify({'error': 'top_k must be between 1 and 50'}), 400
         
+        if aggregate not in AGGREGATIONS:
+            return jsonify({'error': f"aggregate must be one of {', '.join(AGGREGATIONS)}"}), 400
+        
         # Perform semantic search
         results = searcher.semantic_search(
             query=query,
             top_k=top_k,
-            filters=filters
+            filters=filters,
+            aggregate=aggregate
         )
         
         return jsonify({
@@ -290,6 +216,80 @@ def semantic_search():
         return jsonify({'error': str(e)}), 500
 
 
+@history_bp.route('/keyword-search', methods=['POST'])
+def keyword_search():
+    """Keyword (full-text) search over meeting history.
+    
+    Exact terms - names, ticket IDs, Vietnamese phrases - answered from the
+    SQLite FTS5 index, without loading the embedding model.
+    
+    Request body:
+    {
+        "query": "JIRA-142 Minh",
+        "page": 1,          // optional
+        "page_size": 10,    // optional, 1-50
+        "filters": {"meeting_type": "meeting", "language": "vi"}  // optional
+    }
+    
+    Response:
+    {
+        "results": [
+            {
+                "id": "...",
+                "score": 7.12,
+                "original_file": "...",
+                "timestamp": "...",
+                "meeting_type": "...",
+                "snippet": "... <mark>JIRA-142</mark> ..."
+            }
+        ],
+        "total": 3,
+        "page": 1,
+        "page_size": 10,
+        "has_more": false
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        query = data.get('query', '').strip()
+        page = data.get('page', 1)
+        page_size = data.get('page_size', 10)
+        filters = data.get('filters') or {}
+        
+        # Validate
+        if not query:
+            return jsonify({'error': 'Query is required'}), 400
+        
+        if not isinstance(page, int) or page < 1:
+            return jsonify({'error': 'page must be a positive integer'}), 400
+        
+        if not isinstance(page_size, int) or page_size < 1 or page_size > 50:
+            return jsonify({'error': 'page_size must be between 1 and 50'}), 400
+        
+        found = get_history_manager().keyword_search(
+            query,
+            limit=page_size,
+            offset=(page - 1) * page_size,
+            meeting_type=filters.get('meeting_type'),
+            language=filters.get('language')
+        )
+        
+        return jsonify({
+            'query': query,
+            'results': found['results'],
+            'count': len(found['results']),
+            'total': found['total'],
+            'page': page,
+            'page_size': page_size,
+            'has_more': page * page_size < found['total'],
+            'took_ms': found['took_ms']
+        })
+        
+    except Exception as e:
+        print(f"Error in keyword search: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @history_bp.route('/reindex', methods=['POST'])
 def reindex_history():
     """Force re-index all meetings into ChromaDB.
@@ -302,12 +302,19 @@ def reindex_history():
         if searcher is None:
             return jsonify({'error': 'HistorySearcher not available'}), 500
         
+        data = request.get_json(silent=True) or {}
+        
         # Force re-index
-        count = searcher.index_all_meetings(force_reindex=True)
+        count = searcher.index_all_meetings(
+            force_reindex=True,
+            batch_size=int(data.get('batch_size', 64)),
+            parse_workers=int(data.get('parse_workers', 4))
+        )
         
         return jsonify({
             'success': True,
             'indexed': count,
+            'stats': searcher.last_index_stats,
             'message': f'Successfully re-indexed {count} meetings'
         })
         
@@ -316,6 +323,26 @@ def reindex_history():
         return jsonify({'error': str(e)}), 500
 
 
+@history_bp.route('/rebuild-catalog', methods=['POST'])
+def rebuild_catalog():
+    """Rebuild the SQLite history catalog from the JSON files on disk.
+    
+    Needed after history files are added or removed outside the app
+    (generator scripts, backup restore).
+    """
+    try:
+        count = get_history_manager().rebuild_catalog()
+        return jsonify({
+            'success': True,
+            'cataloged': count,
+            'message': f'Catalog rebuilt with {count} analyses'
+        })
+        
+    except Exception as e:
+        print(f"Error rebuilding catalog: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @history_bp.route('/chat', methods=['POST'])
 def chat_history():
     """Chat with meeting history using RAG.
@@ -38,6 +38,12 @@ def get_recording_history():
     except Exception as e:
         return jsonify({'error': str(e), 'recordings': []}), 500
 
+@recording_bp.route('/live-stats', methods=['GET'])
+def get_live_stats():
+    """Live transcription worker metrics (queue depth, per-session lag)."""
+    from app.services.socket_service import get_live_stats as live_stats
+    return jsonify(live_stats())
+
 @recording_bp.route('/load/<recording_id>', methods=['GET'])
 def load_recording(recording_id):
     audio_path, transcript, info = load_selected_recording(recording_id)
@@ -148,10 +154,12 @@ def save_recording_only():
             }
         }
         
-        # Save to history
+        # Save to history and catalog it
+        from backend.data.history_catalog import catalog_entry, get_history_catalog
+        content = json.dumps(history_data, indent=2, ensure_ascii=False).encode('utf-8')
         history_file = recordings_dir / f"{history_data['id']}.json"
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history_data, f, indent=2, ensure_ascii=False)
+        history_file.write_bytes(content)
+        get_history_catalog(str(recordings_dir)).upsert(catalog_entry(history_data, content))
         
         return jsonify({
             'success': True,
@@ -1,15 +1,18 @@
 from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
 from pathlib import Path
+import hashlib
 import json
 import re
 import os
 from werkzeug.utils import secure_filename
-from backend.handlers.meeting_processing import process_upload, process_file
+from backend.handlers.meeting_processing import process_upload, process_file, history_manager
 from backend.audio.huggingface_stt import transcribe_audio_huggingface
 from backend.audio.speaker_diarization import transcribe_with_speakers
-from backend.rag.chroma_manager import ChromaManager
+from backend.config import Settings
+from backend.utils.job_queue import get_job_queue, TERMINAL_STATES
 
 upload_bp = Blueprint('upload', __name__)
+job_queue = get_job_queue(Settings.JOB_DB_PATH, Settings.JOB_MAX_WORKERS)
 
 # ============================================================================
 # Validation & Security Functions
@@ -113,6 +116,93 @@ def validate_language(lang):
     return lang
 
 
+def _parse_upload_form():
+    """Validate upload form fields and save the uploaded file.
+    
+    Returns:
+        (params, None) with keyword arguments for process_upload, or
+        (None, (response, status_code)) if the request is invalid
+    """
+    # Get parameters (Standard Form Data)
+    file_type = request.form.get('file_type', 'audio')
+    meeting_type = request.form.get('meeting_type', 'meeting')
+    output_lang = request.form.get('output_lang', 'vi')
+    transcribe_lang = request.form.get('transcribe_lang', 'vi')
+    enable_diarization = request.form.get('enable_diarization', 'false').lower() == 'true'
+    colab_url = request.form.get('colab_url', '').strip()
+    
+    # Validate language
+    try:
+        transcribe_lang = validate_language(transcribe_lang)
+        output_lang = validate_language(output_lang)
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+    
+    # Validate file type
+    if file_type not in ['audio', 'text']:
+        return None, (jsonify({'error': f'Loại file không hợp lệ: {file_type}'}), 400)
+    
+    audio_file = None
+    text_file = None
+    
+    upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
+    upload_folder.mkdir(parents=True, exist_ok=True)
+    
+    # Handle file upload with validation
+    try:
+        if file_type == 'audio':
+            if 'audio_file' not in request.files:
+                return None, (jsonify({'error': 'Không có file audio được tải lên'}), 400)
+            
+            f = request.files['audio_file']
+            
+            # Validate file
+            validate_file(f, 'audio')
+            
+            # Sanitize filename
+            safe_filename = sanitize_filename(f.filename)
+            
+            # Save file
+            path = upload_folder / safe_filename
+            f.save(str(path))
+            audio_file = str(path)
+            
+        else:  # text
+            if 'text_file' not in request.files:
+                return None, (jsonify({'error': 'Không có file text được tải lên'}), 400)
+            
+            f = request.files['text_file']
+            
+            # Validate file
+            validate_file(f, 'text')
+            
+            # Sanitize filename
+            safe_filename = sanitize_filename(f.filename)
+            
+            # Save file
+            path = upload_folder / safe_filename
+            f.save(str(path))
+            text_file = str(path)
+    
+    except ValueError as e:
+        # Validation errors
+        return None, (jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        # File save errors
+        return None, (jsonify({'error': f'Lỗi khi lưu file: {str(e)}'}), 400)
+    
+    return {
+        'file_type': file_type,
+        'audio_file': audio_file,
+        'text_file': text_file,
+        'transcribe_lang': transcribe_lang,
+        'enable_diarization': enable_diarization,
+        'meeting_type': meeting_type,
+        'output_lang': output_lang,
+        'colab_url': colab_url
+    }, None
+
+
 # ============================================================================
 # Routes
 # ============================================================================
@@ -156,94 +246,18 @@ def process_upload_file():
                     try: os.unlink(temp_path)
                     except: pass
 
-        # Get parameters (Standard Form Data)
-        file_type = request.form.get('file_type', 'audio')
-        meeting_type = request.form.get('meeting_type', 'meeting')
-        output_lang = request.form.get('output_lang', 'vi')
-        transcribe_lang = request.form.get('transcribe_lang', 'vi')
-        enable_diarization = request.form.get('enable_diarization', 'false').lower() == 'true'
-        colab_url = request.form.get('colab_url', '').strip()
-        
-        # Validate language
-        try:
-            transcribe_lang = validate_language(transcribe_lang)
-            output_lang = validate_language(output_lang)
-        except ValueError as e:
-            return jsonify({'error': str(e)}), 400
-        
-        # Validate file type
-        if file_type not in ['audio', 'text']:
-            return jsonify({'error': f'Loại file không hợp lệ: {file_type}'}), 400
-        
-        audio_file = None
-        text_file = None
-        
-        upload_folder = Path(current_app.config['UPLOAD_FOLDER'])
-        upload_folder.mkdir(parents=True, exist_ok=True)
-        
-        # Handle file upload with validation
-        try:
-            if file_type == 'audio':
-                if 'audio_file' not in request.files:
-                    return jsonify({'error': 'Không có file audio được tải lên'}), 400
-                
-                f = request.files['audio_file']
-                
-                # Validate file
-                validate_file(f, 'audio')
-                
-                # Sanitize filename
-                safe_filename = sanitize_filename(f.filename)
-                
-                # Save file
-                path = upload_folder / safe_filename
-                f.save(str(path))
-                audio_file = str(path)
-                
-            else:  # text
-                if 'text_file' not in request.files:
-                    return jsonify({'error': 'Không có file text được tải lên'}), 400
-                
-                f = request.files['text_file']
-                
-                # Validate file
-                validate_file(f, 'text')
-                
-                # Sanitize filename
-                safe_filename = sanitize_filename(f.filename)
-                
-                # Save file
-                path = upload_folder / safe_filename
-                f.save(str(path))
-                text_file = str(path)
-        
-        except ValueError as e:
-            # Validation errors
-            return jsonify({'error': str(e)}), 400
-        except Exception as e:
-            # File save errors
-            return jsonify({'error': f'Lỗi khi lưu file: {str(e)}'}), 400
+        params, error = _parse_upload_form()
+        if error:
+            return error
         
         # Process the file
         try:
-            status, transcript, summary, topics, actions, decisions, participants = process_upload(
-                file_type=file_type,
-                audio_file=audio_file,
-                text_file=text_file,
-                transcribe_lang=transcribe_lang,
-                enable_diarization=enable_diarization,
-                meeting_type=meeting_type,
-                output_lang=output_lang,
-                colab_url=colab_url
-            )
+            status, transcript, summary, topics, actions, decisions, participants = process_upload(**params)
             
             # Check if status indicates an error
             if status.startswith('❌') or status.startswith('⚠️'):
                 return jsonify({'error': status}), 400
 
-            chroma = ChromaManager()
-            chroma.store(transcript)
-
             # Return success response
 
             return jsonify({
@@ -268,6 +282,104 @@ def process_upload_file():
         return jsonify({'error': f'Lỗi không xác định: {str(e)}'}), 500
 
 
+def _run_upload_job(params, report):
+    """Job handler: run the upload pipeline in a background worker."""
+    status, transcript, summary, topics, actions, decisions, participants = process_upload(progress=report, **params)
+    
+    if status.startswith('❌') or status.startswith('⚠️'):
+        raise RuntimeError(status)
+    
+    return {
+        'status': status,
+        'transcript': transcript,
+        'summary': summary,
+        'topics': topics,
+        'actions': actions,
+        'decisions': decisions,
+        'participants': participants
+    }
+
+
+job_queue.register('upload', _run_upload_job)
+
+
+@upload_bp.route('/jobs', methods=['POST'])
+def submit_upload_job():
+    """Submit an upload for background processing.
+    
+    Accepts the same form fields as /process and returns immediately:
+    {"job_id": "...", "status": "queued", "status_url": "...", "events_url": "..."}
+    """
+    try:
+        params, error = _parse_upload_form()
+        if error:
+            return error
+        
+        job_id = job_queue.submit('upload', params)
+        
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/upload/jobs/{job_id}',
+            'events_url': f'/api/upload/jobs/{job_id}/events'
+        }), 202
+    
+    except Exception as e:
+        return jsonify({'error': f'Lỗi không xác định: {str(e)}'}), 500
+
+
+@upload_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    """Get job status, current stage, partial results and final result."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    job.pop('params', None)
+    return jsonify(job)
+
+
+@upload_bp.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_upload_job(job_id):
+    """Stream job updates as Server-Sent Events until the job finishes.
+    
+    Response: Server-Sent Events (SSE) stream
+    - data: {"id": "...", "status": "running", "stage": "transcribing", "progress": 10, "partial": {...}}
+    - data: {"id": "...", "status": "done", "result": {...}}
+    """
+    import queue
+    
+    if job_queue.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        # Subscribe before reading the snapshot so no update is missed in between
+        updates = job_queue.subscribe(job_id)
+        try:
+            job = job_queue.get(job_id)
+            job.pop('params', None)
+            yield f'data: {json.dumps(job, ensure_ascii=False)}\n\n'
+            
+            while job['status'] not in TERMINAL_STATES:
+                try:
+                    job = updates.get(timeout=15)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'data: {json.dumps(job, ensure_ascii=False)}\n\n'
+        finally:
+            job_queue.unsubscribe(job_id, updates)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @upload_bp.route('/read-file', methods=['POST'])
 def read_original_file():
     """Read original file content from uploads directory"""
@@ -314,35 +426,37 @@ def load_original_file():
 
 @upload_bp.route('/check-history', methods=['POST'])
 def check_file_history():
-    """Check if file was already analyzed"""
+    """Check if the same file was already analyzed.
+    
+    Accepts JSON ``{"filename": ..., "content_hash": "<sha256 of the file>"}``
+    (either field may be missing) or a multipart ``file`` (hashed here).
+    See HistoryManager.find_previous_upload for how the two are matched.
+    """
     try:
-        data = request.get_json()
-        filename = data.get('filename', '')
-        
-        if not filename:
-            return jsonify({'error': 'Filename is required'}), 400
-        
-        # Check in history folder
-        history_dir = Path('data/history')
-        history_dir.mkdir(parents=True, exist_ok=True)
+        uploaded = request.files.get('file')
+        if uploaded:
+            digest = hashlib.sha256()
+            for block in iter(lambda: uploaded.stream.read(1 << 20), b''):
+                digest.update(block)
+            content_hash = digest.hexdigest()
+            filename = uploaded.filename or ''
+        else:
+            data = request.get_json(silent=True) or {}
+            content_hash = str(data.get('content_hash') or '').strip().lower()
+            filename = str(data.get('filename') or '').strip()
         
-        # Look for history file
-        safe_filename = secure_filename(filename)
-        base_name = Path(safe_filename).stem
+        if content_hash and not re.fullmatch(r'[0-9a-f]{64}', content_hash):
+            return jsonify({'error': 'content_hash must be a SHA-256 hex digest'}), 400
+        if not content_hash and not filename:
+            return jsonify({'error': 'filename or content_hash is required'}), 400
         
-        # Find matching history files
-        history_files = list(history_dir.glob(f"*{base_name}*.json"))
+        entry = history_manager.find_previous_upload(content_hash, (secure_filename(filename), filename))
+        history_data = history_manager.load_analysis(entry['id']) if entry else None
         
-        if history_files:
-            # Load most recent
-            latest_file = max(history_files, key=lambda x: x.stat().st_mtime)
-            
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-            
+        if history_data:
             return jsonify({
                 'found': True,
-                'history_id': latest_file.stem,
+                'history_id': entry['id'],
                 'timestamp': history_data.get('timestamp'),
                 'summary_preview': history_data.get('summary', '')[:200] + '...',
                 'data': history_data
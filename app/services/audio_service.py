@@ -8,10 +8,12 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from backend.audio.huggingface_stt import transcribe_audio_huggingface
 from backend.audio.speaker_diarization import SpeakerDiarizer
+from backend.audio.online_diarization import OnlineDiarizer
+from backend.audio.models import FASTER_WHISPER, register_audio_models
+from backend.audio.parallel_transcriber import WHISPER_OPTIONS, transcribe_file_parallel
 
 class AudioService:
     _instance = None
-    _whisper_model = None
     _diarizer = None
 
     def __new__(cls):
@@ -19,18 +21,18 @@ class AudioService:
             cls._instance = super(AudioService, cls).__new__(cls)
         return cls._instance
 
+    @property
+    def models(self):
+        """Shared model registry (faster-whisper lives there, not on the service)"""
+        return register_audio_models()
+
     @property
     def whisper_model(self):
-        if self._whisper_model is None:
-            try:
-                from faster_whisper import WhisperModel
-                print("Loading faster-whisper model (base)...")
-                self._whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
-                print("[OK] faster-whisper model loaded!")
-            except Exception as e:
-                print(f"[ERROR] Error loading faster-whisper: {e}")
-                self._whisper_model = None
-        return self._whisper_model
+        try:
+            return self.models.get(FASTER_WHISPER)
+        except Exception as e:
+            print(f"[ERROR] Error loading faster-whisper: {e}")
+            return None
 
     @property
     def diarizer(self):
@@ -47,34 +49,54 @@ class AudioService:
                 self._diarizer = None
         return self._diarizer
 
-    def transcribe_realtime(self, audio_path, language='vi'):
-        """Wrapper for realtime transcription logic"""
-        model = self.whisper_model
-        if not model:
+    def transcribe_realtime(self, audio_path, language='vi', initial_prompt=None):
+        """Wrapper for realtime transcription logic.
+
+        ``audio_path`` may also be a 16 kHz mono float32 array (live streaming).
+        """
+        if not self.whisper_model:
             raise RuntimeError("Whisper model not available")
             
-        segments, info = model.transcribe(
-            audio_path,
-            language=language,
-            beam_size=1,
-            vad_filter=True,
-            condition_on_previous_text=False,
-            # Anti-hallucination settings
-            temperature=0.0,
-            compression_ratio_threshold=2.4,
-            log_prob_threshold=-1.0,
-            no_speech_threshold=0.6,
-            initial_prompt=None
-        )
-        return list(segments)
-
-    def diarize(self, audio_path):
+        with self.models.use(FASTER_WHISPER) as model:
+            # Greedy, VAD-filtered, anti-hallucination settings
+            segments, info = model.transcribe(
+                audio_path,
+                language=language,
+                initial_prompt=initial_prompt,
+                **WHISPER_OPTIONS
+            )
+            return list(segments)
+
+    def create_online_diarizer(self):
+        """Incremental diarizer for a live session, or None if speaker embeddings are unavailable"""
+        diarizer = self.diarizer
+        if not diarizer:
+            return None
+        try:
+            diarizer.load_embedding_model()
+        except Exception as e:
+            print(f"[WARN] Online diarization disabled: {e}")
+            return None
+        return OnlineDiarizer(diarizer.embed)
+
+    def transcribe_file(self, audio_path, language='vi', on_progress=None, audio=None):
+        """Offline transcription of a whole file, split across CPU cores.
+
+        Args:
+            audio: Already decoded DecodedAudio to reuse (decoded here if None)
+
+        Returns:
+            (transcript text, timed segments)
+        """
+        return transcribe_file_parallel(audio_path, language, on_progress, audio=audio)
+
+    def diarize(self, audio_path, audio=None):
         """Wrapper for diarization"""
         diarizer = self.diarizer
         if not diarizer:
             return []
         try:
-            return diarizer.diarize_audio(audio_path)
+            return diarizer.diarize_audio(audio_path, audio)
         except Exception as e:
             print(f"Diarization failed: {e}")
             return []
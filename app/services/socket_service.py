@@ -1,25 +1,60 @@
-import base64
-import tempfile
 import json
 from flask import request
-from flask_socketio import emit
-from pathlib import Path
+from flask_socketio import emit, join_room, leave_room
 from .audio_service import audio_service
+from backend.audio.frame_buffer import ACCEPTED, AudioFrameBuffer
+from backend.audio.speaker_index import SpeakerIndex
+from backend.audio.streaming_transcriber import StreamingSession
+from backend.config import Settings
 
 # Store audio chunks per session
 audio_buffers = {}
 
+# Set by init_socket_events; workers emit through it (no request context there)
+_socketio = None
+
 def init_socket_events(socketio):
+    global _socketio
+    _socketio = socketio
+    # Transcription runs on the live worker pool, never in the event handlers
+    from backend.utils.session_workers import get_session_pool
+    pool = get_session_pool()
+    
+    # Push background job updates to clients subscribed to the job's room
+    from backend.utils.job_queue import get_job_queue
+    job_queue = get_job_queue()
+    job_queue.add_listener(lambda job_id, job: socketio.emit('job_update', job, to=job_id))
+
+    @socketio.on('job_subscribe')
+    def handle_job_subscribe(data):
+        job_id = (data or {}).get('job_id')
+        job = job_queue.get(job_id) if job_id else None
+        if job is None:
+            emit('error', {'message': 'Job not found'})
+            return
+        join_room(job_id)
+        job.pop('params', None)
+        emit('job_update', job)
+
+    @socketio.on('job_unsubscribe')
+    def handle_job_unsubscribe(data):
+        job_id = (data or {}).get('job_id')
+        if job_id:
+            leave_room(job_id)
     
     @socketio.on('connect')
     def handle_connect():
         print(f"Client connected: {request.sid}")
         # Initialize buffer structure
         audio_buffers[request.sid] = {
-            'raw_audio': [],
-            'segments': [], 
-            'temp_file': tempfile.NamedTemporaryFile(suffix='.webm', delete=False).name,
-            'diarization_segments': []
+            'sid': request.sid,
+            'chunks': 0,
+            'stream': None,
+            'segments': [],
+            'committed': [],
+            'speakers': [],
+            'diarization_version': 0,
+            'frames': AudioFrameBuffer()
         }
         emit('connected', {'status': 'ready'})
 
@@ -27,95 +62,30 @@ def init_socket_events(socketio):
     def handle_disconnect():
         print(f"Client disconnected: {request.sid}")
         if request.sid in audio_buffers:
-            # Cleanup
-            try:
-                temp_file = audio_buffers[request.sid].get('temp_file')
-                if temp_file and Path(temp_file).exists():
-                    Path(temp_file).unlink()
-            except Exception as e:
-                print(f"Error cleaning up temp file: {e}")
-            del audio_buffers[request.sid]
-
-    @socketio.on('audio_chunk')
-    def handle_audio_chunk(data):
+            session_data = audio_buffers.pop(request.sid)
+            pool.close(request.sid, lambda: _cleanup_session(session_data))
+
+    @socketio.on('audio_frame')
+    def handle_audio_frame(data):
+        """Binary audio frame: {'seq': int, 'audio': bytes, 'language': str}."""
         try:
             session_id = request.sid
             if session_id not in audio_buffers:
                 return # Should not happen if connect handled
 
-            audio_data = base64.b64decode(data['audio'])
-            language = data.get('language', 'vi')
-            
             session_data = audio_buffers[session_id]
-            session_data['raw_audio'].append(audio_data)
-            
-            with open(session_data['temp_file'], 'ab') as f:
-                f.write(audio_data)
-            
-            chunk_num = len(session_data['raw_audio'])
-            print(f"Received chunk #{chunk_num} from {session_id}")
-
-            # Transcribe
-            try:
-                segments = audio_service.transcribe_realtime(session_data['temp_file'], language)
-                
-                # Diarization (Periodic)
-                if chunk_num % 5 == 0:
-                     new_segments = audio_service.diarize(session_data['temp_file'])
-                     if new_segments:
-                         session_data['diarization_segments'] = new_segments
-                         print(f"[OK] Diarization updated: {len(new_segments)} speakers")
-
-                # Map Speakers
-                diarization_segments = session_data.get('diarization_segments', [])
-                current_transcript = []
-                
-                if not diarization_segments:
-                     full_text = " ".join([s.text.strip() for s in segments])
-                     if full_text.strip():
-                        current_transcript = [{
-                            'speaker': 'Guest-1',
-                            'text': full_text,
-                            'start': segments[0].start if segments else 0,
-                            'end': segments[-1].end if segments else 0
-                        }]
-                else:
-                    for seg in segments:
-                        text = seg.text.strip()
-                        if not text: continue
-                        
-                        seg_mid = (seg.start + seg.end) / 2
-                        best_speaker = "Guest-1"
-                        for d_seg in diarization_segments:
-                            if d_seg['start'] <= seg_mid <= d_seg['end']:
-                                best_speaker = d_seg['speaker']
-                                break
-                        
-                        if current_transcript and current_transcript[-1]['speaker'] == best_speaker:
-                             current_transcript[-1]['text'] += " " + text
-                             current_transcript[-1]['end'] = seg.end
-                        else:
-                            current_transcript.append({
-                                'speaker': best_speaker,
-                                'text': text,
-                                'start': seg.start,
-                                'end': seg.end
-                            })
-
-                session_data['segments'] = current_transcript
-                
-                emit('transcript_update', {
-                    'segments': current_transcript,
-                    'is_final': False,
-                    'chunk': chunk_num
-                })
-                
-            except Exception as e:
-                print(f"Transcription error: {e}")
-                emit('error', {'message': str(e)})
+            frames = session_data['frames']
+            status = frames.push(data.get('seq'), data.get('audio'))
+            emit('audio_ack', frames.ack(status))
+            if status != ACCEPTED:
+                return
+
+            # Frames arriving while this session is busy are coalesced into the next run
+            language = data.get('language', 'vi')
+            pool.submit(session_id, lambda: _process_frames(session_data, language))
 
         except Exception as e:
-            print(f"Error handling chunk: {e}")
+            print(f"Error handling audio frame: {e}")
             emit('error', {'message': str(e)})
 
     @socketio.on('stop_recording')
@@ -123,22 +93,155 @@ def init_socket_events(socketio):
         try:
             session_id = request.sid
             if session_id in audio_buffers:
-                session_data = audio_buffers[session_id]
-                
-                final_text = ""
-                if 'segments' in session_data:
-                    final_text = "\n".join([f"[{s['speaker']}] {s['text']}" for s in session_data['segments']])
-                
-                emit('transcript_final', {'text': final_text})
-                
-                # Cleanup
-                try:
-                    temp_file = session_data.get('temp_file')
-                    if temp_file and Path(temp_file).exists():
-                        Path(temp_file).unlink()
-                except:
-                    pass
-                del audio_buffers[session_id]
+                session_data = audio_buffers.pop(session_id)
+                language = (data or {}).get('language', 'vi')
+                pool.close(session_id, lambda: _finish_session(session_data, language))
                 
         except Exception as e:
             print(f"Error stopping: {e}")
+
+
+def get_live_stats():
+    """Live transcription metrics: worker queue depth, per-session lag and frame buffers."""
+    from backend.utils.session_workers import get_session_pool
+
+    stats = get_session_pool().get_stats()
+    for session_id, session in stats['per_session'].items():
+        session_data = audio_buffers.get(session_id)
+        if session_data is not None:
+            frames = session_data['frames']
+            session.update(frames_buffered=frames.depth, bytes_buffered=frames.nbytes, chunks=session_data['chunks'])
+    return stats
+
+
+def _send(session_data, event, payload):
+    """Emit to one session's client (works from worker threads)."""
+    _socketio.emit(event, payload, to=session_data['sid'])
+
+
+def _finish_session(session_data, language):
+    """Process the remaining frames, flush the streaming window and send the final transcript."""
+    _process_frames(session_data, language)
+    stream = session_data.get('stream')
+    if stream is not None:
+        try:
+            update = stream.close()
+            session_data['stream'] = None
+            _emit_update(session_data, update, session_data['chunks'], False, is_final=True)
+        except Exception as e:
+            print(f"Error flushing stream: {e}")
+    
+    final_text = "\n".join([f"[{s['speaker']}] {s['text']}" for s in session_data['segments']])
+    
+    _send(session_data, 'transcript_final', {'text': final_text})
+    _cleanup_session(session_data)
+
+
+def _process_frames(session_data, language):
+    """Feed buffered frames to the session's stream and emit the transcript update."""
+    audio_data, last_seq = session_data['frames'].drain()
+    if last_seq is None:
+        return
+    session_data['chunks'] += 1
+    chunk_num = session_data['chunks']
+
+    # Transcribe (and diarize) only the newly decoded audio
+    try:
+        if session_data['stream'] is None:
+            session_data['stream'] = _create_stream(language)
+        stream = session_data['stream']
+        update = stream.feed(audio_data)
+
+        # Background re-clustering may have renamed earlier speakers
+        relabeled = False
+        if stream.diarizer is not None and stream.diarizer.version != session_data['diarization_version']:
+            session_data['diarization_version'] = stream.diarizer.version
+            relabeled = True
+
+        if update is not None or relabeled:
+            _emit_update(session_data, update, chunk_num, relabeled)
+
+    except Exception as e:
+        print(f"Transcription error: {e}")
+        _send(session_data, 'error', {'message': str(e)})
+    finally:
+        # Buffer is empty again: let a paused client resume
+        _send(session_data, 'audio_ack', session_data['frames'].ack())
+
+
+def _create_stream(language):
+    """Start the incremental decoder/transcriber (and online diarizer) for a live session."""
+    return StreamingSession(
+        lambda audio, prompt: audio_service.transcribe_realtime(audio, language, initial_prompt=prompt),
+        diarizer=audio_service.create_online_diarizer()
+    )
+
+
+def _cleanup_session(session_data):
+    """Stop the decoder of an abandoned session."""
+    stream = session_data.get('stream')
+    if stream is not None:
+        stream.abort()
+
+
+def _emit_update(session_data, update, chunk_num, relabeled, is_final=False):
+    """Send the transcript delta for one update.
+
+    ``committed`` holds turns that changed or were added since the last
+    update (starting at index ``committed_from``), ``tentative`` the
+    not-yet-final tail: clients replace their turns from ``committed_from``
+    on and the tail, so the payload stays small however long the
+    recording gets. The full list (``segments``, committed turns +
+    tentative) is only sent with LIVE_FULL_SEGMENTS=true, for clients
+    that re-render everything.
+    """
+    turns = session_data['segments']
+    new_committed = update['committed'] if update else []
+    tentative = update['tentative'] if update else []
+    session_data['committed'].extend(new_committed)
+    if update and 'speakers' in update:
+        session_data['speakers'].extend(update['speakers'])
+
+    stream = session_data.get('stream')
+    if relabeled and stream is not None:
+        # Speaker labels may have changed anywhere in the recording
+        session_data['speakers'] = stream.diarizer.segments()
+        turns[:] = _assign_speakers(session_data['committed'], session_data['speakers'])
+        changed_from = 0
+    else:
+        changed_from = max(len(turns) - 1, 0)
+        _assign_speakers(new_committed, update.get('speakers', []) if update else [], turns)
+
+    # Tentative text has no speaker yet: continue the current turn
+    last_speaker = turns[-1]['speaker'] if turns else "Guest-1"
+    tentative_turns = _assign_speakers(tentative, [], default_speaker=last_speaker)
+    payload = {
+        'committed': turns[changed_from:],
+        'committed_from': changed_from,
+        'tentative': tentative_turns,
+        'relabeled': relabeled,
+        'is_final': is_final,
+        'chunk': chunk_num
+    }
+    if Settings.LIVE_FULL_SEGMENTS:
+        payload['segments'] = turns + tentative_turns
+    _send(session_data, 'transcript_update', payload)
+
+
+def _assign_speakers(segments, diarization_segments, turns=None, default_speaker="Guest-1"):
+    """Label segments with the speaker they overlap most and merge same-speaker turns."""
+    turns = [] if turns is None else turns
+    index = SpeakerIndex(diarization_segments)
+    for seg in segments:
+        best_speaker = index.speaker_at(seg['start'], seg['end'], default_speaker)
+
+        if turns and turns[-1]['speaker'] == best_speaker:
+            turns[-1] = dict(turns[-1], text=turns[-1]['text'] + " " + seg['text'], end=seg['end'])
+        else:
+            turns.append({
+                'speaker': best_speaker,
+                'text': seg['text'],
+                'start': seg['start'],
+                'end': seg['end']
+            })
+    return turns
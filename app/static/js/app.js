@@ -109,6 +109,8 @@ function initializeSocket() {
         handleFinalTranscript(data.text);
     });
 
+    socket.on('audio_ack', handleAudioAck);
+
     socket.on('error', (data) => {
         console.error('WebSocket error:', data.message);
         updateTranscript('❌ Lỗi: ' + data.message);
@@ -352,6 +354,7 @@ async function startMicrophoneRecording() {
             mimeType: 'audio/webm;codecs=opus'
         });
         audioChunks = [];
+        resetAudioFrames();
         isRealtimeTranscription = currentRecordingConfig.realtimeMode;
 
         mediaRecorder.ondataavailable = (event) => {
@@ -381,17 +384,75 @@ async function startMicrophoneRecording() {
     }
 }
 
+// Live audio goes out as binary frames with sequence numbers. The server acks
+// each frame, asks us to pause while its buffer is full (chunks recorded
+// meanwhile are coalesced into one frame) and tells us where to resend from
+// if a frame was rejected.
+const MAX_INFLIGHT_FRAMES = 8;
+let audioFrames = null;
+
+function resetAudioFrames() {
+    audioFrames = {
+        nextSeq: 0,
+        inflight: new Map(),   // seq -> Blob, until acked
+        pending: [],           // Blobs not sent yet
+        paused: false,
+        sending: Promise.resolve(),
+        finishLanguage: null
+    };
+}
+
 function sendAudioChunk(audioBlob) {
-    // Convert blob to base64 and send via WebSocket
-    const reader = new FileReader();
-    reader.onloadend = () => {
-        const base64Audio = reader.result.split(',')[1];
-        socket.emit('audio_chunk', {
-            audio: base64Audio,
+    if (!audioFrames) resetAudioFrames();
+    audioFrames.pending.push(audioBlob);
+    pumpAudioFrames();
+}
+
+function pumpAudioFrames() {
+    const frames = audioFrames;
+    if (!frames || frames.paused || frames.pending.length === 0 || frames.inflight.size >= MAX_INFLIGHT_FRAMES) {
+        return;
+    }
+    const blob = new Blob(frames.pending.splice(0));
+    const seq = frames.nextSeq++;
+    frames.inflight.set(seq, blob);
+    // Chain sends so frames leave in sequence order
+    frames.sending = frames.sending
+        .then(() => blob.arrayBuffer())
+        .then(buffer => socket.emit('audio_frame', {
+            seq: seq,
+            audio: buffer,
             language: currentRecordingConfig.language
-        });
-    };
-    reader.readAsDataURL(audioBlob);
+        }));
+}
+
+function handleAudioAck(ack) {
+    const frames = audioFrames;
+    if (!frames) return;
+    for (const seq of Array.from(frames.inflight.keys())) {
+        if (seq <= ack.seq) frames.inflight.delete(seq);
+    }
+    if (ack.rejected !== null && ack.rejected !== undefined) {
+        // Go back: everything not accepted is sent again, in order
+        const resend = Array.from(frames.inflight.keys()).sort((a, b) => a - b).map(seq => frames.inflight.get(seq));
+        frames.inflight.clear();
+        frames.pending.unshift(...resend);
+        frames.nextSeq = ack.rejected;
+    }
+    frames.paused = ack.paused;
+    pumpAudioFrames();
+    finishAudioFrames();
+}
+
+function finishAudioFrames(language) {
+    // Ask for the final transcript once every frame has been acked
+    const frames = audioFrames;
+    if (!frames) return;
+    if (language !== undefined) frames.finishLanguage = language;
+    if (frames.finishLanguage !== null && frames.pending.length === 0 && frames.inflight.size === 0) {
+        socket.emit('stop_recording', { language: frames.finishLanguage });
+        frames.finishLanguage = null;
+    }
 }
 
 // ============================================================================
@@ -528,11 +589,11 @@ function stopRecording() {
             timerInterval = null;
         }
 
-        // Notify server to process final transcription
+        // Notify server to process final transcription, after the last
+        // chunk (delivered just before 'stop') has been acked
         if (socket && isRealtimeTranscription) {
-            socket.emit('stop_recording', {
-                language: currentRecordingConfig.language
-            });
+            const language = currentRecordingConfig.language;
+            mediaRecorder.addEventListener('stop', () => finishAudioFrames(language), { once: true });
         }
 
         // Stop all tracks
@@ -710,7 +771,14 @@ function updateTranscript(text_or_data) {
         return;
     }
 
-    // Handle segment-based updates
+    // Incremental updates: replace turns from committed_from on and the tentative tail
+    if (text_or_data && Array.isArray(text_or_data.committed)) {
+        applyTranscriptDelta(container, text_or_data);
+        container.scrollTop = container.scrollHeight;
+        return;
+    }
+
+    // Handle segment-based updates (full transcript, LIVE_FULL_SEGMENTS=true)
     if (text_or_data && text_or_data.segments) {
         // We will rebuild the view for simplicity to keep sync
         // Optimization: In production, we should diff.
@@ -746,6 +814,42 @@ function updateTranscript(text_or_data) {
     }
 }
 
+// Raw speaker label -> 1, 2, 3... for the live transcript (colors stay stable across updates)
+let liveSpeakerMap = {};
+
+function applyTranscriptDelta(container, data) {
+    const from = data.committed_from || 0;
+
+    if (from === 0) {
+        // Start of a recording or speakers relabeled: everything is re-sent
+        container.querySelectorAll('.chat-bubble').forEach(el => el.remove());
+        liveSpeakerMap = {};
+    } else {
+        container.querySelectorAll('.chat-bubble').forEach(el => {
+            if (el.classList.contains('tentative') || Number(el.dataset.turn) >= from) {
+                el.remove();
+            }
+        });
+    }
+
+    const append = (seg, turn) => {
+        const rawSpeaker = seg.speaker || 'Guest-1';
+        if (!liveSpeakerMap[rawSpeaker]) {
+            liveSpeakerMap[rawSpeaker] = Object.keys(liveSpeakerMap).length + 1;
+        }
+        const bubble = createBubble(rawSpeaker.replace('SPEAKER_', 'Guest-'), seg.text, liveSpeakerMap[rawSpeaker]);
+        if (turn === null) {
+            bubble.classList.add('tentative');
+        } else {
+            bubble.dataset.turn = turn;
+        }
+        container.appendChild(bubble);
+    };
+
+    data.committed.forEach((seg, i) => append(seg, from + i));
+    (data.tentative || []).forEach(seg => append(seg, null));
+}
+
 function createBubble(speakerName, text, speakerIndex = 1) {
     // Determine class based on speaker index to alternate colors
     // 1 -> speaker-1 (Left, Blue)
@@ -0,0 +1,100 @@
+// File Hash Module - incremental SHA-256 of a File, read in chunks
+//
+// crypto.subtle needs the whole file in memory and is missing on plain-HTTP
+// origins other than localhost, so the digest is computed here block by
+// block. hashFile() gives up (returns null) once its time budget is spent;
+// callers then look the file up by name only.
+(function () {
+    const K = new Uint32Array([
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+    ]);
+
+    class Sha256 {
+        constructor() {
+            this.state = new Uint32Array([
+                0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+            ]);
+            this.w = new Uint32Array(64);
+            this.buffer = new Uint8Array(64);
+            this.buffered = 0;
+            this.length = 0;
+        }
+
+        // Compress one 64-byte block starting at offset
+        block(bytes, offset) {
+            const w = this.w;
+            const s = this.state;
+            for (let i = 0; i < 16; i++) {
+                const j = offset + i * 4;
+                w[i] = (bytes[j] << 24) | (bytes[j + 1] << 16) | (bytes[j + 2] << 8) | bytes[j + 3];
+            }
+            for (let i = 16; i < 64; i++) {
+                const a = w[i - 15];
+                const b = w[i - 2];
+                const s0 = ((a >>> 7) | (a << 25)) ^ ((a >>> 18) | (a << 14)) ^ (a >>> 3);
+                const s1 = ((b >>> 17) | (b << 15)) ^ ((b >>> 19) | (b << 13)) ^ (b >>> 10);
+                w[i] = (w[i - 16] + s0 + w[i - 7] + s1) | 0;
+            }
+            let a = s[0], b = s[1], c = s[2], d = s[3], e = s[4], f = s[5], g = s[6], h = s[7];
+            for (let i = 0; i < 64; i++) {
+                const S1 = ((e >>> 6) | (e << 26)) ^ ((e >>> 11) | (e << 21)) ^ ((e >>> 25) | (e << 7));
+                const t1 = (h + S1 + ((e & f) ^ (~e & g)) + K[i] + w[i]) | 0;
+                const S0 = ((a >>> 2) | (a << 30)) ^ ((a >>> 13) | (a << 19)) ^ ((a >>> 22) | (a << 10));
+                const t2 = (S0 + ((a & b) ^ (a & c) ^ (b & c))) | 0;
+                h = g; g = f; f = e; e = (d + t1) | 0;
+                d = c; c = b; b = a; a = (t1 + t2) | 0;
+            }
+            s[0] += a; s[1] += b; s[2] += c; s[3] += d;
+            s[4] += e; s[5] += f; s[6] += g; s[7] += h;
+        }
+
+        update(bytes) {
+            let i = 0;
+            this.length += bytes.length;
+            if (this.buffered) {
+                while (this.buffered < 64 && i < bytes.length) this.buffer[this.buffered++] = bytes[i++];
+                if (this.buffered < 64) return;
+                this.block(this.buffer, 0);
+                this.buffered = 0;
+            }
+            for (; i + 64 <= bytes.length; i += 64) this.block(bytes, i);
+            while (i < bytes.length) this.buffer[this.buffered++] = bytes[i++];
+        }
+
+        hex() {
+            const bits = this.length * 8;
+            const tail = new Uint8Array(this.buffered < 56 ? 64 : 128);
+            tail.set(this.buffer.subarray(0, this.buffered));
+            tail[this.buffered] = 0x80;
+            const view = new DataView(tail.buffer);
+            view.setUint32(tail.length - 8, Math.floor(bits / 0x100000000));
+            view.setUint32(tail.length - 4, bits >>> 0);
+            for (let offset = 0; offset < tail.length; offset += 64) this.block(tail, offset);
+            return Array.from(this.state, word => word.toString(16).padStart(8, '0')).join('');
+        }
+    }
+
+    /**
+     * SHA-256 of a File, reading chunkSize bytes at a time.
+     * @returns {Promise<string|null>} hex digest, or null if budgetMs ran out first
+     */
+    async function hashFile(file, { budgetMs = 1500, chunkSize = 4 << 20 } = {}) {
+        const deadline = performance.now() + budgetMs;
+        const sha = new Sha256();
+        for (let offset = 0; offset < file.size; offset += chunkSize) {
+            if (performance.now() > deadline) return null;
+            const chunk = await file.slice(offset, offset + chunkSize).arrayBuffer();
+            sha.update(new Uint8Array(chunk));
+        }
+        return sha.hex();
+    }
+
+    window.hashFile = hashFile;
+})();
@@ -1,93 +1,349 @@
-"""Audio quality validation before processing."""
+"""Audio quality validation before processing.
 
-import librosa
-import numpy as np
+Validation runs in constant memory: the header is checked first (size,
+sample rate and duration fail without decoding anything), then samples are
+streamed block by block from soundfile or an ffmpeg pipe, and streaming
+stops as soon as a failure is certain.
+
+The upload pipeline probes the header once and runs the sample checks
+(QualityCheck) on the blocks of its own decode, so the file is read a
+single time and a bad file stops the decode early.
+"""
+
+import re
+import subprocess
+from contextlib import closing
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+from .decoded_audio import DecodedAudio
+
+MIN_SAMPLE_RATE = 8000
+MIN_DURATION = 1            # seconds
+MAX_DURATION = 7200         # 2 hours
+MIN_PEAK = 0.01
+CLIP_LEVEL = 0.99
+MAX_CLIPPING_RATE = 0.01    # 1% of samples
+MAX_FILE_MB = 500
+BLOCK_FRAMES = 65536
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_STREAM = re.compile(r"Audio: .*?(\d+) Hz, ([^,]+)")
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "quad": 4, "5.0": 5, "5.1": 6, "7.1": 8}
+
+
+class _StreamStats:
+    """Sample count, peak amplitude and clipped-sample count, updated per block."""
+
+    def __init__(self):
+        self.count = 0
+        self.peak = 0.0
+        self.clipped = 0
+
+    def update(self, block: np.ndarray):
+        if not len(block):
+            return
+        magnitude = np.abs(block)
+        self.count += len(block)
+        self.peak = max(self.peak, float(magnitude.max()))
+        self.clipped += int(np.count_nonzero(magnitude > CLIP_LEVEL))
+
+
+class AudioRejected(Exception):
+    """Raised by QualityCheck.feed once the file has certainly failed validation."""
+
+
+class QualityCheck:
+    """Sample checks (duration, amplitude, clipping) fed one block at a time.
+
+    ``feed`` can be passed as the block callback of DecodedAudio.from_file:
+    it raises AudioRejected as soon as the outcome is certain, which stops
+    the decode. ``result`` gives the verdict once every block was fed.
+    """
+
+    def __init__(self, header: Dict, rate: int):
+        """Initialize check.
+
+        Args:
+            header: Output of probe_audio (its duration bounds the clipping check)
+            rate: Sample rate of the blocks that will be fed
+        """
+        self.rate = rate
+        self.expected = header["duration"] * rate if header["duration"] else None
+        self.stats = _StreamStats()
+
+    def feed(self, block: np.ndarray):
+        """Add a block of mono samples.
+
+        Raises:
+            AudioRejected: If the audio is already too long or too clipped
+        """
+        self.stats.update(block)
+        if self.stats.count > MAX_DURATION * self.rate:
+            raise AudioRejected(_check_duration(self.stats.count / self.rate))
+        if self.expected and self.stats.clipped > MAX_CLIPPING_RATE * self.expected:
+            clipping_rate = self.stats.clipped / self.expected
+            raise AudioRejected(
+                f"❌ Audio bị clipping/distortion (>{clipping_rate*100:.1f}% samples). Giảm volume khi record."
+            )
+
+    def result(self, audio_path: str, source_sample_rate: int) -> Tuple[bool, str]:
+        """Verdict after all blocks were fed.
+
+        Args:
+            audio_path: Validated file (for the size in the message)
+            source_sample_rate: Sample rate of the original file
+
+        Returns:
+            (is_valid, message)
+        """
+        stats = self.stats
+        duration = stats.count / self.rate
+
+        # 1. Check sample rate
+        if source_sample_rate < MIN_SAMPLE_RATE:
+            return False, f"❌ Sample rate quá thấp ({source_sample_rate}Hz). Cần ít nhất 8kHz để transcribe chính xác."
+
+        # 2. Check duration
+        failed = _check_duration(duration)
+        if failed:
+            return False, failed
+
+        # 3. Check if audio is too quiet
+        if stats.peak < MIN_PEAK:
+            return False, "❌ Audio quá nhỏ/yếu (max amplitude < 0.01). Tăng volume khi record hoặc dùng audio editor."
+
+        # 4. Check for clipping (distortion)
+        clipping_rate = stats.clipped / stats.count
+        if clipping_rate > MAX_CLIPPING_RATE:
+            return False, f"❌ Audio bị clipping/distortion ({clipping_rate*100:.1f}% samples). Giảm volume khi record."
+
+        # All checks passed
+        file_size_mb = Path(audio_path).stat().st_size / (1024 * 1024)
+        return True, f"✅ Audio quality OK ({duration:.1f}s, {source_sample_rate}Hz, {file_size_mb:.1f}MB)"
+
+
+def _ffmpeg_path() -> Optional[str]:
+    from backend.utils.ffmpeg_helper import get_ffmpeg_path
+    return get_ffmpeg_path()
+
+
+def probe_audio(audio_path: str) -> Dict:
+    """Read format information from the file header (no decoding).
+
+    Returns:
+        dict with sample_rate, channels, duration (seconds) and reader
+        ("soundfile" or "ffmpeg"); values are None when unknown
+    """
+    info = {"sample_rate": None, "channels": None, "duration": None, "reader": None}
+
+    if sf is not None:
+        try:
+            header = sf.info(audio_path)
+            info.update(
+                sample_rate=header.samplerate,
+                channels=header.channels,
+                duration=header.frames / header.samplerate if header.frames > 0 else None,
+                reader="soundfile"
+            )
+            return info
+        except Exception:
+            pass  # Not a libsndfile format, try ffmpeg
 
+    ffmpeg = _ffmpeg_path()
+    if ffmpeg:
+        # ffmpeg exits with an error without an output file, but prints the header first
+        result = subprocess.run(
+            [ffmpeg, "-nostdin", "-hide_banner", "-i", audio_path],
+            capture_output=True, text=True, errors="replace"
+        )
+        stream = _STREAM.search(result.stderr)
+        if stream:
+            layout = stream.group(2).strip()
+            channels = re.match(r"(\d+) channels", layout)
+            info.update(
+                sample_rate=int(stream.group(1)),
+                channels=int(channels.group(1)) if channels else _CHANNEL_LAYOUTS.get(layout.split("(")[0], 1),
+                reader="ffmpeg"
+            )
+            duration = _DURATION.search(result.stderr)
+            if duration:
+                hours, minutes, seconds = duration.groups()
+                info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
-def validate_audio_quality(audio_path: str) -> Tuple[bool, str]:
+    return info
+
+
+def iter_audio_blocks(audio_path: str, reader: str = "soundfile", block_frames: int = BLOCK_FRAMES) -> Iterator[np.ndarray]:
+    """Stream mono float32 samples at the file's own sample rate.
+
+    Args:
+        audio_path: Path to audio file
+        reader: "soundfile" or "ffmpeg" (see probe_audio)
+        block_frames: Frames per block
+
+    Yields:
+        Blocks of at most ``block_frames`` samples (channels averaged)
+    """
+    if reader == "soundfile":
+        for block in sf.blocks(audio_path, blocksize=block_frames, dtype="float32", always_2d=True):
+            yield block.mean(axis=1)
+        return
+
+    process = subprocess.Popen(
+        [_ffmpeg_path(), "-nostdin", "-v", "error", "-i", audio_path, "-f", "f32le", "-ac", "1", "pipe:1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            data = process.stdout.read(block_frames * 4)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 4], dtype="<f4")
+    finally:
+        # Also reached when the caller stops early
+        process.kill()
+        process.stdout.close()
+        process.wait()
+
+
+def check_audio_header(audio_path: str, header: Optional[Dict] = None) -> Tuple[bool, str]:
+    """Checks that need no decoding: file size, sample rate and duration.
+
+    Args:
+        audio_path: Path to audio file
+        header: Output of probe_audio (probed here if None)
+
+    Returns:
+        (is_valid, message): message is empty when nothing failed; values the
+        header does not provide are left to validate_audio_quality
+    """
+    file_size_mb = Path(audio_path).stat().st_size / (1024 * 1024)
+    if file_size_mb > MAX_FILE_MB:
+        return False, f"❌ File quá lớn ({file_size_mb:.0f}MB). Giới hạn 500MB. Compress hoặc chia nhỏ file."
+
+    header = header or probe_audio(audio_path)
+    sr = header["sample_rate"]
+    if sr is not None and sr < MIN_SAMPLE_RATE:
+        return False, f"❌ Sample rate quá thấp ({sr}Hz). Cần ít nhất 8kHz để transcribe chính xác."
+
+    duration = header["duration"]
+    if duration is not None:
+        failed = _check_duration(duration)
+        if failed:
+            return False, failed
+
+    return True, ""
+
+
+def _check_duration(duration: float) -> Optional[str]:
+    if duration < MIN_DURATION:
+        return "❌ Audio quá ngắn (<1 giây). Không đủ nội dung để transcribe."
+    if duration > MAX_DURATION:
+        duration_min = duration / 60
+        return f"❌ Audio quá dài ({duration_min:.1f} phút). Vui lòng chia nhỏ file (<2 giờ)."
+    return None
+
+
+def validate_audio_quality(
+    audio_path: str,
+    audio: Optional[DecodedAudio] = None,
+    header: Optional[Dict] = None
+) -> Tuple[bool, str]:
     """
     Validate audio file quality before transcription.
-    
+
     Checks:
     - Sample rate (>=8kHz)
     - Duration (1s - 2h)
     - Amplitude (not too quiet)
     - Clipping (not distorted)
     - File size (<500MB)
-    
+
+    Header checks run first; samples are then streamed in fixed-size
+    blocks, so memory use does not depend on the file length.
+
     Args:
         audio_path: Path to audio file
-        
+        audio: The file already decoded (shared with transcription); the
+            file is streamed if None
+        header: Output of probe_audio (probed here if None)
+
     Returns:
         (is_valid, message): True if valid, else False with error message
     """
+    decoded = None
     try:
-        # Load audio
-        y, sr = librosa.load(audio_path, sr=None)
-        duration = len(y) / sr
-        
-        # 1. Check sample rate
-        if sr < 8000:
-            return False, f"❌ Sample rate quá thấp ({sr}Hz). Cần ít nhất 8kHz để transcribe chính xác."
-        
-        # 2. Check duration
-        if duration < 1:
-            return False, "❌ Audio quá ngắn (<1 giây). Không đủ nội dung để transcribe."
-        
-        if duration > 7200:  # 2 hours
-            duration_min = duration / 60
-            return False, f"❌ Audio quá dài ({duration_min:.1f} phút). Vui lòng chia nhỏ file (<2 giờ)."
-        
-        # 3. Check if audio is too quiet
-        max_amplitude = np.max(np.abs(y))
-        if max_amplitude < 0.01:
-            return False, "❌ Audio quá nhỏ/yếu (max amplitude < 0.01). Tăng volume khi record hoặc dùng audio editor."
-        
-        # 4. Check for clipping (distortion)
-        clipping_samples = np.sum(np.abs(y) > 0.99)
-        clipping_rate = clipping_samples / len(y)
-        if clipping_rate > 0.01:  # >1% clipped
-            return False, f"❌ Audio bị clipping/distortion ({clipping_rate*100:.1f}% samples). Giảm volume khi record."
-        
-        # 5. Check file size
-        file_size_mb = Path(audio_path).stat().st_size / (1024 * 1024)
-        if file_size_mb > 500:
-            return False, f"❌ File quá lớn ({file_size_mb:.0f}MB). Giới hạn 500MB. Compress hoặc chia nhỏ file."
-        
-        # All checks passed
-        return True, f"✅ Audio quality OK ({duration:.1f}s, {sr}Hz, {file_size_mb:.1f}MB)"
-        
+        header = header or probe_audio(audio_path)
+        is_valid, message = check_audio_header(audio_path, header)
+        if not is_valid:
+            return False, message
+
+        if audio is None and header["reader"] is None:
+            # Neither soundfile nor ffmpeg can read it; decode to disk instead
+            decoded = DecodedAudio.from_file(audio_path)
+        source = audio or decoded
+        if source is not None:
+            sr = source.source_sample_rate
+            check = QualityCheck(header, source.sample_rate)
+            blocks = source.blocks()
+        else:
+            sr = header["sample_rate"]
+            check = QualityCheck(header, sr)
+            blocks = iter_audio_blocks(audio_path, header["reader"])
+
+        with closing(blocks):
+            for block in blocks:
+                # Stops as soon as the outcome is certain
+                check.feed(block)
+
+        return check.result(audio_path, sr)
+
+    except AudioRejected as e:
+        return False, str(e)
     except Exception as e:
         return False, f"❌ Lỗi khi đọc file audio: {str(e)}"
+    finally:
+        if decoded is not None:
+            decoded.close()
 
 
 def get_audio_info(audio_path: str) -> dict:
     """
     Get detailed audio information.
-    
+
+    Read from the header; samples are only streamed (and counted) when
+    the header has no duration.
+
     Returns:
         dict with duration, sample_rate, channels, file_size_mb
     """
     try:
-        y, sr = librosa.load(audio_path, sr=None, mono=False)
-        
-        # Handle stereo vs mono
-        if len(y.shape) > 1:
-            channels = y.shape[0]
-            duration = y.shape[1] / sr
-        else:
-            channels = 1
-            duration = len(y) / sr
-        
+        header = probe_audio(audio_path)
+        if header["reader"] is None:
+            raise RuntimeError("Unsupported audio format (soundfile/ffmpeg not available)")
+
+        sr = header["sample_rate"]
+        duration = header["duration"]
+        if duration is None:
+            with closing(iter_audio_blocks(audio_path, header["reader"])) as blocks:
+                duration = sum(len(block) for block in blocks) / sr
+
         file_size_mb = Path(audio_path).stat().st_size / (1024 * 1024)
-        
+
         return {
             "duration_seconds": duration,
             "duration_formatted": f"{int(duration // 60):02d}:{int(duration % 60):02d}",
             "sample_rate": sr,
-            "channels": channels,
+            "channels": header["channels"],
             "file_size_mb": round(file_size_mb, 2)
         }
     except Exception as e:
@@ -0,0 +1,243 @@
+"""Decode-once audio buffer shared by the upload pipeline.
+
+An uploaded file is decoded a single time to 16 kHz mono float32 and
+written to a temp file that is memory-mapped, so validation, Whisper,
+pyannote and the parallel transcriber's splitter all read the same pages
+instead of each decoding (and holding) their own copy.
+
+Slices returned by ``segment`` share the mapping and pickle as a file
+reference, so worker processes map the samples themselves instead of
+receiving a copy.
+"""
+
+import os
+import re
+import subprocess
+import tempfile
+import weakref
+from typing import Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+_BLOCK_BYTES = 1 << 20
+_SOURCE_RATE = re.compile(r"Audio: .*?(\d+) Hz")
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class DecodedAudio:
+    """16 kHz mono float32 samples backed by a memory-mapped temp file."""
+
+    sample_rate = SAMPLE_RATE
+
+    def __init__(
+        self,
+        cache_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        source_sample_rate: int = SAMPLE_RATE,
+        source_path: Optional[str] = None,
+        owner: bool = False
+    ):
+        """Map an already decoded sample file.
+
+        Args:
+            cache_path: Raw float32 little-endian samples
+            start: First sample of this view
+            end: End sample of this view (default: end of file)
+            source_sample_rate: Sample rate of the original file
+            source_path: Original file (for messages and hashing)
+            owner: Delete ``cache_path`` on close / garbage collection
+        """
+        total = os.path.getsize(cache_path) // 4
+        self.cache_path = cache_path
+        self.start = start
+        self.end = total if end is None else min(end, total)
+        self.source_sample_rate = source_sample_rate
+        self.source_path = source_path
+        self._samples = None
+        self._finalizer = weakref.finalize(self, _unlink, cache_path) if owner else None
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_file(
+        cls,
+        audio_path: str,
+        ffmpeg_path: Optional[str] = None,
+        on_block: Optional[Callable[[np.ndarray], None]] = None
+    ) -> "DecodedAudio":
+        """Decode a file with ffmpeg (or librosa if ffmpeg is missing).
+
+        The decoded samples are streamed to disk, so decoding itself never
+        holds the whole recording in memory.
+
+        Args:
+            audio_path: Any format ffmpeg/librosa can read
+            ffmpeg_path: ffmpeg executable (auto-detected if None)
+            on_block: Called with each decoded block (16 kHz mono float32),
+                e.g. QualityCheck.feed; an exception it raises stops the
+                decode and is re-raised
+
+        Raises:
+            RuntimeError: If the file cannot be decoded
+        """
+        if ffmpeg_path is None:
+            from backend.utils.ffmpeg_helper import get_ffmpeg_path
+            ffmpeg_path = get_ffmpeg_path()
+
+        fd, cache_path = tempfile.mkstemp(prefix="decoded_", suffix=".f32")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                if ffmpeg_path:
+                    source_rate = cls._decode_ffmpeg(ffmpeg_path, audio_path, out, on_block)
+                else:
+                    source_rate = cls._decode_librosa(audio_path, out, on_block)
+        except Exception:
+            _unlink(cache_path)
+            raise
+
+        audio = cls(cache_path, source_sample_rate=source_rate, source_path=audio_path, owner=True)
+        logger.info(f"Decoded {audio_path}: {audio.duration:.1f}s ({source_rate} Hz source)")
+        return audio
+
+    @classmethod
+    def from_array(cls, samples: np.ndarray, source_sample_rate: int = SAMPLE_RATE) -> "DecodedAudio":
+        """Wrap samples that are already 16 kHz mono (tests, live recordings)."""
+        fd, cache_path = tempfile.mkstemp(prefix="decoded_", suffix=".f32")
+        with os.fdopen(fd, "wb") as out:
+            out.write(np.asarray(samples, dtype="<f4").tobytes())
+        return cls(cache_path, source_sample_rate=source_sample_rate, owner=True)
+
+    @staticmethod
+    def _decode_ffmpeg(ffmpeg_path: str, audio_path: str, out, on_block=None) -> int:
+        with tempfile.TemporaryFile() as log:
+            process = subprocess.Popen(
+                [
+                    ffmpeg_path, "-nostdin", "-hide_banner", "-nostats",
+                    "-i", audio_path,
+                    "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"
+                ],
+                stdout=subprocess.PIPE,
+                stderr=log
+            )
+            try:
+                while True:
+                    block = process.stdout.read(_BLOCK_BYTES)
+                    if not block:
+                        break
+                    out.write(block)
+                    if on_block is not None:
+                        on_block(np.frombuffer(block[:len(block) - len(block) % 4], dtype="<f4"))
+            except BaseException:
+                # Stopped by on_block (or interrupted): don't decode the rest
+                process.kill()
+                process.stdout.close()
+                process.wait()
+                raise
+            process.stdout.close()
+            code = process.wait()
+            log.seek(0)
+            stderr = log.read().decode("utf-8", errors="replace")
+
+        if code != 0:
+            raise RuntimeError(f"ffmpeg could not decode {audio_path}: {stderr.strip()[-300:]}")
+        match = _SOURCE_RATE.search(stderr)
+        return int(match.group(1)) if match else SAMPLE_RATE
+
+    @staticmethod
+    def _decode_librosa(audio_path: str, out, on_block=None) -> int:
+        import librosa
+
+        source_rate = librosa.get_samplerate(audio_path)
+        samples, _ = librosa.load(audio_path, sr=SAMPLE_RATE, mono=True)
+        if on_block is not None:
+            on_block(samples.astype(np.float32, copy=False))
+        out.write(samples.astype("<f4").tobytes())
+        return source_rate
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The samples as a copy-on-write memmap (writes never reach the file)."""
+        if self._samples is None:
+            if self.end <= self.start:
+                self._samples = np.zeros(0, dtype=np.float32)
+            else:
+                self._samples = np.memmap(
+                    self.cache_path, dtype="<f4", mode="c",
+                    offset=self.start * 4, shape=(self.end - self.start,)
+                )
+        return self._samples
+
+    @property
+    def duration(self) -> float:
+        return len(self) / SAMPLE_RATE
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __array__(self, dtype=None, copy=None):
+        samples = self.samples
+        return samples if dtype is None else samples.astype(dtype, copy=False)
+
+    def segment(self, start: int, end: int) -> "DecodedAudio":
+        """View of samples [start, end) relative to this view, sharing the file."""
+        return DecodedAudio(
+            self.cache_path,
+            start=self.start + max(0, start),
+            end=self.start + min(end, len(self)),
+            source_sample_rate=self.source_sample_rate,
+            source_path=self.source_path
+        )
+
+    def blocks(self, block_seconds: float = 30.0) -> Iterator[np.ndarray]:
+        """Iterate over the samples in bounded-size blocks."""
+        size = int(block_seconds * SAMPLE_RATE)
+        samples = self.samples
+        for start in range(0, len(samples), size):
+            yield samples[start:start + size]
+
+    def pipeline_input(self) -> Dict:
+        """Input for a transformers ASR pipeline (no re-decoding)."""
+        return {"raw": self.samples, "sampling_rate": SAMPLE_RATE}
+
+    def pyannote_input(self) -> Dict:
+        """Input for a pyannote pipeline (the tensor shares the mapped memory)."""
+        import torch
+
+        return {"waveform": torch.from_numpy(self.samples).unsqueeze(0), "sample_rate": SAMPLE_RATE}
+
+    def close(self):
+        """Release the mapping and delete the temp file (owner only)."""
+        self._samples = None
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # Pickle as a reference: the receiver maps the file itself and never owns it
+        state = dict(self.__dict__)
+        state["_samples"] = None
+        state["_finalizer"] = None
+        return state
@@ -0,0 +1,112 @@
+"""Ordered, bounded buffer for binary live-audio frames.
+
+Clients send compressed audio as binary Socket.IO frames
+``{"seq": n, "audio": <bytes>, "language": ...}``. The stream is decoded
+as one continuous container, so frames cannot be skipped: the buffer only
+accepts the next expected sequence number (go-back-N). Every frame is
+acknowledged with the ``ack`` message:
+
+- ``seq``: last frame accepted; the client can forget frames up to it
+- ``rejected``: first frame the client must send again (buffer full or
+  out of order), else None
+- ``paused``: the buffer is above its high-water mark; the client should
+  hold new audio (coalescing it locally) until an ack with paused=False
+"""
+
+from collections import deque
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+MAX_BUFFER_BYTES = 2 * 1024 * 1024
+HIGH_WATER = 0.5
+
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+class AudioFrameBuffer:
+    """Per-session ring buffer of audio frames with sequence checks."""
+
+    def __init__(self, max_bytes: int = MAX_BUFFER_BYTES, high_water: float = HIGH_WATER):
+        """Initialize buffer.
+
+        Args:
+            max_bytes: Frames beyond this many buffered bytes are rejected
+            high_water: Fraction of max_bytes above which clients are paused
+        """
+        self.max_bytes = max_bytes
+        self.high_water = high_water
+        self.frames: deque = deque()
+        self.nbytes = 0
+        self.expected_seq = 0
+        self.consumed_seq = -1
+        self.lock = Lock()
+        self.stats = {
+            'frames': 0,
+            'bytes': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'peak_bytes': 0
+        }
+
+    def push(self, seq: Any, data: Any) -> str:
+        """Add a frame.
+
+        Returns:
+            ACCEPTED, DUPLICATE (already received, ignored) or REJECTED
+            (out of order, not binary, or the buffer is full)
+        """
+        with self.lock:
+            if not isinstance(seq, int) or not isinstance(data, (bytes, bytearray)):
+                self.stats['rejected'] += 1
+                return REJECTED
+            if seq < self.expected_seq:
+                self.stats['duplicates'] += 1
+                return DUPLICATE
+            if seq > self.expected_seq or self.nbytes + len(data) > self.max_bytes:
+                self.stats['rejected'] += 1
+                return REJECTED
+
+            self.frames.append((seq, bytes(data)))
+            self.nbytes += len(data)
+            self.expected_seq = seq + 1
+            self.stats['frames'] += 1
+            self.stats['bytes'] += len(data)
+            self.stats['peak_bytes'] = max(self.stats['peak_bytes'], self.nbytes)
+            return ACCEPTED
+
+    def drain(self) -> Tuple[bytes, Optional[int]]:
+        """Take every buffered frame, in order.
+
+        Returns:
+            (concatenated audio, last sequence number taken or None if empty)
+        """
+        with self.lock:
+            if not self.frames:
+                return b"", None
+            data = b"".join(frame for _, frame in self.frames)
+            last = self.frames[-1][0]
+            self.frames.clear()
+            self.nbytes = 0
+            self.consumed_seq = last
+            return data, last
+
+    @property
+    def paused(self) -> bool:
+        return self.nbytes >= self.max_bytes * self.high_water
+
+    @property
+    def depth(self) -> int:
+        return len(self.frames)
+
+    def ack(self, status: Optional[str] = None) -> Dict[str, Any]:
+        """Acknowledgement message for the client (see module docstring)."""
+        with self.lock:
+            return {
+                'seq': self.expected_seq - 1,
+                'processed': self.consumed_seq,
+                'rejected': self.expected_seq if status == REJECTED else None,
+                'paused': self.paused,
+                'buffered_bytes': self.nbytes
+            }
@@ -7,13 +7,14 @@ from pathlib import Path
 from datetime import datetime
 
 
-def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
+def transcribe_audio_huggingface(audio_file, language="vi", realtime=True, audio=None):
     """Transcribe audio using HuggingFace Whisper model.
     
     Args:
         audio_file: Path to audio file
         language: Language code (vi, en, ja, ko, zh)
         realtime: If True, yield progressive updates (chunk by chunk)
+        audio: The file already decoded (DecodedAudio); decoded here if None
         
     Yields:
         str: Progress messages and progressive/final transcript
@@ -26,26 +27,16 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
     print(f"[DEBUG] Transcribing file: {audio_file}")
     print(f"[DEBUG] Language: {language}")
     
+    decoded = None
     try:
-        from transformers import pipeline
         import torch
-        import librosa
-        import shutil
-        import tempfile
+        from backend.audio.decoded_audio import DecodedAudio
         
         yield "🔄 Đang khởi tạo HuggingFace Whisper..."
         
-        # Create a unique copy of audio file to avoid Gradio cache
-        # This ensures each recording is processed fresh
-        temp_dir = tempfile.gettempdir()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        unique_audio_path = Path(temp_dir) / f"whisper_input_{timestamp}.wav"
-        
-        # Copy audio file to unique path
-        shutil.copy2(audio_file, unique_audio_path)
-        audio_file = str(unique_audio_path)  # Use unique path for processing
-        
-        print(f"[DEBUG] Using unique file: {audio_file}")
+        # Decode once (fresh for every request, so no stale Gradio cache);
+        # the pipeline reads these samples instead of decoding the file again
+        decoded = audio or DecodedAudio.from_file(audio_file)
         
         # Check file size and duration
         file_path = Path(audio_file)
@@ -53,8 +44,7 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
         
         # Get audio duration
         try:
-            audio_data, sr = librosa.load(audio_file, sr=None)
-            duration_sec = len(audio_data) / sr
+            duration_sec = decoded.duration
             duration_min = duration_sec / 60
             
             yield f"📊 File: {file_size_mb:.1f} MB, Thời lượng: {duration_min:.1f} phút"
@@ -94,20 +84,11 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
         except Exception as e:
             yield f"⚠️  Không đọc được thông tin file: {e}"
         
-        # Load Whisper Large-v3 model (96% accuracy - BEST)
-        model_name = "openai/whisper-large-v3"
-        yield f"📥 Đang tải Whisper Large-v3 model (1550M params, ~96% accuracy)..."
-        
-        import gc
-        gc.collect()  # Clear memory before loading
-        
-        pipe = pipeline(
-            "automatic-speech-recognition",
-            model=model_name,
-            device=device,
-            return_timestamps=True,
-            torch_dtype=torch.float16 if device == 0 else torch.float32
-        )
+        # Whisper Large-v3 (96% accuracy - BEST), shared across requests
+        from backend.audio.models import WHISPER_LARGE, register_audio_models
+        registry = register_audio_models()
+        if not registry.is_loaded(WHISPER_LARGE):
+            yield f"📥 Đang tải Whisper Large-v3 model (1550M params, ~96% accuracy)..."
         
         yield f"🎤 Đang transcribe audio (ngôn ngữ: {language})..."
         
@@ -116,11 +97,13 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
         import hashlib
         start_time = time.time()
         
-        # Calculate file hash to ensure unique processing
+        # Calculate file hash to ensure unique processing (streamed, not read whole)
+        md5 = hashlib.md5()
         with open(audio_file, 'rb') as f:
-            audio_bytes = f.read()
-            file_hash = hashlib.md5(audio_bytes).hexdigest()[:8]
-            file_size_bytes = len(audio_bytes)
+            for block in iter(lambda: f.read(1 << 20), b''):
+                md5.update(block)
+        file_hash = md5.hexdigest()[:8]
+        file_size_bytes = file_path.stat().st_size
         
         yield f"🔍 Processing audio (ID: {file_hash}, Size: {file_size_bytes} bytes)..."
         
@@ -134,16 +117,17 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
             yield f"⚠️  Hãy thử: 1) Clear browser cache, 2) Refresh page, 3) Record lại"
         
         # Transcribe with timestamps for realtime display
-        result = pipe(
-            audio_file,
-            generate_kwargs={
-                "language": language,
-                "task": "transcribe",
-                "temperature": 0.0,  # More deterministic, reduce hallucination
-                "no_repeat_ngram_size": 3  # Prevent repetition
-            },
-            return_timestamps=True  # Get chunks with timestamps
-        )
+        with registry.use(WHISPER_LARGE) as pipe:
+            result = pipe(
+                decoded.pipeline_input(),
+                generate_kwargs={
+                    "language": language,
+                    "task": "transcribe",
+                    "temperature": 0.0,  # More deterministic, reduce hallucination
+                    "no_repeat_ngram_size": 3  # Prevent repetition
+                },
+                return_timestamps=True  # Get chunks with timestamps
+            )
         
         elapsed_time = time.time() - start_time
         
@@ -220,14 +204,6 @@ def transcribe_audio_huggingface(audio_file, language="vi", realtime=True):
 ✅ Hoàn thành trong {elapsed_time:.1f}s{speed_info}
 💡 Copy text trên để phân tích hoặc lưu lại
 """
-        
-        # Cleanup unique temp file
-        try:
-            if unique_audio_path.exists():
-                unique_audio_path.unlink()
-                print(f"[DEBUG] Cleaned up temp file: {unique_audio_path}")
-        except:
-            pass
             
     except ImportError as e:
         yield f"""❌ Lỗi: Chưa cài đặt thư viện cần thiết
@@ -261,6 +237,10 @@ pip install transformers torch torchaudio --index-url https://download.pytorch.o
 
 **Thử lại hoặc liên hệ support.**
 """
+    finally:
+        # Only release audio decoded here; a caller-provided buffer is the caller's
+        if decoded is not None and audio is None:
+            decoded.close()
 
 
 def transcribe_audio_simple(audio_file, language="vi"):
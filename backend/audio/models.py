@@ -0,0 +1,101 @@
+"""Audio models shared through the process-wide model registry.
+
+Every audio entry point (uploads, live recording, diarization) asks the
+registry for these names instead of constructing its own model.
+"""
+
+import os
+from typing import Optional
+
+from backend.utils.model_registry import ModelRegistry, get_model_registry
+
+WHISPER_LARGE = "whisper-large-v3"
+FASTER_WHISPER = "faster-whisper-base"
+DIARIZATION = "pyannote-diarization"
+SPEAKER_EMBEDDING = "pyannote-embedding"
+
+
+def _cuda_available() -> bool:
+    import torch
+    return torch.cuda.is_available()
+
+
+def load_whisper_large():
+    """HuggingFace Whisper large-v3 ASR pipeline (with timestamps)."""
+    from transformers import pipeline
+    import torch
+
+    device = 0 if torch.cuda.is_available() else -1
+    return pipeline(
+        "automatic-speech-recognition",
+        model="openai/whisper-large-v3",
+        device=device,
+        return_timestamps=True,
+        torch_dtype=torch.float16 if device == 0 else torch.float32
+    )
+
+
+def load_faster_whisper():
+    """faster-whisper base model (int8 on CPU) used for live transcription."""
+    from faster_whisper import WhisperModel
+    return WhisperModel("base", device="cpu", compute_type="int8")
+
+
+def _require_token(hf_token: Optional[str]) -> str:
+    if not hf_token:
+        raise ValueError(
+            "HuggingFace token required. "
+            "Get token from: https://huggingface.co/settings/tokens\n"
+            "Accept terms at: https://huggingface.co/pyannote/speaker-diarization-3.1"
+        )
+    return hf_token
+
+
+def load_diarization_pipeline(hf_token: Optional[str]):
+    """pyannote speaker-diarization-3.1 pipeline."""
+    from pyannote.audio import Pipeline
+
+    pipeline = Pipeline.from_pretrained(
+        "pyannote/speaker-diarization-3.1",
+        use_auth_token=_require_token(hf_token)
+    )
+    if _cuda_available():
+        import torch
+        pipeline = pipeline.to(torch.device("cuda"))
+    return pipeline
+
+
+def load_speaker_embedding(hf_token: Optional[str]):
+    """pyannote speaker embedding model (whole-window inference)."""
+    from pyannote.audio import Inference, Model
+
+    model = Model.from_pretrained(
+        "pyannote/wespeaker-voxceleb-resnet34-LM",
+        use_auth_token=_require_token(hf_token)
+    )
+    if _cuda_available():
+        import torch
+        model = model.to(torch.device("cuda"))
+    return Inference(model, window="whole")
+
+
+def register_audio_models(registry: Optional[ModelRegistry] = None, hf_token: Optional[str] = None) -> ModelRegistry:
+    """Register the audio models (idempotent).
+
+    Args:
+        registry: Registry (default: process-wide)
+        hf_token: HuggingFace token for pyannote (default: $HUGGINGFACE_TOKEN)
+
+    Returns:
+        The registry
+    """
+    registry = registry or get_model_registry()
+    token = hf_token or os.getenv("HUGGINGFACE_TOKEN")
+
+    registry.register(WHISPER_LARGE, load_whisper_large, size_mb=6200)
+    registry.register(FASTER_WHISPER, load_faster_whisper, size_mb=300)
+    # An explicit token replaces a token-less registration that has not loaded yet
+    replace = bool(hf_token)
+    registry.register(DIARIZATION, lambda: load_diarization_pipeline(token), size_mb=600, replace=replace)
+    registry.register(SPEAKER_EMBEDDING, lambda: load_speaker_embedding(token), size_mb=150, replace=replace)
+    return registry
@@ -0,0 +1,274 @@
+"""Incremental speaker diarization for live recordings.
+
+Instead of re-running the full pyannote pipeline over the whole recording,
+each new speech region (a committed transcript segment) is embedded once and
+assigned to the closest running speaker centroid, or opens a new speaker.
+Every few regions the clusters are refined in a background thread
+(spherical k-means seeded with the current centroids, then merging speakers
+that turned out to be the same voice).
+
+Labels belong to clusters, not to positions, so they stay stable: when two
+clusters merge, the one with more speech keeps its label.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class OnlineDiarizer:
+    """Assign speech regions to speakers as they arrive."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[np.ndarray], np.ndarray],
+        threshold: float = 0.5,
+        merge_threshold: float = 0.7,
+        max_speakers: int = 10,
+        min_region_seconds: float = 0.5,
+        recluster_every: int = 20,
+        buffer_seconds: float = 60.0,
+        sample_rate: int = SAMPLE_RATE
+    ):
+        """Initialize diarizer.
+
+        Args:
+            embed_fn: Maps float32 mono samples to a speaker embedding
+            threshold: Minimum cosine similarity to join an existing speaker
+            merge_threshold: Cosine similarity above which two speakers are merged on re-cluster
+            max_speakers: Upper bound on speakers (extra regions join the closest one)
+            min_region_seconds: Shorter regions are not embedded and inherit the previous speaker
+            recluster_every: New embedded regions between background re-clusters
+            buffer_seconds: Audio kept for regions that have not been reported yet
+            sample_rate: Sample rate of added audio
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.merge_threshold = merge_threshold
+        self.max_speakers = max_speakers
+        self.min_region_seconds = min_region_seconds
+        self.recluster_every = recluster_every
+        self.buffer_seconds = buffer_seconds
+        self.sample_rate = sample_rate
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.audio_offset = 0.0  # Stream time of self.audio[0], in seconds
+
+        self.regions: List[Dict] = []  # {'start', 'end', 'cluster'}
+        self.embeddings: List[Optional[np.ndarray]] = []
+        self.clusters: Dict[int, Dict] = {}  # id -> {'sum', 'weight'} (weighted embedding sum)
+        self.next_cluster = 0
+        self.version = 0  # Bumped whenever earlier regions change speaker
+
+        self.lock = threading.Lock()
+        self.since_recluster = 0
+        self.recluster_thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def add_audio(self, samples: np.ndarray):
+        """Append decoded audio (same stream as the regions)."""
+        if len(samples):
+            self.audio = np.concatenate([self.audio, samples.astype(np.float32, copy=False)])
+        excess = len(self.audio) - int(self.buffer_seconds * self.sample_rate)
+        if excess > 0:
+            self.audio = self.audio[excess:]
+            self.audio_offset += excess / self.sample_rate
+
+    def add_regions(self, regions: List[Dict]) -> List[Dict]:
+        """Embed and label new speech regions.
+
+        Args:
+            regions: Dicts with stream-time ``start`` and ``end``
+
+        Returns:
+            ``{'start', 'end', 'speaker'}`` for each region
+        """
+        labeled = []
+        for region in regions:
+            start, end = region['start'], region['end']
+            embedding = None
+            if end - start >= self.min_region_seconds:
+                audio = self._slice(start, end)
+                if len(audio) >= self.min_region_seconds * self.sample_rate:
+                    embedding = self._normalize(np.asarray(self.embed_fn(audio), dtype=np.float32).ravel())
+
+            with self.lock:
+                cluster = self._assign(embedding, end - start)
+                self.regions.append({'start': start, 'end': end, 'cluster': cluster})
+                self.embeddings.append(embedding)
+                if embedding is not None:
+                    self.since_recluster += 1
+                labeled.append({'start': start, 'end': end, 'speaker': self._label(cluster)})
+
+        self._maybe_recluster()
+        return labeled
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def segments(self) -> List[Dict]:
+        """All regions with their current speaker label."""
+        with self.lock:
+            return [
+                {'start': r['start'], 'end': r['end'], 'speaker': self._label(r['cluster'])}
+                for r in self.regions
+            ]
+
+    def recluster(self):
+        """Refine clusters over all embeddings and reconcile labels (blocking)."""
+        with self.lock:
+            count = len(self.regions)
+            embeddings = list(self.embeddings)
+            weights = [r['end'] - r['start'] for r in self.regions]
+            current = [r['cluster'] for r in self.regions]
+            centroids = {cid: self._normalize(c['sum']) for cid, c in self.clusters.items() if c['weight'] > 0}
+
+        indices = [i for i, e in enumerate(embeddings) if e is not None]
+        if not indices or not centroids:
+            return
+
+        E = np.stack([embeddings[i] for i in indices])
+        W = np.array([weights[i] for i in indices], dtype=np.float32)
+        ids = list(centroids)
+        C = np.stack([centroids[cid] for cid in ids])
+
+        # Spherical k-means seeded with the online centroids
+        for _ in range(5):
+            assign = np.argmax(E @ C.T, axis=1)
+            kept = [k for k in range(len(ids)) if np.any(assign == k)]
+            ids = [ids[k] for k in kept]
+            C = np.stack([self._normalize((E[assign == k] * W[assign == k, None]).sum(axis=0)) for k in kept])
+        assign = np.argmax(E @ C.T, axis=1)
+        totals = {cid: float(W[assign == k].sum()) for k, cid in enumerate(ids)}
+
+        # Merge speakers that are the same voice; the one with more speech survives
+        merged_into = {cid: cid for cid in ids}
+        alive = list(range(len(ids)))
+        while len(alive) > 1:
+            sims = C[alive] @ C[alive].T
+            np.fill_diagonal(sims, -1.0)
+            a, b = np.unravel_index(np.argmax(sims), sims.shape)
+            if sims[a, b] < self.merge_threshold:
+                break
+            keep, drop = alive[a], alive[b]
+            if totals[ids[drop]] > totals[ids[keep]]:
+                keep, drop = drop, keep
+            C[keep] = self._normalize(C[keep] * totals[ids[keep]] + C[drop] * totals[ids[drop]])
+            totals[ids[keep]] += totals[ids[drop]]
+            for cid, target in merged_into.items():
+                if target == ids[drop]:
+                    merged_into[cid] = ids[keep]
+            alive.remove(drop)
+
+        new_cluster = {i: merged_into[ids[assign[n]]] for n, i in enumerate(indices)}
+
+        with self.lock:
+            changed = False
+            new_sums = {}
+            for i in range(count):
+                if i in new_cluster:
+                    cluster = new_cluster[i]
+                else:
+                    # Short region: keep its previous speaker, following merges
+                    cluster = merged_into.get(current[i], current[i])
+                if self.regions[i]['cluster'] != cluster:
+                    self.regions[i]['cluster'] = cluster
+                    changed = True
+                if self.embeddings[i] is not None:
+                    entry = new_sums.setdefault(cluster, [0.0, 0.0])
+                    entry[0] = entry[0] + self.embeddings[i] * weights[i]
+                    entry[1] += weights[i]
+
+            # Regions added while re-clustering follow merges of their cluster
+            for region in self.regions[count:]:
+                target = merged_into.get(region['cluster'], region['cluster'])
+                if target != region['cluster']:
+                    region['cluster'] = target
+                    changed = True
+
+            for cid in list(self.clusters):
+                if cid in new_sums:
+                    self.clusters[cid]['sum'], self.clusters[cid]['weight'] = new_sums[cid]
+                elif merged_into.get(cid, cid) != cid or not any(r['cluster'] == cid for r in self.regions):
+                    del self.clusters[cid]
+
+            if changed:
+                self.version += 1
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _assign(self, embedding: Optional[np.ndarray], weight: float) -> int:
+        if embedding is None:
+            # Too short to embed reliably: same speaker as the previous region
+            if self.regions:
+                return self.regions[-1]['cluster']
+            return self._new_cluster(None, 0.0)
+
+        best, best_sim = None, -1.0
+        for cid, cluster in self.clusters.items():
+            if cluster['weight'] <= 0:
+                continue
+            sim = float(self._normalize(cluster['sum']) @ embedding)
+            if sim > best_sim:
+                best, best_sim = cid, sim
+
+        if best is not None and (best_sim >= self.threshold or len(self.clusters) >= self.max_speakers):
+            self.clusters[best]['sum'] = self.clusters[best]['sum'] + embedding * weight
+            self.clusters[best]['weight'] += weight
+            return best
+
+        # Reuse a placeholder opened by a leading short region
+        for cid, cluster in self.clusters.items():
+            if cluster['weight'] <= 0:
+                cluster['sum'], cluster['weight'] = embedding * weight, weight
+                return cid
+        return self._new_cluster(embedding, weight)
+
+    def _new_cluster(self, embedding: Optional[np.ndarray], weight: float) -> int:
+        cid = self.next_cluster
+        self.next_cluster += 1
+        self.clusters[cid] = {
+            'sum': embedding * weight if embedding is not None else 0.0,
+            'weight': weight
+        }
+        return cid
+
+    @staticmethod
+    def _label(cluster: int) -> str:
+        return f"SPEAKER_{cluster:02d}"
+
+    def _maybe_recluster(self):
+        with self.lock:
+            due = self.since_recluster >= self.recluster_every
+            running = self.recluster_thread is not None and self.recluster_thread.is_alive()
+            if not due or running:
+                return
+            self.since_recluster = 0
+            self.recluster_thread = threading.Thread(target=self._recluster_safely, daemon=True)
+            self.recluster_thread.start()
+
+    def _recluster_safely(self):
+        try:
+            self.recluster()
+        except Exception as e:
+            print(f"[WARN] Background re-clustering failed: {e}")
+
+    def _slice(self, start: float, end: float) -> np.ndarray:
+        first = int(round((start - self.audio_offset) * self.sample_rate))
+        last = int(round((end - self.audio_offset) * self.sample_rate))
+        return self.audio[max(first, 0):max(last, 0)]
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -0,0 +1,363 @@
+"""Parallel offline transcription on CPU.
+
+Long recordings are cut at silences into segments of roughly
+``segment_seconds``, padded with a little overlap, and transcribed in a
+process pool where every worker owns one faster-whisper int8 model. Results
+are stitched back in order: each segment only keeps the text whose midpoint
+falls inside its own (un-padded) span, so overlap is never duplicated and
+the output does not depend on completion order.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.audio.decoded_audio import SAMPLE_RATE, DecodedAudio
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_SECONDS = 0.03
+
+# Approximate resident memory of one int8 worker, for the worker count and the model registry budget
+MODEL_SIZE_MB = {'tiny': 100, 'base': 150, 'small': 500, 'medium': 1000, 'large-v2': 1600, 'large-v3': 1600}
+
+# CTranslate2 threads per worker: single-threaded workers leave most of each model's time in Python overhead
+MIN_THREADS_PER_WORKER = 2
+
+# Decoding settings, also used for live transcription (AudioService.transcribe_realtime)
+WHISPER_OPTIONS = {
+    'beam_size': 1,
+    'vad_filter': True,
+    'condition_on_previous_text': False,
+    'temperature': 0.0,
+    'compression_ratio_threshold': 2.4,
+    'log_prob_threshold': -1.0,
+    'no_speech_threshold': 0.6,
+}
+
+
+# ----------------------------------------------------------------------
+# Splitting
+# ----------------------------------------------------------------------
+
+def find_cut_points(
+    audio: np.ndarray,
+    segment_seconds: float = 120.0,
+    search_seconds: float = 10.0,
+    sample_rate: int = SAMPLE_RATE
+) -> List[int]:
+    """Choose sample positions to cut at, preferring silence.
+
+    Around every multiple of ``segment_seconds`` the quietest 30 ms frame
+    within ``search_seconds`` is picked (energy VAD), so cuts fall between
+    words whenever there is a pause.
+
+    Args:
+        audio: Mono float32 samples
+        segment_seconds: Target segment length
+        search_seconds: How far before/after the target to look for silence
+        sample_rate: Sample rate of ``audio``
+
+    Returns:
+        Sorted cut positions, including 0 and len(audio)
+    """
+    total = len(audio)
+    target = int(segment_seconds * sample_rate)
+    if total <= target * 1.5:
+        return [0, total]
+
+    frame = int(FRAME_SECONDS * sample_rate)
+    energy = _frame_energy(audio, frame)
+    search = int(search_seconds / FRAME_SECONDS)
+
+    cuts = [0]
+    position = target
+    while total - position > target // 2:
+        center = position // frame
+        low = max(center - search, cuts[-1] // frame + 1)
+        high = min(center + search, len(energy) - 1)
+        if high > low:
+            # argmin returns the first minimum, which keeps the choice deterministic
+            position = (low + int(np.argmin(energy[low:high + 1]))) * frame
+        cuts.append(position)
+        position += target
+    cuts.append(total)
+    return cuts
+
+
+def _frame_energy(audio: np.ndarray, frame: int, block_frames: int = 100_000) -> np.ndarray:
+    """RMS per frame, computed block-wise so memory-mapped audio is never copied whole."""
+    frames = len(audio) // frame
+    energy = np.empty(frames, dtype=np.float32)
+    for first in range(0, frames, block_frames):
+        last = min(frames, first + block_frames)
+        block = np.asarray(audio[first * frame:last * frame], dtype=np.float32).reshape(-1, frame)
+        energy[first:last] = np.sqrt(np.mean(block ** 2, axis=1))
+    return energy
+
+
+def plan_segments(
+    total: int,
+    cuts: List[int],
+    overlap_seconds: float = 1.0,
+    sample_rate: int = SAMPLE_RATE
+) -> List[Dict[str, int]]:
+    """Turn cut points into padded segments.
+
+    Returns:
+        One dict per segment: ``core_start``/``core_end`` (the span it owns)
+        and ``start``/``end`` (what is actually transcribed), in samples
+    """
+    pad = int(overlap_seconds * sample_rate)
+    return [
+        {
+            'core_start': start,
+            'core_end': end,
+            'start': max(0, start - pad),
+            'end': min(total, end + pad)
+        }
+        for start, end in zip(cuts[:-1], cuts[1:])
+    ]
+
+
+def stitch_segments(results: List[List[Dict]], plan: List[Dict[str, int]], sample_rate: int = SAMPLE_RATE) -> List[Dict]:
+    """Merge per-segment results into one timeline.
+
+    Args:
+        results: For each planned segment, its transcribed segments with
+            times relative to the padded segment start
+        plan: Output of plan_segments
+
+    Returns:
+        Segments with absolute ``start``/``end`` seconds, in order
+    """
+    merged = []
+    for segments, span in zip(results, plan):
+        offset = span['start'] / sample_rate
+        core_start = span['core_start'] / sample_rate
+        core_end = span['core_end'] / sample_rate
+        for seg in segments:
+            start = offset + seg['start']
+            end = offset + seg['end']
+            middle = (start + end) / 2
+            # The last segment also owns anything Whisper timed past the end
+            at_end = span['end'] == span['core_end']
+            if core_start <= middle < core_end or (at_end and middle >= core_end):
+                merged.append({'start': round(start, 2), 'end': round(end, 2), 'text': seg['text']})
+    return merged
+
+
+# ----------------------------------------------------------------------
+# Worker processes
+# ----------------------------------------------------------------------
+
+def available_memory_mb() -> float:
+    """Memory available to new processes (MemAvailable), or 0 if unknown."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        return 0.0
+
+
+def plan_workers(
+    requested: int,
+    model_size: str,
+    memory_mb: float = 0,
+    cores: Optional[int] = None
+) -> Tuple[int, int]:
+    """Choose the pool size from the memory budget and CPU cores.
+
+    Args:
+        requested: Wanted worker count (0 = as many as fit)
+        model_size: faster-whisper model name (sets the memory per worker)
+        memory_mb: Memory the workers may use (0 = memory available now)
+        cores: CPU cores (default: os.cpu_count())
+
+    Returns:
+        (workers, cpu_threads per worker)
+    """
+    cores = cores or os.cpu_count() or 1
+    memory_mb = memory_mb or available_memory_mb()
+    limit = max(1, cores // MIN_THREADS_PER_WORKER)
+    if memory_mb:
+        limit = min(limit, max(1, int(memory_mb // MODEL_SIZE_MB.get(model_size, 1600))))
+    workers = min(requested, limit) if requested else limit
+    if workers < requested:
+        logger.warning(
+            f"TRANSCRIBE_WORKERS={requested} lowered to {workers} "
+            f"({memory_mb:.0f} MB for {model_size} workers, {cores} cores)"
+        )
+    return workers, max(1, cores // workers)
+
+
+_worker_model = None
+_worker_options: Dict = {}
+
+
+def _init_worker(model_size: str, cpu_threads: int, options: Dict):
+    """Load this worker's faster-whisper model once."""
+    global _worker_model, _worker_options
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+    _worker_options = options
+
+
+def _transcribe_segment(audio, language: str) -> List[Dict]:
+    # DecodedAudio segments arrive as file references and are mapped here
+    samples = np.ascontiguousarray(audio, dtype=np.float32)
+    segments, _ = _worker_model.transcribe(samples, language=language, **_worker_options)
+    return [
+        {'start': seg.start, 'end': seg.end, 'text': seg.text.strip()}
+        for seg in segments
+        if seg.text.strip()
+    ]
+
+
+class ParallelTranscriber:
+    """Process pool of faster-whisper workers."""
+
+    def __init__(self, workers: int = 0, model_size: str = "large-v3", memory_mb: float = 0):
+        """Start the worker pool.
+
+        Args:
+            workers: Number of worker processes (0 = as many as fit, see plan_workers)
+            model_size: faster-whisper model name
+            memory_mb: Memory the workers may use (0 = memory available now)
+        """
+        # Every worker holds its own model: the count is capped by memory, and
+        # cores are split between workers so they do not oversubscribe each other
+        self.workers, cpu_threads = plan_workers(workers, model_size, memory_mb)
+        self.model_size = model_size
+        # Spawn, not fork: the server process already runs threads (Socket.IO,
+        # job queue, torch) whose locks a forked child could inherit held
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_size, cpu_threads, WHISPER_OPTIONS)
+        )
+        logger.info(f"ParallelTranscriber started: {self.workers} workers x {cpu_threads} threads ({model_size}, int8)")
+
+    def transcribe(
+        self,
+        audio,
+        language: str = "vi",
+        segment_seconds: float = 120.0,
+        overlap_seconds: float = 1.0,
+        on_progress: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[Dict]:
+        """Transcribe 16 kHz mono audio.
+
+        Args:
+            audio: Mono float32 samples at 16 kHz, or a DecodedAudio (workers
+                then map their segment from its file instead of receiving a copy)
+            language: Language code
+            segment_seconds: Target segment length
+            overlap_seconds: Padding added on each side of a segment
+            on_progress: Called with (done, total, text so far in order)
+
+        Returns:
+            Segments with absolute ``start``/``end`` seconds and ``text``
+        """
+        # Short files: smaller segments so every worker gets some (never below 30 s)
+        duration = len(audio) / SAMPLE_RATE
+        segment_seconds = max(30.0, min(segment_seconds, duration / self.workers))
+        cuts = find_cut_points(np.asarray(audio), segment_seconds)
+        plan = plan_segments(len(audio), cuts, overlap_seconds)
+        logger.info(f"Transcribing {duration:.0f}s of audio in {len(plan)} segments")
+
+        slice_of = audio.segment if isinstance(audio, DecodedAudio) else lambda start, end: audio[start:end]
+        futures = {
+            self.pool.submit(_transcribe_segment, slice_of(span['start'], span['end']), language): i
+            for i, span in enumerate(plan)
+        }
+        results: List[Optional[List[Dict]]] = [None] * len(plan)
+        done = 0
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            done += 1
+            if on_progress:
+                ready = []
+                for result in results:
+                    if result is None:
+                        break
+                    ready.append(result)
+                text = " ".join(seg['text'] for seg in stitch_segments(ready, plan[:len(ready)]))
+                on_progress(done, len(plan), text)
+
+        return stitch_segments(results, plan)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+PARALLEL_WHISPER = "faster-whisper-pool"
+
+
+def register_parallel_transcriber():
+    """Register the shared worker pool in the model registry (unloaded when idle).
+
+    Returns:
+        The registry
+    """
+    from backend.config import Settings
+    from backend.utils.model_registry import get_model_registry
+
+    registry = get_model_registry()
+    if registry.is_registered(PARALLEL_WHISPER):
+        return registry
+    workers, _ = plan_workers(Settings.TRANSCRIBE_WORKERS, Settings.TRANSCRIBE_MODEL, Settings.TRANSCRIBE_MEMORY_MB)
+    registry.register(
+        PARALLEL_WHISPER,
+        lambda: ParallelTranscriber(workers, Settings.TRANSCRIBE_MODEL, Settings.TRANSCRIBE_MEMORY_MB),
+        size_mb=workers * MODEL_SIZE_MB.get(Settings.TRANSCRIBE_MODEL, 1600),
+        on_unload=lambda transcriber: transcriber.shutdown()
+    )
+    return registry
+
+
+def transcribe_file_parallel(
+    audio_file: str,
+    language: str = "vi",
+    on_progress: Optional[Callable[[int, int, str], None]] = None,
+    audio: Optional[DecodedAudio] = None
+) -> Tuple[str, List[Dict]]:
+    """Transcribe an audio file with the shared worker pool.
+
+    Args:
+        audio_file: Path to audio file
+        language: Language code
+        on_progress: See ParallelTranscriber.transcribe
+        audio: The file already decoded (decoded here if None)
+
+    Returns:
+        (transcript text, timed segments)
+    """
+    from backend.config import Settings
+
+    decoded = audio or DecodedAudio.from_file(audio_file)
+    try:
+        with register_parallel_transcriber().use(PARALLEL_WHISPER) as transcriber:
+            segments = transcriber.transcribe(
+                decoded,
+                language,
+                segment_seconds=Settings.TRANSCRIBE_SEGMENT_SECONDS,
+                overlap_seconds=Settings.TRANSCRIBE_OVERLAP_SECONDS,
+                on_progress=on_progress
+            )
+    finally:
+        if audio is None:
+            decoded.close()
+    return " ".join(seg['text'] for seg in segments), segments
@@ -4,9 +4,16 @@ Identifies and labels different speakers in audio recordings.
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from queue import Queue
+from typing import Any, Callable, Dict, List, Tuple, Optional
+
+from .decoded_audio import DecodedAudio
+from .speaker_index import SpeakerIndex
+from .models import DIARIZATION, SPEAKER_EMBEDDING, WHISPER_LARGE, register_audio_models
 
 
 class SpeakerDiarizer:
@@ -19,53 +26,67 @@ class SpeakerDiarizer:
             hf_token: HuggingFace token for accessing pyannote models
         """
         self.hf_token = hf_token or os.getenv("HUGGINGFACE_TOKEN")
-        self.pipeline = None
+        # Models live in the shared registry, not on the instance
+        self.registry = register_audio_models(hf_token=hf_token)
         
     def load_pipeline(self):
-        """Load pyannote speaker diarization pipeline."""
-        if self.pipeline is not None:
-            return self.pipeline
-            
+        """Load pyannote speaker diarization pipeline (shared by all diarizers)."""
         try:
-            from pyannote.audio import Pipeline
-            
-            if not self.hf_token:
-                raise ValueError(
-                    "HuggingFace token required. "
-                    "Get token from: https://huggingface.co/settings/tokens\n"
-                    "Accept terms at: https://huggingface.co/pyannote/speaker-diarization-3.1"
-                )
-            
-            # Load speaker diarization pipeline
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=self.hf_token
-            )
-            
-            # Use GPU if available
-            import torch
-            if torch.cuda.is_available():
-                self.pipeline = self.pipeline.to(torch.device("cuda"))
-                
-            return self.pipeline
-            
+            return self.registry.get(DIARIZATION)
         except Exception as e:
             raise RuntimeError(f"Failed to load diarization pipeline: {e}")
     
-    def diarize_audio(self, audio_file: str) -> List[Dict]:
+    def load_embedding_model(self):
+        """Load the pyannote speaker embedding model (used by online diarization)."""
+        try:
+            return self.registry.get(SPEAKER_EMBEDDING)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load speaker embedding model: {e}")
+
+    def embed(self, audio, sample_rate: int = 16000):
+        """Compute a speaker embedding for one speech region.
+
+        Args:
+            audio: Mono float32 samples
+            sample_rate: Sample rate of ``audio``
+
+        Returns:
+            1-D numpy embedding
+        """
+        import torch
+
+        waveform = torch.from_numpy(audio).float().unsqueeze(0)
+        with self.registry.use(SPEAKER_EMBEDDING) as inference:
+            return inference({"waveform": waveform, "sample_rate": sample_rate})
+
+    def diarize_audio(
+        self,
+        audio_file: str,
+        audio: Optional[DecodedAudio] = None,
+        on_step: Optional[Callable[[str], None]] = None
+    ) -> List[Dict]:
         """Perform speaker diarization on audio file.
         
         Args:
             audio_file: Path to audio file
+            audio: The file already decoded; pyannote reads its samples
+                instead of decoding the file again
+            on_step: Called with the name of each pipeline step as it starts
+                (segmentation, embeddings, ...)
             
         Returns:
             List of diarization segments with speaker labels
             Format: [{"start": 0.0, "end": 5.2, "speaker": "SPEAKER_00"}, ...]
         """
-        pipeline = self.load_pipeline()
+        self.load_pipeline()
         
         # Run diarization
-        diarization = pipeline(audio_file)
+        source = audio.pyannote_input() if audio is not None else audio_file
+        with self.registry.use(DIARIZATION) as pipeline:
+            if on_step is None:
+                diarization = pipeline(source)
+            else:
+                diarization = pipeline(source, hook=self._step_hook(on_step))
         
         # Extract segments
         segments = []
@@ -78,6 +99,17 @@ class SpeakerDiarizer:
         
         return segments
     
+    @staticmethod
+    def _step_hook(on_step: Callable[[str], None]):
+        """pyannote progress hook that reports each step once."""
+        seen = set()
+
+        def hook(step_name, step_artifact, file=None, total=None, completed=None):
+            if step_name not in seen:
+                seen.add(step_name)
+                on_step(step_name)
+        return hook
+
     def format_diarization(self, segments: List[Dict]) -> str:
         """Format diarization results as readable text.
         
@@ -124,6 +156,7 @@ class SpeakerDiarizer:
         if not transcript_chunks or not diarization_segments:
             return ""
         
+        index = SpeakerIndex(diarization_segments)
         lines = ["📝 **Transcript with Speakers:**\n"]
         
         for chunk in transcript_chunks:
@@ -136,14 +169,9 @@ class SpeakerDiarizer:
             # Find speaker for this chunk
             chunk_start = timestamp[0] if timestamp[0] is not None else 0
             chunk_end = timestamp[1] if timestamp[1] is not None else chunk_start
-            chunk_mid = (chunk_start + chunk_end) / 2
             
-            # Find overlapping speaker
-            speaker = "Unknown"
-            for seg in diarization_segments:
-                if seg["start"] <= chunk_mid <= seg["end"]:
-                    speaker = seg["speaker"].replace("SPEAKER_", "Guest-")
-                    break
+            # Speaker who talks most during this chunk
+            speaker = index.speaker_at(chunk_start, chunk_end, "Unknown").replace("SPEAKER_", "Guest-")
             
             # Format timestamp
             minutes = int(chunk_start // 60)
@@ -239,19 +267,55 @@ pip install pyannote.audio speechbrain
 """
 
 
+def _run_concurrently(tasks: Dict[str, Callable[[Callable[[str], None]], Any]]):
+    """Run independent passes in parallel threads, streaming their progress.
+
+    Each task receives a ``report(message)`` callback. Use as
+    ``results = yield from _run_concurrently(...)``: progress messages are
+    yielded as they arrive and the results (by task name) are returned once
+    every task has finished.
+
+    Raises:
+        The first task exception, after all tasks have stopped
+    """
+    messages: Queue = Queue()
+    done = object()
+
+    def run(task):
+        try:
+            return task(messages.put)
+        finally:
+            messages.put(done)
+
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="speakers") as pool:
+        futures = {name: pool.submit(run, task) for name, task in tasks.items()}
+        running = len(futures)
+        while running:
+            message = messages.get()
+            if message is done:
+                running -= 1
+            else:
+                yield message
+    return {name: future.result() for name, future in futures.items()}
+
+
 def transcribe_with_speakers(
     audio_file: str,
     language: str = "vi",
-    hf_token: Optional[str] = None
+    hf_token: Optional[str] = None,
+    audio: Optional[DecodedAudio] = None
 ):
     """Transcribe audio with speaker diarization (generator).
     
     Combines Whisper transcription with pyannote speaker diarization.
+    Both read the same decoded samples and run concurrently (each with its
+    own model), so wall time is close to the slower of the two passes.
     
     Args:
         audio_file: Path to audio file
         language: Language code for transcription
         hf_token: HuggingFace token for diarization
+        audio: The file already decoded (decoded here if None)
         
     Yields:
         str: Progress messages and final transcript with speakers
@@ -260,45 +324,43 @@ def transcribe_with_speakers(
         yield "🎙️ No audio file provided"
         return
     
+    decoded = None
     try:
-        from transformers import pipeline as hf_pipeline
-        import torch
-        
-        yield "🔄 Step 1/2: Transcribing audio with Whisper..."
-        
-        # Transcribe with Whisper
-        device = 0 if torch.cuda.is_available() else -1
-        whisper = hf_pipeline(
-            "automatic-speech-recognition",
-            model="openai/whisper-large-v3",
-            device=device,
-            return_timestamps=True,
-            torch_dtype=torch.float16 if device == 0 else torch.float32
-        )
+        yield "🔄 Transcribing (Whisper) and identifying speakers (pyannote) in parallel..."
         
-        result = whisper(
-            audio_file,
-            generate_kwargs={
-                "language": language,
-                "task": "transcribe"
-            },
-            return_timestamps=True
-        )
-        
-        transcript_chunks = result.get("chunks", [])
-        
-        yield f"✅ Transcription complete ({len(transcript_chunks)} chunks)\n"
-        
-        yield "🔄 Step 2/2: Identifying speakers..."
-        
-        # Diarize speakers
+        decoded = audio or DecodedAudio.from_file(audio_file)
         diarizer = SpeakerDiarizer(hf_token)
-        diarizer.load_pipeline()
         
-        segments = diarizer.diarize_audio(audio_file)
-        speakers = set(seg["speaker"] for seg in segments)
+        def transcribe(report):
+            # Transcribe with the shared Whisper model
+            start = time.time()
+            with diarizer.registry.use(WHISPER_LARGE) as whisper:
+                result = whisper(
+                    decoded.pipeline_input(),
+                    generate_kwargs={
+                        "language": language,
+                        "task": "transcribe"
+                    },
+                    return_timestamps=True
+                )
+            chunks = result.get("chunks", [])
+            report(f"✅ Transcription complete ({len(chunks)} chunks, {time.time() - start:.1f}s)\n")
+            return chunks
+        
+        def diarize(report):
+            start = time.time()
+            segments = diarizer.diarize_audio(
+                audio_file, decoded,
+                on_step=lambda step: report(f"🎤 Diarization: {step}...")
+            )
+            speakers = set(seg["speaker"] for seg in segments)
+            report(f"✅ Detected {len(speakers)} speaker(s) ({time.time() - start:.1f}s)\n")
+            return segments
         
-        yield f"✅ Detected {len(speakers)} speaker(s)\n"
+        results = yield from _run_concurrently({"transcript": transcribe, "speakers": diarize})
+        transcript_chunks = results["transcript"]
+        segments = results["speakers"]
+        speakers = set(seg["speaker"] for seg in segments)
         
         # Merge transcript with speakers
         merged = diarizer.merge_with_transcript(transcript_chunks, segments)
@@ -315,3 +377,6 @@ def transcribe_with_speakers(
         
     except Exception as e:
         yield f"❌ Error: {str(e)}"
+    finally:
+        if decoded is not None and audio is None:
+            decoded.close()
@@ -0,0 +1,127 @@
+"""Interval index for assigning diarization speakers to transcript spans.
+
+Diarization segments are sorted once and put in a centered interval
+tree; each transcript span then visits O(log m) nodes plus the segments
+it actually touches, so labelling n spans against m segments costs
+O((n + m) log m) even when a few long segments overlap everything.
+
+A span gets the speaker it overlaps most (summed per speaker), rather
+than whoever happens to cover its midpoint first. Zero-length spans and
+spans falling in gaps fall back to the segment containing their midpoint.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+
+class _Node:
+    """Segments containing ``center``, plus subtrees entirely left/right of it."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: float, by_start: List[int], by_end: List[int]):
+        self.center = center
+        self.by_start = by_start  # indices, ascending start
+        self.by_end = by_end      # indices, descending end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+class SpeakerIndex:
+    """Sorted, queryable view of diarization segments."""
+
+    def __init__(self, segments: Sequence[Dict]):
+        """Build the index.
+
+        Args:
+            segments: Diarization segments ``{"start", "end", "speaker"}``
+                in any order; overlapping segments are allowed
+        """
+        ordered = sorted(segments, key=lambda seg: (seg["start"], seg["end"]))
+        self.starts = [seg["start"] for seg in ordered]
+        self.ends = [seg["end"] for seg in ordered]
+        self.speakers = [seg["speaker"] for seg in ordered]
+        self.root = self._build(list(range(len(ordered))))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self, indices: List[int]) -> Optional[_Node]:
+        """Build the subtree for ``indices`` (ascending) around their median midpoint."""
+        if not indices:
+            return None
+        midpoints = sorted((self.starts[i] + self.ends[i]) / 2 for i in indices)
+        center = midpoints[len(midpoints) // 2]
+
+        here, left, right = [], [], []
+        for i in indices:
+            if self.ends[i] < center:
+                left.append(i)
+            elif self.starts[i] > center:
+                right.append(i)
+            else:
+                here.append(i)
+        # The median segment contains its own midpoint, so every node keeps at
+        # least one segment and each side gets at most half: depth O(log m)
+        node = _Node(center, here, sorted(here, key=lambda i: -self.ends[i]))
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def _candidates(self, start: float, end: float) -> List[int]:
+        """Indices (in sorted order) of segments touching [start, end]."""
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                # Every segment here ends after the query: it touches iff it starts in time
+                for i in node.by_start:
+                    if self.starts[i] > end:
+                        break
+                    found.append(i)
+                stack.append(node.left)
+            elif start > node.center:
+                for i in node.by_end:
+                    if self.ends[i] < start:
+                        break
+                    found.append(i)
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        found.sort()
+        return found
+
+    def speaker_at(self, start: float, end: float, default: Optional[str] = None) -> Optional[str]:
+        """Speaker with the largest overlap with [start, end].
+
+        Args:
+            start: Span start (seconds)
+            end: Span end (seconds)
+            default: Returned when no segment overlaps or contains the midpoint
+
+        Returns:
+            Speaker label (ties go to the speaker whose segment comes first)
+        """
+        overlap: Dict[str, float] = {}
+        for i in self._candidates(start, end):
+            shared = min(end, self.ends[i]) - max(start, self.starts[i])
+            if shared > 0:
+                speaker = self.speakers[i]
+                overlap[speaker] = overlap.get(speaker, 0.0) + shared
+        if overlap:
+            # max() keeps the first of equal values, and dicts keep insertion order
+            return max(overlap, key=overlap.get)
+
+        middle = (start + end) / 2
+        for i in self._candidates(middle, middle):
+            if self.starts[i] <= middle <= self.ends[i]:
+                return self.speakers[i]
+        return default
+
+    def assign(self, spans: Sequence[Dict], default: Optional[str] = None) -> List[Optional[str]]:
+        """Speaker for each ``{"start", "end"}`` span (see speaker_at)."""
+        return [self.speaker_at(span["start"], span["end"], default) for span in spans]
@@ -0,0 +1,262 @@
+"""Incremental transcription for live recordings.
+
+Browser MediaRecorder chunks are fragments of one WebM/Ogg stream, so they
+are piped into a long-lived ffmpeg process that turns them into 16 kHz mono
+PCM as they arrive. Each update only re-transcribes the uncommitted tail of
+the recording (bounded by ``window_seconds``):
+
+- committed segments are final and reported once;
+- tentative segments (the last few seconds) may still change.
+
+Work per chunk therefore depends on the window length, not on how long the
+recording has been running.
+"""
+
+import subprocess
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class PCMStreamDecoder:
+    """Decode a growing compressed audio stream to float32 PCM with ffmpeg."""
+
+    def __init__(self, ffmpeg_path: Optional[str] = None, sample_rate: int = SAMPLE_RATE):
+        """Start the decoder process.
+
+        Args:
+            ffmpeg_path: ffmpeg executable (auto-detected if None)
+            sample_rate: Output sample rate
+        """
+        if ffmpeg_path is None:
+            from backend.utils.ffmpeg_helper import get_ffmpeg_path
+            ffmpeg_path = get_ffmpeg_path()
+        if not ffmpeg_path:
+            raise RuntimeError("ffmpeg not found - required for live transcription")
+
+        self.process = subprocess.Popen(
+            [
+                ffmpeg_path, "-loglevel", "error",
+                # Start emitting audio as soon as the container header is parsed
+                "-probesize", "4096", "-analyzeduration", "0",
+                "-i", "pipe:0",
+                "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.pcm = bytearray()
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read_output, daemon=True)
+        self.reader.start()
+
+    def feed(self, data: bytes):
+        """Write compressed bytes to the decoder."""
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def read(self) -> np.ndarray:
+        """Return the samples decoded since the last call."""
+        with self.lock:
+            usable = len(self.pcm) - len(self.pcm) % 2
+            raw = bytes(self.pcm[:usable])
+            del self.pcm[:usable]
+        return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def close(self, timeout: float = 10.0) -> np.ndarray:
+        """Finish the stream and return the remaining samples."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.reader.join(timeout=timeout)
+        return self.read()
+
+    def kill(self):
+        """Stop the decoder without waiting for output."""
+        if self.process.poll() is None:
+            self.process.kill()
+
+    def _read_output(self):
+        while True:
+            data = self.process.stdout.read1(65536)
+            if not data:
+                break
+            with self.lock:
+                self.pcm.extend(data)
+
+
+class StreamingTranscriber:
+    """Rolling-window transcriber with a committed/tentative split.
+
+    ``transcribe_fn(audio, initial_prompt)`` receives float32 samples at
+    ``sample_rate`` and returns objects (or dicts) with ``start``, ``end``
+    and ``text``, timed relative to the start of ``audio``.
+    """
+
+    def __init__(
+        self,
+        transcribe_fn: Callable,
+        window_seconds: float = 20.0,
+        min_new_seconds: float = 1.0,
+        tentative_seconds: float = 2.0,
+        context_chars: int = 200,
+        sample_rate: int = SAMPLE_RATE
+    ):
+        """Initialize transcriber.
+
+        Args:
+            transcribe_fn: Speech-to-text callable (see class docstring)
+            window_seconds: Uncommitted audio kept before segments are force-committed
+            min_new_seconds: New audio needed before re-transcribing
+            tentative_seconds: Segments ending within this margin of the live edge stay tentative
+            context_chars: Committed text passed as prompt for continuity
+            sample_rate: Sample rate of pushed audio
+        """
+        self.transcribe_fn = transcribe_fn
+        self.window_seconds = window_seconds
+        self.min_new_seconds = min_new_seconds
+        self.tentative_seconds = tentative_seconds
+        self.context_chars = context_chars
+        self.sample_rate = sample_rate
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.offset = 0.0  # Stream time of self.audio[0], in seconds
+        self.pending_samples = 0
+        self.committed: List[Dict] = []
+        self.tentative: List[Dict] = []
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received so far."""
+        return self.offset + len(self.audio) / self.sample_rate
+
+    def push(self, samples: np.ndarray) -> Optional[Dict[str, List[Dict]]]:
+        """Add decoded audio and re-transcribe the window if enough is new.
+
+        Args:
+            samples: float32 mono samples
+
+        Returns:
+            ``{'committed': [...], 'tentative': [...]}`` with newly committed
+            segments and the current tentative tail, or None if not enough
+            new audio arrived yet
+        """
+        if len(samples):
+            self.audio = np.concatenate([self.audio, samples.astype(np.float32, copy=False)])
+            self.pending_samples += len(samples)
+        if self.pending_samples < self.min_new_seconds * self.sample_rate:
+            return None
+        return self._update(final=False)
+
+    def flush(self, samples: Optional[np.ndarray] = None) -> Dict[str, List[Dict]]:
+        """Commit everything still in the window (end of recording).
+
+        Args:
+            samples: Last decoded samples, if any
+        """
+        if samples is not None and len(samples):
+            self.audio = np.concatenate([self.audio, samples.astype(np.float32, copy=False)])
+        if not len(self.audio):
+            self.tentative = []
+            return {'committed': [], 'tentative': []}
+        return self._update(final=True)
+
+    def _update(self, final: bool) -> Dict[str, List[Dict]]:
+        self.pending_samples = 0
+        prompt = " ".join(seg['text'] for seg in self.committed)[-self.context_chars:] or None
+
+        segments = []
+        for seg in self.transcribe_fn(self.audio, prompt):
+            get = seg.get if isinstance(seg, dict) else lambda key: getattr(seg, key)
+            text = (get('text') or '').strip()
+            if text:
+                segments.append({
+                    'start': round(self.offset + get('start'), 2),
+                    'end': round(self.offset + get('end'), 2),
+                    'text': text
+                })
+
+        window = len(self.audio) / self.sample_rate
+        if final:
+            stable = segments
+        else:
+            live_edge = self.duration - self.tentative_seconds
+            stable = []
+            for seg in segments:
+                if seg['end'] > live_edge:
+                    break
+                stable.append(seg)
+            if not stable and window > self.window_seconds:
+                # Continuous speech: commit all but the segment still being spoken
+                stable = segments[:-1] or segments
+
+        self.committed.extend(stable)
+        self.tentative = segments[len(stable):]
+
+        if stable:
+            self._trim(stable[-1]['end'])
+        elif not segments and window > self.window_seconds:
+            # No speech in the window: keep only the live edge
+            self._trim(self.duration - self.tentative_seconds)
+
+        return {'committed': stable, 'tentative': self.tentative}
+
+    def _trim(self, until: float):
+        drop = int(round((until - self.offset) * self.sample_rate))
+        drop = max(0, min(drop, len(self.audio)))
+        self.audio = self.audio[drop:]
+        self.offset += drop / self.sample_rate
+
+
+class StreamingSession:
+    """Decoder plus transcriber (and optional online diarizer) for one live recording."""
+
+    def __init__(self, transcribe_fn: Callable, decoder: Optional[PCMStreamDecoder] = None, diarizer=None, **options):
+        """Initialize session.
+
+        Args:
+            transcribe_fn: See StreamingTranscriber
+            decoder: PCM decoder (a new ffmpeg process if None)
+            diarizer: Optional OnlineDiarizer labelling committed segments
+            **options: StreamingTranscriber options
+        """
+        self.decoder = decoder or PCMStreamDecoder()
+        self.transcriber = StreamingTranscriber(transcribe_fn, **options)
+        self.diarizer = diarizer
+        self.lock = threading.Lock()
+
+    def feed(self, data: bytes) -> Optional[Dict[str, List[Dict]]]:
+        """Add a compressed chunk and return the transcript delta, if any.
+
+        With a diarizer, the delta also has ``speakers``: one
+        ``{'start', 'end', 'speaker'}`` per committed segment.
+        """
+        with self.lock:
+            self.decoder.feed(data)
+            samples = self.decoder.read()
+            if self.diarizer is not None:
+                self.diarizer.add_audio(samples)
+            return self._label(self.transcriber.push(samples))
+
+    def close(self) -> Dict[str, List[Dict]]:
+        """Decode the remaining audio and commit the final segments."""
+        with self.lock:
+            samples = self.decoder.close()
+            if self.diarizer is not None:
+                self.diarizer.add_audio(samples)
+            return self._label(self.transcriber.flush(samples))
+
+    def abort(self):
+        """Drop the session (client disconnected)."""
+        self.decoder.kill()
+
+    def _label(self, update):
+        if update is not None and self.diarizer is not None:
+            update['speakers'] = self.diarizer.add_regions(update['committed'])
+        return update
@@ -22,6 +22,55 @@ class Settings:
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "4000"))
     
+    # Maximum number of LLM extraction calls in flight per transcript
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    
+    # Extraction mode: "separate" (4 calls) or "combined" (1 JSON call)
+    LLM_EXTRACTION_MODE: str = os.getenv("LLM_EXTRACTION_MODE", "separate")
+    
+    # Transcripts longer than one chunk are analyzed map-reduce style
+    ANALYSIS_CHUNK_SIZE: int = int(os.getenv("ANALYSIS_CHUNK_SIZE", "15000"))
+    
+    # Persistent analysis cache (keyed on transcript content + settings)
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+    ANALYSIS_CACHE_PATH: str = os.getenv("ANALYSIS_CACHE_PATH", "data/cache/analysis_cache.db")
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Background jobs for /api/upload/jobs (persisted, bounded worker pool)
+    JOB_MAX_WORKERS: int = int(os.getenv("JOB_MAX_WORKERS", "2"))
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "data/jobs/jobs.db")
+    
+    # Shared ML models (Whisper, pyannote, embeddings)
+    MODEL_IDLE_TIMEOUT: float = float(os.getenv("MODEL_IDLE_TIMEOUT", "900"))
+    MODEL_MAX_RESIDENT_MB: float = float(os.getenv("MODEL_MAX_RESIDENT_MB", "0"))
+    MODEL_WARMUP: str = os.getenv("MODEL_WARMUP", "")
+    
+    # Live recordings: worker threads transcribing Socket.IO sessions (one session per worker at a time)
+    LIVE_MAX_WORKERS: int = int(os.getenv("LIVE_MAX_WORKERS", "4"))
+    # Also send the whole transcript with every live update (legacy clients that re-render it)
+    LIVE_FULL_SEGMENTS: bool = os.getenv("LIVE_FULL_SEGMENTS", "false").lower() == "true"
+    
+    # Offline transcription: audio split at silences, one faster-whisper (int8) model per worker process
+    PARALLEL_TRANSCRIPTION: bool = os.getenv("PARALLEL_TRANSCRIPTION", "false").lower() == "true"
+    TRANSCRIBE_WORKERS: int = int(os.getenv("TRANSCRIBE_WORKERS", "0"))
+    TRANSCRIBE_MODEL: str = os.getenv("TRANSCRIBE_MODEL", "large-v3")
+    TRANSCRIBE_MEMORY_MB: float = float(os.getenv("TRANSCRIBE_MEMORY_MB", "0"))
+    TRANSCRIBE_SEGMENT_SECONDS: float = float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "120"))
+    TRANSCRIBE_OVERLAP_SECONDS: float = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "1.0"))
+    
+    # History chat retrieval: BM25 (SQLite FTS5) + embeddings, fused with reciprocal rank fusion
+    HYBRID_RETRIEVAL: bool = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+    RETRIEVAL_CANDIDATE_POOL: int = int(os.getenv("RETRIEVAL_CANDIDATE_POOL", "20"))
+    RRF_K: int = int(os.getenv("RRF_K", "60"))
+    
+    # History chat reranking: CPU cross-encoder over a larger candidate pool, under a latency budget
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL: str = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", "30"))
+    RERANK_BUDGET_MS: int = int(os.getenv("RERANK_BUDGET_MS", "300"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+    
     # Output Language
     OUTPUT_LANGUAGE: str = os.getenv("OUTPUT_LANGUAGE", "vi")
 
@@ -0,0 +1,535 @@
+"""SQLite catalog of saved analyses.
+
+The JSON files in ``data/history`` stay the source of truth; the catalog
+keeps one indexed row per file (id, timestamp, original_file, meeting_type,
+language, summary_preview, content_hash, source_hash) so listing, filename
+and uploaded-file lookup and filtering are index queries instead of
+opening every JSON file.
+
+An FTS5 table over the analysis text (summary, topics, action items,
+decisions, transcript) serves keyword search - names, ticket IDs, exact
+Vietnamese terms - without an embedding model.
+
+HistoryManager updates the catalog on save/delete. Files written by other
+tools (or restored from a backup) are picked up by ``rebuild``:
+
+    python tools/rebuild_history_catalog.py
+
+The ``search_index`` table is the manifest of what HistorySearcher has
+embedded (per collection and meeting: the file's content_hash when it was
+indexed, the chunks' content hash, chunking and chunk count), so an
+incremental reindex finds new, edited and deleted analyses with one query.
+"""
+
+import hashlib
+import html
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CATALOG_FILE = "catalog.db"
+PREVIEW_CHARS = 200
+
+COLUMNS = (
+    "id", "timestamp", "original_file", "meeting_type", "language", "summary_preview", "content_hash", "source_hash"
+)
+
+# FTS columns, searched in this order; bm25 weights favour names and summaries
+FTS_COLUMNS = ("original_file", "summary", "topics", "action_items", "decisions", "transcript")
+FTS_WEIGHTS = (5.0, 3.0, 2.0, 2.0, 2.0, 1.0)
+SNIPPET_TOKENS = 16
+# Highlight markers, swapped for <mark> after the snippet is HTML-escaped
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+SORT_ORDERS = {
+    "newest": "timestamp DESC",
+    "oldest": "timestamp ASC",
+    "name": "original_file COLLATE NOCASE ASC",
+}
+
+
+def _flatten(value: Any) -> str:
+    """Text of a summary/topic/action/decision field (str, dict or list of either)."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return " - ".join(_flatten(v) for v in value.values() if v)
+    if isinstance(value, (list, tuple)):
+        return "\n".join(_flatten(v) for v in value if v)
+    return str(value)
+
+
+def fts_query(query: str, match_any: bool = False) -> str:
+    """Turn user input into a safe FTS5 query.
+
+    Every whitespace-separated term is quoted, so punctuation in IDs
+    ("JIRA-142", "v2.0") is matched as a phrase instead of being parsed as
+    FTS syntax. A trailing ``*`` keeps prefix matching; terms without any
+    letter or digit are dropped.
+
+    Args:
+        query: Raw search text
+        match_any: OR the terms (ranked retrieval over long questions)
+            instead of requiring all of them
+
+    Returns:
+        FTS5 MATCH expression ('' when there is nothing to search)
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if any(ch.isalnum() for ch in term):
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return (" OR " if match_any else " ").join(terms)
+
+
+def catalog_entry(data: Dict[str, Any], content: Optional[bytes] = None) -> Dict[str, Any]:
+    """Build a catalog row from an analysis dict.
+
+    Args:
+        data: Analysis as saved in the history JSON file
+        content: Raw file bytes (hashed for content_hash); the dict is
+            serialized when omitted
+
+    Returns:
+        Row dict with the catalog columns, file_stem and the FTS text columns
+    """
+    if content is None:
+        content = json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    metadata = data.get("metadata") or {}
+    original_file = data.get("original_file") or ""
+    return {
+        "id": data.get("id") or "",
+        "timestamp": data.get("timestamp") or "",
+        "original_file": original_file,
+        "meeting_type": metadata.get("meeting_type", "meeting"),
+        "language": metadata.get("language", ""),
+        "summary_preview": (data.get("summary") or "")[:PREVIEW_CHARS],
+        "content_hash": hashlib.sha256(content).hexdigest(),
+        "source_hash": metadata.get("source_hash") or "",
+        "file_stem": Path(original_file).stem.lower(),
+        "summary": _flatten(data.get("summary")),
+        "topics": _flatten(data.get("topics")),
+        "action_items": _flatten(data.get("action_items")),
+        "decisions": _flatten(data.get("decisions")),
+        "transcript": _flatten(data.get("transcript") or metadata.get("transcript")),
+    }
+
+
+class HistoryCatalog:
+    """Indexed metadata for the history JSON files."""
+
+    def __init__(self, db_path: str = "data/history/catalog.db"):
+        """Initialize catalog.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS history (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    original_file TEXT NOT NULL,
+                    file_stem TEXT NOT NULL,
+                    meeting_type TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    summary_preview TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    source_hash TEXT NOT NULL DEFAULT ''
+                )"""
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(history)")}
+            if "source_hash" not in columns:
+                self.conn.execute("ALTER TABLE history ADD COLUMN source_hash TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_type ON history(meeting_type, timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_name ON history(original_file COLLATE NOCASE)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_stem ON history(file_stem, timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_hash ON history(content_hash)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_source ON history(source_hash, timestamp)")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS search_index (
+                    collection TEXT NOT NULL,
+                    meeting_id TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    chunking TEXT NOT NULL,
+                    chunks INTEGER NOT NULL,
+                    PRIMARY KEY (collection, meeting_id)
+                )"""
+            )
+            # rowid matches history.rowid; remove_diacritics: "quyet dinh" also finds "quyết định"
+            self.conn.execute(
+                f"""CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                    {', '.join(FTS_COLUMNS)},
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )"""
+            )
+
+    def upsert(self, entry: Dict[str, Any]):
+        """Insert or replace a row built by catalog_entry()."""
+        with self.lock, self.conn:
+            self._upsert(entry)
+
+    def delete(self, history_id: str) -> bool:
+        """Remove a row.
+
+        Returns:
+            True if a row was removed
+        """
+        with self.lock, self.conn:
+            return self._delete(history_id)
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM history")
+            self.conn.execute("DELETE FROM history_fts")
+
+    def get(self, history_id: str) -> Optional[Dict[str, Any]]:
+        """Row for a history ID, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history WHERE id = ?", (history_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list(
+        self,
+        limit: int = 20,
+        meeting_type: Optional[str] = None,
+        sort_by: str = "newest",
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """List rows.
+
+        Args:
+            limit: Maximum number of rows
+            meeting_type: Only this meeting type (None or 'all' for every type)
+            sort_by: 'newest', 'oldest' or 'name'
+            offset: Rows to skip (paging)
+
+        Returns:
+            Row dicts
+        """
+        order = SORT_ORDERS.get(sort_by, SORT_ORDERS["newest"])
+        where, params = "", []
+        if meeting_type and meeting_type != "all":
+            where, params = "WHERE meeting_type = ?", [meeting_type]
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history {where} ORDER BY {order}, id LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Most recent analysis of a file.
+
+        An exact (case-insensitive) stem match is an index lookup; names that
+        only contain the stem (e.g. renamed copies) fall back to a substring
+        scan of the catalog rows, never of the JSON files.
+
+        Args:
+            filename: Uploaded filename (with or without extension)
+
+        Returns:
+            Row dict or None
+        """
+        stem = Path(filename).stem.lower()
+        if not stem:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history WHERE file_stem = ? "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (stem,)
+            ).fetchone()
+            if row is None:
+                pattern = stem.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                row = self.conn.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM history WHERE lower(original_file) LIKE ? ESCAPE '\\' "
+                    "ORDER BY timestamp DESC LIMIT 1",
+                    (f"%{pattern}%",)
+                ).fetchone()
+        return dict(row) if row else None
+
+    def find_by_content_hash(self, content_hash: str) -> List[Dict[str, Any]]:
+        """Rows whose JSON content hashes to content_hash."""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history WHERE content_hash = ? ORDER BY timestamp DESC",
+                (content_hash,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_by_source_hash(self, source_hash: str) -> Optional[Dict[str, Any]]:
+        """Most recent row analysed from an uploaded file with this SHA-256, or None."""
+        if not source_hash:
+            return None
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history WHERE source_hash = ? "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (source_hash,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def keyword_search(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        meeting_type: Optional[str] = None,
+        language: Optional[str] = None,
+        match_any: bool = False
+    ) -> Dict[str, Any]:
+        """Full-text search over the analysis text.
+
+        Args:
+            query: Search terms (all must match; ``term*`` for prefixes)
+            limit: Page size
+            offset: Results to skip
+            meeting_type: Only this meeting type ('all' or None for every type)
+            language: Only this language
+            match_any: Match meetings containing any term (ranked by bm25)
+
+        Returns:
+            {'results': [row + score + snippet], 'total': int, 'took_ms': float};
+            snippets are HTML-escaped with matches wrapped in <mark>
+        """
+        start = time.perf_counter()
+        match = fts_query(query, match_any=match_any)
+        if not match:
+            return {'results': [], 'total': 0, 'took_ms': 0.0}
+
+        where, params = ["history_fts MATCH ?"], [match]
+        if meeting_type and meeting_type != "all":
+            where.append("h.meeting_type = ?")
+            params.append(meeting_type)
+        if language:
+            where.append("h.language = ?")
+            params.append(language)
+        where = " AND ".join(where)
+        bm25 = f"bm25(history_fts, {', '.join(str(w) for w in FTS_WEIGHTS)})"
+
+        with self.lock:
+            try:
+                total = self.conn.execute(
+                    f"SELECT COUNT(*) FROM history_fts JOIN history h ON h.rowid = history_fts.rowid WHERE {where}",
+                    params
+                ).fetchone()[0]
+                rows = self.conn.execute(
+                    f"""SELECT h.rowid AS rowid, {', '.join('h.' + c for c in COLUMNS)}, {bm25} AS score
+                        FROM history_fts JOIN history h ON h.rowid = history_fts.rowid
+                        WHERE {where} ORDER BY score, h.timestamp DESC LIMIT ? OFFSET ?""",
+                    (*params, limit, offset)
+                ).fetchall()
+                # Snippets only for the returned page; they cost more than ranking
+                snippets = dict(self.conn.execute(
+                    f"""SELECT rowid, snippet(history_fts, -1, ?, ?, '…', {SNIPPET_TOKENS})
+                        FROM history_fts WHERE history_fts MATCH ?
+                        AND rowid IN ({', '.join('?' * len(rows))})""",
+                    (_MARK_OPEN, _MARK_CLOSE, match, *(row['rowid'] for row in rows))
+                ).fetchall()) if rows else {}
+            except sqlite3.OperationalError as e:
+                # Terms the tokenizer drops entirely (e.g. only punctuation)
+                print(f"[HistoryCatalog] Keyword search failed for {query!r}: {e}")
+                return {'results': [], 'total': 0, 'took_ms': 0.0}
+
+        results = []
+        for row in rows:
+            item = dict(row)
+            rowid = item.pop('rowid')
+            # bm25 is lower-is-better and negative; expose higher-is-better
+            item['score'] = round(-item['score'], 4)
+            item['snippet'] = (
+                html.escape(snippets.get(rowid, ""))
+                .replace(_MARK_OPEN, "<mark>")
+                .replace(_MARK_CLOSE, "</mark>")
+            )
+            results.append(item)
+        return {
+            'results': results,
+            'total': total,
+            'took_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def needs_rebuild(self, history_dir: str) -> bool:
+        """True when JSON files exist but the catalog (or its text index) was never built."""
+        with self.lock:
+            rows = self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            indexed = self.conn.execute("SELECT COUNT(*) FROM history_fts").fetchone()[0]
+        if rows:
+            return indexed != rows
+        return any(Path(history_dir).glob("*.json"))
+
+    def rebuild(self, history_dir: str = "data/history") -> int:
+        """Recreate the catalog from the JSON files on disk.
+
+        Unreadable files are skipped. The swap happens in one transaction,
+        so readers never see a half-built catalog. Files are parsed one at
+        a time, so transcripts are never all held in memory.
+
+        Args:
+            history_dir: Directory with history JSON files
+
+        Returns:
+            Number of analyses cataloged
+        """
+        count = 0
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM history")
+            self.conn.execute("DELETE FROM history_fts")
+            for path in sorted(Path(history_dir).glob("*.json")):
+                try:
+                    content = path.read_bytes()
+                    data = json.loads(content)
+                except (OSError, ValueError) as e:
+                    print(f"[HistoryCatalog] Skipping {path.name}: {e}")
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                data.setdefault("id", path.stem)
+                self._upsert(catalog_entry(data, content))
+                count += 1
+        return count
+
+    def index_changes(
+        self,
+        collection: str,
+        chunking: str,
+        force: bool = False
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Compare the catalog with a search index manifest (one query).
+
+        Args:
+            collection: Vector collection the manifest describes
+            chunking: Current chunking; meetings indexed with another one changed
+            force: Report every analysis as changed
+
+        Returns:
+            (changed, deleted) rows with ``meeting_id``, ``fingerprint`` (the
+            file's current content_hash) and ``content_hash`` (of the indexed
+            chunks, '' if never indexed). Changed: new, edited since indexing
+            or chunked differently; deleted: indexed but no longer cataloged
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT h.id AS meeting_id, h.content_hash AS fingerprint,
+                          COALESCE(s.content_hash, '') AS content_hash, 0 AS deleted
+                   FROM history h LEFT JOIN search_index s ON s.collection = ? AND s.meeting_id = h.id
+                   WHERE ? OR s.meeting_id IS NULL OR s.fingerprint != h.content_hash OR s.chunking != ?
+                   UNION ALL
+                   SELECT s.meeting_id, '', s.content_hash, 1
+                   FROM search_index s LEFT JOIN history h ON h.id = s.meeting_id
+                   WHERE s.collection = ? AND h.id IS NULL""",
+                (collection, int(force), chunking, collection)
+            ).fetchall()
+        changed = [dict(row) for row in rows if not row["deleted"]]
+        deleted = [dict(row) for row in rows if row["deleted"]]
+        for row in changed + deleted:
+            del row["deleted"]
+        return changed, deleted
+
+    def indexed_chunk_count(self, collection: str) -> int:
+        """Chunks the manifest says a collection holds."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COALESCE(SUM(chunks), 0) FROM search_index WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+    def record_indexed(self, collection: str, rows: Iterable[Dict[str, Any]]):
+        """Insert or replace manifest rows (meeting_id, fingerprint, content_hash, chunking, chunks)."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT OR REPLACE INTO search_index
+                   (collection, meeting_id, fingerprint, content_hash, chunking, chunks)
+                   VALUES (:collection, :meeting_id, :fingerprint, :content_hash, :chunking, :chunks)""",
+                [dict(row, collection=collection) for row in rows]
+            )
+
+    def forget_indexed(self, collection: str, meeting_ids: Optional[Iterable[str]] = None):
+        """Drop manifest rows for some meetings, or for the whole collection (None)."""
+        with self.lock, self.conn:
+            if meeting_ids is None:
+                self.conn.execute("DELETE FROM search_index WHERE collection = ?", (collection,))
+            else:
+                self.conn.executemany(
+                    "DELETE FROM search_index WHERE collection = ? AND meeting_id = ?",
+                    [(collection, meeting_id) for meeting_id in meeting_ids]
+                )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _delete(self, history_id: str) -> bool:
+        # Called with self.lock held, inside a transaction
+        row = self.conn.execute("SELECT rowid FROM history WHERE id = ?", (history_id,)).fetchone()
+        if row is None:
+            return False
+        self.conn.execute("DELETE FROM history_fts WHERE rowid = ?", (row[0],))
+        self.conn.execute("DELETE FROM history WHERE rowid = ?", (row[0],))
+        return True
+
+    def _upsert(self, entry: Dict[str, Any]):
+        # Called with self.lock held, inside a transaction
+        self._delete(entry["id"])
+        rowid = self.conn.execute(
+            """INSERT INTO history
+               (id, timestamp, original_file, file_stem, meeting_type, language, summary_preview,
+                content_hash, source_hash)
+               VALUES (:id, :timestamp, :original_file, :file_stem, :meeting_type, :language,
+                       :summary_preview, :content_hash, :source_hash)""",
+            entry
+        ).lastrowid
+        self.conn.execute(
+            f"INSERT INTO history_fts (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (:rowid, {', '.join(':' + c for c in FTS_COLUMNS)})",
+            {**entry, "rowid": rowid}
+        )
+
+
+_catalogs: Dict[str, HistoryCatalog] = {}
+_catalogs_lock = Lock()
+
+
+def get_history_catalog(history_dir: str = "data/history") -> HistoryCatalog:
+    """Get or create the catalog for a history directory.
+
+    A new (empty) catalog next to existing JSON files, or one created
+    before the text index existed, is built from disk once, so upgrading
+    installs need no manual step.
+
+    Args:
+        history_dir: Directory with history JSON files
+
+    Returns:
+        HistoryCatalog instance (one per directory per process)
+    """
+    key = str(Path(history_dir).resolve())
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = HistoryCatalog(str(Path(history_dir) / CATALOG_FILE))
+            if catalog.needs_rebuild(history_dir):
+                count = catalog.rebuild(history_dir)
+                print(f"[HistoryCatalog] Built catalog for {count} analyses in {history_dir}")
+            _catalogs[key] = catalog
+        return catalog
@@ -4,7 +4,9 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
+
+from .history_catalog import catalog_entry, get_history_catalog
 
 
 class HistoryManager:
@@ -18,6 +20,7 @@ class HistoryManager:
         """
         self.history_dir = Path(history_dir)
         self.history_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = get_history_catalog(str(self.history_dir))
     
     def save_analysis(
         self,
@@ -60,10 +63,11 @@ class HistoryManager:
             "metadata": metadata or {}
         }
         
-        # Save to JSON file
+        # Save to JSON file, then catalog it
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
         history_file = self.history_dir / f"{history_id}.json"
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        history_file.write_bytes(content)
+        self.catalog.upsert(catalog_entry(data, content))
         
         return history_id
     
@@ -86,38 +90,83 @@ class HistoryManager:
         
         return data
     
-    def list_history(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """List recent analysis history.
+    def list_history(
+        self,
+        limit: int = 20,
+        meeting_type: Optional[str] = None,
+        sort_by: str = "newest"
+    ) -> List[Dict[str, Any]]:
+        """List recent analysis history (from the catalog, no JSON parsing).
         
         Args:
             limit: Maximum number of items to return
+            meeting_type: Only this meeting type ('all' or None for every type)
+            sort_by: 'newest', 'oldest' or 'name'
             
         Returns:
             List of history items (metadata only)
         """
-        history_files = sorted(
-            self.history_dir.glob("*.json"),
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
+        history_list = self.catalog.list(limit=limit, meeting_type=meeting_type, sort_by=sort_by)
+        for item in history_list:
+            item["summary_preview"] = item["summary_preview"][:100] + "..."
+        return history_list
+    
+    def find_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry of the most recent analysis of a file, or None."""
+        return self.catalog.find_by_filename(filename)
+    
+    def find_by_source_hash(self, source_hash: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry of the most recent analysis of an uploaded file (by content SHA-256), or None."""
+        return self.catalog.find_by_source_hash(source_hash)
+    
+    def find_previous_upload(self, source_hash: str = "", filenames: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """Catalog entry of an earlier analysis of an uploaded file, or None.
         
-        history_list = []
-        for file in history_files[:limit]:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Return metadata only
-                history_list.append({
-                    "id": data.get("id"),
-                    "timestamp": data.get("timestamp"),
-                    "original_file": data.get("original_file"),
-                    "summary_preview": data.get("summary", "")[:100] + "..."
-                })
-            except Exception:
-                continue
+        Content matches first, so a renamed re-upload is found. Otherwise the
+        filenames are looked up in order, skipping entries whose recorded hash
+        differs (a different file with a reused name); history saved before
+        hashes were recorded can only be found this way.
+        """
+        entry = self.find_by_source_hash(source_hash) if source_hash else None
+        if entry is not None:
+            return entry
+        for filename in filenames:
+            entry = self.find_by_filename(filename) if filename else None
+            if entry and (not source_hash or entry.get("source_hash") in ("", source_hash)):
+                return entry
+        return None
+    
+    def keyword_search(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        meeting_type: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Full-text search (SQLite FTS5) over summary, topics, actions, decisions and transcript.
         
-        return history_list
+        Args:
+            query: Search terms (all must match; ``term*`` for prefixes)
+            limit: Page size
+            offset: Results to skip
+            meeting_type: Only this meeting type
+            language: Only this language
+            
+        Returns:
+            {'results': [...], 'total': int, 'took_ms': float}
+        """
+        return self.catalog.keyword_search(
+            query, limit=limit, offset=offset, meeting_type=meeting_type, language=language
+        )
+    
+    def rebuild_catalog(self) -> int:
+        """Rebuild the catalog from the JSON files on disk.
+        
+        Returns:
+            Number of analyses cataloged
+        """
+        return self.catalog.rebuild(str(self.history_dir))
     
     def delete_analysis(self, history_id: str) -> bool:
         """Delete analysis from history.
@@ -132,8 +181,11 @@ class HistoryManager:
         
         if history_file.exists():
             history_file.unlink()
+            self.catalog.delete(history_id)
             return True
         
+        # Drop a stale row left by files removed outside the manager
+        self.catalog.delete(history_id)
         return False
     
     def clear_all_history(self) -> int:
@@ -146,6 +198,7 @@ class HistoryManager:
         for file in self.history_dir.glob("*.json"):
             file.unlink()
             count += 1
+        self.catalog.clear()
         
         return count
     
@@ -2,28 +2,38 @@
 History Semantic Searcher using ChromaDB.
 
 Smart ChromaDB usage:
-- Separate collection for meeting history
+- Chunk-level collection in the shared retrieval store (see backend.rag.retrieval_service):
+  every section (summary, topics, actions, decisions) and every transcript
+  window is its own vector with ``meeting_id`` / ``section`` metadata, so
+  nothing is lost to the embedding model's 256-token limit
+- Chunk hits aggregated back to meetings (max or sum of chunk scores)
 - Metadata filtering for efficient queries
 - Batch operations for indexing
-- Incremental updates
+- Incremental updates, diffed against the index manifest in the history catalog
 """
 
+import hashlib
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-import threading
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-except ImportError:
-    chromadb = None
+from backend.data.history_catalog import get_history_catalog
+from backend.rag.retrieval_service import get_retrieval_service
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    SentenceTransformer = None
+# all-MiniLM-L6-v2 reads 256 word pieces; Vietnamese words often take 2-3
+CHUNK_WORDS = 80
+CHUNK_OVERLAP_WORDS = 16
+# Stored with every chunk: changing the chunking re-embeds meetings
+CHUNKING = f"sections+transcript/{CHUNK_WORDS}/{CHUNK_OVERLAP_WORDS}"
+# Meetings per metadata ($in) lookup when fetching the chunks of changed meetings
+MEETING_LOOKUP_BATCH = 500
+# Chunks fetched per requested meeting before aggregation
+CHUNK_FANOUT = 5
+AGGREGATIONS = ("max", "sum")
 
 
 class HistorySearcher:
@@ -46,15 +56,9 @@ class HistorySearcher:
         self.history_dir.mkdir(parents=True, exist_ok=True)
         self.collection_name = collection_name
         
-        # Initialize ChromaDB client
-        if chromadb is None:
-            raise ImportError("chromadb not installed. Run: pip install chromadb")
-        
-        # Create persistent ChromaDB client
-        chroma_dir = Path("data/chroma_history")
-        chroma_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.chroma_client = chromadb.PersistentClient(path=str(chroma_dir))
+        # Shared store and embedding model (also used by AdvancedRAG and ChromaManager)
+        self.store = get_retrieval_service()
+        self.chroma_client = self.store.client
         
         # Get or create collection for meeting history
         self.collection = self.chroma_client.get_or_create_collection(
@@ -62,18 +66,14 @@ class HistorySearcher:
             metadata={"description": "Meeting history for semantic search", "hnsw:space": "cosine"}
         )
         
-        if SentenceTransformer is None:
-            raise ImportError("sentence-transformers not installed")
+        # Manifest of what is embedded (see HistoryCatalog.index_changes)
+        self.catalog = get_history_catalog(str(self.history_dir))
         
-        # Model lazy loading/preloading
+        # Model is loaded (in background) by the shared store
         self.model = None
-        self.model_lock = threading.Lock()
+        self.last_index_stats: Dict[str, Any] = {}
         self.initialized = True
         
-        # Start preloading in background
-        print(f"[HistorySearcher] Starting background model load...")
-        threading.Thread(target=self._preload_model, daemon=True).start()
-        
         print(f"[OK] HistorySearcher initialized")
         print(f"     Collection: {self.collection_name}")
         try:
@@ -81,29 +81,20 @@ class HistorySearcher:
         except:
             pass
 
-    def _preload_model(self):
-        """Load model into memory in background."""
-        try:
-            with self.model_lock:
-                if self.model is None:
-                    print("[HistorySearcher] Preloading AI model (all-MiniLM-L6-v2)...")
-                    self.model = SentenceTransformer('all-MiniLM-L6-v2')
-                    print("[HistorySearcher] AI Model loaded successfully!")
-        except Exception as e:
-            print(f"[HistorySearcher] Model load failed: {e}")
-
-    def _get_model(self):
-        """Get model, loading if likely not yet ready (fallback)."""
-        with self.model_lock:
-            if self.model is None:
-                print("[HistorySearcher] Model not ready/preloaded. Loading now (blocking)...")
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        return self.model
+    @contextmanager
+    def _use_model(self):
+        """Hold the shared embedding model while encoding (blocks until loaded)."""
+        if self.model is not None:
+            yield self.model
+            return
+        # Not kept on the instance so the registry can unload it when idle
+        with self.store.use_model() as model:
+            yield model
     
-    def _create_search_document(self, meeting_data: Dict) -> str:
-        """Create searchable document from meeting data."""
-        parts = []
-        if meeting_data.get('summary'): parts.append(f"Summary: {meeting_data['summary']}")
+    def _sections(self, meeting_data: Dict) -> List[Tuple[str, str]]:
+        """(section, text) pairs for summary, topics, actions and decisions."""
+        sections = []
+        if meeting_data.get('summary'): sections.append(("summary", f"Summary: {meeting_data['summary']}"))
         
         # Topics: handle both list of strings and list of dicts
         if meeting_data.get('topics'):
@@ -115,7 +106,7 @@ class HistorySearcher:
                 else:
                     # List of dicts
                     topics_text = ", ".join([f"{t.get('topic', '')} - {t.get('description', '')}" for t in topics])
-                parts.append(f"Topics: {topics_text}")
+                sections.append(("topics", f"Topics: {topics_text}"))
         
         # Action items: handle both formats
         if meeting_data.get('action_items'):
@@ -125,7 +116,7 @@ class HistorySearcher:
                     actions_text = ", ".join(actions)
                 else:
                     actions_text = ", ".join([f"{a.get('task', '')} ({a.get('assignee', '')})" for a in actions])
-                parts.append(f"Actions: {actions_text}")
+                sections.append(("actions", f"Actions: {actions_text}"))
         
         # Decisions: handle both formats
         if meeting_data.get('decisions'):
@@ -135,9 +126,43 @@ class HistorySearcher:
                     decisions_text = ", ".join(decisions)
                 else:
                     decisions_text = ", ".join([f"{d.get('decision', '')} - {d.get('context', '')}" for d in decisions])
-                parts.append(f"Decisions: {decisions_text}")
+                sections.append(("decisions", f"Decisions: {decisions_text}"))
+        
+        return sections
+    
+    def _create_search_document(self, meeting_data: Dict) -> str:
+        """Create searchable document from meeting data (all sections, used as LLM context)."""
+        return " ".join(text for _, text in self._sections(meeting_data))
+    
+    @staticmethod
+    def _windows(text: str, size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP_WORDS) -> List[str]:
+        """Split text into overlapping windows of ``size`` words."""
+        words = text.split()
+        if len(words) <= size:
+            return [" ".join(words)] if words else []
+        step = size - overlap
+        return [" ".join(words[i:i + size]) for i in range(0, len(words) - overlap, step)]
+    
+    def _create_chunks(self, meeting_data: Dict) -> List[Tuple[str, int, str]]:
+        """(section, index, text) chunks: each section, then transcript windows.
+        
+        Long sections are windowed too; every window keeps its section label.
+        """
+        chunks = []
+        for section, text in self._sections(meeting_data):
+            label, _, body = text.partition(": ")
+            for index, window in enumerate(self._windows(body)):
+                chunks.append((section, index, f"{label}: {window}"))
         
-        return " ".join(parts)
+        transcript = meeting_data.get('transcript') or meeting_data.get('metadata', {}).get('transcript') or ''
+        if isinstance(transcript, str):
+            for index, window in enumerate(self._windows(transcript)):
+                chunks.append(("transcript", index, window))
+        return chunks
+    
+    @staticmethod
+    def _chunk_id(meeting_id: str, section: str, index: int) -> str:
+        return f"{meeting_id}::{section}:{index}"
     
     def _extract_metadata(self, meeting_data: Dict) -> Dict:
         """Extract metadata for ChromaDB filtering."""
@@ -151,110 +176,381 @@ class HistorySearcher:
             metadata['language'] = meeting_data['metadata']['language']
         return metadata
     
+    def _build_chunks(self, meeting_id: str, meeting_data: Dict, extra: Optional[Dict] = None) -> Optional[tuple]:
+        """Build (chunk ids, texts, metadatas) for a meeting; None if it has no text.
+        
+        Every chunk carries the meeting metadata plus ``section`` and
+        ``chunk_index``; ``content_hash`` covers all chunks of the meeting.
+        """
+        chunks = self._create_chunks(meeting_data)
+        if not chunks: return None
+        
+        metadata = self._extract_metadata(meeting_data)
+        metadata['meeting_id'] = meeting_id
+        metadata['chunking'] = CHUNKING
+        metadata['content_hash'] = self._content_hash([text for _, _, text in chunks], metadata)
+        metadata.update(extra or {})
+        
+        ids = [self._chunk_id(meeting_id, section, index) for section, index, _ in chunks]
+        texts = [text for _, _, text in chunks]
+        metadatas = [dict(metadata, section=section, chunk_index=index) for section, index, _ in chunks]
+        return ids, texts, metadatas
+    
     def index_single_meeting(self, meeting_id: str, meeting_data: Dict) -> bool:
-        """Index a single meeting into ChromaDB."""
+        """Index a single meeting (all of its chunks) into ChromaDB."""
         try:
-            doc_text = self._create_search_document(meeting_data)
-            if not doc_text.strip(): return False
-            
-            metadata = self._extract_metadata(meeting_data)
-            embedding = self._get_model().encode(doc_text).tolist()
+            built = self._build_chunks(meeting_id, meeting_data)
+            if built is None: return False
+            ids, texts, metadatas = built
             
+            with self._use_model() as model:
+                embeddings = model.encode(texts, normalize_embeddings=True).tolist()
             self.collection.upsert(
-                ids=[meeting_id],
-                embeddings=[embedding],
-                documents=[doc_text],
-                metadatas=[metadata]
+                ids=ids,
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas
             )
+            
+            # Drop chunks the meeting no longer has (and a legacy whole-meeting vector)
+            existing = list(self.collection.get(where={"meeting_id": meeting_id}, include=[]).get('ids') or [])
+            existing += self.collection.get(ids=[meeting_id], include=[]).get('ids') or []
+            current = set(ids)
+            stale = sorted({i for i in existing if i not in current})
+            if stale:
+                self.collection.delete(ids=stale)
+            # No file fingerprint: the next full pass re-checks this meeting (without re-embedding)
+            self.catalog.record_indexed(self.collection_name, [{
+                'meeting_id': meeting_id, 'fingerprint': '', 'content_hash': metadatas[0]['content_hash'],
+                'chunking': CHUNKING, 'chunks': len(ids)
+            }])
             return True
         except Exception as e:
             print(f"[ERROR] Failed to index {meeting_id}: {e}")
             return False
     
-    def index_all_meetings(self, force_reindex: bool = False) -> int:
-        """Index all meetings from history directory."""
+    @staticmethod
+    def _content_hash(doc_text, metadata: Dict) -> str:
+        """Hash of everything that is stored for a meeting (chunk texts + filter metadata)."""
+        payload = json.dumps([doc_text, metadata], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+    
+    def _parse_history_file(self, history_file: Path) -> Optional[tuple]:
+        """Load a history file and build (meeting_id, chunk ids, texts, metadatas).
+        
+        A meeting without any text has no chunks (empty lists); None if the
+        file cannot be read.
+        """
+        try:
+            with open(history_file, 'r', encoding='utf-8') as f:
+                meeting_data = json.load(f)
+            
+            meeting_id = meeting_data.get('id', history_file.stem)
+            built = self._build_chunks(meeting_id, meeting_data, {'source_file': history_file.name})
+            return (meeting_id,) + (built or ([], [], []))
+        except Exception as e:
+            print(f"[ERROR] Failed to process {history_file}: {e}")
+            return None
+    
+    def _get_indexed_metadata(self, page_size: int = 10000) -> Dict[str, Dict]:
+        """Fetch chunk id -> metadata for everything in the collection (paged bulk reads)."""
+        indexed = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            ids = page.get('ids') or []
+            metadatas = page.get('metadatas') or [{}] * len(ids)
+            for chunk_id, metadata in zip(ids, metadatas):
+                indexed[chunk_id] = metadata or {}
+            if len(ids) < page_size:
+                break
+            offset += page_size
+        return indexed
+    
+    def _get_meeting_metadata(self, meeting_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch chunk id -> metadata for some meetings only (batched ``$in`` lookups)."""
+        indexed = {}
+        for i in range(0, len(meeting_ids), MEETING_LOOKUP_BATCH):
+            page = self.collection.get(
+                where={"meeting_id": {"$in": meeting_ids[i:i + MEETING_LOOKUP_BATCH]}},
+                include=["metadatas"]
+            )
+            ids = page.get('ids') or []
+            metadatas = page.get('metadatas') or [{}] * len(ids)
+            for chunk_id, metadata in zip(ids, metadatas):
+                indexed[chunk_id] = metadata or {}
+        return indexed
+    
+    def _get_indexed_meetings(self, meeting_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Group indexed chunks by meeting: meeting_id -> {'ids', 'content_hash'}.
+        
+        Args:
+            meeting_ids: Only these meetings (None = page through the whole collection)
+        """
+        chunks = self._get_indexed_metadata() if meeting_ids is None else self._get_meeting_metadata(meeting_ids)
+        meetings: Dict[str, Dict] = {}
+        for chunk_id, metadata in chunks.items():
+            meeting_id = metadata.get('meeting_id') or chunk_id
+            meetings.setdefault(meeting_id, {'ids': []})['ids'].append(chunk_id)
+        
+        for entry in meetings.values():
+            # Not whichever chunk Chroma returned first: the hash is known only if
+            # every chunk agrees, so a half-written meeting counts as changed
+            hashes = {chunks[i].get('content_hash') for i in entry['ids']}
+            entry['content_hash'] = hashes.pop() if len(hashes) == 1 else None
+        return meetings
+    
+    def _manifest_in_sync(self) -> bool:
+        """True when the manifest accounts for every chunk in the collection."""
+        try:
+            return self.catalog.indexed_chunk_count(self.collection_name) == self.collection.count()
+        except Exception:
+            return False
+    
+    def index_all_meetings(
+        self,
+        force_reindex: bool = False,
+        batch_size: int = 64,
+        normalize_embeddings: bool = True,
+        parse_workers: int = 4
+    ) -> int:
+        """Index all meetings from history directory (incrementally).
+        
+        The history catalog holds a manifest of what is embedded; one query
+        against it yields the meetings that are new, whose file changed
+        (catalog content_hash) or that were chunked differently, and the
+        ones that were deleted. Only those are read back from Chroma and
+        parsed; a changed file is re-embedded only if its chunk content hash
+        changed, after which chunks it no longer has are deleted. A no-op run
+        touches neither the history files nor Chroma beyond ``count()``.
+        
+        If the manifest does not account for every chunk in the collection
+        (first run after an upgrade, collection reset, external writes), or
+        with ``force_reindex``, the whole collection is read instead and the
+        manifest is rebuilt; chunks of meetings not in the catalog are purged.
+        
+        Chunks are embedded in batches of ``batch_size`` (one forward pass
+        per batch instead of per file) while a thread pool parses the JSON files.
+        
+        Args:
+            force_reindex: Rebuild the catalog from disk and re-embed every meeting
+            batch_size: Chunks per encode call / upsert
+            normalize_embeddings: L2-normalize vectors (cosine space)
+            parse_workers: Threads parsing history files (<= 1 parses inline)
+            
+        Returns:
+            Number of meetings (re-)embedded (details in ``self.last_index_stats``)
+        """
         print(f"\n[INFO] Indexing meetings from {self.history_dir}")
-        history_files = list(self.history_dir.glob("*.json"))
-        if not history_files: return 0
+        start = time.perf_counter()
+        
+        if force_reindex:
+            # Files written by other tools (generators, restores) join the catalog first
+            self.catalog.rebuild(str(self.history_dir))
+        full_scan = force_reindex or not self._manifest_in_sync()
+        if full_scan:
+            self.catalog.forget_indexed(self.collection_name)
         
-        ids_batch, embeddings_batch, documents_batch, metadatas_batch = [], [], [], []
+        changed, deleted = self.catalog.index_changes(self.collection_name, CHUNKING, force=force_reindex)
+        if full_scan:
+            indexed = self._get_indexed_meetings()
+        else:
+            indexed = self._get_indexed_meetings([row['meeting_id'] for row in changed + deleted])
+        manifest = {row['meeting_id']: row for row in changed}
+        to_parse = [self.history_dir / f"{row['meeting_id']}.json" for row in changed]
+        
+        seen_ids = set()
+        indexed_rows = []
+        ids_batch, documents_batch, metadatas_batch = [], [], []
+        refreshed_ids, refreshed_metadatas = [], []
+        replaced_ids = []
         indexed_count = 0
+        chunk_count = 0
+        encode_seconds = 0.0
         
-        for history_file in history_files:
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    meeting_data = json.load(f)
-                
-                meeting_id = meeting_data.get('id', history_file.stem)
-                
-                if not force_reindex:
-                    existing = self.collection.get(ids=[meeting_id])
-                    if existing['ids']: continue
-                
-                doc_text = self._create_search_document(meeting_data)
-                if not doc_text.strip(): continue
+        def flush():
+            nonlocal chunk_count, encode_seconds
+            encode_start = time.perf_counter()
+            with self._use_model() as model:
+                embeddings = model.encode(
+                    documents_batch,
+                    batch_size=batch_size,
+                    normalize_embeddings=normalize_embeddings
+                ).tolist()
+            encode_seconds += time.perf_counter() - encode_start
+            
+            self.collection.upsert(
+                ids=ids_batch,
+                embeddings=embeddings,
+                documents=documents_batch,
+                metadatas=metadatas_batch
+            )
+            chunk_count += len(ids_batch)
+            print(f"[OK] Indexed batch: {chunk_count} chunks")
+        
+        executor = ThreadPoolExecutor(max_workers=parse_workers) if parse_workers > 1 else None
+        try:
+            # Parsed meetings stream in file order while later files are still being read
+            parsed = executor.map(self._parse_history_file, to_parse) if executor else map(self._parse_history_file, to_parse)
+            
+            for history_file, item in zip(to_parse, parsed):
+                if item is None: continue
+                meeting_id, chunk_ids, texts, metadatas = item
+                if meeting_id not in manifest:
+                    print(f"[WARN] Skipping {history_file.name}: its id is {meeting_id}")
+                    continue
+                seen_ids.add(meeting_id)
+                previous = indexed.get(meeting_id)
+                content_hash = metadatas[0]['content_hash'] if metadatas else ''
+                indexed_rows.append({
+                    'meeting_id': meeting_id,
+                    'fingerprint': manifest[meeting_id]['fingerprint'],
+                    'content_hash': content_hash,
+                    'chunking': CHUNKING,
+                    'chunks': len(chunk_ids)
+                })
                 
-                metadata = self._extract_metadata(meeting_data)
-                embedding = self._get_model().encode(doc_text).tolist()
+                if not force_reindex and previous and chunk_ids:
+                    known_hash = manifest[meeting_id]['content_hash'] or previous['content_hash']
+                    if known_hash == content_hash:
+                        # Same content (file touched or re-saved): refresh metadata only
+                        refreshed_ids.extend(chunk_ids)
+                        refreshed_metadatas.extend(metadatas)
+                        continue
                 
-                ids_batch.append(meeting_id)
-                embeddings_batch.append(embedding)
-                documents_batch.append(doc_text)
-                metadatas_batch.append(metadata)
+                if previous:
+                    current = set(chunk_ids)
+                    replaced_ids.extend(i for i in previous['ids'] if i not in current)
+                if not chunk_ids: continue
+                indexed_count += 1
+                ids_batch.extend(chunk_ids)
+                documents_batch.extend(texts)
+                metadatas_batch.extend(metadatas)
                 
-                if len(ids_batch) >= 100:
-                    self.collection.upsert(
-                        ids=ids_batch,
-                        embeddings=embeddings_batch,
-                        documents=documents_batch,
-                        metadatas=metadatas_batch
+                while len(ids_batch) >= batch_size:
+                    rest = ids_batch[batch_size:], documents_batch[batch_size:], metadatas_batch[batch_size:]
+                    ids_batch, documents_batch, metadatas_batch = (
+                        ids_batch[:batch_size], documents_batch[:batch_size], metadatas_batch[:batch_size]
                     )
-                    indexed_count += len(ids_batch)
-                    print(f"[OK] Indexed batch: {indexed_count} meetings")
-                    ids_batch, embeddings_batch, documents_batch, metadatas_batch = [], [], [], []
-                
-            except Exception as e:
-                print(f"[ERROR] Failed to process {history_file}: {e}")
-                continue
+                    flush()
+                    ids_batch, documents_batch, metadatas_batch = rest
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
         
         if ids_batch:
-            self.collection.upsert(
-                ids=ids_batch,
-                embeddings=embeddings_batch,
-                documents=documents_batch,
-                metadatas=metadatas_batch
-            )
-            indexed_count += len(ids_batch)
+            flush()
         
-        print(f"   Indexed: {indexed_count} meetings")
+        if refreshed_ids:
+            self.collection.update(ids=refreshed_ids, metadatas=refreshed_metadatas)
+        
+        # Chunks that re-embedded meetings no longer have (after their new chunks are in)
+        if replaced_ids:
+            self.collection.delete(ids=replaced_ids)
+        
+        # Purge meetings whose history file no longer exists
+        stale_meetings = [meeting_id for meeting_id in indexed if meeting_id not in seen_ids]
+        if stale_meetings:
+            self.collection.delete(ids=[i for meeting_id in stale_meetings for i in indexed[meeting_id]['ids']])
+            print(f"[OK] Purged {len(stale_meetings)} deleted meetings")
+        
+        # Manifest last, once Chroma holds what it describes
+        self.catalog.forget_indexed(
+            self.collection_name, [row['meeting_id'] for row in changed + deleted if row['meeting_id'] not in seen_ids]
+        )
+        self.catalog.record_indexed(self.collection_name, indexed_rows)
+        
+        elapsed = time.perf_counter() - start
+        total = self.catalog.count()
+        self.last_index_stats = {
+            "indexed": indexed_count,
+            "chunks": chunk_count,
+            "files": total,
+            "parsed": len(to_parse),
+            "unchanged": total - len(to_parse) + len({m['meeting_id'] for m in refreshed_metadatas}),
+            "full_scan": full_scan,
+            "purged": len(stale_meetings),
+            "seconds": round(elapsed, 3),
+            "encode_seconds": round(encode_seconds, 3),
+            "docs_per_sec": round(chunk_count / elapsed, 1) if elapsed > 0 else 0.0,
+            "batch_size": batch_size,
+            "parse_workers": parse_workers
+        }
+        print(f"   Indexed: {indexed_count} meetings ({chunk_count} chunks) in {elapsed:.2f}s "
+              f"({self.last_index_stats['docs_per_sec']} chunks/sec, encode {encode_seconds:.2f}s, "
+              f"unchanged {self.last_index_stats['unchanged']}, purged {len(stale_meetings)})")
         return indexed_count
 
-    def semantic_search(self, query: str, top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
-        """Perform semantic search."""
+    def semantic_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict] = None,
+        aggregate: str = "max"
+    ) -> List[Dict]:
+        """Perform semantic search over chunks, aggregated per meeting.
+        
+        Args:
+            query: Search text
+            top_k: Meetings to return
+            filters: Chroma ``where`` filter on meeting metadata
+            aggregate: "max" (best chunk decides) or "sum" (meetings matching
+                in several sections/windows rank higher)
+        
+        Returns:
+            [{'id': meeting_id, 'score', 'matched_text': best chunk text,
+              'metadata', 'chunks': [{'id', 'section', 'chunk_index', 'text', 'score'}]}],
+            best first; chunks are best first too
+        """
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"aggregate must be one of {AGGREGATIONS}")
         try:
             if not query.strip(): return []
             
-            embedding = self._get_model().encode(query).tolist()
+            with self._use_model() as model:
+                embedding = model.encode(query).tolist()
             
             search_args = {
                 "query_embeddings": [embedding],
-                "n_results": top_k
+                # Several chunks usually come from the same meeting
+                "n_results": top_k * CHUNK_FANOUT
             }
             if filters: search_args["where"] = filters
             
             results = self.collection.query(**search_args)
             
-            formatted_results = []
+            meetings: Dict[str, Dict] = {}
             if results['ids'] and results['ids'][0]:
                 for i in range(len(results['ids'][0])):
-                    formatted_results.append({
-                        'id': results['ids'][0][i],
-                        'score': 1 - results['distances'][0][i] if 'distances' in results else 0,
-                        'matched_text': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i]
-                    })
+                    chunk_id = results['ids'][0][i]
+                    metadata = results['metadatas'][0][i] or {}
+                    score = 1 - results['distances'][0][i] if 'distances' in results else 0
+                    # Legacy whole-meeting vectors have no section: the id is the meeting
+                    meeting_id = metadata.get('meeting_id') or chunk_id
+                    
+                    chunk = {
+                        'id': chunk_id,
+                        'section': metadata.get('section'),
+                        'chunk_index': metadata.get('chunk_index'),
+                        'text': results['documents'][0][i],
+                        'score': score
+                    }
+                    meeting = meetings.get(meeting_id)
+                    if meeting is None:
+                        # Chroma returns nearest chunks first: the first one is the best
+                        meetings[meeting_id] = {
+                            'id': meeting_id,
+                            'score': score,
+                            'matched_text': chunk['text'],
+                            'metadata': metadata,
+                            'chunks': [chunk]
+                        }
+                        continue
+                    meeting['chunks'].append(chunk)
+                    if aggregate == "sum":
+                        meeting['score'] += score
             
-            return formatted_results
+            return sorted(meetings.values(), key=lambda m: -m['score'])[:top_k]
             
         except Exception as e:
             print(f"[ERROR] Semantic search failed: {e}")
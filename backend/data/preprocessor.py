@@ -1,5 +1,12 @@
 """Text preprocessing."""
 
+import re
+from typing import List
+
+# Ranh giới lượt nói: xuống dòng, timestamp "[MM:SS]" hoặc nhãn "**Speaker**:"
+TURN_BOUNDARY = re.compile(r'\s*\n+\s*|\s+(?=\[\d{1,2}:\d{2}(?::\d{2})?\])|(?<!\])\s+(?=\*\*[^*\n]{1,40}\*\*:)')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+')
+
 
 class TranscriptPreprocessor:
     """Tiền xử lý transcript text."""
@@ -40,3 +47,68 @@ class TranscriptPreprocessor:
         if len(text) <= max_length:
             return text
         return text[:max_length] + "\n\n[... Transcript đã được cắt ngắn ...]"
+
+    @staticmethod
+    def split_turns(text: str) -> List[str]:
+        """
+        Tách transcript thành các lượt nói theo ranh giới speaker/timestamp.
+
+        Args:
+            text: Transcript text
+
+        Returns:
+            List các lượt nói (không rỗng)
+        """
+        return [turn.strip() for turn in TURN_BOUNDARY.split(text) if turn and turn.strip()]
+
+    @staticmethod
+    def chunk_text(text: str, max_length: int = 15000, overlap: int = 1) -> List[str]:
+        """
+        Chia transcript thành các đoạn không vượt quá max_length ký tự.
+
+        Ưu tiên cắt theo lượt nói (speaker/timestamp), sau đó theo câu, cuối
+        cùng mới cắt cứng. Mỗi đoạn lặp lại ``overlap`` lượt nói cuối của đoạn
+        trước để giữ ngữ cảnh.
+
+        Args:
+            text: Transcript text
+            max_length: Độ dài tối đa mỗi đoạn
+            overlap: Số lượt nói lặp lại giữa hai đoạn liên tiếp
+
+        Returns:
+            List các đoạn transcript
+        """
+        if len(text) <= max_length:
+            return [text] if text.strip() else []
+
+        # Break oversized turns into sentences, then hard-split what is still too long
+        units = []
+        for turn in TranscriptPreprocessor.split_turns(text):
+            if len(turn) <= max_length:
+                units.append(turn)
+                continue
+            for sentence in SENTENCE_BOUNDARY.split(turn):
+                while len(sentence) > max_length:
+                    units.append(sentence[:max_length])
+                    sentence = sentence[max_length:]
+                if sentence.strip():
+                    units.append(sentence)
+
+        chunks = []
+        current: List[str] = []
+        current_len = 0
+        for unit in units:
+            if current and current_len + len(unit) + 1 > max_length:
+                chunks.append("\n".join(current))
+                # Carry the last turns over, as long as they leave room for new content
+                carried = current[-overlap:] if overlap > 0 else []
+                while carried and sum(len(u) + 1 for u in carried) + len(unit) > max_length // 2:
+                    carried = carried[1:]
+                current = list(carried)
+                current_len = sum(len(u) + 1 for u in current)
+            current.append(unit)
+            current_len += len(unit) + 1
+
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
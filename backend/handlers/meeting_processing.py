@@ -3,8 +3,10 @@
 import sys
 from pathlib import Path
 from datetime import datetime
+import hashlib
 import logging
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,7 +23,13 @@ from backend.utils.error_handler import (
     safe_execute
 )
 from backend.utils.rate_limiter import get_rate_limiter
-from backend.utils.cache import get_cached_llm_response, cache_llm_response
+from backend.utils.analysis_cache import (
+    get_analysis_cache,
+    analysis_cache_key,
+    file_content_hash,
+    normalize_transcript,
+    transcript_cache_key
+)
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -29,7 +37,7 @@ logger = get_logger(__name__)
 from backend.config import Settings
 from backend.data import TranscriptLoader, TranscriptPreprocessor
 from backend.data.history_manager import HistoryManager
-from backend.llm import LLMManager
+from backend.llm import LLMManager, PromptTemplates
 from backend.rag import Chatbot
 from backend.audio.audio_manager import AudioManager
 from backend.audio.stt_processor import STTProcessor
@@ -52,10 +60,62 @@ last_actions = []
 last_decisions = []
 current_language = "vi"
 current_filename = ""
+# Serializes process_file, which publishes its results through the globals above
+_analysis_lock = threading.Lock()
+
+
+def _report_progress(progress, stage, percent, partial=None):
+    """Forward pipeline progress to a job's report callback (if any)."""
+    if progress is None:
+        return
+    try:
+        progress(stage, percent, partial)
+    except Exception as e:
+        logger.warning(f"Progress callback failed: {e}")
+
+
+def _transcribe_parallel(audio_file, language, progress=None, audio=None):
+    """Transcribe with the faster-whisper worker pool.
+
+    Args:
+        audio: The upload already decoded (DecodedAudio), shared with validation
+
+    Returns:
+        Transcript text, or None if faster-whisper is not installed
+    """
+    import importlib.util
+    if importlib.util.find_spec("faster_whisper") is None:
+        logger.warning("faster-whisper not installed, using the Whisper pipeline")
+        return None
+
+    from backend.audio.parallel_transcriber import transcribe_file_parallel
+
+    def on_segment(done, total, text):
+        _report_progress(progress, 'transcribing', 10 + int(30 * done / total), {'transcript': text})
+
+    logger.info("Using parallel faster-whisper pipeline")
+    transcript, _ = transcribe_file_parallel(audio_file, language, on_segment, audio=audio)
+    return transcript
+
+
+def process_file(file, meeting_type, output_language, progress=None, source_hash=None):
+    """Process uploaded transcript file - Using working logic from gradio_app.py.
+    
+    Analyses run one at a time: results are published through module-level
+    state (``chatbot``, ``last_summary``, ...), which concurrent background
+    jobs would otherwise overwrite mid-analysis. Transcription (in
+    process_upload) still runs concurrently.
+    
+    Args:
+        progress: Optional callback(stage, percent, partial) used by background jobs
+        source_hash: SHA-256 of the uploaded file, saved with the history
+            entry so /api/upload/check-history finds re-uploads by content
+    """
+    with _analysis_lock:
+        return _process_file(file, meeting_type, output_language, progress, source_hash)
 
 
-def process_file(file, meeting_type, output_language):
-    """Process uploaded transcript file - Using working logic from gradio_app.py."""
+def _process_file(file, meeting_type, output_language, progress=None, source_hash=None):
     global chatbot, transcript_text, last_summary, last_topics, last_actions, last_decisions, current_language, current_filename
     
     logger.info(f"Processing file: type={meeting_type}, language={output_language}")
@@ -91,36 +151,42 @@ def process_file(file, meeting_type, output_language):
     
     current_language = language
     
-    # Check rate limit
-    rate_limiter = get_rate_limiter('gemini', max_calls=15, time_window=60)
-    if not rate_limiter.wait_if_needed(key='process_file', max_wait=30):
-        logger.warning("Rate limit exceeded")
-        return "⚠️ Quá nhiều requests. Vui lòng đợi 30 giây...", "", "", "", "", "", ""
-    
     try:
         # Load transcript
         logger.debug(f"Loading file: {filename}")
         loader = TranscriptLoader()
         transcript = loader.load_file(filename)
         
-        # Sanitize input
-        transcript = sanitize_input(transcript, max_length=50000)
+        # Sanitize only, no length cap: long transcripts are chunked by
+        # extract_map_reduce, so the end of a long meeting is still analyzed
+        transcript = sanitize_input(transcript, max_length=None)
         
-        # Clean and truncate
+        # Clean
         preprocessor = TranscriptPreprocessor()
         transcript = preprocessor.clean_text(transcript)
-        transcript = preprocessor.truncate_text(transcript, max_length=15000)
         transcript_text = transcript
         
         logger.info(f"Transcript loaded: {len(transcript)} chars")
         
-        # Check cache first
-        cache_key = f"{meeting_type}_{language}_{transcript[:100]}"
-        cached_result = get_cached_llm_response(cache_key, model=model)
+        # Check cache first (keyed on content, so renamed re-uploads hit too)
+        analysis_cache = None
+        cached_result = None
+        cache_key = analysis_cache_key(
+            transcript, meeting_type, language, model, PromptTemplates.PROMPT_VERSION,
+            extraction_mode=Settings.LLM_EXTRACTION_MODE,
+            chunk_size=Settings.ANALYSIS_CHUNK_SIZE
+        )
+        if Settings.ANALYSIS_CACHE_ENABLED:
+            try:
+                analysis_cache = get_analysis_cache(Settings.ANALYSIS_CACHE_PATH, Settings.ANALYSIS_CACHE_MAX_ENTRIES)
+                cached_result = analysis_cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Analysis cache unavailable: {e}")
         
-        if cached_result:
-            logger.info("Using cached result")
-            # Parse cached result (simplified - in production, cache full response)
+        # Every LLM call in extract_map_reduce takes its own slot (an upfront
+        # check here would spend one more per analysis); when no slot frees up
+        # in time it raises "Rate limit exceeded", handled below
+        rate_limiter = get_rate_limiter('gemini', max_calls=15, time_window=60)
         
         # Initialize LLM and chatbot
         logger.debug(f"Initializing LLM: provider={provider}, model={model}")
@@ -140,31 +206,62 @@ def process_file(file, meeting_type, output_language):
         
         chatbot = Chatbot(llm_manager=llm_manager, transcript=transcript, language=language, meeting_type=meeting_type)
         
-        # Generate summary
-        logger.info("Generating summary")
-        summary = chatbot.generate_summary()
-        
-        # Cache the summary
-        cache_llm_response(cache_key, summary, model=model)
-        
-        # Extract information based on meeting type
-        topics = chatbot.extract_topics()
-        action_items = chatbot.extract_action_items_initially()
-        decisions = chatbot.extract_decisions()
-        
-        # Extract specialized information based on meeting type
-        specialized_data = {}
-        if meeting_type == "workshop":
-            # Workshop-specific extractions
-            specialized_data['key_learnings'] = WorkshopFunctions.extract_key_learnings(transcript)
-            specialized_data['exercises'] = WorkshopFunctions.extract_exercises(transcript)
-            specialized_data['qa_pairs'] = WorkshopFunctions.extract_qa_pairs(transcript)
-        elif meeting_type == "brainstorming":
-            # Brainstorming-specific extractions
-            ideas_result = BrainstormingFunctions.extract_ideas(transcript)
-            specialized_data['ideas'] = ideas_result
-            specialized_data['categorized_ideas'] = BrainstormingFunctions.categorize_ideas(ideas_result)
-            specialized_data['concerns'] = BrainstormingFunctions.extract_concerns(transcript)
+        _report_progress(progress, 'analyzing', 40, {'transcript': transcript})
+        
+        if cached_result is not None:
+            logger.info(f"Using cached analysis: {cache_key[:12]}")
+            summary = cached_result.get('summary', '')
+            topics = cached_result.get('topics', [])
+            action_items = cached_result.get('action_items', [])
+            decisions = cached_result.get('decisions', [])
+            specialized_data = cached_result.get('specialized_data', {})
+        else:
+            # Generate summary, topics, action items and decisions
+            # (single pass for short transcripts, map-reduce over chunks for long ones)
+            logger.info(
+                f"Running extractions (mode={Settings.LLM_EXTRACTION_MODE}, "
+                f"max_concurrency={Settings.LLM_MAX_CONCURRENCY}, chunk_size={Settings.ANALYSIS_CHUNK_SIZE})"
+            )
+            summary, topics, action_items, decisions = chatbot.extract_map_reduce(
+                chunk_size=Settings.ANALYSIS_CHUNK_SIZE,
+                max_workers=Settings.LLM_MAX_CONCURRENCY,
+                rate_limiter=rate_limiter,
+                rate_limit_key='process_file',
+                combined=Settings.LLM_EXTRACTION_MODE == "combined"
+            )
+            if chatbot.extraction_errors:
+                logger.warning(f"Partial extraction failure: {chatbot.extraction_errors}")
+            
+            # Extract specialized information based on meeting type
+            specialized_data = {}
+            if meeting_type == "workshop":
+                # Workshop-specific extractions
+                specialized_data['key_learnings'] = WorkshopFunctions.extract_key_learnings(transcript)
+                specialized_data['exercises'] = WorkshopFunctions.extract_exercises(transcript)
+                specialized_data['qa_pairs'] = WorkshopFunctions.extract_qa_pairs(transcript)
+            elif meeting_type == "brainstorming":
+                # Brainstorming-specific extractions
+                ideas_result = BrainstormingFunctions.extract_ideas(transcript)
+                specialized_data['ideas'] = ideas_result
+                specialized_data['categorized_ideas'] = BrainstormingFunctions.categorize_ideas(ideas_result)
+                specialized_data['concerns'] = BrainstormingFunctions.extract_concerns(transcript)
+            
+            # Cache the full analysis; partial failures are not cached so a retry can fill them in
+            if analysis_cache and not chatbot.extraction_errors:
+                try:
+                    analysis_cache.set(cache_key, {
+                        'summary': summary,
+                        'topics': topics,
+                        'action_items': action_items,
+                        'decisions': decisions,
+                        'specialized_data': specialized_data
+                    })
+                except Exception as e:
+                    logger.warning(f"Failed to cache analysis: {e}")
+        
+        # Q&A still sends the whole transcript in one prompt, so keep it bounded
+        if len(transcript) > Settings.ANALYSIS_CHUNK_SIZE:
+            chatbot.set_transcript(preprocessor.truncate_text(transcript, max_length=Settings.ANALYSIS_CHUNK_SIZE))
         
         # Save results globally
         global last_summary, last_topics, last_actions, last_decisions
@@ -175,7 +272,18 @@ def process_file(file, meeting_type, output_language):
         current_filename = Path(filename).name
         print(f"DEBUG: SET last_summary len={len(last_summary) if last_summary else 0}")
         
+        _report_progress(progress, 'saving', 85, {
+            'summary': summary, 'topics': topics, 'action_items': action_items, 'decisions': decisions
+        })
+        
         # Save to history
+        history_metadata = {
+            "language": language, 
+            "meeting_type": meeting_type,
+            "specialized_data": specialized_data
+        }
+        if source_hash:
+            history_metadata["source_hash"] = source_hash
         try:
             history_manager.save_analysis(
                 filename=filename,
@@ -183,17 +291,17 @@ def process_file(file, meeting_type, output_language):
                 topics=topics,
                 action_items=action_items,
                 decisions=decisions,
-                metadata={
-                    "language": language, 
-                    "meeting_type": meeting_type,
-                    "specialized_data": specialized_data
-                }
+                transcript=transcript,
+                metadata=history_metadata
             )
         except Exception as e:
             print(f"Failed to save history: {e}")
         
-        # Add to RAG system
+        # Add to RAG system. Chunk ids derive from the transcript content, so
+        # re-adding a cached analysis upserts the same chunks instead of
+        # duplicating them, and restores them if the store was reset.
         if rag_system:
+            _report_progress(progress, 'indexing', 90)
             try:
                 rag_metadata = {
                     "meeting_type": meeting_type,
@@ -201,8 +309,8 @@ def process_file(file, meeting_type, output_language):
                     "filename": current_filename,
                     "timestamp": datetime.now().isoformat()
                 }
-                # Use filename as meeting_id for simplicity, or generate a UUID
-                meeting_id = f"{Path(filename).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                transcript_hash = hashlib.sha256(normalize_transcript(transcript).encode('utf-8')).hexdigest()
+                meeting_id = f"meeting_{transcript_hash[:16]}"
                 rag_system.add_meeting(meeting_id, transcript, rag_metadata)
                 logger.info(f"Added meeting {meeting_id} to RAG system")
             except Exception as e:
@@ -574,13 +682,53 @@ def _convert_json_to_transcript(data):
     return ""
 
 
+def _transcript_cache(source_hash, language, enable_diarization, colab_url):
+    """Analysis cache and transcript key for an uploaded recording, or (None, None) when disabled."""
+    if not Settings.ANALYSIS_CACHE_ENABLED:
+        return None, None
+    if colab_url and len(colab_url.strip()) > 5:
+        pipeline = {'pipeline': 'colab'}
+    elif enable_diarization:
+        pipeline = {'pipeline': 'diarization'}
+    elif Settings.PARALLEL_TRANSCRIPTION:
+        pipeline = {'pipeline': 'parallel', 'model': Settings.TRANSCRIBE_MODEL}
+    else:
+        pipeline = {'pipeline': 'whisper'}
+    try:
+        cache = get_analysis_cache(Settings.ANALYSIS_CACHE_PATH, Settings.ANALYSIS_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        logger.warning(f"Analysis cache unavailable: {e}")
+        return None, None
+    return cache, transcript_cache_key(source_hash, language=language, **pipeline)
+
+
+def _analyze_transcript(transcript, meeting_type, output_lang, progress=None, source_hash=None):
+    """Run process_file on transcript text (written to a temp file)."""
+    import tempfile
+    
+    fd, temp_path = tempfile.mkstemp(suffix='.txt', text=True)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(transcript)
+    
+    class MockFile: 
+        def __init__(self, n): self.name = str(n)
+    
+    try:
+        return process_file(MockFile(temp_path), meeting_type, output_lang, progress=progress, source_hash=source_hash)
+    finally:
+        try: os.unlink(temp_path)
+        except OSError: pass
+
+
 def process_upload(file_type, audio_file=None, text_file=None, transcribe_lang='vi', 
-                   enable_diarization=False, meeting_type='meeting', output_lang='vi', colab_url=None):
+                   enable_diarization=False, meeting_type='meeting', output_lang='vi', colab_url=None,
+                   progress=None):
     """
     Process uploaded files (Audio, Text, or JSON) with Colab Server support.
     
     Args:
         colab_url: Optional URL to Google Colab WhisperX server (via ngrok)
+        progress: Optional callback(stage, percent, partial) used by background jobs
         
     Returns: (status, transcript, summary, topics, actions, decisions, participants)
     """
@@ -589,21 +737,57 @@ def process_upload(file_type, audio_file=None, text_file=None, transcribe_lang='
     try:
         # A. Audio Processing
         if file_type == 'audio' and audio_file:
+            # Same recording uploaded again: skip validation, decoding and transcription
+            source_hash = file_content_hash(audio_file)
+            transcript_cache, transcript_key = _transcript_cache(
+                source_hash, transcribe_lang, enable_diarization, colab_url
+            )
+            cached_transcript = transcript_cache.get_transcript(transcript_key) if transcript_cache else None
+            if cached_transcript:
+                logger.info(f"Using cached transcript: {transcript_key[:12]}")
+                _report_progress(progress, 'transcribing', 10, {'transcript': cached_transcript})
+                return _analyze_transcript(cached_transcript, meeting_type, output_lang, progress, source_hash)
+            
             # ✅ NEW: Validate audio quality first
-            from backend.audio.audio_validator import validate_audio_quality
+            from backend.audio.audio_validator import AudioRejected, QualityCheck, check_audio_header, probe_audio
+            from backend.audio.decoded_audio import DecodedAudio
             
-            is_valid, validation_msg = validate_audio_quality(audio_file)
+            _report_progress(progress, 'validating', 5)
+            # Header checks first, so e.g. a 3-hour file is rejected without decoding it
+            header = probe_audio(audio_file)
+            is_valid, validation_msg = check_audio_header(audio_file, header)
             if not is_valid:
                 logger.warning(f"Audio validation failed: {validation_msg}")
                 return validation_msg, "", "", "", "", "", ""
             
+            # Decode once; every local model reads these samples. The sample
+            # checks run on the blocks as they are decoded, so a clipped or
+            # overlong file stops the decode instead of being read in full.
+            quality = QualityCheck(header, DecodedAudio.sample_rate)
+            try:
+                decoded = DecodedAudio.from_file(audio_file, on_block=quality.feed)
+            except AudioRejected as e:
+                logger.warning(f"Audio validation failed: {e}")
+                return str(e), "", "", "", "", "", ""
+            except Exception as e:
+                logger.warning(f"Audio decoding failed: {e}")
+                return f"❌ Lỗi khi đọc file audio: {str(e)}", "", "", "", "", "", ""
+            
+            is_valid, validation_msg = quality.result(audio_file, decoded.source_sample_rate)
+            if not is_valid:
+                decoded.close()
+                logger.warning(f"Audio validation failed: {validation_msg}")
+                return validation_msg, "", "", "", "", "", ""
+            
             logger.info(f"Audio validation passed: {validation_msg}")
             
             transcript = ""
+            _report_progress(progress, 'transcribing', 10)
             
             # 1. Priority: Colab Server (Zero Cost Model)
             if colab_url and len(colab_url.strip()) > 5:
                 logger.info(f"Using Colab Server: {colab_url}")
+                decoded.close()  # Colab decodes the uploaded file itself
                 try:
                     import requests
                     
@@ -647,60 +831,57 @@ def process_upload(file_type, audio_file=None, text_file=None, transcribe_lang='
                 logger.info(f"Processing audio locally: {audio_file}")
                 
                 try:
-                    # Choose pipeline based on diarization flag
-                    if enable_diarization:
-                        logger.info("Using Speaker Diarization pipeline")
-                        from backend.audio.speaker_diarization import transcribe_with_speakers
-                        generator = transcribe_with_speakers(audio_file, transcribe_lang)
-                    else:
-                        logger.info("Using Standard Whisper pipeline")
-                        from backend.audio.huggingface_stt import transcribe_audio_huggingface
-                        generator = transcribe_audio_huggingface(audio_file, transcribe_lang, realtime=False)
-
-                    # Consume generator to get the final result
-                    final_output = ""
-                    for update in generator:
-                        if isinstance(update, str):
-                            final_output = update
-                        elif isinstance(update, dict) and 'text' in update:
-                            final_output = update['text']
+                    transcript = None
+                    if not enable_diarization and Settings.PARALLEL_TRANSCRIPTION:
+                        transcript = _transcribe_parallel(audio_file, transcribe_lang, progress, decoded)
+
+                    if transcript is None:
+                        # Choose pipeline based on diarization flag
+                        if enable_diarization:
+                            logger.info("Using Speaker Diarization pipeline")
+                            from backend.audio.speaker_diarization import transcribe_with_speakers
+                            generator = transcribe_with_speakers(audio_file, transcribe_lang, audio=decoded)
+                        else:
+                            logger.info("Using Standard Whisper pipeline")
+                            from backend.audio.huggingface_stt import transcribe_audio_huggingface
+                            generator = transcribe_audio_huggingface(audio_file, transcribe_lang, realtime=False, audio=decoded)
+
+                        # Consume generator to get the final result
+                        final_output = ""
+                        for update in generator:
+                            if isinstance(update, str):
+                                final_output = update
+                            elif isinstance(update, dict) and 'text' in update:
+                                final_output = update['text']
+                            _report_progress(progress, 'transcribing', 10, {'transcript': final_output})
                     
-                    # The final output from our generators is usually a formatted markdown report
-                    # We use it as the transcript. 
-                    # Note: Ideally we should strip the header/footer metadata for 'clean' processing
-                    # but current process_file logic handles raw text reasonably well.
-                    transcript = final_output.strip()
+                        # The final output from our generators is usually a formatted markdown report
+                        # We use it as the transcript. 
+                        # Note: Ideally we should strip the header/footer metadata for 'clean' processing
+                        # but current process_file logic handles raw text reasonably well.
+                        transcript = final_output.strip()
 
                 except Exception as e:
                     logger.error(f"Local Transcription Error: {e}")
                     return f"❌ Audio Error: {str(e)}", "", "", "", "", "", ""
+                finally:
+                    decoded.close()
 
             if not transcript or len(transcript) < 5:
                  return "❌ Transcription failed or empty", "", "", "", "", "", ""
 
-            # Save transcript to temp file and process analysis
-            import tempfile
-            import os
-            
-            fd, temp_path = tempfile.mkstemp(suffix='.txt', text=True)
-            with os.fdopen(fd, 'w', encoding='utf-8') as f:
-                f.write(transcript)
-            
-            # Common processing
-            class MockFile: 
-                def __init__(self, n): self.name = str(n)
-            
-            result = process_file(MockFile(temp_path), meeting_type, output_lang)
-            
-            # Cleanup
-            try: os.unlink(temp_path)
-            except: pass
-            
-            return result
+            if transcript_cache:
+                try:
+                    transcript_cache.set_transcript(transcript_key, transcript)
+                except Exception as e:
+                    logger.warning(f"Failed to cache transcript: {e}")
+
+            return _analyze_transcript(transcript, meeting_type, output_lang, progress, source_hash)
 
         # B. Text/JSON Processing
         elif file_type == 'text' and text_file:
             logger.info(f"Processing text file: {text_file}")
+            source_hash = file_content_hash(text_file)
             
             # Handle JSON Import (WhisperX Output)
             if text_file.lower().endswith('.json'):
@@ -725,7 +906,9 @@ def process_upload(file_type, audio_file=None, text_file=None, transcribe_lang='
                     class MockFile: 
                         def __init__(self, n): self.name = str(n)
                     
-                    result = process_file(MockFile(temp_path), meeting_type, output_lang)
+                    result = process_file(
+                        MockFile(temp_path), meeting_type, output_lang, progress=progress, source_hash=source_hash
+                    )
                     
                     try: os.unlink(temp_path)
                     except: pass
@@ -742,7 +925,9 @@ def process_upload(file_type, audio_file=None, text_file=None, transcribe_lang='
             else:
                  class MockFile: 
                      def __init__(self, n): self.name = str(n)
-                 return process_file(MockFile(text_file), meeting_type, output_lang)
+                 return process_file(
+                     MockFile(text_file), meeting_type, output_lang, progress=progress, source_hash=source_hash
+                 )
 
         else:
             return "❌ Invalid file input", "", "", "", "", "", ""
@@ -1,9 +1,14 @@
 """Prompt templates for the chatbot."""
 
+import json
+
 
 class PromptTemplates:
     """Các prompt templates với system messages tối ưu."""
 
+    # Bump khi thay đổi prompt trích xuất - cache phân tích cũ sẽ bị bỏ qua
+    PROMPT_VERSION = "1"
+
     # System Messages - Vietnamese
     SYSTEM_ANALYST_VI = """Bạn là một trợ lý AI chuyên nghiệp, chuyên phân tích transcript cuộc họp.
 
@@ -647,6 +652,81 @@ TRANSCRIPT:
 
 {headers[5]}"""
 
+    @staticmethod
+    def get_combined_analysis_prompt(transcript: str, language: str = "vi", sections: list = None) -> str:
+        """Prompt trích xuất summary, topics, action items, decisions trong MỘT lần gọi.
+
+        Args:
+            transcript: Nội dung transcript
+            language: Ngôn ngữ output
+            sections: Các phần cần trích xuất (mặc định: tất cả)
+        """
+        schema = FunctionCallingSchemas.get_meeting_analysis_function()["parameters"]
+        sections = [s for s in (sections or schema["required"]) if s in schema["properties"]]
+        requested_schema = {
+            "type": "object",
+            "properties": {s: schema["properties"][s] for s in sections},
+            "required": sections
+        }
+        schema_text = json.dumps(requested_schema, ensure_ascii=False, indent=2)
+        keys_text = ", ".join(f'"{s}"' for s in sections)
+
+        language_names = {"vi": "Vietnamese", "en": "English", "ja": "Japanese", "ko": "Korean", "zh": "Chinese"}
+        language_name = language_names.get(language, "Vietnamese")
+
+        if language == "vi":
+            rules = {
+                "summary": '- "summary": tóm tắt 3-5 câu, nêu rõ mục đích và các điểm quan trọng',
+                "topics": '- "topics": 3-5 chủ đề chính',
+                "action_items": '- "action_items": TẤT CẢ nhiệm vụ; không có người phụ trách thì "assignee": "Chưa phân công", không có hạn thì "deadline": "Chưa xác định"',
+                "decisions": '- "decisions": chỉ các quyết định chính thức',
+            }
+            section_rules = "\n".join(rules[s] for s in sections)
+            return f"""Phân tích transcript cuộc họp sau và trả về MỘT JSON object duy nhất.
+
+TRANSCRIPT:
+{transcript}
+
+YÊU CẦU:
+- JSON object phải có đúng các key: {keys_text}
+{section_rules}
+- Danh sách nào không có nội dung thì trả về []
+- Chỉ dùng thông tin có trong transcript, không bịa đặt
+- Viết nội dung bằng tiếng Việt
+
+JSON SCHEMA:
+{schema_text}
+
+Chỉ trả về JSON, không kèm giải thích.
+
+JSON:"""
+
+        rules = {
+            "summary": '- "summary": 3-5 sentences stating the meeting purpose and important points',
+            "topics": '- "topics": 3-5 main topics',
+            "action_items": '- "action_items": ALL tasks; use "Not assigned" / "Not specified" when assignee / deadline is unknown',
+            "decisions": '- "decisions": official decisions only',
+        }
+        section_rules = "\n".join(rules[s] for s in sections)
+        return f"""Analyze the following meeting transcript and return a SINGLE JSON object.
+
+TRANSCRIPT:
+{transcript}
+
+REQUIREMENTS:
+- The JSON object must contain exactly these keys: {keys_text}
+{section_rules}
+- Return [] for any list with no content
+- Only use information present in the transcript, do not invent
+- Write all text values in {language_name}
+
+JSON SCHEMA:
+{schema_text}
+
+Return only the JSON, no explanation.
+
+JSON:"""
+
     @staticmethod
     def get_system_message_for_task(task: str, language: str = "vi") -> str:
         """
@@ -666,7 +746,7 @@ TRANSCRIPT:
             return getattr(PromptTemplates, f"SYSTEM_SUMMARIZER{suffix}")
         elif task == "qa":
             return getattr(PromptTemplates, f"SYSTEM_ANALYST{suffix}")
-        elif task in ["action_items", "decisions", "topics"]:
+        elif task in ["action_items", "decisions", "topics", "analysis"]:
             return getattr(PromptTemplates, f"SYSTEM_EXTRACTOR{suffix}")
         else:
             return getattr(PromptTemplates, f"SYSTEM_ANALYST{suffix}")
@@ -1067,6 +1147,46 @@ class FunctionCallingSchemas:
             }
         }
     
+    @staticmethod
+    def get_meeting_analysis_function() -> dict:
+        """Function schema for extracting the full analysis in one call."""
+        action_items = FunctionCallingSchemas.get_action_items_function()["parameters"]["properties"]["action_items"]
+        decisions = FunctionCallingSchemas.get_extract_decisions_function()["parameters"]["properties"]["decisions"]
+        return {
+            "name": "extract_meeting_analysis",
+            "description": "Extract summary, topics, action items and decisions from meeting transcript",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "summary": {
+                        "type": "string",
+                        "description": "Concise 3-5 sentence summary of the meeting"
+                    },
+                    "topics": {
+                        "type": "array",
+                        "description": "Main topics discussed in the meeting",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "topic": {
+                                    "type": "string",
+                                    "description": "Concise topic name"
+                                },
+                                "description": {
+                                    "type": "string",
+                                    "description": "Description of the discussion"
+                                }
+                            },
+                            "required": ["topic", "description"]
+                        }
+                    },
+                    "action_items": action_items,
+                    "decisions": decisions
+                },
+                "required": ["summary", "topics", "action_items", "decisions"]
+            }
+        }
+    
     @staticmethod
     def get_all_functions() -> list:
         """Get all available function schemas."""
@@ -1074,5 +1194,6 @@ class FunctionCallingSchemas:
             FunctionCallingSchemas.get_action_items_function(),
             FunctionCallingSchemas.get_meeting_participants_function(),
             FunctionCallingSchemas.get_search_transcript_function(),
-            FunctionCallingSchemas.get_extract_decisions_function()
+            FunctionCallingSchemas.get_extract_decisions_function(),
+            FunctionCallingSchemas.get_meeting_analysis_function()
         ]
@@ -39,33 +39,11 @@ class AdvancedRAG:
         self._init_llm()
         
     def _init_embeddings(self):
-        """Initialize embedding model."""
-        try:
-            from langchain_huggingface import HuggingFaceEmbeddings
-            
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2",
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
-            )
-            print("[OK] Embeddings initialized: HuggingFace")
-        except ImportError:
-            # Fallback to sentence-transformers directly with wrapper
-            from sentence_transformers import SentenceTransformer
-            from typing import List
-            
-            class SentenceTransformerEmbeddings:
-                def __init__(self, model_name="all-MiniLM-L6-v2"):
-                    self.model = SentenceTransformer(model_name)
-                
-                def embed_documents(self, texts: List[str]) -> List[List[float]]:
-                    return self.model.encode(texts).tolist()
-                
-                def embed_query(self, text: str) -> List[float]:
-                    return self.model.encode([text])[0].tolist()
-            
-            self.embeddings = SentenceTransformerEmbeddings('all-MiniLM-L6-v2')
-            print("[OK] Embeddings initialized: SentenceTransformer (Wrapped)")
+        """Initialize embedding model (shared with HistorySearcher and ChromaManager)."""
+        from backend.rag.retrieval_service import get_retrieval_service
+        
+        self.embeddings = get_retrieval_service().embeddings
+        print("[OK] Embeddings initialized: shared SentenceTransformer")
     
     def _init_vector_store(self):
         """Initialize vector store (ChromaDB or PineCone)."""
@@ -75,19 +53,12 @@ class AdvancedRAG:
             self._init_chroma()
     
     def _init_chroma(self):
-        """Initialize ChromaDB."""
+        """Initialize ChromaDB (chunk view of the shared retrieval store)."""
         try:
-            from langchain_chroma import Chroma
-            
-            persist_directory = "data/chroma_langchain"
-            os.makedirs(persist_directory, exist_ok=True)
+            from backend.rag.retrieval_service import get_retrieval_service
             
-            self.vector_store = Chroma(
-                persist_directory=persist_directory,
-                embedding_function=self.embeddings,
-                collection_name="meetings_advanced"
-            )
-            print("[OK] Vector Store initialized: ChromaDB")
+            self.vector_store = get_retrieval_service().chunk_vectorstore()
+            print("[OK] Vector Store initialized: ChromaDB (shared store)")
         except Exception as e:
             print(f"[WARN] ChromaDB init failed: {e}")
             self.vector_store = None
@@ -472,7 +443,7 @@ Trả lời (bằng tiếng Việt):"""
                     # PineCone stats (simplified)
                     count = "N/A"
             
-            return {
+            stats = {
                 "vector_store": self.vector_store_type,
                 "total_meetings": count, # Using total_meetings key to match UI
                 "total_chunks": count,
@@ -482,6 +453,12 @@ Trả lời (bằng tiếng Việt):"""
                 "llm_provider": self.llm_provider,
                 "status": "active" if self.vector_store is not None else "inactive"
             }
+            if self.vector_store_type == "chroma":
+                from backend.rag.retrieval_service import get_retrieval_service
+                cache_stats = get_retrieval_service().get_stats().get("embedding_cache")
+                if cache_stats:
+                    stats["embedding_cache"] = cache_stats
+            return stats
         except Exception as e:
             return {
                 "error": str(e),
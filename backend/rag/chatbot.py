@@ -1,8 +1,75 @@
 """Chatbot implementation without vector database."""
 
 import json
-from typing import Dict, List, Any
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Optional, Tuple
+from backend.data.preprocessor import TranscriptPreprocessor
 from backend.llm import LLMManager, PromptTemplates
+from backend.llm.prompts import FunctionCallingSchemas
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Key field used to deduplicate each extracted section when merging chunks
+MERGE_KEYS = {
+    "topics": "topic",
+    "action_items": "task",
+    "decisions": "decision",
+}
+
+
+def _normalize_key(text: str) -> str:
+    """Normalize text for duplicate detection (lowercase, no punctuation)."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+
+def merge_extracted_items(item_lists: List[List[Dict]], key: str, similarity: float = 0.85) -> List[Dict]:
+    """
+    Merge items extracted from several chunks, removing duplicates.
+
+    Items are considered duplicates when their ``key`` field is (nearly) the
+    same text. The first occurrence is kept, and empty/unknown fields in it are
+    filled from later duplicates (e.g. an assignee only mentioned in a later chunk).
+
+    Args:
+        item_lists: One list of items per chunk, in transcript order
+        key: Field used to compare items (topic, task, decision)
+        similarity: SequenceMatcher ratio above which two keys are duplicates
+
+    Returns:
+        Merged list in order of first appearance
+    """
+    merged: List[Dict] = []
+    keys: List[str] = []
+    unknown = {"", "n/a", "chưa phân công", "chưa xác định", "not assigned", "not specified"}
+
+    for items in item_lists:
+        for item in items or []:
+            if not isinstance(item, dict):
+                continue
+            norm = _normalize_key(item.get(key, ""))
+            if not norm:
+                continue
+
+            match = None
+            for i, existing in enumerate(keys):
+                if existing == norm or SequenceMatcher(None, existing, norm).ratio() >= similarity:
+                    match = i
+                    break
+
+            if match is None:
+                merged.append(dict(item))
+                keys.append(norm)
+                continue
+
+            target = merged[match]
+            for field, value in item.items():
+                if str(target.get(field, "")).strip().lower() in unknown and str(value).strip().lower() not in unknown:
+                    target[field] = value
+
+    return merged
 
 
 class Chatbot:
@@ -23,6 +90,7 @@ class Chatbot:
         self.language = language
         self.meeting_type = meeting_type
         self.conversation_history: List[Dict[str, str]] = []
+        self.extraction_errors: Dict[str, str] = {}
 
     def set_transcript(self, transcript: str) -> None:
         """
@@ -53,6 +121,16 @@ class Chatbot:
         if not self.transcript:
             return "Chưa có transcript để tóm tắt." if self.language == "vi" else "No transcript to summarize."
 
+        prompt = PromptTemplates.get_summary_prompt(self.transcript, self.language)
+        prompt = self._with_meeting_type_context(prompt)
+        
+        system_message = PromptTemplates.get_system_message_for_task("summary", self.language)
+        
+        summary = self.llm_manager.generate(prompt, system_message)
+        return summary
+
+    def _with_meeting_type_context(self, prompt: str) -> str:
+        """Prepend meeting type context to prompt (bỏ qua với cuộc họp thường)."""
         # Add meeting type context to prompt (in correct language)
         if self.language == "vi":
             meeting_type_context = {
@@ -68,16 +146,11 @@ class Chatbot:
             }
         
         context = meeting_type_context.get(self.meeting_type, "")
-        prompt = PromptTemplates.get_summary_prompt(self.transcript, self.language)
         
         # Prepend context if not regular meeting
         if self.meeting_type != "meeting" and context:
             prompt = f"{context}\n\n{prompt}"
-        
-        system_message = PromptTemplates.get_system_message_for_task("summary", self.language)
-        
-        summary = self.llm_manager.generate(prompt, system_message)
-        return summary
+        return prompt
 
     def ask_question(self, question: str) -> Dict[str, Any]:
         """
@@ -215,6 +288,365 @@ NOTE: Use conversation history to understand context of current question (e.g.,
         # Parse JSON response
         return self._parse_json_response(response)
 
+    def extract_all(
+        self,
+        max_workers: int = 4,
+        rate_limiter=None,
+        rate_limit_key: str = "default",
+        max_wait: int = 30
+    ) -> Tuple[str, List[Dict], List[Dict], List[Dict]]:
+        """
+        Chạy song song summary, topics, action items và decisions.
+
+        Mỗi phần là một lần gọi LLM độc lập, nên tổng thời gian xấp xỉ lần gọi
+        chậm nhất thay vì tổng của cả bốn. Một phần lỗi không làm hỏng các phần
+        còn lại: phần đó nhận giá trị rỗng và lỗi được ghi vào
+        ``self.extraction_errors``.
+
+        Args:
+            max_workers: Số lần gọi LLM tối đa chạy cùng lúc
+            rate_limiter: RateLimiter dùng chung (vd. get_rate_limiter('gemini')),
+                mỗi lần gọi LLM tiêu tốn một lượt trong budget
+            rate_limit_key: Key dùng cho rate limiter
+            max_wait: Thời gian chờ tối đa (giây) cho mỗi lượt rate limit
+
+        Returns:
+            (summary, topics, action_items, decisions)
+
+        Raises:
+            Exception: Lỗi đầu tiên, nếu tất cả các phần đều thất bại
+        """
+        tasks = {
+            "summary": self.generate_summary,
+            "topics": self.extract_topics,
+            "action_items": self.extract_action_items_initially,
+            "decisions": self.extract_decisions,
+        }
+        results: Dict[str, Any] = {
+            "summary": "",
+            "topics": [],
+            "action_items": [],
+            "decisions": [],
+        }
+
+        workers = max_workers
+        if rate_limiter is not None:
+            workers = min(workers, rate_limiter.max_calls)
+        workers = max(1, min(workers, len(tasks)))
+
+        def run(func):
+            if rate_limiter is not None and not rate_limiter.wait_if_needed(key=rate_limit_key, max_wait=max_wait):
+                raise RuntimeError("Rate limit exceeded")
+            return func()
+
+        self.extraction_errors = {}
+        failures: List[Exception] = []
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+            futures = {executor.submit(run, func): section for section, func in tasks.items()}
+            for future in as_completed(futures):
+                section = futures[future]
+                try:
+                    results[section] = future.result()
+                except Exception as e:
+                    logger.warning(f"Extraction failed for '{section}': {e}")
+                    self.extraction_errors[section] = str(e)
+                    failures.append(e)
+
+        if len(failures) == len(tasks):
+            raise failures[0]
+
+        return results["summary"], results["topics"], results["action_items"], results["decisions"]
+
+    def extract_map_reduce(
+        self,
+        chunk_size: int = 15000,
+        max_workers: int = 4,
+        rate_limiter=None,
+        rate_limit_key: str = "default",
+        max_wait: int = 60,
+        combined: bool = False
+    ) -> Tuple[str, List[Dict], List[Dict], List[Dict]]:
+        """
+        Phân tích transcript dài theo kiểu map-reduce thay vì cắt ngắn.
+
+        Map: transcript được chia theo lượt nói (speaker/timestamp) thành các
+        đoạn <= chunk_size, mỗi đoạn được trích xuất song song trên cùng một
+        thread pool. Reduce: topics, action items, decisions được gộp và loại
+        trùng; các bản tóm tắt từng đoạn được tóm tắt lại (nhiều tầng nếu cần).
+        Transcript ngắn hơn chunk_size đi thẳng qua ``extract_all``.
+
+        Args:
+            chunk_size: Độ dài tối đa mỗi đoạn (ký tự)
+            max_workers: Số lần gọi LLM tối đa chạy cùng lúc
+            rate_limiter: RateLimiter dùng chung, mỗi lần gọi LLM tiêu tốn một lượt
+            rate_limit_key: Key dùng cho rate limiter
+            max_wait: Thời gian chờ tối đa (giây) cho mỗi lượt rate limit
+            combined: Dùng ``extract_combined`` (1 lần gọi) cho mỗi đoạn
+
+        Returns:
+            (summary, topics, action_items, decisions)
+        """
+        chunks = TranscriptPreprocessor.chunk_text(self.transcript, max_length=chunk_size)
+        if len(chunks) <= 1:
+            if combined:
+                return self.extract_combined(rate_limiter=rate_limiter, rate_limit_key=rate_limit_key, max_wait=max_wait)
+            return self.extract_all(
+                max_workers=max_workers,
+                rate_limiter=rate_limiter,
+                rate_limit_key=rate_limit_key,
+                max_wait=max_wait
+            )
+
+        logger.info(f"Map-reduce extraction: {len(self.transcript)} chars in {len(chunks)} chunks")
+
+        workers = max_workers
+        if rate_limiter is not None:
+            workers = min(workers, rate_limiter.max_calls)
+        workers = max(1, workers)
+
+        def run(func):
+            if rate_limiter is not None and not rate_limiter.wait_if_needed(key=rate_limit_key, max_wait=max_wait):
+                raise RuntimeError("Rate limit exceeded")
+            return func()
+
+        sections = ["summary", "topics", "action_items", "decisions"]
+        partials: Dict[str, List[Any]] = {section: [None] * len(chunks) for section in sections}
+        failures: Dict[str, List[Exception]] = {section: [] for section in sections}
+        self.extraction_errors = {}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+            # Map: every (chunk, section) pair is an independent LLM call
+            futures = {}
+            for index, chunk in enumerate(chunks):
+                part = Chatbot(self.llm_manager, transcript=chunk, language=self.language, meeting_type=self.meeting_type)
+                if combined:
+                    # One call per chunk; extract_combined applies the rate limiter itself
+                    future = executor.submit(
+                        part.extract_combined,
+                        rate_limiter=rate_limiter, rate_limit_key=rate_limit_key, max_wait=max_wait
+                    )
+                    futures[future] = (None, index, part)
+                    continue
+                tasks = {
+                    "summary": part.generate_summary,
+                    "topics": part.extract_topics,
+                    "action_items": part.extract_action_items_initially,
+                    "decisions": part.extract_decisions,
+                }
+                for section, func in tasks.items():
+                    futures[executor.submit(run, func)] = (section, index, part)
+
+            for future in as_completed(futures):
+                section, index, part = futures[future]
+                targets = [section] if section else sections
+                try:
+                    result = future.result()
+                    values = [result] if section else list(result)
+                    for target, value in zip(targets, values):
+                        partials[target][index] = value
+                    if not section:
+                        # extract_combined reports sections whose fallback also failed
+                        for target, error in part.extraction_errors.items():
+                            failures[target].append(RuntimeError(error))
+                except Exception as e:
+                    logger.warning(f"Extraction failed for '{section or 'all sections'}' in chunk {index + 1}/{len(chunks)}: {e}")
+                    for target in targets:
+                        failures[target].append(e)
+
+            # Reduce; a section missing from some chunks is incomplete, so it is reported too
+            for section in sections:
+                failed = len(failures[section])
+                if failed == len(chunks):
+                    self.extraction_errors[section] = str(failures[section][0])
+                elif failed:
+                    self.extraction_errors[section] = f"{failed}/{len(chunks)} chunks failed: {failures[section][0]}"
+
+            if all(len(failures[section]) == len(chunks) for section in sections):
+                raise failures["summary"][0]
+
+            summaries = [s for s in partials["summary"] if s]
+            summary = ""
+            if summaries:
+                try:
+                    summary = self._reduce_summaries(summaries, chunk_size, executor, run)
+                except Exception as e:
+                    logger.warning(f"Summary reduce failed: {e}")
+                    self.extraction_errors["summary"] = str(e)
+                    summary = "\n\n".join(summaries)
+
+        topics, action_items, decisions = (
+            merge_extracted_items([items for items in partials[section] if items], MERGE_KEYS[section])
+            for section in ("topics", "action_items", "decisions")
+        )
+        return summary, topics, action_items, decisions
+
+    def _reduce_summaries(self, summaries: List[str], chunk_size: int, executor, run) -> str:
+        """
+        Tóm tắt lại các bản tóm tắt từng đoạn, theo nhiều tầng nếu quá dài.
+
+        Args:
+            summaries: Tóm tắt từng đoạn theo thứ tự
+            chunk_size: Độ dài tối đa một lần gọi
+            executor: Thread pool dùng chung với bước map
+            run: Hàm gọi LLM có rate limit
+
+        Returns:
+            Bản tóm tắt cuối cùng
+        """
+        if len(summaries) == 1:
+            return summaries[0]
+
+        label = "Phần" if self.language == "vi" else "Part"
+        while True:
+            parts = [f"[{label} {i + 1}] {text.strip()}" for i, text in enumerate(summaries)]
+            groups = TranscriptPreprocessor.chunk_text("\n\n".join(parts), max_length=chunk_size, overlap=0)
+
+            bots = [
+                Chatbot(self.llm_manager, transcript=group, language=self.language, meeting_type=self.meeting_type)
+                for group in groups
+            ]
+            if len(bots) >= len(summaries) > 1:
+                # Partial summaries are too long to shrink any further
+                return "\n\n".join(summaries)
+            summaries = [f.result() for f in [executor.submit(run, bot.generate_summary) for bot in bots]]
+
+            if len(summaries) == 1:
+                return summaries[0]
+
+    def extract_combined(
+        self,
+        rate_limiter=None,
+        rate_limit_key: str = "default",
+        max_wait: int = 30,
+        max_retries: int = 1
+    ) -> Tuple[str, List[Dict], List[Dict], List[Dict]]:
+        """
+        Trích xuất summary, topics, action items, decisions trong MỘT lần gọi LLM.
+
+        Transcript chỉ được gửi một lần thay vì bốn lần. Response được kiểm tra
+        theo ``FunctionCallingSchemas.get_meeting_analysis_function()``; các
+        phần thiếu hoặc sai định dạng được hỏi lại (chỉ riêng các phần đó), và
+        nếu vẫn lỗi thì fallback về extractor riêng của từng phần.
+
+        Args:
+            rate_limiter: RateLimiter dùng chung, mỗi lần gọi LLM tiêu tốn một lượt
+            rate_limit_key: Key dùng cho rate limiter
+            max_wait: Thời gian chờ tối đa (giây) cho mỗi lượt rate limit
+            max_retries: Số lần hỏi lại các phần bị thiếu
+
+        Returns:
+            (summary, topics, action_items, decisions)
+        """
+        sections = list(FunctionCallingSchemas.get_meeting_analysis_function()["parameters"]["required"])
+        results: Dict[str, Any] = {}
+        self.extraction_errors = {}
+
+        if not self.transcript:
+            return (
+                "Chưa có transcript để tóm tắt." if self.language == "vi" else "No transcript to summarize.",
+                [], [], []
+            )
+
+        def call_llm(func, *args):
+            if rate_limiter is not None and not rate_limiter.wait_if_needed(key=rate_limit_key, max_wait=max_wait):
+                raise RuntimeError("Rate limit exceeded")
+            return func(*args)
+
+        system_message = PromptTemplates.get_system_message_for_task("analysis", self.language)
+        missing = sections
+        for attempt in range(1 + max_retries):
+            prompt = PromptTemplates.get_combined_analysis_prompt(self.transcript, self.language, sections=missing)
+            prompt = self._with_meeting_type_context(prompt)
+            try:
+                response = call_llm(self.llm_manager.generate, prompt, system_message)
+            except Exception as e:
+                # The first call failing is an API problem, not a format problem:
+                # the per-section fallbacks would hit the same error
+                if attempt == 0:
+                    raise
+                logger.warning(f"Combined extraction retry failed: {e}")
+                break
+
+            results.update(self._validate_analysis(self._parse_json_object(response), missing))
+            missing = [s for s in sections if s not in results]
+            if not missing:
+                break
+            logger.info(f"Combined extraction incomplete (attempt {attempt + 1}), missing: {missing}")
+
+        # Fall back to the dedicated extractor for anything still missing
+        fallbacks = {
+            "summary": self.generate_summary,
+            "topics": self.extract_topics,
+            "action_items": self.extract_action_items_initially,
+            "decisions": self.extract_decisions,
+        }
+        for section in missing:
+            try:
+                results[section] = call_llm(fallbacks[section])
+            except Exception as e:
+                logger.warning(f"Extraction failed for '{section}': {e}")
+                self.extraction_errors[section] = str(e)
+                results[section] = "" if section == "summary" else []
+
+        return results["summary"], results["topics"], results["action_items"], results["decisions"]
+
+    @staticmethod
+    def _validate_analysis(data: Dict, sections: List[str]) -> Dict[str, Any]:
+        """
+        Kiểm tra JSON analysis theo schema, chỉ giữ lại các phần hợp lệ.
+
+        Args:
+            data: JSON object từ LLM
+            sections: Các phần cần kiểm tra
+
+        Returns:
+            Dict chỉ chứa các phần hợp lệ
+        """
+        properties = FunctionCallingSchemas.get_meeting_analysis_function()["parameters"]["properties"]
+        valid: Dict[str, Any] = {}
+        if not isinstance(data, dict):
+            return valid
+
+        for section in sections:
+            value = data.get(section)
+            spec = properties.get(section, {})
+
+            if spec.get("type") == "string":
+                if isinstance(value, str) and value.strip():
+                    valid[section] = value.strip()
+            elif spec.get("type") == "array" and isinstance(value, list):
+                required = spec.get("items", {}).get("required", [])
+                items = [
+                    item for item in value
+                    if isinstance(item, dict) and all(isinstance(item.get(k), str) for k in required)
+                ]
+                # An empty list is a valid answer ("nothing found"); a list whose items all fail is not
+                if items or not value:
+                    valid[section] = items
+        return valid
+
+    def _parse_json_object(self, response: str) -> Dict:
+        """
+        Parse JSON object response từ LLM.
+
+        Args:
+            response: Response string từ LLM
+
+        Returns:
+            Dict hoặc empty dict
+        """
+        try:
+            start_idx = response.find('{')
+            end_idx = response.rfind('}') + 1
+
+            if start_idx != -1 and end_idx > start_idx:
+                data = json.loads(response[start_idx:end_idx])
+                return data if isinstance(data, dict) else {}
+            return {}
+        except (json.JSONDecodeError, ValueError):
+            return {}
+
     def _parse_json_response(self, response: str) -> List[Dict]:
         """
         Parse JSON response từ LLM.
@@ -1,15 +1,19 @@
+import hashlib
 import os
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
 
 import dotenv
-from langchain_community.vectorstores import Chroma
-from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
+from langchain_openai import AzureChatOpenAI
 from langgraph.graph import StateGraph
 from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel, SecretStr
 
+from backend.data.preprocessor import TranscriptPreprocessor
+from backend.rag.retrieval_service import get_retrieval_service
+
 dotenv.load_dotenv()
 
 class RAGState(BaseModel):
@@ -21,18 +25,10 @@ class ChromaManager:
     def __init__(self, chroma_index_path: str = "data/chroma_db"):
         # --- Step 0: Environment Setup ---
         dotenv.load_dotenv()
+        # chroma_index_path is kept for compatibility: all endpoints now read the
+        # chunk view of the shared retrieval store (same chunks, same embeddings)
         self.chroma_index_path = chroma_index_path
-        self.embeddings = AzureOpenAIEmbeddings(
-            azure_endpoint=os.environ["AZURE_OPENAI_EMBEDDING_ENDPOINT"],
-            api_key=SecretStr(os.environ["AZURE_OPENAI_EMBEDDING_API_KEY"]),
-            model="text-embedding-3-small",
-            api_version="2024-07-01-preview",
-        )
-        if os.path.exists(self.chroma_index_path):
-            self.vectorstore = Chroma(persist_directory=self.chroma_index_path, embedding_function=self.embeddings)
-        else:
-            self.vectorstore = Chroma.from_documents([], self.embeddings, persist_directory=self.chroma_index_path)
-            self.vectorstore.persist()
+        self.vectorstore = get_retrieval_service().chunk_vectorstore()
         self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 2})
         self.llm = AzureChatOpenAI(
             azure_endpoint=os.environ["AZURE_OPENAI_LLM_ENDPOINT"],
@@ -49,6 +45,8 @@ class ChromaManager:
             ("human", "{context}\n\nUser question: {question}"),
         ])
         self._build_graph()
+        # Chroma's persistent client is not safe for concurrent writes
+        self._write_lock = threading.Lock()
 
     def _build_graph(self):
         def retrieve_node(state: RAGState):
@@ -77,12 +75,18 @@ class ChromaManager:
         builder.set_finish_point("generate")
         self.rag_graph = builder.compile()
 
-    def store(self, text: str):
+    def store(self, text: str, meeting_id: Optional[str] = None):
         print(f"[ChromaManager] Storing document (chars={len(text)})")
-        doc = Document(page_content=text)
-        self.vectorstore.add_documents([doc])
-        self.vectorstore.persist()
-        print("[ChromaManager] Document stored and persisted.")
+        # Content-addressed ids make re-storing the same text a no-op upsert
+        meeting_id = meeting_id or f"doc_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+        chunks = TranscriptPreprocessor.chunk_text(text, max_length=1000, overlap=0)
+        with self._write_lock:
+            self.vectorstore.add_texts(
+                texts=chunks,
+                metadatas=[{"meeting_id": meeting_id, "chunk_id": i} for i in range(len(chunks))],
+                ids=[f"{meeting_id}_chunk_{i}" for i in range(len(chunks))]
+            )
+        print(f"[ChromaManager] Stored {len(chunks)} chunks.")
 
     def retrieve(self, question: str) -> str:
         print(f"[ChromaManager] Retrieving answer for question: {question}")
@@ -92,6 +96,63 @@ class ChromaManager:
         print(f"[ChromaManager] Retrieved answer {answer}")
         return answer
 
+    def health_check(self) -> dict:
+        """Cheap liveness probe: the persistent store must still answer a count."""
+        start = time.perf_counter()
+        try:
+            documents = self.vectorstore._collection.count()
+            return {"ok": True, "documents": documents, "latency_ms": (time.perf_counter() - start) * 1000}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "latency_ms": (time.perf_counter() - start) * 1000}
+
+
+# Process-wide instances, one per index path. Building a ChromaManager creates
+# the embedding and LLM clients, opens the store and compiles the graph, which
+# dominates the latency of short questions if done per request.
+_managers: Dict[str, ChromaManager] = {}
+_last_health_check: Dict[str, float] = {}
+_managers_lock = threading.Lock()
+HEALTH_CHECK_INTERVAL = 60
+
+
+def get_chroma_manager(chroma_index_path: str = "data/chroma_db") -> ChromaManager:
+    """Get the shared ChromaManager, creating it lazily on first use.
+
+    The instance is health-checked at most every HEALTH_CHECK_INTERVAL seconds
+    and rebuilt if the store stopped responding.
+    """
+    manager = _managers.get(chroma_index_path)
+    now = time.monotonic()
+    if manager is not None and now - _last_health_check.get(chroma_index_path, 0) < HEALTH_CHECK_INTERVAL:
+        return manager
+
+    with _managers_lock:
+        manager = _managers.get(chroma_index_path)
+        if manager is not None and now - _last_health_check.get(chroma_index_path, 0) >= HEALTH_CHECK_INTERVAL:
+            health = manager.health_check()
+            _last_health_check[chroma_index_path] = now
+            if not health["ok"]:
+                print(f"[ChromaManager] Health check failed ({health['error']}), rebuilding")
+                manager = None
+        if manager is None:
+            start = time.perf_counter()
+            manager = ChromaManager(chroma_index_path)
+            _managers[chroma_index_path] = manager
+            _last_health_check[chroma_index_path] = time.monotonic()
+            print(f"[ChromaManager] Initialized in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return manager
+
+
+def reset_chroma_manager(chroma_index_path: Optional[str] = None):
+    """Drop shared instances so the next call rebuilds them (e.g. after config changes)."""
+    with _managers_lock:
+        if chroma_index_path is None:
+            _managers.clear()
+            _last_health_check.clear()
+        else:
+            _managers.pop(chroma_index_path, None)
+            _last_health_check.pop(chroma_index_path, None)
+
 # Example usage:
 # manager = ChromaManager()
 # manager.store("Walmart customers may return electronics within 30 days with a receipt and original packaging.")
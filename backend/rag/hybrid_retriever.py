@@ -0,0 +1,211 @@
+"""
+Hybrid retrieval over meeting history: BM25 + embeddings.
+
+Dense search (HistorySearcher, chunk embeddings aggregated per meeting) misses exact
+names, numbers and IDs; keyword search (the FTS5 index in the history
+catalog) misses paraphrases. Both run in parallel and their rankings are
+merged with reciprocal rank fusion:
+
+    score(meeting) = sum over retrievers of 1 / (rrf_k + rank)
+
+RRF only uses ranks, so bm25 scores and cosine similarities never have to
+be calibrated against each other. Results are deduplicated by meeting.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_CANDIDATE_POOL = 20
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Sequence[str]],
+    rrf_k: int = DEFAULT_RRF_K,
+    weights: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """Fuse ranked ID lists.
+
+    Args:
+        rankings: Retriever name -> IDs, best first (duplicates keep their best rank)
+        rrf_k: Smoothing constant; larger values flatten the weight of top ranks
+        weights: Optional per-retriever multiplier (default 1.0)
+
+    Returns:
+        [{'id', 'score', 'ranks': {retriever: 1-based rank}}], best first;
+        ties keep the order in which IDs were first seen
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for name, ids in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        seen = set()
+        for rank, item_id in enumerate((i for i in ids if not (i in seen or seen.add(i))), start=1):
+            entry = fused.setdefault(item_id, {'id': item_id, 'score': 0.0, 'ranks': {}})
+            entry['score'] += weight / (rrf_k + rank)
+            entry['ranks'][name] = rank
+    return sorted(fused.values(), key=lambda e: -e['score'])
+
+
+class HybridRetriever:
+    """Lexical + dense retrieval over meeting history, fused per meeting."""
+
+    def __init__(
+        self,
+        searcher=None,
+        catalog=None,
+        history_dir: str = "data/history",
+        candidate_pool: int = DEFAULT_CANDIDATE_POOL,
+        rrf_k: int = DEFAULT_RRF_K
+    ):
+        """Initialize retriever.
+
+        Args:
+            searcher: HistorySearcher for dense search (None = lexical only)
+            catalog: HistoryCatalog for keyword search (None = the catalog of history_dir)
+            history_dir: Directory with history JSON files (text of keyword-only hits)
+            candidate_pool: Candidates taken from each retriever before fusion
+            rrf_k: Reciprocal rank fusion constant
+        """
+        if catalog is None:
+            from backend.data.history_catalog import get_history_catalog
+            catalog = get_history_catalog(history_dir)
+        self.searcher = searcher
+        self.catalog = catalog
+        self.history_dir = Path(history_dir)
+        self.candidate_pool = candidate_pool
+        self.rrf_k = rrf_k
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dense-search")
+        self.last_stats: Dict[str, Any] = {}
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict] = None,
+        lexical_query: Optional[str] = None
+    ) -> List[Dict]:
+        """Retrieve meetings for a question.
+
+        Args:
+            query: Text for dense search (e.g. the expanded question)
+            top_k: Meetings to return
+            filters: Equality filters, e.g. {"meeting_type": "meeting"}
+            lexical_query: Text for keyword search (default: query); any
+                term may match, bm25 ranks meetings matching more/rarer terms first
+
+        Returns:
+            Results shaped like HistorySearcher.semantic_search
+            ({'id', 'score', 'matched_text', 'metadata', 'chunks'}) plus 'ranks'
+            ({'dense': n, 'lexical': n} for the retrievers that found it);
+            'score' is the fused RRF score; keyword-only hits have no 'chunks'
+        """
+        if not query.strip():
+            return []
+        start = time.perf_counter()
+        pool = max(self.candidate_pool, top_k)
+
+        dense_future = None
+        if self.searcher is not None:
+            dense_future = self.executor.submit(self._timed, self._dense, query, pool, filters)
+        lexical, lexical_ms = self._timed(self._lexical, lexical_query or query, pool, filters)
+        dense, dense_ms = dense_future.result() if dense_future else ([], 0.0)
+
+        by_id: Dict[str, Dict] = {}
+        for result in dense + lexical:
+            by_id.setdefault(result['id'], result)
+        fused = reciprocal_rank_fusion(
+            {'dense': [r['id'] for r in dense], 'lexical': [r['id'] for r in lexical]},
+            rrf_k=self.rrf_k
+        )[:top_k]
+
+        results = []
+        for entry in fused:
+            result = dict(by_id[entry['id']])
+            if not result.get('matched_text'):
+                result['matched_text'] = self._meeting_text(entry['id'])
+            result['score'] = round(entry['score'], 6)
+            result['ranks'] = entry['ranks']
+            results.append(result)
+
+        self.last_stats = {
+            'dense_ms': round(dense_ms, 2),
+            'lexical_ms': round(lexical_ms, 2),
+            'total_ms': round((time.perf_counter() - start) * 1000, 2),
+            'dense_candidates': len(dense),
+            'lexical_candidates': len(lexical),
+            'both': sum(1 for e in fused if len(e['ranks']) == 2)
+        }
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _timed(fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            print(f"[HybridRetriever] {fn.__name__} failed: {e}")
+            result = []
+        return result, (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _meeting_key(result: Dict) -> str:
+        return (result.get('metadata') or {}).get('meeting_id') or result['id']
+
+    def _dense(self, query: str, pool: int, filters: Optional[Dict]) -> List[Dict]:
+        results = self.searcher.semantic_search(query, top_k=pool, filters=filters or None)
+        # One entry per meeting, at its best rank
+        meetings, seen = [], set()
+        for result in results:
+            key = self._meeting_key(result)
+            if key not in seen:
+                seen.add(key)
+                meetings.append(dict(result, id=key))
+        return meetings
+
+    def _lexical(self, query: str, pool: int, filters: Optional[Dict]) -> List[Dict]:
+        filters = filters or {}
+        found = self.catalog.keyword_search(
+            query,
+            limit=pool,
+            meeting_type=filters.get('meeting_type'),
+            language=filters.get('language'),
+            match_any=True
+        )
+        return [
+            {
+                'id': row['id'],
+                'score': row['score'],
+                'matched_text': '',
+                'metadata': {
+                    'meeting_id': row['id'],
+                    'original_file': row['original_file'],
+                    'timestamp': row['timestamp'],
+                    'meeting_type': row['meeting_type'],
+                    'language': row['language']
+                }
+            }
+            for row in found['results']
+        ]
+
+    def _meeting_text(self, meeting_id: str) -> str:
+        """Context text for a keyword-only hit (same document the dense index stores)."""
+        history_file = self.history_dir / f"{meeting_id}.json"
+        try:
+            with open(history_file, 'r', encoding='utf-8') as f:
+                meeting_data = json.load(f)
+        except (OSError, ValueError):
+            row = self.catalog.get(meeting_id) or {}
+            return row.get('summary_preview', '')
+        if self.searcher is not None:
+            return self.searcher._create_search_document(meeting_data)
+        return f"Summary: {meeting_data.get('summary', '')}"
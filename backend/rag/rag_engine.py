@@ -2,7 +2,8 @@
 RAG Engine for Meeting History.
 
 This module implements the Retrieval-Augmented Generation logic:
-1. Retrieve relevant contexts from ChromaDB (via HistorySearcher).
+1. Retrieve relevant contexts: keyword (BM25) and ChromaDB (via HistorySearcher)
+   search fused per meeting (HybridRetriever), or ChromaDB alone.
 2. Construct a prompt with context.
 3. Generate answer using LLM.
 
@@ -12,21 +13,64 @@ Enhanced with:
 """
 
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from backend.config import Settings
 from backend.data.history_searcher import HistorySearcher
 from backend.llm.factory import LLMFactory
 from backend.llm.prompts import PromptTemplates
+from backend.rag.hybrid_retriever import HybridRetriever
+from backend.rag.reranker import CrossEncoderReranker
 
 load_dotenv()
 
+# Best chunks of each retrieved meeting put into the prompt
+MAX_CHUNKS_PER_SOURCE = 2
+EXCERPT_CHARS = 300
+
 class RAGEngine:
     """Engine for chatting with meeting history."""
     
-    def __init__(self):
-        """Initialize RAG Engine."""
+    def __init__(
+        self,
+        retriever: Optional[HybridRetriever] = None,
+        reranker: Optional[CrossEncoderReranker] = None
+    ):
+        """Initialize RAG Engine.
+        
+        Args:
+            retriever: Retriever with a HybridRetriever-style ``retrieve``;
+                default is a HybridRetriever over the history searcher, or
+                plain semantic search when HYBRID_RETRIEVAL is off
+            reranker: Reranker with a CrossEncoderReranker-style ``rerank``;
+                default is a cross-encoder when RERANK_ENABLED is on, else none
+        """
         self.searcher = HistorySearcher()
+        self.retriever = retriever
+        if self.retriever is None and Settings.HYBRID_RETRIEVAL:
+            try:
+                self.retriever = HybridRetriever(
+                    self.searcher,
+                    history_dir=str(self.searcher.history_dir),
+                    candidate_pool=Settings.RETRIEVAL_CANDIDATE_POOL,
+                    rrf_k=Settings.RRF_K
+                )
+            except Exception as e:
+                print(f"[RAGEngine] Hybrid retrieval unavailable, using semantic search only: {e}")
+        self.reranker = reranker
+        if self.reranker is None and Settings.RERANK_ENABLED:
+            try:
+                self.reranker = CrossEncoderReranker(
+                    model_name=Settings.RERANK_MODEL,
+                    budget_ms=Settings.RERANK_BUDGET_MS,
+                    batch_size=Settings.RERANK_BATCH_SIZE,
+                    cache_size=Settings.RERANK_CACHE_SIZE,
+                    chunks_per_result=MAX_CHUNKS_PER_SOURCE
+                )
+                self.reranker.warm_up()
+            except Exception as e:
+                print(f"[RAGEngine] Reranking unavailable: {e}")
         self.llm = self._init_llm()
         
     def _init_llm(self):
@@ -82,6 +126,63 @@ Rewritten question:"""
             print(f"[RAGEngine] Query expansion failed: {e}")
             return query
 
+    def _retrieve(self, query: str, expanded_query: str, top_k: int) -> List[Dict]:
+        """Retrieve meeting contexts for the (expanded) question.
+        
+        Keyword search sees both the original and the expanded question, so
+        names and numbers the user typed still match if the expansion
+        rephrased them. With a reranker, RERANK_CANDIDATES meetings are
+        retrieved and reranked down to ``top_k``.
+        """
+        pool = max(Settings.RERANK_CANDIDATES, top_k) if self.reranker is not None else top_k
+        if self.retriever is None:
+            results = self.searcher.semantic_search(expanded_query, top_k=pool)
+        else:
+            lexical_query = query if expanded_query == query else f"{query} {expanded_query}"
+            results = self.retriever.retrieve(expanded_query, top_k=pool, lexical_query=lexical_query)
+            print(f"[RAGEngine] Hybrid retrieval: {self.retriever.last_stats}")
+        if self.reranker is None:
+            return results
+        results = self.reranker.rerank(expanded_query, results, top_k=top_k)
+        print(f"[RAGEngine] Reranking: {self.reranker.last_stats}")
+        return results
+
+    @staticmethod
+    def _build_context(search_results: List[Dict]) -> Tuple[List[str], List[Dict]]:
+        """Context blocks and source citations for retrieved meetings.
+        
+        Each meeting contributes its best matching chunks (section or
+        transcript window), and its source cites the best one exactly.
+        Keyword-only hits have no chunks and cite the whole meeting.
+        """
+        context_parts = []
+        sources = []
+        
+        for i, res in enumerate(search_results):
+            meta = res.get('metadata', {})
+            source_name = meta.get('original_file', f"Meeting {i+1}")
+            score = res.get('score', 0)
+            chunks = res.get('chunks') or [{'id': None, 'section': None, 'text': res.get('matched_text', '')}]
+            cited = chunks[:MAX_CHUNKS_PER_SOURCE]
+            
+            sections = ", ".join(c['section'] for c in cited if c.get('section'))
+            label = f"{source_name}: {sections}" if sections else source_name
+            text = "\n...\n".join(c['text'] for c in cited)
+            context_parts.append(f"SOURCE [{i+1}] ({label}):\n{text}\n")
+            
+            sources.append({
+                "id": i+1,
+                "name": source_name,
+                "score": score,
+                "timestamp": meta.get('timestamp'),
+                "meeting_id": meta.get('meeting_id', res.get('id')),
+                "chunk_id": cited[0]['id'],
+                "section": cited[0]['section'],
+                "excerpt": cited[0]['text'][:EXCERPT_CHARS]
+            })
+        
+        return context_parts, sources
+
     def chat(self, query: str, conversation_history: List[Dict] = None, top_k: int = 5) -> Dict:
         """
         Answer a user question based on meeting history with conversation memory.
@@ -114,7 +215,7 @@ Rewritten question:"""
         
         # Step 2: Retrieve relevant documents
         print(f"[RAGEngine] Retrieving for: {expanded_query}")
-        search_results = self.searcher.semantic_search(expanded_query, top_k=top_k)
+        search_results = self._retrieve(query, expanded_query, top_k)
         
         if not search_results:
             return {
@@ -123,25 +224,7 @@ Rewritten question:"""
             }
             
         # Step 3: Construct Context
-        context_parts = []
-        sources = []
-        
-        for i, res in enumerate(search_results):
-            meta = res.get('metadata', {})
-            source_name = meta.get('original_file', f"Meeting {i+1}")
-            text = res.get('matched_text', '')
-            score = res.get('score', 0)
-            
-            # Add to context
-            context_parts.append(f"SOURCE [{i+1}] ({source_name}):\n{text}\n")
-            
-            # Add to sources list
-            sources.append({
-                "id": i+1,
-                "name": source_name,
-                "score": score,
-                "timestamp": meta.get('timestamp')
-            })
+        context_parts, sources = self._build_context(search_results)
             
         full_context = "\n".join(context_parts)
         
@@ -212,29 +295,14 @@ Rewritten question:"""
         expanded_query = self._expand_query(query, conversation_context)
         print(f"[RAGEngine] Streaming for: {expanded_query}")
         
-        search_results = self.searcher.semantic_search(expanded_query, top_k=top_k)
+        search_results = self._retrieve(query, expanded_query, top_k)
         
         if not search_results:
             yield json.dumps({"error": "No relevant meetings found"})
             return
         
         # Build context and sources
-        context_parts = []
-        sources = []
-        
-        for i, res in enumerate(search_results):
-            meta = res.get('metadata', {})
-            source_name = meta.get('original_file', f"Meeting {i+1}")
-            text = res.get('matched_text', '')
-            score = res.get('score', 0)
-            
-            context_parts.append(f"SOURCE [{i+1}] ({source_name}):\n{text}\n")
-            sources.append({
-                "id": i+1,
-                "name": source_name,
-                "score": score,
-                "timestamp": meta.get('timestamp')
-            })
+        context_parts, sources = self._build_context(search_results)
         
         # Send sources first
         yield json.dumps({"sources": sources, "expanded_query": expanded_query})
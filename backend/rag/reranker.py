@@ -0,0 +1,238 @@
+"""
+Cross-encoder reranking for history chat.
+
+Retrieval (bi-encoder + BM25) is fast but coarse: the query and each chunk
+are embedded separately. A cross-encoder reads query and chunk together
+and scores relevance much more precisely, at a cost per pair. The
+reranker therefore takes a larger candidate pool (e.g. 30 meetings),
+scores each candidate's best chunks and keeps the top few for the prompt.
+
+Cost control:
+- pairs are scored in batches (one forward pass per batch)
+- scores are cached per (model, query, chunk text)
+- a hard latency budget: scoring runs on a worker thread and, when the
+  budget runs out (or the model is still loading), the candidates are
+  returned in their retrieval order. The worker finishes its current
+  batch and caches it, so a repeated question gets faster. A spare
+  worker lets the next query start right away instead of queueing
+  behind that batch; when every worker is still busy, the query falls
+  back at once rather than waiting out its budget in the queue.
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    CrossEncoder = None
+
+from backend.utils.cache import get_cache
+from backend.utils.model_registry import get_model_registry
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_MODEL_SIZE_MB = 90
+# Long keyword-only hits (whole meeting documents) are cut; the model reads 512 tokens anyway
+MAX_TEXT_CHARS = 2000
+SCORE_CACHE_TTL = 24 * 3600
+# One for the current query, one for a batch finishing after a budget overrun
+SCORING_WORKERS = 2
+
+
+class CrossEncoderReranker:
+    """Rerank retrieved meetings with a cross-encoder under a latency budget."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        budget_ms: float = 300,
+        batch_size: int = 16,
+        cache_size: int = 4096,
+        chunks_per_result: int = 2,
+        model=None
+    ):
+        """Initialize reranker.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model
+            budget_ms: Hard limit for scoring one query; over it, retrieval order is kept
+            batch_size: Pairs per forward pass
+            cache_size: Cached (query, chunk) scores
+            chunks_per_result: Best chunks of each meeting that are scored
+            model: Preloaded model with ``predict(pairs)`` (default: loaded
+                through the model registry)
+        """
+        if model is None and CrossEncoder is None:
+            raise ImportError("sentence-transformers not installed")
+
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.chunks_per_result = chunks_per_result
+        self.model = model
+        self.cache = get_cache(f"rerank_scores:{model_name}", max_size=cache_size, ttl=SCORE_CACHE_TTL)
+        self.executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="rerank")
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        self.last_stats: Dict[str, Any] = {}
+
+        self.registry = get_model_registry()
+        self.model_key = f"cross-encoder:{model_name}"
+        if model is None:
+            self.registry.register(self.model_key, self._load_model, size_mb=RERANK_MODEL_SIZE_MB)
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_lock = threading.Lock()
+
+    def warm_up(self):
+        """Start loading the model in the background (no-op if loaded or loading)."""
+        if self.model is not None or self.registry.is_loaded(self.model_key):
+            return
+        with self._warmup_lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = self.registry.warm_up([self.model_key])
+
+    def rerank(self, query: str, results: List[Dict], top_k: int = 5) -> List[Dict]:
+        """Reorder retrieved meetings by cross-encoder relevance.
+
+        Args:
+            query: Question the candidates were retrieved for
+            results: Candidates shaped like HybridRetriever.retrieve /
+                HistorySearcher.semantic_search output, best first
+            top_k: Meetings to keep
+
+        Returns:
+            Top ``top_k`` results. When scored, each gets 'rerank_score'
+            (best of its chunks) and its 'chunks' / 'matched_text' are
+            reordered by it; otherwise the retrieval order is returned
+            unchanged (reason in ``last_stats['fallback']``)
+        """
+        start = time.perf_counter()
+        candidates = [self._texts(result) for result in results]
+        texts = {text for texts in candidates for text in texts}
+        scores = {text: self.cache.get(self._key(query, text)) for text in texts}
+        missing = [text for text, score in scores.items() if score is None]
+        self.last_stats = {
+            'candidates': len(results),
+            'pairs': len(texts),
+            'cached': len(texts) - len(missing),
+            'scored': 0,
+            'fallback': None
+        }
+
+        if missing:
+            fallback = None
+            if not self._model_ready():
+                fallback = 'model_loading'
+            elif not self._reserve_worker():
+                fallback = 'busy'
+            else:
+                cancel = threading.Event()
+                future = self.executor.submit(self._score, query, missing, cancel)
+                future.add_done_callback(self._release_worker)
+                remaining = self.budget_ms / 1000 - (time.perf_counter() - start)
+                try:
+                    scores.update(future.result(timeout=max(remaining, 0)))
+                    self.last_stats['scored'] = len(missing)
+                except FutureTimeout:
+                    # The worker stops after its current batch (which still gets cached)
+                    cancel.set()
+                    fallback = 'budget'
+                except Exception as e:
+                    print(f"[Reranker] Scoring failed: {e}")
+                    fallback = 'error'
+            if fallback:
+                self.last_stats['fallback'] = fallback
+                self.last_stats['ms'] = round((time.perf_counter() - start) * 1000, 2)
+                return results[:top_k]
+
+        reranked = []
+        for result, texts in zip(results, candidates):
+            result = dict(result)
+            if texts:
+                result['rerank_score'] = max(scores[text] for text in texts)
+            else:
+                result['rerank_score'] = float('-inf')
+            if result.get('chunks'):
+                result['chunks'] = sorted(
+                    result['chunks'],
+                    key=lambda c: -scores.get(self._clip(c['text']), float('-inf'))
+                )
+                result['matched_text'] = result['chunks'][0]['text']
+            reranked.append(result)
+
+        # Stable sort: equal scores keep their retrieval order
+        reranked.sort(key=lambda r: -r['rerank_score'])
+        self.last_stats['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return reranked[:top_k]
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _load_model(self):
+        print(f"[Reranker] Loading cross-encoder ({self.model_name})...")
+        model = CrossEncoder(self.model_name, device="cpu")
+        print("[Reranker] Cross-encoder loaded")
+        return model
+
+    def _model_ready(self) -> bool:
+        """True if the model is loaded; otherwise start loading it."""
+        if self.model is not None or self.registry.is_loaded(self.model_key):
+            return True
+        self.warm_up()
+        return False
+
+    def _reserve_worker(self) -> bool:
+        """Claim a scoring worker; False if all are still busy with earlier queries."""
+        with self._busy_lock:
+            if self._busy >= SCORING_WORKERS:
+                return False
+            self._busy += 1
+            return True
+
+    def _release_worker(self, _future):
+        with self._busy_lock:
+            self._busy -= 1
+
+    @contextmanager
+    def _use_model(self):
+        """Hold the model while scoring, so the registry cannot unload it mid-batch."""
+        if self.model is not None:
+            yield self.model
+            return
+        with self.registry.use(self.model_key) as model:
+            yield model
+
+    @staticmethod
+    def _clip(text: str) -> str:
+        return text[:MAX_TEXT_CHARS]
+
+    def _texts(self, result: Dict) -> List[str]:
+        """Texts scored for a candidate: its best chunks, or its matched text."""
+        chunks = result.get('chunks') or [{'text': result.get('matched_text', '')}]
+        texts = [self._clip(c['text']) for c in chunks[:self.chunks_per_result]]
+        return [text for text in texts if text.strip()]
+
+    def _key(self, query: str, text: str) -> str:
+        return hashlib.sha1(f"{query}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _score(self, query: str, texts: List[str], cancel: threading.Event) -> Dict[str, float]:
+        """Score (query, text) pairs in batches, caching each batch."""
+        scores = {}
+        with self._use_model() as model:
+            for i in range(0, len(texts), self.batch_size):
+                if cancel.is_set():
+                    break
+                batch = texts[i:i + self.batch_size]
+                batch_scores = model.predict([(query, text) for text in batch], batch_size=len(batch))
+                for text, score in zip(batch, batch_scores):
+                    scores[text] = float(score)
+                    self.cache.set(self._key(query, text), float(score))
+        return scores
@@ -0,0 +1,223 @@
+"""
+Unified retrieval service.
+
+One persistent ChromaDB store and one embedding model shared by every
+search path:
+- Meeting history view (collection ``meeting_history``): one vector per
+  section / transcript window of each analyzed meeting, tagged with
+  ``meeting_id``; used by HistorySearcher / RAGEngine (/api/history/*).
+- Chunk-level view (collection ``meeting_chunks``): transcript chunks,
+  used by AdvancedRAG (/api/rag/*) and ChromaManager (/api/chat/ask).
+
+Each piece of content is embedded once, at ingestion, with the same model
+that embeds the queries, so all endpoints rank against the same data.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import chromadb
+except ImportError:
+    chromadb = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+from backend.utils.embedding_cache import CachedEncoder, EmbeddingCache, get_embedding_cache
+from backend.utils.model_registry import get_model_registry
+
+MEETING_COLLECTION = "meeting_history"
+CHUNK_COLLECTION = "meeting_chunks"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_MODEL_SIZE_MB = 120
+
+# Pre-unification chunk store written by AdvancedRAG with the same model
+LEGACY_CHUNK_STORE = ("data/chroma_langchain", "meetings_advanced")
+
+
+class SharedEmbeddings:
+    """LangChain-compatible embeddings backed by the service's model."""
+
+    def __init__(self, service: "RetrievalService"):
+        self.service = service
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.service.encode(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.service.encode([text])[0]
+
+
+class RetrievalService:
+    """Owner of the shared vector store and embedding model."""
+
+    def __init__(self, persist_dir: Optional[str] = None, model_name: str = EMBEDDING_MODEL):
+        """Open the shared store and start loading the embedding model.
+
+        Args:
+            persist_dir: ChromaDB directory (default: $VECTOR_STORE_DIR or data/chroma_store)
+            model_name: SentenceTransformer model used for documents and queries
+        """
+        if chromadb is None:
+            raise ImportError("chromadb not installed. Run: pip install chromadb")
+        if SentenceTransformer is None:
+            raise ImportError("sentence-transformers not installed")
+
+        self.persist_dir = Path(persist_dir or os.getenv("VECTOR_STORE_DIR", "data/chroma_store"))
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+
+        self.client = chromadb.PersistentClient(path=str(self.persist_dir))
+        self.chunks = self.get_collection(CHUNK_COLLECTION, "Transcript chunks for RAG")
+        self.embeddings = SharedEmbeddings(self)
+
+        # The model itself lives in the shared registry (idle unload, memory budget)
+        self.registry = get_model_registry()
+        self.model_key = f"sentence-transformer:{model_name}"
+        self.registry.register(self.model_key, self._load_model, size_mb=EMBEDDING_MODEL_SIZE_MB)
+        self._vectorstore = None
+        self._vectorstore_lock = threading.Lock()
+
+        print(f"[RetrievalService] Store: {self.persist_dir}")
+        threading.Thread(target=self.get_model, daemon=True).start()
+
+    def get_collection(self, name: str, description: str = "Meeting history for semantic search"):
+        """Get or create a cosine-space collection in the shared store."""
+        return self.client.get_or_create_collection(
+            name=name,
+            metadata={"description": description, "hnsw:space": "cosine"}
+        )
+
+    def get_model(self):
+        """Get the embedding model, loading it on first use.
+
+        Callers should not keep the returned model; it may be unloaded
+        from the registry when idle. Use ``use_model`` while encoding.
+        """
+        return self.registry.get(self.model_key)
+
+    def use_model(self):
+        """Hold the embedding model while using it (``with service.use_model() as model``).
+
+        The reference keeps the idle reaper and the memory budget from
+        unloading the model mid-encode.
+        """
+        return self.registry.use(self.model_key)
+
+    def _load_model(self):
+        """Load the SentenceTransformer.
+
+        Unless EMBEDDING_CACHE_ENABLED=false, the model is wrapped in a
+        CachedEncoder so repeated texts (re-indexing, repeated queries)
+        are served from the persistent embedding cache.
+        """
+        print(f"[RetrievalService] Loading embedding model ({self.model_name})...")
+        model = SentenceTransformer(self.model_name)
+        if self._embedding_cache_enabled():
+            model = CachedEncoder(model, self.model_name, self._embedding_cache())
+        print("[RetrievalService] Embedding model loaded")
+        return model
+
+    @staticmethod
+    def _embedding_cache_enabled() -> bool:
+        return os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+
+    @staticmethod
+    def _embedding_cache() -> EmbeddingCache:
+        return get_embedding_cache(
+            db_path=os.getenv("EMBEDDING_CACHE_PATH", "data/cache/embeddings.db"),
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024,
+            dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+        )
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts (normalized, so cosine and dot product agree)."""
+        if not texts:
+            return []
+        with self.use_model() as model:
+            return model.encode(texts, normalize_embeddings=True).tolist()
+
+    def chunk_vectorstore(self):
+        """LangChain view over the chunk collection (shared by AdvancedRAG and ChromaManager)."""
+        with self._vectorstore_lock:
+            if self._vectorstore is None:
+                from langchain_chroma import Chroma
+
+                self._vectorstore = Chroma(
+                    client=self.client,
+                    collection_name=CHUNK_COLLECTION,
+                    embedding_function=self.embeddings
+                )
+                self.migrate_legacy_chunks()
+        return self._vectorstore
+
+    def migrate_legacy_chunks(self) -> int:
+        """Copy chunks from the old AdvancedRAG store without re-embedding them.
+
+        Only runs while the shared chunk collection is empty. The old
+        ChromaManager store (data/chroma_db) used Azure embeddings, which
+        live in a different vector space, so it is not migrated.
+
+        Returns:
+            Number of chunks copied
+        """
+        legacy_dir, legacy_name = LEGACY_CHUNK_STORE
+        if self.chunks.count() > 0 or not Path(legacy_dir).exists():
+            return 0
+
+        try:
+            legacy = chromadb.PersistentClient(path=legacy_dir).get_collection(legacy_name)
+            data = legacy.get(include=["embeddings", "documents", "metadatas"])
+        except Exception as e:
+            print(f"[RetrievalService] No legacy chunks to migrate: {e}")
+            return 0
+
+        ids = data.get("ids") or []
+        for start in range(0, len(ids), 500):
+            end = start + 500
+            self.chunks.upsert(
+                ids=ids[start:end],
+                embeddings=data["embeddings"][start:end],
+                documents=data["documents"][start:end],
+                metadatas=data["metadatas"][start:end]
+            )
+        if ids:
+            print(f"[RetrievalService] Migrated {len(ids)} chunks from {legacy_dir}")
+        return len(ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counts per view."""
+        stats = {"persist_dir": str(self.persist_dir), "embedding_model": self.model_name}
+        for name in (MEETING_COLLECTION, CHUNK_COLLECTION):
+            try:
+                stats[name] = self.client.get_collection(name).count()
+            except Exception:
+                stats[name] = 0
+        if self._embedding_cache_enabled() and self.registry.is_loaded(self.model_key):
+            stats["embedding_cache"] = self._embedding_cache().get_stats()
+        return stats
+
+
+_service: Optional[RetrievalService] = None
+_service_lock = threading.Lock()
+
+
+def get_retrieval_service() -> RetrievalService:
+    """Get or create the process-wide retrieval service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RetrievalService()
+        return _service
+
+
+def reset_retrieval_service():
+    """Drop the process-wide instance (tests, config changes)."""
+    global _service
+    with _service_lock:
+        _service = None
@@ -0,0 +1,296 @@
+"""Persistent, content-addressed cache for full meeting analyses.
+
+Keys are a hash of the normalized transcript plus everything that changes
+the LLM output (meeting type, language, model, prompt version), so the same
+content always maps to the same entry regardless of filename, and two
+different transcripts never collide.
+
+Transcripts of uploaded audio are cached the same way, keyed on the audio
+file's bytes plus the transcription settings, so re-uploading a recording
+skips decoding and transcription as well as the LLM calls.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_transcript(text: str) -> str:
+    """Normalize transcript text for hashing.
+
+    Unicode is NFC-normalized and whitespace is collapsed, so re-saving a
+    file with a different editor (CRLF, trailing spaces, NFD accents)
+    still hits the cache.
+
+    Args:
+        text: Transcript text
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def analysis_cache_key(
+    transcript: str,
+    meeting_type: str,
+    language: str,
+    model: str,
+    prompt_version: str,
+    **params
+) -> str:
+    """Build the cache key for an analysis.
+
+    Args:
+        transcript: Transcript text (normalized before hashing)
+        meeting_type: Meeting type
+        language: Output language
+        model: LLM model name
+        prompt_version: Version of the extraction prompts
+        **params: Other settings that affect the output (e.g. extraction mode)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    key_data = {
+        "transcript": hashlib.sha256(normalize_transcript(transcript).encode("utf-8")).hexdigest(),
+        "meeting_type": meeting_type,
+        "language": language,
+        "model": model,
+        "prompt_version": prompt_version,
+        "params": params,
+    }
+    key_str = json.dumps(key_data, sort_keys=True, default=str)
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+def file_content_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in blocks so large recordings are never held in memory.
+
+    Args:
+        path: File path
+        block_size: Bytes read at a time
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transcript_cache_key(file_hash: str, **params) -> str:
+    """Build the cache key for the transcript of an uploaded file.
+
+    Args:
+        file_hash: file_content_hash() of the upload
+        **params: Settings that affect the transcript (language, pipeline, model, ...)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    key_str = json.dumps({"file": file_hash, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache of analysis results (summary, topics, actions, decisions, specialized data)
+    and of upload transcripts."""
+
+    def __init__(self, db_path: str = "data/cache/analysis_cache.db", max_entries: int = 1000):
+        """Initialize cache.
+
+        Args:
+            db_path: SQLite database file
+            max_entries: Maximum number of entries; least recently used are evicted
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS analyses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_accessed ON analyses(accessed_at)")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcripts (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts(accessed_at)")
+
+        logger.info(f"AnalysisCache initialized: {self.db_path} (max_entries={max_entries})")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get cached analysis.
+
+        Args:
+            key: Cache key from analysis_cache_key()
+
+        Returns:
+            Cached analysis dict or None
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                value = json.loads(row[0])
+            except json.JSONDecodeError:
+                logger.warning(f"Corrupt analysis cache entry dropped: {key}")
+                with self.conn:
+                    self.conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE analyses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+
+        logger.debug(f"Analysis cache hit: {key[:12]}")
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store analysis.
+
+        Args:
+            key: Cache key from analysis_cache_key()
+            value: JSON-serializable analysis dict
+        """
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, data, now, now)
+            )
+            # Evict least recently used entries beyond capacity
+            self.conn.execute(
+                """DELETE FROM analyses WHERE key IN (
+                    SELECT key FROM analyses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+        logger.debug(f"Analysis cache set: {key[:12]}")
+
+    def get_transcript(self, key: str) -> Optional[str]:
+        """Get the cached transcript of an upload.
+
+        Args:
+            key: Cache key from transcript_cache_key()
+
+        Returns:
+            Transcript text or None
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE transcripts SET accessed_at = ? WHERE key = ?", (time.time(), key))
+
+        logger.debug(f"Transcript cache hit: {key[:12]}")
+        return row[0]
+
+    def set_transcript(self, key: str, transcript: str):
+        """Store the transcript of an upload.
+
+        Args:
+            key: Cache key from transcript_cache_key()
+            transcript: Transcript text
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, transcript, now, now)
+            )
+            self.conn.execute(
+                """DELETE FROM transcripts WHERE key IN (
+                    SELECT key FROM transcripts ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+        logger.debug(f"Transcript cache set: {key[:12]}")
+
+    def delete(self, key: str):
+        """Delete cached analysis.
+
+        Args:
+            key: Cache key
+        """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+
+    def clear(self):
+        """Clear all cached analyses and transcripts."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM analyses")
+            self.conn.execute("DELETE FROM transcripts")
+        logger.info("Analysis cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache stats
+        """
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            transcripts = self.conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'size': size,
+                'transcripts': transcripts,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'path': str(self.db_path)
+            }
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = Lock()
+
+
+def get_analysis_cache(db_path: str = "data/cache/analysis_cache.db", max_entries: int = 1000) -> AnalysisCache:
+    """Get or create the process-wide analysis cache.
+
+    Args:
+        db_path: SQLite database file (used on first call only)
+        max_entries: Maximum number of entries (used on first call only)
+
+    Returns:
+        AnalysisCache instance
+    """
+    global _analysis_cache
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache(db_path, max_entries)
+        return _analysis_cache
@@ -3,6 +3,7 @@
 Provides automatic backup, restore, and cleanup functionality.
 """
 
+import os
 import shutil
 import json
 from pathlib import Path
@@ -61,7 +62,7 @@ class BackupManager:
                     logger.debug(f"Backed up {len(list(checklist_dir.glob('*.json')))} checklist files")
                 
                 # Backup ChromaDB
-                chroma_dir = Path("data/chroma_db")
+                chroma_dir = Path(os.getenv("VECTOR_STORE_DIR", "data/chroma_store"))
                 if chroma_dir.exists():
                     for file in chroma_dir.rglob("*"):
                         if file.is_file():
@@ -135,6 +136,12 @@ class BackupManager:
                 else:
                     zipf.extractall(extract_dir)
                     logger.info(f"Backup restored to: {extract_dir}")
+                    
+                    # Restored history files bypass HistoryManager
+                    from backend.data.history_catalog import get_history_catalog
+                    history_dir = extract_dir / "history"
+                    count = get_history_catalog(str(history_dir)).rebuild(str(history_dir))
+                    logger.info(f"History catalog rebuilt: {count} analyses")
             
             logger.info("Backup restored successfully")
             return True
@@ -272,6 +279,9 @@ class DataCleanup:
         if not history_dir.exists():
             return 0
         
+        from backend.data.history_catalog import get_history_catalog
+        catalog = get_history_catalog(str(history_dir))
+        
         cutoff_date = datetime.now() - timedelta(days=days)
         deleted_count = 0
         
@@ -288,6 +298,7 @@ class DataCleanup:
                         
                         if timestamp < cutoff_date:
                             history_file.unlink()
+                            catalog.delete(history_file.stem)
                             deleted_count += 1
                             logger.debug(f"Deleted old history: {history_file.name}")
             except Exception as e:
@@ -326,7 +337,7 @@ class DataCleanup:
             stats["history"]["size_mb"] = sum(f.stat().st_size for f in files) / (1024 * 1024)
         
         # ChromaDB
-        chroma_dir = Path("data/chroma_db")
+        chroma_dir = Path(os.getenv("VECTOR_STORE_DIR", "data/chroma_store"))
         if chroma_dir.exists():
             size = sum(f.stat().st_size for f in chroma_dir.rglob("*") if f.is_file())
             stats["chroma_db"]["size_mb"] = size / (1024 * 1024)
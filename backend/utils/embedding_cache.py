@@ -0,0 +1,294 @@
+"""Persistent embedding cache.
+
+Vectors are keyed by (model name, normalized text hash) and stored as
+compact numpy blobs (float16 by default) in SQLite, with an in-memory LRU
+in front. The on-disk size is bounded in bytes; least recently used
+entries are evicted first.
+"""
+
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def embedding_cache_key(namespace: str, text: str) -> str:
+    """Build the cache key for a text.
+
+    Args:
+        namespace: Model name plus any option that changes the vector
+        text: Input text (NFC-normalized, whitespace-collapsed before hashing)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text or "").split())
+    return hashlib.sha256(f"{namespace}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with an in-memory LRU front."""
+
+    def __init__(
+        self,
+        db_path: str = "data/cache/embeddings.db",
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_items: int = 10000,
+        dtype: str = "float16"
+    ):
+        """Initialize cache.
+
+        Args:
+            db_path: SQLite database file
+            max_bytes: Maximum total size of stored vectors on disk
+            memory_items: Number of vectors kept in the in-memory LRU
+            dtype: Storage dtype, "float16" (half the size) or "float32"
+        """
+        if dtype not in ("float16", "float32"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.dtype = np.dtype(dtype)
+        self.memory: OrderedDict = OrderedDict()
+        self.lock = Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dtype TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+
+        logger.info(f"EmbeddingCache initialized: {self.db_path} ({self.total_bytes / 1024 / 1024:.1f} MB, dtype={dtype})")
+
+    def get_many(self, namespace: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up vectors for texts.
+
+        Args:
+            namespace: Model name/options namespace
+            texts: Input texts
+
+        Returns:
+            List aligned with ``texts``: float32 vector or None on miss
+        """
+        keys = [embedding_cache_key(namespace, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        disk_lookup: Dict[str, List[int]] = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                vector = self.memory.get(key)
+                if vector is not None:
+                    self.memory.move_to_end(key)
+                    results[i] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+            if disk_lookup:
+                found = {}
+                lookup_keys = list(disk_lookup)
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(lookup_keys), 500):
+                    chunk = lookup_keys[start:start + 500]
+                    rows = self.conn.execute(
+                        f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, dtype, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+
+                for key, positions in disk_lookup.items():
+                    vector = found.get(key)
+                    if vector is None:
+                        self.misses += len(positions)
+                        continue
+                    self.disk_hits += len(positions)
+                    self._remember(key, vector)
+                    for i in positions:
+                        results[i] = vector
+
+                if found:
+                    now = time.time()
+                    with self.conn:
+                        self.conn.executemany(
+                            "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                            [(now, key) for key in found]
+                        )
+
+        return results
+
+    def put_many(self, namespace: str, texts: List[str], vectors: List[np.ndarray]):
+        """Store vectors for texts.
+
+        Args:
+            namespace: Model name/options namespace
+            texts: Input texts
+            vectors: Vectors aligned with ``texts``
+        """
+        now = time.time()
+        rows = []
+        with self.lock:
+            for text, vector in zip(texts, vectors):
+                key = embedding_cache_key(namespace, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                blob = vector.astype(self.dtype).tobytes()
+                rows.append((key, self.dtype.name, blob, len(blob), now))
+
+            with self.conn:
+                # Replace keeps total_bytes exact when a key is re-inserted
+                existing = self._stored_bytes([row[0] for row in rows])
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dtype, vector, nbytes, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.total_bytes += sum(row[3] for row in rows) - existing
+                if self.total_bytes > self.max_bytes:
+                    self._evict()
+
+    def clear(self):
+        """Clear memory and disk."""
+        with self.lock, self.conn:
+            self.memory.clear()
+            self.conn.execute("DELETE FROM embeddings")
+            self.total_bytes = 0
+        logger.info("Embedding cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with hit rates and sizes
+        """
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'entries': entries,
+                'memory_entries': len(self.memory),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'dtype': self.dtype.name,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (hits / lookups) if lookups else 0.0
+            }
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _stored_bytes(self, keys: List[str]) -> int:
+        total = 0
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            total += self.conn.execute(
+                f"SELECT COALESCE(SUM(nbytes), 0) FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+        return total
+
+    def _evict(self):
+        # Drop least recently used rows until 90% of the budget is free again
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute("SELECT key, nbytes FROM embeddings ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, nbytes in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append(key)
+            self.total_bytes -= nbytes
+            self.memory.pop(key, None)
+        self.conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in evicted])
+        logger.debug(f"Embedding cache evicted {len(evicted)} entries")
+
+
+class CachedEncoder:
+    """Drop-in wrapper for a SentenceTransformer that serves repeated texts from the cache.
+
+    Only ``encode`` is intercepted; every other attribute is forwarded to the model.
+    """
+
+    # encode() options that do not change the returned numpy vectors
+    PASSTHROUGH_OPTIONS = {"batch_size", "show_progress_bar", "device"}
+
+    def __init__(self, model, model_name: str, cache: EmbeddingCache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **kwargs):
+        if set(kwargs) - self.PASSTHROUGH_OPTIONS:
+            # Tensors, token embeddings, etc. are not cached
+            return self.model.encode(sentences, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self.model.encode(texts, normalize_embeddings=normalize_embeddings, **kwargs)
+
+        namespace = f"{self.model_name}|normalize={bool(normalize_embeddings)}"
+        vectors = self.cache.get_many(namespace, texts)
+
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            encoded = np.asarray(
+                self.model.encode(missing, normalize_embeddings=normalize_embeddings, **kwargs),
+                dtype=np.float32
+            )
+            self.cache.put_many(namespace, missing, list(encoded))
+            by_text = dict(zip(missing, encoded))
+            vectors = [by_text[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+
+        result = np.vstack(vectors).astype(np.float32)
+        return result[0] if single else result
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = Lock()
+
+
+def get_embedding_cache(
+    db_path: str = "data/cache/embeddings.db",
+    max_bytes: int = 512 * 1024 * 1024,
+    memory_items: int = 10000,
+    dtype: str = "float16"
+) -> EmbeddingCache:
+    """Get or create the process-wide embedding cache (arguments used on first call only)."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(db_path, max_bytes, memory_items, dtype)
+        return _embedding_cache
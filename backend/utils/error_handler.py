@@ -232,12 +232,12 @@ def validate_file(file_path: str, max_size_mb: int = 100, allowed_extensions: li
         return False, f"Lỗi kiểm tra file: {str(e)}"
 
 
-def sanitize_input(text: str, max_length: int = 50000) -> str:
+def sanitize_input(text: str, max_length: Optional[int] = 50000) -> str:
     """Sanitize user input text.
     
     Args:
         text: Input text to sanitize
-        max_length: Maximum allowed length
+        max_length: Maximum allowed length (None = no limit)
         
     Returns:
         Sanitized text
@@ -249,7 +249,7 @@ def sanitize_input(text: str, max_length: int = 50000) -> str:
     text = text.replace('\x00', '')
     
     # Truncate if too long
-    if len(text) > max_length:
+    if max_length is not None and len(text) > max_length:
         logger.warning(f"Input truncated from {len(text)} to {max_length} chars")
         text = text[:max_length]
     
@@ -0,0 +1,410 @@
+"""Background job queue for long-running pipelines.
+
+Jobs are persisted in SQLite and executed by a bounded thread pool, so
+HTTP requests only submit work and return a job id. Progress (stage,
+percent, partial results) is written back to the database and pushed to
+subscribers (SSE streams, Socket.IO rooms).
+
+Several processes (e.g. gunicorn workers) may share one database: a job
+is claimed with a conditional UPDATE before it runs, so each job runs in
+exactly one process, and only jobs whose owning process is gone are
+resumed after a restart.
+"""
+
+import json
+import os
+import queue
+import socket
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL_STATES = (DONE, FAILED)
+
+# Progress within a stage is persisted at most this often, unless it moved by PROGRESS_STEP
+PROGRESS_INTERVAL = 1.0
+PROGRESS_STEP = 5
+
+
+def _process_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that claimed a job still runs (unknown hosts count as alive)."""
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class JobQueue:
+    """SQLite-persisted job queue with a bounded worker pool."""
+
+    def __init__(
+        self,
+        db_path: str = "data/jobs/jobs.db",
+        max_workers: int = 2,
+        max_attempts: int = 2,
+        progress_interval: float = PROGRESS_INTERVAL
+    ):
+        """Initialize job queue.
+
+        Args:
+            db_path: SQLite database file
+            max_workers: Maximum number of jobs running at once
+            max_attempts: How many times an interrupted job is restarted after a restart
+            progress_interval: Minimum seconds between persisted updates within one stage
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.progress_interval = progress_interval
+        self.owner = _process_owner()
+        self.handlers: Dict[str, Callable] = {}
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.subscribers: Dict[str, List[queue.Queue]] = {}
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    params TEXT NOT NULL,
+                    partial TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+            if 'owner' not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+
+        logger.info(f"JobQueue initialized: {self.db_path} (max_workers={max_workers})")
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def register(self, kind: str, handler: Callable):
+        """Register the handler for a job kind.
+
+        The handler is called as ``handler(params, report)`` and returns a
+        JSON-serializable result. ``report(stage, progress=None, partial=None)``
+        publishes progress; ``partial`` is merged into the job's partial results.
+
+        Args:
+            kind: Job kind (e.g. 'upload')
+            handler: Callable running the job
+        """
+        self.handlers[kind] = handler
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        """Add a callback invoked with (job_id, event) on every job update.
+
+        Args:
+            listener: Callback (e.g. Socket.IO emitter)
+        """
+        self.listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Submit / query
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> str:
+        """Persist and schedule a job.
+
+        Args:
+            kind: Registered job kind
+            params: JSON-serializable job parameters
+
+        Returns:
+            Job id
+
+        Raises:
+            ValueError: If no handler is registered for ``kind``
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, kind, status, stage, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, QUEUED, json.dumps(params, ensure_ascii=False), now, now)
+            )
+        logger.info(f"Job submitted: {job_id} ({kind})")
+        self._publish(job_id)
+        self.executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job status and results.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Job dict or None if not found
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List most recent jobs.
+
+        Args:
+            status: Optional status filter
+            limit: Maximum number of jobs
+
+        Returns:
+            List of job dicts (without params)
+        """
+        with self.lock:
+            if status:
+                rows = self.conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = self.conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        jobs = [self._row_to_dict(row) for row in rows]
+        for job in jobs:
+            job.pop('params', None)
+        return jobs
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        """Subscribe to updates of a job.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Queue receiving job dicts on every update
+        """
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.setdefault(job_id, []).append(q)
+        return q
+
+    def unsubscribe(self, job_id: str, q: queue.Queue):
+        """Remove a subscriber queue.
+
+        Args:
+            job_id: Job id
+            q: Queue returned by subscribe()
+        """
+        with self.lock:
+            subs = self.subscribers.get(job_id, [])
+            if q in subs:
+                subs.remove(q)
+            if not subs:
+                self.subscribers.pop(job_id, None)
+
+    def resume_pending(self) -> int:
+        """Re-schedule jobs left queued, or running in a process that is gone.
+
+        Interrupted jobs are restarted from the beginning until
+        ``max_attempts`` is reached, then reported as failed. Jobs running
+        in another live process are left alone; queued jobs may be picked
+        up by several processes, but only the one that claims a job runs it.
+
+        Returns:
+            Number of jobs re-scheduled
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, status, attempts, owner FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING)
+            ).fetchall()
+
+        resumed = 0
+        for row in rows:
+            if row['status'] == RUNNING:
+                if _owner_alive(row['owner']):
+                    continue
+                if row['attempts'] >= self.max_attempts:
+                    new_status, error = FAILED, "Interrupted by server restart"
+                else:
+                    new_status, error = QUEUED, None
+                # Conditional, so only one restarted process takes the interrupted job over
+                with self.lock, self.conn:
+                    taken = self.conn.execute(
+                        "UPDATE jobs SET status = ?, stage = ?, error = ?, owner = NULL, updated_at = ? "
+                        "WHERE id = ? AND status = ? AND owner IS ?",
+                        (new_status, new_status, error, time.time(), row['id'], RUNNING, row['owner'])
+                    ).rowcount
+                if not taken:
+                    continue
+                self._publish(row['id'])
+                if new_status == FAILED:
+                    continue
+            self.executor.submit(self._run, row['id'])
+            resumed += 1
+
+        if resumed:
+            logger.info(f"Resumed {resumed} pending jobs")
+        return resumed
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and wait for running ones.
+
+        Args:
+            wait: Wait for running jobs to finish
+        """
+        self.executor.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _claim(self, job_id: str) -> bool:
+        """Atomically move a queued job to running in this process."""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, owner = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, RUNNING, self.owner, time.time(), job_id, QUEUED)
+            ).rowcount == 1
+
+    def _run(self, job_id: str):
+        with self.lock:
+            row = self.conn.execute("SELECT kind, params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+
+        handler = self.handlers.get(row['kind'])
+        if handler is None:
+            self._update(job_id, status=FAILED, stage=FAILED, error=f"No handler for job kind: {row['kind']}")
+            return
+
+        if not self._claim(job_id):
+            logger.info(f"Job {job_id} already claimed by another worker")
+            return
+        self._publish(job_id)
+        partial_results: Dict[str, Any] = {}
+        last = {'stage': None, 'progress': None, 'at': 0.0, 'dirty': False}
+
+        def report(stage: str, progress: Optional[float] = None, partial: Optional[Dict[str, Any]] = None):
+            if partial:
+                partial_results.update(partial)
+                last['dirty'] = True
+            # Generators report on every update (with the whole transcript so far):
+            # within a stage, persist only every progress_interval seconds or PROGRESS_STEP percent
+            now = time.monotonic()
+            if (stage == last['stage'] and now - last['at'] < self.progress_interval
+                    and (progress is None or last['progress'] is None
+                         or abs(progress - last['progress']) < PROGRESS_STEP)):
+                return
+            changed = partial_results if last['dirty'] else None
+            last.update(stage=stage, at=now, dirty=False,
+                        progress=progress if progress is not None else last['progress'])
+            self._update(job_id, stage=stage, progress=progress, partial=changed)
+
+        start = time.time()
+        try:
+            result = handler(json.loads(row['params']), report)
+            self._update(job_id, status=DONE, stage=DONE, progress=100, result=result,
+                         partial=partial_results if last['dirty'] else None)
+            logger.info(f"Job done: {job_id} in {time.time() - start:.1f}s")
+        except Exception as e:
+            logger.error(f"Job failed: {job_id}: {e}", exc_info=True)
+            self._update(job_id, status=FAILED, stage=FAILED, error=str(e))
+
+    def _update(self, job_id: str, **fields):
+        columns = []
+        values = []
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if name in ('partial', 'result'):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            columns.append(f"{name} = ?")
+            values.append(value)
+        columns.append("updated_at = ?")
+        values.append(time.time())
+        values.append(job_id)
+
+        with self.lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {', '.join(columns)} WHERE id = ?", values)
+        self._publish(job_id)
+
+    def _publish(self, job_id: str):
+        job = self.get(job_id)
+        if job is None:
+            return
+        job.pop('params', None)
+
+        with self.lock:
+            subs = list(self.subscribers.get(job_id, []))
+        for q in subs:
+            q.put(job)
+
+        for listener in self.listeners:
+            try:
+                listener(job_id, job)
+            except Exception as e:
+                logger.warning(f"Job listener failed: {e}")
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for name in ('params', 'partial', 'result'):
+            if job.get(name):
+                job[name] = json.loads(job[name])
+        return job
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = Lock()
+
+
+def get_job_queue(db_path: str = "data/jobs/jobs.db", max_workers: int = 2) -> JobQueue:
+    """Get or create the process-wide job queue.
+
+    Args:
+        db_path: SQLite database file (used on first call only)
+        max_workers: Worker pool size (used on first call only)
+
+    Returns:
+        JobQueue instance
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(db_path, max_workers)
+        return _job_queue
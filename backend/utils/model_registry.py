@@ -0,0 +1,330 @@
+"""Process-wide registry for heavy ML models.
+
+Models (Whisper, pyannote, SentenceTransformer, ...) are registered once
+with a loader and an estimated resident size, then shared by every caller:
+
+- loaded lazily on first use (one load even under concurrent requests);
+- reference counted while in use (``with registry.use(name) as model``);
+- unloaded after ``idle_timeout`` seconds without users;
+- least recently used idle models are unloaded first when loading another
+  one would exceed ``max_resident_mb``;
+- optionally warmed up in the background at startup.
+"""
+
+import gc
+import os
+import time
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Entry:
+    def __init__(
+        self,
+        loader: Callable[[], Any],
+        size_mb: float,
+        idle_timeout: Optional[float],
+        on_unload: Optional[Callable[[Any], None]]
+    ):
+        self.loader = loader
+        self.on_unload = on_unload
+        self.size_mb = size_mb
+        self.idle_timeout = idle_timeout
+        self.model = None
+        self.refs = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_lock = Lock()
+
+
+class ModelRegistry:
+    """Shared, reference-counted model cache with idle and memory limits."""
+
+    def __init__(self, idle_timeout: float = 900.0, max_resident_mb: float = 0, reap_interval: float = 30.0):
+        """Initialize registry.
+
+        Args:
+            idle_timeout: Seconds without users before a model is unloaded (0 = never)
+            max_resident_mb: Budget for loaded models, by their declared size (0 = unlimited)
+            reap_interval: Seconds between idle checks
+        """
+        self.idle_timeout = idle_timeout
+        self.max_resident_mb = max_resident_mb
+        self.reap_interval = reap_interval
+        self.entries: Dict[str, _Entry] = {}
+        self.lock = Lock()
+        self._stop = Event()
+        self._reaper: Optional[Thread] = None
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        size_mb: float = 0,
+        idle_timeout: Optional[float] = None,
+        replace: bool = False,
+        on_unload: Optional[Callable[[Any], None]] = None
+    ) -> bool:
+        """Register a model loader.
+
+        Args:
+            name: Model name used by callers
+            loader: Zero-argument callable returning the loaded model
+            size_mb: Estimated resident memory once loaded
+            idle_timeout: Per-model idle timeout (default: registry setting)
+            replace: Replace an existing registration (only if not loaded)
+            on_unload: Called with the model when it is unloaded (e.g. to stop worker processes)
+
+        Returns:
+            True if registered, False if the name was already taken
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and (not replace or entry.model is not None):
+                return False
+            self.entries[name] = _Entry(loader, size_mb, idle_timeout, on_unload)
+            return True
+
+    def is_registered(self, name: str) -> bool:
+        return name in self.entries
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def use(self, name: str):
+        """Hold a model while using it (it will not be unloaded meanwhile).
+
+        Args:
+            name: Registered model name
+
+        Yields:
+            Loaded model
+        """
+        entry = self._entry(name)
+        with self.lock:
+            entry.refs += 1
+        try:
+            yield self._ensure_loaded(name, entry)
+        finally:
+            with self.lock:
+                entry.refs -= 1
+                entry.last_used = time.time()
+
+    def get(self, name: str):
+        """Get a loaded model without holding a reference.
+
+        Callers should not keep the returned object around; call ``get``
+        (or ``use``) again each time so idle models can be reclaimed.
+        """
+        entry = self._entry(name)
+        model = self._ensure_loaded(name, entry)
+        entry.last_used = time.time()
+        return model
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self.entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def unload(self, name: str, force: bool = False) -> bool:
+        """Unload a model.
+
+        Args:
+            name: Model name
+            force: Unload even while in use
+
+        Returns:
+            True if the model was unloaded
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None or entry.model is None or (entry.refs and not force):
+                return False
+            model, entry.model = entry.model, None
+        if entry.on_unload is not None:
+            try:
+                entry.on_unload(model)
+            except Exception as e:
+                logger.warning(f"Unload hook failed for {name}: {e}")
+        del model
+        self._release_memory()
+        logger.info(f"Model unloaded: {name}")
+        return True
+
+    def unload_idle(self, now: Optional[float] = None) -> int:
+        """Unload models whose idle timeout has expired.
+
+        Returns:
+            Number of models unloaded
+        """
+        now = now or time.time()
+        with self.lock:
+            expired = []
+            for name, entry in self.entries.items():
+                timeout = self.idle_timeout if entry.idle_timeout is None else entry.idle_timeout
+                if entry.model is not None and entry.refs == 0 and timeout and now - entry.last_used > timeout:
+                    expired.append(name)
+        return sum(self.unload(name) for name in expired)
+
+    def warm_up(self, names: Iterable[str], background: bool = True) -> Optional[Thread]:
+        """Load models ahead of the first request.
+
+        Args:
+            names: Model names (unknown names are skipped with a warning)
+            background: Load in a daemon thread
+
+        Returns:
+            The warm-up thread when ``background`` is True
+        """
+        names = [name for name in names if name]
+
+        def load_all():
+            for name in names:
+                if not self.is_registered(name):
+                    logger.warning(f"Warm-up skipped, model not registered: {name}")
+                    continue
+                try:
+                    start = time.time()
+                    self.get(name)
+                    logger.info(f"Model warmed up: {name} ({time.time() - start:.1f}s)")
+                except Exception as e:
+                    logger.warning(f"Warm-up failed for {name}: {e}")
+
+        if not background:
+            load_all()
+            return None
+        thread = Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def start_reaper(self):
+        """Start the background thread unloading idle models."""
+        with self.lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._stop.clear()
+            self._reaper = Thread(target=self._reap, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def stop_reaper(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Loaded models, their users and the memory budget."""
+        with self.lock:
+            models = {
+                name: {
+                    'loaded': entry.model is not None,
+                    'refs': entry.refs,
+                    'size_mb': entry.size_mb,
+                    'loads': entry.loads,
+                    'idle_seconds': round(time.time() - entry.last_used, 1) if entry.last_used else None
+                }
+                for name, entry in self.entries.items()
+            }
+            return {
+                'resident_mb': self._resident_mb(),
+                'max_resident_mb': self.max_resident_mb,
+                'idle_timeout': self.idle_timeout,
+                'models': models
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _entry(self, name: str) -> _Entry:
+        entry = self.entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model not registered: {name}")
+        return entry
+
+    def _ensure_loaded(self, name: str, entry: _Entry):
+        model = entry.model
+        if model is not None:
+            return model
+
+        with entry.load_lock:
+            if entry.model is None:
+                self._make_room(name, entry.size_mb)
+                logger.info(f"Loading model: {name} (~{entry.size_mb:.0f} MB)")
+                start = time.time()
+                model = entry.loader()
+                with self.lock:
+                    entry.model = model
+                    entry.loads += 1
+                    entry.last_used = time.time()
+                logger.info(f"Model loaded: {name} in {time.time() - start:.1f}s")
+            return entry.model
+
+    def _make_room(self, name: str, size_mb: float):
+        if not self.max_resident_mb:
+            return
+        with self.lock:
+            idle = sorted(
+                (entry.last_used, other)
+                for other, entry in self.entries.items()
+                if other != name and entry.model is not None and entry.refs == 0
+            )
+        for _, other in idle:
+            if self._resident_mb() + size_mb <= self.max_resident_mb:
+                break
+            self.unload(other)
+        if self._resident_mb() + size_mb > self.max_resident_mb:
+            logger.warning(
+                f"Loading {name} exceeds model memory budget "
+                f"({self._resident_mb() + size_mb:.0f}/{self.max_resident_mb:.0f} MB; other models in use)"
+            )
+
+    def _resident_mb(self) -> float:
+        return sum(entry.size_mb for entry in self.entries.values() if entry.model is not None)
+
+    def _reap(self):
+        while not self._stop.wait(self.reap_interval):
+            try:
+                self.unload_idle()
+            except Exception as e:
+                logger.warning(f"Idle model check failed: {e}")
+
+    @staticmethod
+    def _release_memory():
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the process-wide model registry.
+
+    Configured from MODEL_IDLE_TIMEOUT / MODEL_MAX_RESIDENT_MB (see Settings),
+    read from the environment on first call rather than through Settings,
+    whose import validates the LLM configuration: search and retrieval
+    need no LLM key.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(
+                idle_timeout=float(os.getenv("MODEL_IDLE_TIMEOUT", "900")),
+                max_resident_mb=float(os.getenv("MODEL_MAX_RESIDENT_MB", "0"))
+            )
+            _registry.start_reaper()
+        return _registry
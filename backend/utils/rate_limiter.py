@@ -56,6 +56,9 @@ class RateLimiter:
             
             # Check if limit reached
             if len(self.calls[key]) >= self.max_calls:
+                if not self.calls[key]:
+                    logger.warning(f"Rate limit for '{key}' allows no calls")
+                    return False
                 oldest_call = self.calls[key][0]
                 wait_time = self.time_window - (now - oldest_call)
                 logger.warning(
@@ -78,24 +81,30 @@ class RateLimiter:
         Returns:
             True if call can proceed, False if max_wait exceeded
         """
-        if self.is_allowed(key):
-            return True
+        deadline = time.time() + max_wait
         
-        with self.lock:
-            now = time.time()
-            if key in self.calls and self.calls[key]:
-                oldest_call = self.calls[key][0]
-                wait_time = self.time_window - (now - oldest_call)
-                
-                if wait_time > max_wait:
-                    logger.error(f"Wait time ({wait_time:.1f}s) exceeds max_wait ({max_wait}s)")
-                    return False
-                
-                logger.info(f"Waiting {wait_time:.1f}s for rate limit...")
-                time.sleep(wait_time + 0.1)  # Add small buffer
-                return True
+        while not self.is_allowed(key):
+            with self.lock:
+                now = time.time()
+                calls = self.calls.get(key)
+                if not calls:
+                    if self.max_calls <= 0:
+                        # No call is ever allowed: waiting would only spin until the deadline
+                        logger.error(f"Rate limit for '{key}' allows no calls (max_calls={self.max_calls})")
+                        return False
+                    continue  # Window was reset concurrently; re-check
+                wait_time = self.time_window - (now - calls[0])
+            
+            if now + wait_time > deadline:
+                logger.error(f"Wait time ({wait_time:.1f}s) exceeds max_wait ({max_wait}s)")
+                return False
+            
+            # Sleep outside the lock so concurrent callers are not serialized,
+            # then re-check: another caller may have taken the freed slot
+            logger.info(f"Waiting {wait_time:.1f}s for rate limit...")
+            time.sleep(max(wait_time, 0) + 0.1)  # Add small buffer
         
-        return False
+        return True
     
     def get_remaining_calls(self, key: str = "default") -> int:
         """Get number of remaining calls in current window.
@@ -0,0 +1,173 @@
+"""Worker pool for per-session live work (Socket.IO recordings).
+
+Event handlers only submit work and return, so one slow session never
+stalls event delivery for other clients. Per session:
+
+- tasks run one at a time, in submission order;
+- while a task runs, at most one more is kept: newer submissions replace
+  the queued one (coalescing), because every run processes the latest
+  session state anyway;
+- a closing task runs after the running task (replacing queued work like
+  any newer submission), then the session is dropped.
+
+Queue depth, per-session lag (how long the oldest queued submission has
+waited) and run times are available from ``get_stats``.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _SessionState:
+    def __init__(self):
+        self.pending: Optional[Callable[[], Any]] = None
+        self.pending_since: Optional[float] = None
+        self.running = False
+        self.closing = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.last_duration = 0.0
+
+
+class SessionWorkerPool:
+    """Thread pool running each session's tasks serially, coalescing queued work."""
+
+    def __init__(self, max_workers: int = 4):
+        """Initialize pool.
+
+        Args:
+            max_workers: Sessions processed at the same time
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="live")
+        self.sessions: Dict[str, _SessionState] = {}
+        self.lock = Lock()
+        self.totals = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0}
+
+    def submit(self, session_id: str, task: Callable[[], Any]) -> bool:
+        """Queue work for a session.
+
+        Args:
+            session_id: Session key (e.g. Socket.IO sid)
+            task: Zero-argument callable
+
+        Returns:
+            False if the task replaced one that was already queued (or the
+            session is closing), True if it was queued on its own
+        """
+        with self.lock:
+            state = self.sessions.setdefault(session_id, _SessionState())
+            if state.closing:
+                return False
+            return self._enqueue(session_id, state, task)
+
+    def close(self, session_id: str, task: Optional[Callable[[], Any]] = None):
+        """Run ``task`` after the session's running task, then forget the session.
+
+        Queued work is coalesced into ``task``, so it must process the
+        latest state itself. Later submissions for the session are ignored.
+        """
+        with self.lock:
+            state = self.sessions.setdefault(session_id, _SessionState())
+            state.closing = True
+            self._enqueue(session_id, state, task or (lambda: None))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, per-session lag and totals."""
+        now = time.time()
+        with self.lock:
+            sessions = {
+                session_id: {
+                    'running': state.running,
+                    'queued': state.pending is not None,
+                    # Waiting time of queued work, else how long the last run waited
+                    'lag_seconds': round(now - state.pending_since if state.pending_since else state.last_lag, 3),
+                    'last_run_seconds': round(state.last_duration, 3),
+                    'submitted': state.submitted,
+                    'coalesced': state.coalesced,
+                    'completed': state.completed,
+                    'failed': state.failed
+                }
+                for session_id, state in self.sessions.items()
+            }
+            return {
+                'max_workers': self.max_workers,
+                'sessions': len(sessions),
+                'running': sum(1 for s in sessions.values() if s['running']),
+                'queue_depth': sum(1 for s in sessions.values() if s['queued']),
+                'max_lag_seconds': max((s['lag_seconds'] for s in sessions.values()), default=0.0),
+                **self.totals,
+                'per_session': sessions
+            }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, session_id: str, state: _SessionState, task: Callable[[], Any]) -> bool:
+        # Called with self.lock held
+        state.submitted += 1
+        self.totals['submitted'] += 1
+        coalesced = state.pending is not None
+        if coalesced:
+            state.coalesced += 1
+            self.totals['coalesced'] += 1
+        else:
+            state.pending_since = time.time()
+        state.pending = task
+        if not state.running:
+            state.running = True
+            self.executor.submit(self._drain, session_id, state)
+        return not coalesced
+
+    def _drain(self, session_id: str, state: _SessionState):
+        """Run the session's queued task until none is left (one worker per session)."""
+        while True:
+            with self.lock:
+                task = state.pending
+                if task is None:
+                    state.running = False
+                    if state.closing and self.sessions.get(session_id) is state:
+                        del self.sessions[session_id]
+                    return
+                state.pending = None
+                state.last_lag = time.time() - state.pending_since
+                state.pending_since = None
+
+            start = time.time()
+            try:
+                task()
+                outcome = 'completed'
+            except Exception as e:
+                logger.error(f"Live task failed for session {session_id}: {e}", exc_info=True)
+                outcome = 'failed'
+            with self.lock:
+                state.last_duration = time.time() - start
+                setattr(state, outcome, getattr(state, outcome) + 1)
+                self.totals[outcome] += 1
+
+
+_pool: Optional[SessionWorkerPool] = None
+_pool_lock = Lock()
+
+
+def get_session_pool() -> SessionWorkerPool:
+    """Get or create the process-wide live session pool (sized from Settings)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from backend.config import Settings
+            _pool = SessionWorkerPool(max_workers=Settings.LIVE_MAX_WORKERS)
+        return _pool
@@ -1,13 +1,4 @@
 import backend.utils.ffmpeg_helper # Auto-setup ffmpeg path (MUST BE FIRST)
-from app import create_app, socketio
-import os
-import logging
-
-# Giảm log của werkzeug và socketio
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
-from app import create_app, socketio
-import os
 import logging
 
 # Giảm log của werkzeug và socketio
@@ -16,9 +7,15 @@ log.setLevel(logging.ERROR)
 logging.getLogger('socketio').setLevel(logging.ERROR)
 logging.getLogger('engineio').setLevel(logging.ERROR)
 
-app = create_app('development')
+# The app is only built under the __main__ guard: transcription workers are
+# spawned and re-import this file as __mp_main__, and must not start the
+# Socket.IO handlers, session pool or job queue. Gunicorn serves wsgi:app.
 
 if __name__ == '__main__':
+    from app import create_app, socketio
+
+    app = create_app('development')
+
     # Force reload trigger v2 - Performance Fixes Applied 🚀
     try:
         # Pring with emoji might fail on some windows consoles, so wrap in try/except
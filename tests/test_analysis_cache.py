@@ -0,0 +1,108 @@
+"""
+Tests for the persistent, content-addressed analysis cache.
+
+Run: pytest tests/test_analysis_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.analysis_cache import AnalysisCache, analysis_cache_key, file_content_hash, transcript_cache_key
+
+
+ANALYSIS = {
+    "summary": "Budget approved.",
+    "topics": [{"topic": "Ngân sách", "description": "Q4"}],
+    "action_items": [],
+    "decisions": [{"decision": "Approve", "context": "ROI"}],
+    "specialized_data": {},
+}
+
+
+def key(transcript, **overrides):
+    args = dict(meeting_type="meeting", language="vi", model="gpt-4o-mini", prompt_version="1")
+    args.update(overrides)
+    return analysis_cache_key(transcript, **args)
+
+
+class TestAnalysisCacheKey:
+
+    def test_whitespace_and_line_endings_are_normalized(self):
+        assert key("An: hello\r\nBinh:  hi ") == key("An: hello\nBinh: hi")
+
+    def test_shared_prefix_does_not_collide(self):
+        prefix = "x" * 100
+        assert key(prefix + " first meeting") != key(prefix + " second meeting")
+
+    @pytest.mark.parametrize("field,value", [
+        ("meeting_type", "workshop"),
+        ("language", "en"),
+        ("model", "gemini-2.5-flash"),
+        ("prompt_version", "2"),
+    ])
+    def test_settings_are_part_of_key(self, field, value):
+        assert key("same text") != key("same text", **{field: value})
+
+
+class TestAnalysisCache:
+
+    def test_roundtrip_persists_across_instances(self, tmp_path):
+        db = tmp_path / "cache.db"
+        AnalysisCache(str(db)).set("k", ANALYSIS)
+
+        cache = AnalysisCache(str(db))
+        assert cache.get("k") == ANALYSIS
+        assert cache.get("missing") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "cache.db"), max_entries=2)
+        cache.set("a", ANALYSIS)
+        cache.set("b", ANALYSIS)
+        cache.get("a")
+        cache.set("c", ANALYSIS)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.get_stats()["size"] == 2
+
+
+class TestTranscriptCache:
+
+    def test_same_bytes_hash_alike_under_any_name(self, tmp_path):
+        (tmp_path / "standup.mp3").write_bytes(b"RIFF" + b"\x00" * 3000000)
+        (tmp_path / "renamed.mp3").write_bytes(b"RIFF" + b"\x00" * 3000000)
+        (tmp_path / "other.mp3").write_bytes(b"RIFF" + b"\x01" * 3000000)
+
+        assert file_content_hash(str(tmp_path / "standup.mp3")) == file_content_hash(str(tmp_path / "renamed.mp3"))
+        assert file_content_hash(str(tmp_path / "standup.mp3")) != file_content_hash(str(tmp_path / "other.mp3"))
+
+    def test_transcription_settings_are_part_of_key(self):
+        base = transcript_cache_key("abc", language="vi", pipeline="whisper")
+        assert base == transcript_cache_key("abc", pipeline="whisper", language="vi")
+        assert base != transcript_cache_key("abc", language="en", pipeline="whisper")
+        assert base != transcript_cache_key("abc", language="vi", pipeline="diarization")
+
+    def test_roundtrip_and_clear(self, tmp_path):
+        db = tmp_path / "cache.db"
+        AnalysisCache(str(db)).set_transcript("t", "An: xin chào")
+
+        cache = AnalysisCache(str(db))
+        assert cache.get_transcript("t") == "An: xin chào"
+        assert cache.get_transcript("missing") is None
+        assert cache.get_stats()["transcripts"] == 1
+
+        cache.clear()
+        assert cache.get_transcript("t") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
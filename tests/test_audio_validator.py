@@ -0,0 +1,128 @@
+"""
+Tests for streaming (constant-memory) audio validation.
+
+Run: pytest tests/test_audio_validator.py -v
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio import audio_validator
+from backend.audio.audio_validator import get_audio_info, validate_audio_quality
+
+
+class FakeSoundfile:
+    """Serves samples through the soundfile API and records how much was read."""
+
+    def __init__(self, samples, sample_rate=16000, channels=1, frames=None):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = len(samples) if frames is None else frames
+        self.blocks_read = 0
+
+    def info(self, path):
+        return SimpleNamespace(samplerate=self.sample_rate, channels=self.channels, frames=self.frames)
+
+    def blocks(self, path, blocksize, dtype, always_2d):
+        for start in range(0, len(self.samples), blocksize):
+            self.blocks_read += 1
+            block = self.samples[start:start + blocksize]
+            yield np.repeat(block[:, None], self.channels, axis=1)
+
+
+def tone(seconds, sample_rate=16000, amplitude=0.5):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "upload.wav"
+    path.write_bytes(b"\0" * 1024)
+    return str(path)
+
+
+@pytest.fixture
+def use_soundfile(monkeypatch):
+    def install(fake):
+        monkeypatch.setattr(audio_validator, "sf", fake)
+        return fake
+    return install
+
+
+class TestValidateAudioQuality:
+
+    def test_valid_audio_passes(self, upload, use_soundfile):
+        use_soundfile(FakeSoundfile(tone(5, 44100), sample_rate=44100, channels=2))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert is_valid
+        assert "5.0s" in message and "44100Hz" in message
+
+    def test_long_audio_fails_from_header_without_reading(self, upload, use_soundfile):
+        fake = use_soundfile(FakeSoundfile(tone(1), frames=16000 * 7300))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert not is_valid
+        assert "quá dài" in message
+        assert fake.blocks_read == 0
+
+    def test_low_sample_rate_fails_from_header(self, upload, use_soundfile):
+        fake = use_soundfile(FakeSoundfile(tone(5, 4000), sample_rate=4000))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert not is_valid and "Sample rate" in message
+        assert fake.blocks_read == 0
+
+    def test_quiet_audio_fails(self, upload, use_soundfile):
+        use_soundfile(FakeSoundfile(tone(5, amplitude=0.001)))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert not is_valid and "quá nhỏ" in message
+
+    def test_clipping_stops_reading_once_certain(self, upload, use_soundfile):
+        samples = tone(60)
+        samples[:16000 * 10] = 1.0  # First 10 s fully clipped
+        fake = use_soundfile(FakeSoundfile(samples))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert not is_valid and "clipping" in message
+        assert fake.blocks_read < len(samples) // audio_validator.BLOCK_FRAMES
+
+    def test_duration_without_header_is_counted(self, upload, use_soundfile):
+        use_soundfile(FakeSoundfile(tone(0.5), frames=0))
+
+        is_valid, message = validate_audio_quality(upload)
+
+        assert not is_valid and "quá ngắn" in message
+
+
+class TestGetAudioInfo:
+
+    def test_reads_header_only(self, upload, use_soundfile):
+        fake = use_soundfile(FakeSoundfile(tone(90, 48000), sample_rate=48000, channels=2))
+
+        info = get_audio_info(upload)
+
+        assert info["duration_seconds"] == pytest.approx(90)
+        assert info["duration_formatted"] == "01:30"
+        assert (info["sample_rate"], info["channels"]) == (48000, 2)
+        assert fake.blocks_read == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
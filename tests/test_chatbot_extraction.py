@@ -0,0 +1,370 @@
+"""
+Tests for Chatbot extraction stages (concurrent, combined and map-reduce).
+
+Run: pytest tests/test_chatbot_extraction.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import json
+
+from backend.data.preprocessor import TranscriptPreprocessor
+from backend.rag.chatbot import Chatbot, merge_extracted_items
+from backend.utils.error_handler import sanitize_input
+from backend.utils.rate_limiter import RateLimiter
+
+
+class FakeLLM:
+    """LLM stub that answers based on the prompt and records concurrency."""
+
+    def __init__(self, delay=0.1, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt, system_message=""):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("boom")
+            if '"topic"' in prompt:
+                return '[{"topic": "Budget", "description": "Q4"}]'
+            if '"decision"' in prompt:
+                return '[{"decision": "Approve", "context": "ROI"}]'
+            if '"task"' in prompt:
+                return '[{"task": "Send report", "assignee": "An", "deadline": "Friday"}]'
+            return "Short summary."
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def transcript():
+    return "An: We should approve the Q4 budget. Binh: Agreed, An will send the report by Friday."
+
+
+class TestExtractAll:
+
+    def test_returns_same_tuple_shape(self, transcript):
+        bot = Chatbot(llm_manager=FakeLLM(delay=0), transcript=transcript, language="en")
+        summary, topics, actions, decisions = bot.extract_all()
+
+        assert summary == "Short summary."
+        assert topics[0]["topic"] == "Budget"
+        assert actions[0]["assignee"] == "An"
+        assert decisions[0]["decision"] == "Approve"
+        assert bot.extraction_errors == {}
+
+    def test_runs_concurrently(self, transcript):
+        llm = FakeLLM(delay=0.2)
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        start = time.time()
+        bot.extract_all(max_workers=4)
+        elapsed = time.time() - start
+
+        assert llm.peak == 4
+        assert elapsed < 0.6
+
+    def test_concurrency_cap(self, transcript):
+        llm = FakeLLM(delay=0.05)
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+        bot.extract_all(max_workers=2)
+        assert llm.peak <= 2
+
+    def test_cap_respects_rate_limiter(self, transcript):
+        llm = FakeLLM(delay=0.05)
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+        limiter = RateLimiter(max_calls=1, time_window=60)
+        limiter.wait_if_needed = MagicMock(return_value=True)
+
+        bot.extract_all(max_workers=4, rate_limiter=limiter)
+        assert llm.peak == 1
+
+    def test_each_call_consumes_rate_limit(self, transcript):
+        bot = Chatbot(llm_manager=FakeLLM(delay=0), transcript=transcript, language="en")
+        limiter = RateLimiter(max_calls=10, time_window=60)
+
+        bot.extract_all(rate_limiter=limiter, rate_limit_key="test")
+        assert limiter.get_remaining_calls("test") == 6
+
+    def test_partial_failure(self, transcript):
+        bot = Chatbot(llm_manager=FakeLLM(delay=0, fail_on='"decision"'), transcript=transcript, language="en")
+        summary, topics, actions, decisions = bot.extract_all()
+
+        assert summary == "Short summary."
+        assert topics and actions
+        assert decisions == []
+        assert set(bot.extraction_errors) == {"decisions"}
+
+    def test_all_failed_raises(self, transcript):
+        llm = MagicMock()
+        llm.generate.side_effect = RuntimeError("429 quota exceeded")
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        with pytest.raises(RuntimeError, match="quota"):
+            bot.extract_all()
+
+
+class ScriptedLLM:
+    """LLM stub returning queued responses and recording prompts."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate(self, prompt, system_message=""):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+FULL_ANALYSIS = {
+    "summary": "Budget approved.",
+    "topics": [{"topic": "Budget", "description": "Q4"}],
+    "action_items": [{"task": "Send report", "assignee": "An", "deadline": "Friday"}],
+    "decisions": [{"decision": "Approve", "context": "ROI"}],
+}
+
+
+class TestExtractCombined:
+
+    def test_single_call(self, transcript):
+        llm = ScriptedLLM([json.dumps(FULL_ANALYSIS)])
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        summary, topics, actions, decisions = bot.extract_combined()
+
+        assert len(llm.prompts) == 1
+        assert llm.prompts[0].count(transcript) == 1
+        assert summary == "Budget approved."
+        assert topics == FULL_ANALYSIS["topics"]
+        assert actions == FULL_ANALYSIS["action_items"]
+        assert decisions == FULL_ANALYSIS["decisions"]
+
+    def test_rerequests_only_missing_sections(self, transcript):
+        partial = {k: v for k, v in FULL_ANALYSIS.items() if k != "decisions"}
+        partial["topics"] = "not a list"
+        retry = {"topics": FULL_ANALYSIS["topics"], "decisions": FULL_ANALYSIS["decisions"]}
+        llm = ScriptedLLM(["Here you go: " + json.dumps(partial), json.dumps(retry)])
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        summary, topics, actions, decisions = bot.extract_combined()
+
+        assert len(llm.prompts) == 2
+        assert '"summary"' not in llm.prompts[1]
+        assert '"decisions"' in llm.prompts[1]
+        assert topics == FULL_ANALYSIS["topics"]
+        assert decisions == FULL_ANALYSIS["decisions"]
+        assert summary == "Budget approved."
+
+    def test_falls_back_to_section_extractor(self, transcript):
+        no_decisions = {k: v for k, v in FULL_ANALYSIS.items() if k != "decisions"}
+        llm = ScriptedLLM([
+            json.dumps(no_decisions),
+            "not json",
+            '[{"decision": "Approve", "context": "ROI"}]',
+        ])
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        _, _, _, decisions = bot.extract_combined(max_retries=1)
+
+        assert len(llm.prompts) == 3
+        assert decisions == FULL_ANALYSIS["decisions"]
+
+    def test_empty_lists_are_valid(self, transcript):
+        empty = dict(FULL_ANALYSIS, action_items=[], decisions=[])
+        llm = ScriptedLLM([json.dumps(empty)])
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+
+        _, _, actions, decisions = bot.extract_combined()
+
+        assert len(llm.prompts) == 1
+        assert actions == [] and decisions == []
+
+
+def long_transcript(turns=300):
+    return " ".join(
+        f"[{i // 60:02d}:{i % 60:02d}] **Speaker {i % 3}**: Line {i} about the roadmap and hiring plan."
+        for i in range(turns)
+    )
+
+
+class TestChunkText:
+
+    def test_short_text_is_single_chunk(self):
+        assert TranscriptPreprocessor.chunk_text("hello", max_length=100) == ["hello"]
+
+    def test_splits_on_speaker_boundaries(self):
+        chunks = TranscriptPreprocessor.chunk_text(long_transcript(), max_length=2000)
+
+        assert len(chunks) > 1
+        assert all(len(c) <= 2000 for c in chunks)
+        for chunk in chunks:
+            assert all(line.startswith("[") for line in chunk.split("\n"))
+
+    def test_overlap_repeats_last_turn(self):
+        chunks = TranscriptPreprocessor.chunk_text(long_transcript(), max_length=2000, overlap=1)
+        assert chunks[0].split("\n")[-1] == chunks[1].split("\n")[0]
+
+    def test_covers_whole_transcript(self):
+        text = long_transcript()
+        chunks = TranscriptPreprocessor.chunk_text(text, max_length=2000)
+        assert "Line 299 " in chunks[-1]
+        assert "Line 0 " in chunks[0]
+
+    def test_hard_split_without_boundaries(self):
+        chunks = TranscriptPreprocessor.chunk_text("x" * 5000, max_length=2000)
+        assert "".join(chunks) == "x" * 5000
+
+    def test_sanitized_upload_keeps_end_of_long_meeting(self):
+        # process_file sanitizes without a length cap before map-reduce
+        text = "\n".join(f"[{i:05d}] Speaker: Line {i} " + "x" * 200 for i in range(1000))
+        sanitized = sanitize_input(text, max_length=None)
+
+        assert len(sanitized) > 200000
+        assert "Line 999 " in TranscriptPreprocessor.chunk_text(sanitized, max_length=15000)[-1]
+
+
+class TestMergeExtractedItems:
+
+    def test_deduplicates_near_identical_keys(self):
+        merged = merge_extracted_items([
+            [{"task": "Send the report", "assignee": "Chưa phân công", "deadline": "Friday"}],
+            [{"task": "Send the report.", "assignee": "An", "deadline": "Friday"},
+             {"task": "Book a room", "assignee": "Binh", "deadline": "Monday"}],
+        ], key="task")
+
+        assert [m["task"] for m in merged] == ["Send the report", "Book a room"]
+        assert merged[0]["assignee"] == "An"
+
+    def test_skips_items_without_key(self):
+        assert merge_extracted_items([[{"topic": ""}, "bad", {"topic": "Budget"}]], key="topic") == [{"topic": "Budget"}]
+
+
+class TestExtractMapReduce:
+
+    def test_short_transcript_uses_single_pass(self, transcript):
+        llm = FakeLLM(delay=0)
+        bot = Chatbot(llm_manager=llm, transcript=transcript, language="en")
+        summary, topics, _, _ = bot.extract_map_reduce(chunk_size=15000)
+
+        assert summary == "Short summary."
+        assert topics[0]["topic"] == "Budget"
+
+    def test_long_transcript_is_not_truncated(self):
+        llm = FakeLLM(delay=0)
+        text = long_transcript()
+        bot = Chatbot(llm_manager=llm, transcript=text, language="en")
+
+        seen = []
+        original = llm.generate
+
+        def recording_generate(prompt, system_message=""):
+            seen.append(prompt)
+            return original(prompt, system_message)
+
+        llm.generate = recording_generate
+        summary, topics, actions, decisions = bot.extract_map_reduce(chunk_size=3000, max_workers=4)
+
+        n_chunks = len(TranscriptPreprocessor.chunk_text(text, max_length=3000))
+        assert n_chunks > 1
+        # 4 calls per chunk plus at least one reduce call for the summary
+        assert len(seen) >= 4 * n_chunks + 1
+        assert any("Line 299 " in p for p in seen)
+        # Identical items from every chunk collapse into one
+        assert len(topics) == 1 and len(actions) == 1 and len(decisions) == 1
+        assert summary == "Short summary."
+
+    def test_parallel_map(self):
+        llm = FakeLLM(delay=0.05)
+        bot = Chatbot(llm_manager=llm, transcript=long_transcript(), language="en")
+        bot.extract_map_reduce(chunk_size=3000, max_workers=4)
+        assert llm.peak == 4
+
+    def test_combined_map_uses_one_call_per_chunk(self):
+        text = long_transcript()
+        n_chunks = len(TranscriptPreprocessor.chunk_text(text, max_length=3000))
+        llm = MagicMock()
+        llm.generate.return_value = json.dumps(FULL_ANALYSIS)
+        bot = Chatbot(llm_manager=llm, transcript=text, language="en")
+
+        summary, topics, actions, decisions = bot.extract_map_reduce(chunk_size=3000, combined=True)
+
+        # One combined call per chunk plus the summary reduce
+        assert llm.generate.call_count == n_chunks + 1
+        assert topics == FULL_ANALYSIS["topics"]
+
+
+    def test_failure_in_one_chunk_is_reported(self):
+        text = long_transcript()
+        n_chunks = len(TranscriptPreprocessor.chunk_text(text, max_length=3000))
+        llm = FakeLLM(delay=0)
+        original = llm.generate
+
+        def flaky_generate(prompt, system_message=""):
+            if '"decision"' in prompt and "Line 299 " in prompt:
+                raise RuntimeError("429 rate limited")
+            return original(prompt, system_message)
+
+        llm.generate = flaky_generate
+        bot = Chatbot(llm_manager=llm, transcript=text, language="en")
+        _, _, _, decisions = bot.extract_map_reduce(chunk_size=3000)
+
+        assert decisions
+        assert set(bot.extraction_errors) == {"decisions"}
+        assert bot.extraction_errors["decisions"].startswith(f"1/{n_chunks} chunks failed")
+
+    def test_combined_map_keeps_chunk_errors(self):
+        text = long_transcript()
+        no_decisions = {k: v for k, v in FULL_ANALYSIS.items() if k != "decisions"}
+
+        def generate(prompt, system_message=""):
+            if "Line 299 " not in prompt:
+                return json.dumps(FULL_ANALYSIS)
+            if '"summary"' in prompt:
+                return json.dumps(no_decisions)
+            raise RuntimeError("429 rate limited")
+
+        llm = MagicMock()
+        llm.generate.side_effect = generate
+        bot = Chatbot(llm_manager=llm, transcript=text, language="en")
+        bot.extract_map_reduce(chunk_size=3000, combined=True)
+
+        assert set(bot.extraction_errors) == {"decisions"}
+        assert "chunks failed" in bot.extraction_errors["decisions"]
+
+
+
+class TestRateLimiterWait:
+
+    def test_zero_budget_fails_fast(self):
+        limiter = RateLimiter(max_calls=0, time_window=60)
+
+        start = time.perf_counter()
+        assert limiter.wait_if_needed(key="k", max_wait=5) is False
+        assert time.perf_counter() - start < 0.5
+
+    def test_wait_beyond_max_wait_fails(self):
+        limiter = RateLimiter(max_calls=1, time_window=60)
+        assert limiter.wait_if_needed(key="k", max_wait=1) is True
+        assert limiter.wait_if_needed(key="k", max_wait=1) is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
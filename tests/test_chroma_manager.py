@@ -0,0 +1,110 @@
+"""
+Tests for the shared ChromaManager behind /api/chat/ask (lazy init, health-checked rebuild, reset).
+
+Run: pytest tests/test_chroma_manager.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.rag import chroma_manager
+from backend.rag.chroma_manager import HEALTH_CHECK_INTERVAL, get_chroma_manager, reset_chroma_manager
+
+
+class FakeManager:
+    """Stands in for ChromaManager: no store, embeddings or LLM client."""
+
+    def __init__(self, chroma_index_path="data/chroma_db"):
+        self.chroma_index_path = chroma_index_path
+        self.healthy = True
+        self.checks = 0
+
+    def health_check(self):
+        self.checks += 1
+        if self.healthy:
+            return {"ok": True, "documents": 0, "latency_ms": 0.1}
+        return {"ok": False, "error": "store closed", "latency_ms": 0.1}
+
+
+@pytest.fixture
+def created(monkeypatch):
+    instances = []
+
+    def build(chroma_index_path="data/chroma_db"):
+        instances.append(FakeManager(chroma_index_path))
+        return instances[-1]
+
+    monkeypatch.setattr(chroma_manager, "ChromaManager", build)
+    reset_chroma_manager()
+    yield instances
+    reset_chroma_manager()
+
+
+def age_last_check(path="data/chroma_db", seconds=HEALTH_CHECK_INTERVAL + 1):
+    chroma_manager._last_health_check[path] -= seconds
+
+
+class TestGetChromaManager:
+
+    def test_created_lazily_and_shared(self, created):
+        assert created == []
+
+        first = get_chroma_manager()
+        second = get_chroma_manager()
+
+        assert first is second
+        assert len(created) == 1
+        assert get_chroma_manager("other/path") is not first
+        assert len(created) == 2
+
+    def test_no_health_check_within_interval(self, created):
+        manager = get_chroma_manager()
+        get_chroma_manager()
+        age_last_check(seconds=HEALTH_CHECK_INTERVAL - 5)
+        get_chroma_manager()
+
+        assert manager.checks == 0
+
+    def test_healthy_instance_is_kept_after_interval(self, created):
+        manager = get_chroma_manager()
+        age_last_check()
+
+        assert get_chroma_manager() is manager
+        assert manager.checks == 1
+        # The check time was refreshed: the next call does not probe again
+        get_chroma_manager()
+        assert manager.checks == 1
+
+    def test_failed_health_check_rebuilds(self, created):
+        broken = get_chroma_manager()
+        broken.healthy = False
+        age_last_check()
+
+        rebuilt = get_chroma_manager()
+
+        assert rebuilt is not broken
+        assert broken.checks == 1
+        assert len(created) == 2
+        assert get_chroma_manager() is rebuilt
+
+    def test_reset_one_path_or_all(self, created):
+        default = get_chroma_manager()
+        other = get_chroma_manager("other/path")
+
+        reset_chroma_manager("other/path")
+        assert get_chroma_manager() is default
+        assert get_chroma_manager("other/path") is not other
+
+        reset_chroma_manager()
+        assert get_chroma_manager() is not default
+        assert len(created) == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,168 @@
+"""
+Tests for the decode-once, memory-mapped audio buffer.
+
+Run: pytest tests/test_decoded_audio.py -v
+"""
+
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio.decoded_audio import SAMPLE_RATE, DecodedAudio
+from backend.audio.parallel_transcriber import find_cut_points
+
+
+def tone(seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+class TestDecodedAudio:
+
+    def test_samples_are_memory_mapped(self):
+        samples = tone(2)
+        with DecodedAudio.from_array(samples) as audio:
+            assert isinstance(audio.samples, np.memmap)
+            assert len(audio) == len(samples)
+            assert audio.duration == pytest.approx(2.0)
+            np.testing.assert_array_equal(np.asarray(audio), samples)
+
+    def test_writes_never_reach_the_shared_file(self):
+        with DecodedAudio.from_array(tone(1)) as audio:
+            audio.samples[:10] = 0.0
+            reopened = DecodedAudio(audio.cache_path)
+            assert reopened.samples[5] == pytest.approx(tone(1)[5])
+
+    def test_segment_shares_the_file(self):
+        samples = tone(3)
+        with DecodedAudio.from_array(samples) as audio:
+            part = audio.segment(SAMPLE_RATE, 2 * SAMPLE_RATE)
+            inner = part.segment(100, 200)
+
+            assert part.cache_path == audio.cache_path
+            np.testing.assert_array_equal(np.asarray(part), samples[SAMPLE_RATE:2 * SAMPLE_RATE])
+            np.testing.assert_array_equal(np.asarray(inner), samples[SAMPLE_RATE + 100:SAMPLE_RATE + 200])
+
+    def test_pickles_as_a_file_reference(self):
+        with DecodedAudio.from_array(tone(60)) as audio:
+            payload = pickle.dumps(audio.segment(0, 30 * SAMPLE_RATE))
+            restored = pickle.loads(payload)
+
+            assert len(payload) < 10_000  # 30 s of samples would be ~1.9 MB
+            np.testing.assert_array_equal(np.asarray(restored), np.asarray(audio)[:30 * SAMPLE_RATE])
+
+            # A restored reference never deletes the owner's file
+            restored.close()
+            assert os.path.exists(audio.cache_path)
+
+    def test_close_deletes_temp_file(self):
+        audio = DecodedAudio.from_array(tone(1))
+        path = audio.cache_path
+        audio.close()
+        assert not os.path.exists(path)
+
+    def test_blocks_cover_all_samples(self):
+        samples = tone(5)
+        with DecodedAudio.from_array(samples) as audio:
+            blocks = list(audio.blocks(block_seconds=2))
+            assert [len(b) for b in blocks] == [2 * SAMPLE_RATE, 2 * SAMPLE_RATE, SAMPLE_RATE]
+            np.testing.assert_array_equal(np.concatenate(blocks), samples)
+
+    def test_splitter_reads_the_mapping(self):
+        samples = tone(100)
+        samples[58 * SAMPLE_RATE:int(58.5 * SAMPLE_RATE)] = 0.0
+        with DecodedAudio.from_array(samples) as audio:
+            assert find_cut_points(np.asarray(audio), 60, 5) == find_cut_points(samples, 60, 5)
+
+
+class TestValidation:
+
+    @pytest.fixture
+    def validate(self):
+        from backend.audio.audio_validator import validate_audio_quality
+        return validate_audio_quality
+
+    def test_uses_shared_buffer(self, validate, tmp_path):
+        upload = tmp_path / "upload.wav"
+        upload.write_bytes(b"\0" * 1024)
+        with DecodedAudio.from_array(tone(3), source_sample_rate=44100) as audio:
+            is_valid, message = validate(str(upload), audio)
+
+        assert is_valid
+        assert "44100Hz" in message
+
+    def test_quiet_audio_fails(self, validate, tmp_path):
+        upload = tmp_path / "upload.wav"
+        upload.write_bytes(b"\0" * 1024)
+        with DecodedAudio.from_array(tone(3, amplitude=0.001)) as audio:
+            is_valid, _ = validate(str(upload), audio)
+
+        assert not is_valid
+
+
+def fake_ffmpeg(tmp_path, samples, source_rate=44100):
+    """Executable that prints an ffmpeg-like header and pipes the given samples."""
+    raw = tmp_path / "samples.f32"
+    raw.write_bytes(samples.astype("<f4").tobytes())
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"sys.stderr.write('Stream #0:0: Audio: pcm_s16le, {source_rate} Hz, mono\\n')\n"
+        f"with open({str(raw)!r}, 'rb') as f:\n"
+        "    for block in iter(lambda: f.read(65536), b''):\n"
+        "        sys.stdout.buffer.write(block)\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+class TestValidationDuringDecode:
+
+    @pytest.fixture
+    def upload(self, tmp_path):
+        path = tmp_path / "upload.mp3"
+        path.write_bytes(b"\0" * 1024)
+        return str(path)
+
+    def test_blocks_are_checked_as_they_are_decoded(self, tmp_path, upload):
+        from backend.audio.audio_validator import QualityCheck
+
+        samples = tone(20)
+        check = QualityCheck({"duration": 20.0}, SAMPLE_RATE)
+        with DecodedAudio.from_file(upload, fake_ffmpeg(tmp_path, samples), on_block=check.feed) as audio:
+            np.testing.assert_array_equal(np.asarray(audio), samples)
+            is_valid, message = check.result(upload, audio.source_sample_rate)
+
+        assert check.stats.count == len(samples)
+        assert is_valid and "20.0s" in message and "44100Hz" in message
+
+    def test_rejection_stops_the_decode(self, tmp_path, upload, monkeypatch):
+        from backend.audio import decoded_audio
+        from backend.audio.audio_validator import AudioRejected, QualityCheck
+
+        samples = tone(600)
+        samples[:SAMPLE_RATE * 60] = 1.0  # First minute fully clipped
+        check = QualityCheck({"duration": 600.0}, SAMPLE_RATE)
+        created = []
+        mkstemp = decoded_audio.tempfile.mkstemp
+        monkeypatch.setattr(decoded_audio.tempfile, "mkstemp",
+                            lambda **kw: created.append(mkstemp(**kw)) or created[-1])
+
+        with pytest.raises(AudioRejected, match="clipping"):
+            DecodedAudio.from_file(upload, fake_ffmpeg(tmp_path, samples), on_block=check.feed)
+
+        assert check.stats.count < len(samples) // 4
+        assert not os.path.exists(created[0][1])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,117 @@
+"""
+Tests for the persistent embedding cache.
+
+Run: pytest tests/test_embedding_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.embedding_cache import CachedEncoder, EmbeddingCache, embedding_cache_key
+
+
+class FakeModel:
+    """Deterministic 8-dim encoder that records what it was asked to encode."""
+
+    def __init__(self):
+        self.calls = []
+        self.max_seq_length = 256
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.calls.append(texts)
+        vectors = np.array([[len(t) + i for i in range(8)] for t in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "embeddings.db")
+
+
+class TestEmbeddingCache:
+
+    def test_key_normalizes_whitespace_and_separates_models(self):
+        assert embedding_cache_key("m", "hello  world\n") == embedding_cache_key("m", "hello world")
+        assert embedding_cache_key("m", "hello") != embedding_cache_key("other", "hello")
+
+    def test_roundtrip_persists_across_instances(self, db_path):
+        vector = np.arange(8, dtype=np.float32)
+        EmbeddingCache(db_path).put_many("m", ["text"], [vector])
+
+        cache = EmbeddingCache(db_path)
+        found, missing = cache.get_many("m", ["text", "unknown"])
+        assert np.allclose(found, vector)
+        assert found.dtype == np.float32
+        assert missing is None
+        stats = cache.get_stats()
+        assert stats["disk_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == 8 * 2  # float16
+
+    def test_evicts_least_recently_used_by_bytes(self, db_path):
+        # float32, 8 dims = 32 bytes per entry; eviction frees down to 90% of the budget
+        cache = EmbeddingCache(db_path, max_bytes=100, memory_items=0, dtype="float32")
+        vector = np.ones(8, dtype=np.float32)
+        for text in ("a", "b", "c"):
+            cache.put_many("m", [text], [vector])
+        cache.get_many("m", ["a"])
+        cache.put_many("m", ["d"], [vector])
+
+        assert cache.get_stats()["bytes"] == 64
+        a, b, c, d = cache.get_many("m", ["a", "b", "c", "d"])
+        assert b is None and c is None
+        assert a is not None and d is not None
+
+
+class TestCachedEncoder:
+
+    def test_only_missing_texts_are_encoded(self, db_path):
+        model = FakeModel()
+        encoder = CachedEncoder(model, "fake", EmbeddingCache(db_path))
+
+        first = encoder.encode(["a", "bb", "a"], normalize_embeddings=True)
+        second = encoder.encode(["bb", "ccc"], normalize_embeddings=True)
+
+        assert model.calls == [["a", "bb"], ["ccc"]]
+        assert first.shape == (3, 8)
+        assert np.allclose(first[1], second[0], atol=1e-3)
+
+    def test_normalize_flag_is_part_of_key(self, db_path):
+        model = FakeModel()
+        encoder = CachedEncoder(model, "fake", EmbeddingCache(db_path))
+
+        encoder.encode(["a"], normalize_embeddings=True)
+        encoder.encode(["a"], normalize_embeddings=False)
+
+        assert len(model.calls) == 2
+
+    def test_single_string_and_attribute_passthrough(self, db_path):
+        model = FakeModel()
+        encoder = CachedEncoder(model, "fake", EmbeddingCache(db_path))
+
+        assert encoder.encode("hello").shape == (8,)
+        assert encoder.max_seq_length == 256
+
+    def test_unknown_options_bypass_cache(self, db_path):
+        model = FakeModel()
+        cache = EmbeddingCache(db_path)
+        encoder = CachedEncoder(model, "fake", cache)
+
+        encoder.encode(["a"], output_value="token_embeddings")
+
+        assert cache.get_stats()["entries"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+"""
+Tests for the live-audio binary frame buffer (sequence numbers, bounds, acks).
+
+Run: pytest tests/test_frame_buffer.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio.frame_buffer import ACCEPTED, DUPLICATE, REJECTED, AudioFrameBuffer
+
+
+class TestAudioFrameBuffer:
+
+    def test_frames_drain_in_order(self):
+        buffer = AudioFrameBuffer()
+        for seq, data in enumerate([b"ab", b"cd", b"ef"]):
+            assert buffer.push(seq, data) == ACCEPTED
+
+        assert buffer.drain() == (b"abcdef", 2)
+        assert buffer.drain() == (b"", None)
+        assert buffer.ack()['processed'] == 2
+
+    def test_duplicates_are_ignored(self):
+        buffer = AudioFrameBuffer()
+        buffer.push(0, b"ab")
+
+        assert buffer.push(0, b"ab") == DUPLICATE
+        assert buffer.drain() == (b"ab", 0)
+
+    def test_gap_asks_for_resend_from_expected(self):
+        buffer = AudioFrameBuffer()
+        buffer.push(0, b"ab")
+
+        status = buffer.push(2, b"ef")
+
+        assert status == REJECTED
+        assert buffer.ack(status) == {
+            'seq': 0, 'processed': -1, 'rejected': 1, 'paused': False, 'buffered_bytes': 2
+        }
+
+    def test_full_buffer_rejects_and_pauses(self):
+        buffer = AudioFrameBuffer(max_bytes=10, high_water=0.5)
+        assert buffer.push(0, b"x" * 6) == ACCEPTED
+        assert buffer.ack()['paused'] is True
+
+        status = buffer.push(1, b"y" * 6)
+        ack = buffer.ack(status)
+
+        assert status == REJECTED
+        assert (ack['seq'], ack['rejected']) == (0, 1)
+
+        # Once drained the client resumes and resends frame 1
+        buffer.drain()
+        assert buffer.ack()['paused'] is False
+        assert buffer.push(1, b"y" * 6) == ACCEPTED
+
+    def test_non_binary_frames_are_rejected(self):
+        buffer = AudioFrameBuffer()
+        assert buffer.push(0, "YWJj") == REJECTED  # base64 text is not accepted
+        assert buffer.push("0", b"abc") == REJECTED
+        assert buffer.stats['rejected'] == 2
+
+    def test_memory_stays_bounded(self):
+        buffer = AudioFrameBuffer(max_bytes=1000)
+        seq = 0
+        for _ in range(100):
+            if buffer.push(seq, b"z" * 300) == ACCEPTED:
+                seq += 1
+            if buffer.depth == 3:
+                buffer.drain()
+            assert buffer.nbytes <= 1000
+        assert buffer.stats['peak_bytes'] <= 1000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
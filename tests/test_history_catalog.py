@@ -0,0 +1,287 @@
+"""
+Tests for the SQLite history catalog and its consistency with HistoryManager.
+
+Run: pytest tests/test_history_catalog.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.data.history_catalog import HistoryCatalog, catalog_entry, fts_query, get_history_catalog
+from backend.data.history_manager import HistoryManager
+
+
+def write_history(history_dir, history_id, original_file, timestamp, meeting_type="meeting", summary="S"):
+    data = {
+        "id": history_id,
+        "timestamp": timestamp,
+        "original_file": original_file,
+        "summary": summary,
+        "metadata": {"meeting_type": meeting_type, "language": "vi"}
+    }
+    (Path(history_dir) / f"{history_id}.json").write_text(json.dumps(data), encoding="utf-8")
+    return data
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = HistoryCatalog(str(tmp_path / "catalog.db"))
+    yield catalog
+    catalog.close()
+
+
+class TestHistoryCatalog:
+
+    def test_list_filters_and_sorts(self, catalog):
+        catalog.upsert(catalog_entry({"id": "a", "timestamp": "2025-01-02", "original_file": "beta.mp3",
+                                      "metadata": {"meeting_type": "meeting"}}))
+        catalog.upsert(catalog_entry({"id": "b", "timestamp": "2025-01-03", "original_file": "Alpha.mp3",
+                                      "metadata": {"meeting_type": "interview"}}))
+        catalog.upsert(catalog_entry({"id": "c", "timestamp": "2025-01-01", "original_file": "gamma.mp3",
+                                      "metadata": {"meeting_type": "meeting"}}))
+
+        assert [r["id"] for r in catalog.list(sort_by="newest")] == ["b", "a", "c"]
+        assert [r["id"] for r in catalog.list(sort_by="oldest")] == ["c", "a", "b"]
+        assert [r["id"] for r in catalog.list(sort_by="name")] == ["b", "a", "c"]
+        assert [r["id"] for r in catalog.list(meeting_type="meeting")] == ["a", "c"]
+        assert [r["id"] for r in catalog.list(limit=1, offset=1)] == ["a"]
+
+    def test_find_by_filename_prefers_latest_exact_stem(self, catalog):
+        catalog.upsert(catalog_entry({"id": "old", "timestamp": "2025-01-01", "original_file": "standup.mp3"}))
+        catalog.upsert(catalog_entry({"id": "new", "timestamp": "2025-02-01", "original_file": "standup.wav"}))
+        catalog.upsert(catalog_entry({"id": "copy", "timestamp": "2025-03-01", "original_file": "standup_copy.mp3"}))
+
+        assert catalog.find_by_filename("STANDUP.m4a")["id"] == "new"
+        # No exact stem: substring match, like the old glob
+        assert catalog.find_by_filename("copy")["id"] == "copy"
+        assert catalog.find_by_filename("100%_done") is None
+
+    def test_rebuild_matches_disk(self, tmp_path, catalog):
+        write_history(tmp_path, "one", "one.mp3", "2025-01-01")
+        write_history(tmp_path, "two", "two.mp3", "2025-01-02")
+        (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+        catalog.upsert(catalog_entry({"id": "gone", "timestamp": "2024", "original_file": "gone.mp3"}))
+
+        assert catalog.rebuild(str(tmp_path)) == 2
+        assert {r["id"] for r in catalog.list()} == {"one", "two"}
+
+    def test_content_hash_tracks_file_bytes(self, tmp_path, catalog):
+        write_history(tmp_path, "one", "one.mp3", "2025-01-01")
+        catalog.rebuild(str(tmp_path))
+        before = catalog.get("one")["content_hash"]
+
+        write_history(tmp_path, "one", "one.mp3", "2025-01-01", summary="changed")
+        catalog.rebuild(str(tmp_path))
+
+        assert catalog.get("one")["content_hash"] != before
+        assert catalog.find_by_content_hash(catalog.get("one")["content_hash"])[0]["id"] == "one"
+
+    def test_find_by_source_hash_returns_latest(self, catalog):
+        catalog.upsert(catalog_entry({"id": "old", "timestamp": "2025-01-01", "original_file": "a.mp3",
+                                      "metadata": {"source_hash": "f" * 64}}))
+        catalog.upsert(catalog_entry({"id": "new", "timestamp": "2025-02-01", "original_file": "renamed.mp3",
+                                      "metadata": {"source_hash": "f" * 64}}))
+        catalog.upsert(catalog_entry({"id": "plain", "timestamp": "2025-03-01", "original_file": "a.mp3"}))
+
+        assert catalog.find_by_source_hash("f" * 64)["id"] == "new"
+        assert catalog.find_by_source_hash("0" * 64) is None
+        assert catalog.find_by_source_hash("") is None
+
+    def test_index_changes_diff_manifest_against_catalog(self, catalog):
+        for history_id in ("kept", "edited", "rechunked", "new"):
+            catalog.upsert(catalog_entry({"id": history_id, "timestamp": "2025-01-01", "original_file": f"{history_id}.txt"}))
+        fingerprint = {h: catalog.get(h)["content_hash"] for h in ("kept", "edited", "rechunked")}
+        catalog.record_indexed("c", [
+            {"meeting_id": "kept", "fingerprint": fingerprint["kept"], "content_hash": "k", "chunking": "v2", "chunks": 3},
+            {"meeting_id": "edited", "fingerprint": "stale", "content_hash": "e", "chunking": "v2", "chunks": 2},
+            {"meeting_id": "rechunked", "fingerprint": fingerprint["rechunked"], "content_hash": "r", "chunking": "v1", "chunks": 1},
+            {"meeting_id": "gone", "fingerprint": "x", "content_hash": "g", "chunking": "v2", "chunks": 4},
+        ])
+
+        changed, deleted = catalog.index_changes("c", "v2")
+
+        assert sorted((row["meeting_id"], row["content_hash"]) for row in changed) == [
+            ("edited", "e"), ("new", ""), ("rechunked", "r")
+        ]
+        assert {row["meeting_id"]: row["fingerprint"] for row in changed}["new"] == catalog.get("new")["content_hash"]
+        assert [row["meeting_id"] for row in deleted] == ["gone"]
+        assert catalog.indexed_chunk_count("c") == 10
+        # Manifests are per collection
+        assert len(catalog.index_changes("other", "v2")[0]) == 4
+        assert len(catalog.index_changes("c", "v2", force=True)[0]) == 4
+
+        catalog.forget_indexed("c", ["gone"])
+        assert catalog.index_changes("c", "v2")[1] == []
+        catalog.forget_indexed("c")
+        assert catalog.indexed_chunk_count("c") == 0
+
+    def test_catalog_without_source_hash_is_migrated(self, tmp_path):
+        import sqlite3
+        conn = sqlite3.connect(str(tmp_path / "catalog.db"))
+        conn.execute(
+            """CREATE TABLE history (id TEXT PRIMARY KEY, timestamp TEXT NOT NULL, original_file TEXT NOT NULL,
+               file_stem TEXT NOT NULL, meeting_type TEXT NOT NULL, language TEXT NOT NULL,
+               summary_preview TEXT NOT NULL, content_hash TEXT NOT NULL)"""
+        )
+        conn.execute("INSERT INTO history VALUES ('x', '2025', 'x.mp3', 'x', 'meeting', 'vi', '', 'h')")
+        conn.commit()
+        conn.close()
+
+        catalog = HistoryCatalog(str(tmp_path / "catalog.db"))
+
+        assert catalog.get("x")["source_hash"] == ""
+        catalog.close()
+
+    def test_existing_history_is_cataloged_on_first_use(self, tmp_path):
+        write_history(tmp_path, "legacy", "legacy.mp3", "2025-01-01", summary="x" * 500)
+
+        catalog = get_history_catalog(str(tmp_path))
+
+        assert catalog.count() == 1
+        assert len(catalog.get("legacy")["summary_preview"]) == 200
+
+
+class TestKeywordSearch:
+
+    @pytest.fixture
+    def indexed(self, catalog):
+        catalog.upsert(catalog_entry({
+            "id": "m1", "timestamp": "2025-01-01", "original_file": "sprint.mp3",
+            "summary": "Quyết định chuyển sang PostgreSQL",
+            "action_items": [{"task": "Fix JIRA-142", "assignee": "Minh"}],
+            "metadata": {"meeting_type": "meeting", "language": "vi"}
+        }))
+        catalog.upsert(catalog_entry({
+            "id": "m2", "timestamp": "2025-01-02", "original_file": "review.mp3",
+            "summary": "Code review", "topics": ["PostgreSQL indexes"],
+            "transcript": "Minh: we keep <script> tags escaped",
+            "metadata": {"meeting_type": "workshop", "language": "en"}
+        }))
+        return catalog
+
+    def test_ids_and_names_match_exactly(self, indexed):
+        found = indexed.keyword_search("JIRA-142")
+        assert [r["id"] for r in found["results"]] == ["m1"]
+        assert "<mark>JIRA-142</mark>" in found["results"][0]["snippet"]
+        assert found["results"][0]["score"] >= 0
+
+        assert {r["id"] for r in indexed.keyword_search("minh")["results"]} == {"m1", "m2"}
+        assert [r["id"] for r in indexed.keyword_search("minh postgresql")["results"]] == ["m1", "m2"]
+
+    def test_diacritics_prefix_and_filters(self, indexed):
+        assert [r["id"] for r in indexed.keyword_search("quyet")["results"]] == ["m1"]
+        assert [r["id"] for r in indexed.keyword_search("postgre*", meeting_type="workshop")["results"]] == ["m2"]
+        assert indexed.keyword_search("postgresql", language="en")["total"] == 1
+
+    def test_summary_match_outranks_transcript_match(self, indexed):
+        indexed.upsert(catalog_entry({"id": "m3", "timestamp": "2025-01-03", "original_file": "x.mp3",
+                                      "summary": "Budget", "transcript": "a b c d e f budget"}))
+        indexed.upsert(catalog_entry({"id": "m4", "timestamp": "2025-01-04", "original_file": "y.mp3",
+                                      "summary": "Other", "transcript": "a b c d e f budget"}))
+        assert [r["id"] for r in indexed.keyword_search("budget")["results"]] == ["m3", "m4"]
+
+    def test_pagination_and_total(self, indexed):
+        first = indexed.keyword_search("minh", limit=1)
+        second = indexed.keyword_search("minh", limit=1, offset=1)
+        assert first["total"] == second["total"] == 2
+        assert first["results"][0]["id"] != second["results"][0]["id"]
+
+    def test_snippets_are_escaped(self, indexed):
+        snippet = indexed.keyword_search("tags")["results"][0]["snippet"]
+        assert "&lt;script&gt;" in snippet and "<mark>tags</mark>" in snippet
+
+    def test_hostile_queries_do_not_raise(self, indexed):
+        for query in ['"', "AND", "NEAR(", "-", "***", "a:b", ""]:
+            assert isinstance(indexed.keyword_search(query)["results"], list)
+        assert fts_query('say "hi" v2.0*') == '"say" """hi""" "v2.0"*'
+
+    def test_delete_and_update_keep_index_in_sync(self, indexed):
+        indexed.delete("m1")
+        assert indexed.keyword_search("JIRA-142")["total"] == 0
+
+        indexed.upsert(catalog_entry({"id": "m2", "timestamp": "2025-01-02", "original_file": "review.mp3",
+                                      "summary": "Renamed to MySQL"}))
+        assert indexed.keyword_search("postgresql")["total"] == 0
+        assert indexed.keyword_search("mysql")["results"][0]["id"] == "m2"
+
+
+class TestHistoryManagerCatalog:
+
+    def test_save_list_delete_stay_consistent(self, tmp_path):
+        manager = HistoryManager(str(tmp_path))
+        history_id = manager.save_analysis(
+            filename="Weekly Sync.mp3", summary="Team sync", topics=[], action_items=[], decisions=[],
+            metadata={"meeting_type": "meeting", "language": "en"}
+        )
+
+        items = manager.list_history()
+        assert [item["id"] for item in items] == [history_id]
+        assert items[0]["summary_preview"] == "Team sync..."
+        assert items[0]["language"] == "en"
+        assert manager.find_by_filename("weekly sync.wav")["id"] == history_id
+
+        assert manager.delete_analysis(history_id) is True
+        assert manager.list_history() == []
+        assert manager.find_by_filename("Weekly Sync.mp3") is None
+
+    def test_source_hash_from_metadata_is_searchable(self, tmp_path):
+        manager = HistoryManager(str(tmp_path))
+        history_id = manager.save_analysis(
+            filename="tmpab12.txt", summary="S", topics=[], action_items=[], decisions=[],
+            metadata={"source_hash": "a" * 64}
+        )
+
+        assert manager.find_by_source_hash("a" * 64)["id"] == history_id
+
+    def test_previous_upload_by_content_then_name(self, tmp_path):
+        manager = HistoryManager(str(tmp_path))
+        hashed = manager.save_analysis(
+            filename="weekly.mp3", summary="S", topics=[], action_items=[], decisions=[],
+            metadata={"source_hash": "a" * 64}
+        )
+        write_history(tmp_path, "legacy", "standup.mp3", "2025-01-01")
+        manager.rebuild_catalog()
+
+        # Renamed re-upload: found by content
+        assert manager.find_previous_upload("a" * 64, ["renamed.mp3"])["id"] == hashed
+        # History saved before hashes were recorded: found by name
+        assert manager.find_previous_upload("b" * 64, ["standup.mp3"])["id"] == "legacy"
+        assert manager.find_previous_upload("", ["standup.mp3"])["id"] == "legacy"
+        # Same name, different content
+        assert manager.find_previous_upload("b" * 64, ["weekly.mp3"]) is None
+        assert manager.find_previous_upload("", ["Weekly.mp3"])["id"] == hashed
+        assert manager.find_previous_upload("", []) is None
+
+    def test_saved_analysis_is_keyword_searchable(self, tmp_path):
+        manager = HistoryManager(str(tmp_path))
+        history_id = manager.save_analysis(
+            filename="standup.mp3", summary="Daily standup", topics=[{"topic": "Release", "description": "v2.1"}],
+            action_items=[], decisions=[], transcript="Lan sẽ kiểm tra TICKET-9 trước thứ sáu"
+        )
+
+        found = manager.keyword_search("ticket-9")
+        assert [r["id"] for r in found["results"]] == [history_id]
+        assert manager.keyword_search("v2.1")["total"] == 1
+
+        manager.delete_analysis(history_id)
+        assert manager.keyword_search("ticket-9")["total"] == 0
+
+    def test_clear_and_rebuild(self, tmp_path):
+        manager = HistoryManager(str(tmp_path))
+        manager.save_analysis(filename="a.txt", summary="A", topics=[], action_items=[], decisions=[])
+        write_history(tmp_path, "external", "external.mp3", "2025-01-01")
+
+        assert manager.rebuild_catalog() == 2
+        assert manager.clear_all_history() == 2
+        assert manager.list_history() == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
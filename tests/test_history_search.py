@@ -22,7 +22,9 @@ if project_root not in sys.path:
 
 # Try importing backend classes strictly
 try:
+    from backend.data.history_catalog import catalog_entry, get_history_catalog
     from backend.data.history_searcher import HistorySearcher
+    from backend.rag.retrieval_service import reset_retrieval_service
 except ImportError as e:
     print(f"!!! CRITICAL IMPORT ERROR: {e}")
     # Retrying with debug prints
@@ -102,12 +104,63 @@ def sample_meetings():
     ]
     return meetings
 
+class FakeCollection:
+    """Minimal in-memory stand-in for a Chroma collection."""
+
+    def __init__(self):
+        self.documents, self.metadatas, self.embeddings = {}, {}, {}
+        self.reads = 0
+
+    @staticmethod
+    def _matches(value, condition):
+        if isinstance(condition, dict) and "$in" in condition:
+            return value in condition["$in"]
+        return value == condition
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        self.reads += 1
+        keys = list(self.documents) if ids is None else [i for i in ids if i in self.documents]
+        if where:
+            keys = [k for k in keys if all(self._matches(self.metadatas[k].get(f), v) for f, v in where.items())]
+        keys = keys[offset:offset + limit] if limit else keys
+        return {'ids': keys, 'metadatas': [self.metadatas[k] for k in keys]}
+
+    def count(self):
+        return len(self.documents)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for i, e, d, m in zip(ids, embeddings, documents, metadatas):
+            self.embeddings[i], self.documents[i], self.metadatas[i] = e, d, m
+
+    def update(self, ids, metadatas):
+        for i, m in zip(ids, metadatas):
+            self.metadatas[i] = m
+
+    def delete(self, ids):
+        for i in ids:
+            self.documents.pop(i, None)
+            self.metadatas.pop(i, None)
+            self.embeddings.pop(i, None)
+
+def save_meeting(history_dir, meeting):
+    """Write a history file and catalog it, as HistoryManager.save_analysis does."""
+    content = json.dumps(meeting).encode("utf-8")
+    (Path(history_dir) / f"{meeting['id']}.json").write_bytes(content)
+    get_history_catalog(str(history_dir)).upsert(catalog_entry(meeting, content))
+
+def delete_meeting(history_dir, meeting_id):
+    """Remove a history file and its catalog row, as HistoryManager.delete_analysis does."""
+    (Path(history_dir) / f"{meeting_id}.json").unlink()
+    get_history_catalog(str(history_dir)).delete(meeting_id)
+
 @pytest.fixture
 def reset_singleton():
-    """Reset HistorySearcher singleton."""
+    """Reset HistorySearcher singleton and the shared retrieval store."""
     HistorySearcher._instance = None
+    reset_retrieval_service()
     yield
     HistorySearcher._instance = None
+    reset_retrieval_service()
 
 class TestHistorySearcher:
     """Test HistorySearcher functionality."""
@@ -139,7 +192,7 @@ class TestHistorySearcher:
         
         searcher = HistorySearcher(history_dir=history_dir)
         searcher.model = MagicMock()
-        searcher.model.encode.return_value.tolist.return_value = [0.1, 0.2, 0.3]
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1, 0.2, 0.3] for _ in docs])
         
         meeting = sample_meetings[0]
         success = searcher.index_single_meeting(meeting['id'], meeting)
@@ -148,8 +201,10 @@ class TestHistorySearcher:
         mock_collection.upsert.assert_called_once()
         
         call_args = mock_collection.upsert.call_args[1]
-        assert call_args['ids'] == [meeting['id']]
+        assert call_args['ids'] == [f"{meeting['id']}::{section}:0" for section in ("summary", "topics", "actions", "decisions")]
         assert len(call_args['embeddings'][0]) == 3
+        assert call_args['metadatas'][1]['meeting_id'] == meeting['id']
+        assert call_args['metadatas'][1]['section'] == "topics"
 
     @patch("chromadb.PersistentClient")
     def test_index_all_meetings(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
@@ -177,6 +232,231 @@ class TestHistorySearcher:
         assert count == 3
         assert mock_collection.upsert.called
 
+    @patch("chromadb.PersistentClient")
+    def test_index_all_meetings_batches_encode(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
+        """Test that documents are embedded in batches, not one by one."""
+        history_dir_path, _ = temp_dirs
+        history_dir = Path(history_dir_path)
+        
+        for i in range(5):
+            m = dict(sample_meetings[i % 3], id=f"meeting_{i}")
+            with open(history_dir / f"{m['id']}.json", 'w') as f:
+                json.dump(m, f)
+        
+        mock_collection = MagicMock()
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir_path)
+        searcher.model = MagicMock()
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1] * 3 for _ in docs])
+        mock_collection.get.return_value = {'ids': [], 'metadatas': []}
+        
+        # 4 chunks (summary, topics, actions, decisions) per meeting
+        count = searcher.index_all_meetings(force_reindex=True, batch_size=8, parse_workers=2)
+        
+        assert count == 5
+        assert searcher.model.encode.call_count == 3
+        batch_sizes = [len(c.args[0]) for c in searcher.model.encode.call_args_list]
+        assert batch_sizes == [8, 8, 4]
+        assert searcher.model.encode.call_args.kwargs['normalize_embeddings'] is True
+        assert mock_collection.upsert.call_count == 3
+        assert searcher.last_index_stats['indexed'] == 5
+        assert searcher.last_index_stats['chunks'] == 20
+        assert searcher.last_index_stats['docs_per_sec'] > 0
+
+    @patch("chromadb.PersistentClient")
+    def test_incremental_reindex(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
+        """Test that only new/changed meetings are embedded and deleted ones are purged."""
+        history_dir_path, _ = temp_dirs
+        history_dir = Path(history_dir_path)
+        
+        for m in sample_meetings:
+            with open(history_dir / f"{m['id']}.json", 'w') as f:
+                json.dump(m, f)
+        
+        collection = FakeCollection()
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir_path)
+        searcher.model = MagicMock()
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1] * 3 for _ in docs])
+        
+        assert searcher.index_all_meetings() == 3
+        
+        # No-op run: one manifest query, no Chroma reads, nothing parsed or embedded
+        encode_calls = searcher.model.encode.call_count
+        reads = collection.reads
+        assert searcher.index_all_meetings() == 0
+        assert searcher.last_index_stats['parsed'] == 0
+        assert searcher.last_index_stats['full_scan'] is False
+        assert collection.reads == reads
+        assert searcher.model.encode.call_count == encode_calls
+        
+        # Changed summary is re-embedded
+        changed = dict(sample_meetings[0], summary="Budget was cut by 10% instead.")
+        save_meeting(history_dir, changed)
+        assert searcher.index_all_meetings() == 1
+        assert searcher.last_index_stats['parsed'] == 1
+        assert "cut by 10%" in collection.documents[f"{changed['id']}::summary:0"]
+        
+        # Re-saved with the same content: parsed, metadata refreshed, not re-embedded
+        save_meeting(history_dir, dict(changed, timestamp="2025-12-01T10:00:00", extra="x"))
+        encode_calls = searcher.model.encode.call_count
+        assert searcher.index_all_meetings() == 0
+        assert searcher.model.encode.call_count == encode_calls
+        
+        # Sections the meeting no longer has are dropped
+        trimmed = dict(changed, decisions=[])
+        save_meeting(history_dir, trimmed)
+        assert searcher.index_all_meetings() == 1
+        assert f"{changed['id']}::decisions:0" not in collection.documents
+        
+        # Deleted file is purged (all of its chunks)
+        delete_meeting(history_dir, sample_meetings[1]['id'])
+        assert searcher.index_all_meetings() == 0
+        assert searcher.last_index_stats['purged'] == 1
+        assert not any(m['meeting_id'] == sample_meetings[1]['id'] for m in collection.metadatas.values())
+        assert searcher.index_all_meetings() == 0
+        assert searcher.last_index_stats['full_scan'] is False
+
+    @patch("chromadb.PersistentClient")
+    def test_collection_out_of_sync_with_manifest_is_rescanned(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
+        """Test that a reset collection (or stray chunks) falls back to a full scan."""
+        history_dir_path, _ = temp_dirs
+        for m in sample_meetings:
+            save_meeting(history_dir_path, m)
+        
+        collection = FakeCollection()
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir_path)
+        searcher.model = MagicMock()
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1] * 3 for _ in docs])
+        assert searcher.index_all_meetings() == 3
+        
+        # Chunks of a meeting the catalog does not know are purged
+        collection.upsert(["orphan::summary:0"], [[0.0]], ["x"], [{"meeting_id": "orphan", "section": "summary"}])
+        assert searcher.index_all_meetings() == 0
+        assert searcher.last_index_stats['full_scan'] is True
+        assert "orphan::summary:0" not in collection.documents
+        
+        # Emptied collection is rebuilt
+        collection.delete(list(collection.documents))
+        assert searcher.index_all_meetings() == 3
+        assert searcher.index_all_meetings() == 0
+        assert searcher.last_index_stats['full_scan'] is False
+
+    @patch("chromadb.PersistentClient")
+    def test_half_written_meeting_is_reembedded(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
+        """Test that chunks disagreeing on the content hash are not trusted (whichever comes first)."""
+        history_dir_path, _ = temp_dirs
+        meeting = sample_meetings[0]
+        save_meeting(history_dir_path, meeting)
+        
+        collection = FakeCollection()
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir_path)
+        searcher.model = MagicMock()
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1] * 3 for _ in docs])
+        assert searcher.index_all_meetings() == 1
+        
+        # An interrupted upsert left one stale chunk; no manifest to fall back on
+        collection.metadatas[f"{meeting['id']}::decisions:0"]['content_hash'] = "stale"
+        searcher.catalog.forget_indexed(searcher.collection_name)
+        
+        assert searcher.index_all_meetings() == 1
+        assert {m['content_hash'] for m in collection.metadatas.values()} != {"stale"}
+        assert len({m['content_hash'] for m in collection.metadatas.values()}) == 1
+
+    @patch("chromadb.PersistentClient")
+    def test_transcript_is_windowed(self, mock_client_cls, temp_dirs, reset_singleton):
+        """Test that long transcripts become overlapping windows instead of being truncated."""
+        history_dir, _ = temp_dirs
+        mock_client_cls.return_value = MagicMock()
+        searcher = HistorySearcher(history_dir=history_dir)
+        
+        words = [f"w{i}" for i in range(200)]
+        chunks = searcher._create_chunks({"summary": "Short", "transcript": " ".join(words)})
+        
+        assert chunks[0] == ("summary", 0, "Summary: Short")
+        windows = [text.split() for section, _, text in chunks if section == "transcript"]
+        assert [len(w) for w in windows] == [80, 80, 72]
+        assert windows[1][0] == "w64"  # 16 words of overlap
+        assert windows[-1][-1] == "w199"
+
+    @patch("chromadb.PersistentClient")
+    def test_legacy_meeting_vectors_are_replaced(self, mock_client_cls, temp_dirs, sample_meetings, reset_singleton):
+        """Test that whole-meeting vectors from older indexes are replaced by chunks."""
+        history_dir_path, _ = temp_dirs
+        meeting = sample_meetings[0]
+        with open(Path(history_dir_path) / f"{meeting['id']}.json", 'w') as f:
+            json.dump(meeting, f)
+        
+        collection = FakeCollection()
+        collection.upsert([meeting['id']], [[0.0]], ["whole meeting"],
+                          [{"meeting_id": meeting['id'], "source_file": f"{meeting['id']}.json", "content_hash": "old"}])
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir_path)
+        searcher.model = MagicMock()
+        searcher.model.encode.side_effect = lambda docs, **kwargs: MagicMock(tolist=lambda: [[0.1] * 3 for _ in docs])
+        
+        assert searcher.index_all_meetings() == 1
+        assert meeting['id'] not in collection.documents
+        assert {m['section'] for m in collection.metadatas.values()} == {"summary", "topics", "actions", "decisions"}
+
+    @patch("chromadb.PersistentClient")
+    def test_chunk_hits_aggregate_per_meeting(self, mock_client_cls, temp_dirs, reset_singleton):
+        """Test that chunk hits are grouped by meeting with max or sum scoring."""
+        history_dir, _ = temp_dirs
+        
+        mock_collection = MagicMock()
+        mock_collection.query.return_value = {
+            'ids': [['a::summary:0', 'b::transcript:3', 'b::decisions:0', 'b::actions:0']],
+            'distances': [[0.1, 0.2, 0.5, 0.6]],
+            'documents': [['A summary', 'B window', 'B decisions', 'B actions']],
+            'metadatas': [[
+                {'meeting_id': 'a', 'section': 'summary', 'chunk_index': 0},
+                {'meeting_id': 'b', 'section': 'transcript', 'chunk_index': 3},
+                {'meeting_id': 'b', 'section': 'decisions', 'chunk_index': 0},
+                {'meeting_id': 'b', 'section': 'actions', 'chunk_index': 0}
+            ]]
+        }
+        mock_client = MagicMock()
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_client_cls.return_value = mock_client
+        
+        searcher = HistorySearcher(history_dir=history_dir)
+        searcher.model = MagicMock()
+        searcher.model.encode.return_value.tolist.return_value = [0.1]*384
+        
+        by_max = searcher.semantic_search("query", top_k=2)
+        assert [r['id'] for r in by_max] == ['a', 'b']
+        assert by_max[1]['score'] == pytest.approx(0.8)
+        assert by_max[1]['matched_text'] == 'B window'
+        assert [(c['section'], c['chunk_index']) for c in by_max[1]['chunks']] == [
+            ('transcript', 3), ('decisions', 0), ('actions', 0)
+        ]
+        assert mock_collection.query.call_args[1]['n_results'] == 10
+        
+        by_sum = searcher.semantic_search("query", top_k=2, aggregate="sum")
+        assert [r['id'] for r in by_sum] == ['b', 'a']
+        assert by_sum[0]['score'] == pytest.approx(0.8 + 0.5 + 0.4)
+        
+        with pytest.raises(ValueError):
+            searcher.semantic_search("query", aggregate="mean")
+
     @patch("chromadb.PersistentClient")
     def test_semantic_search_logic(self, mock_client_cls, temp_dirs, reset_singleton):
         """Test semantic search query construction and result parsing."""
@@ -0,0 +1,137 @@
+"""
+Tests for hybrid (BM25 + dense) retrieval with reciprocal rank fusion.
+
+Run: pytest tests/test_hybrid_retriever.py -v
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.data.history_catalog import HistoryCatalog
+from backend.rag.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+
+MEETINGS = [
+    {"id": "budget", "timestamp": "2025-01-01", "original_file": "budget.mp3",
+     "summary": "Q4 budget planning", "action_items": [{"task": "Send forecast", "assignee": "Nguyen Van An"}]},
+    {"id": "hiring", "timestamp": "2025-01-02", "original_file": "hiring.mp3",
+     "summary": "Hiring plan for backend engineers", "decisions": [{"decision": "Open 3 roles"}]},
+    {"id": "outage", "timestamp": "2025-01-03", "original_file": "outage.mp3",
+     "summary": "Post-mortem of incident INC-4521 in the payment gateway"},
+]
+
+
+class FakeSearcher:
+    """Dense search stand-in returning a fixed ranking (chunk-style duplicates allowed)."""
+
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.threads = []
+
+    def semantic_search(self, query, top_k=5, filters=None):
+        self.threads.append(threading.current_thread().name)
+        return [
+            {"id": f"{meeting_id}#{i}", "score": 0.9 - i / 10, "matched_text": f"dense text of {meeting_id}",
+             "metadata": {"meeting_id": meeting_id}}
+            for i, meeting_id in enumerate(self.ranking[:top_k])
+        ]
+
+    def _create_search_document(self, meeting_data):
+        return f"Summary: {meeting_data['summary']}"
+
+
+@pytest.fixture
+def history(tmp_path):
+    for meeting in MEETINGS:
+        (tmp_path / f"{meeting['id']}.json").write_text(json.dumps(meeting), encoding="utf-8")
+    catalog = HistoryCatalog(str(tmp_path / "catalog.db"))
+    catalog.rebuild(str(tmp_path))
+    yield tmp_path, catalog
+    catalog.close()
+
+
+class TestReciprocalRankFusion:
+
+    def test_items_found_by_both_lists_win(self):
+        fused = reciprocal_rank_fusion({"dense": ["a", "b", "c"], "lexical": ["c", "d"]}, rrf_k=60)
+
+        assert fused[0]["id"] == "c"
+        assert fused[0]["ranks"] == {"dense": 3, "lexical": 1}
+        assert fused[0]["score"] == pytest.approx(1 / 63 + 1 / 61)
+
+    def test_duplicates_keep_best_rank_and_weights_apply(self):
+        fused = reciprocal_rank_fusion({"dense": ["a", "a", "b"]}, rrf_k=0, weights={"dense": 2.0})
+
+        assert [(e["id"], e["ranks"]["dense"]) for e in fused] == [("a", 1), ("b", 2)]
+        assert fused[1]["score"] == pytest.approx(1.0)
+
+
+class TestHybridRetriever:
+
+    def test_exact_ids_are_found_even_when_dense_misses(self, history):
+        history_dir, catalog = history
+        retriever = HybridRetriever(FakeSearcher(["budget", "hiring"]), catalog, str(history_dir))
+
+        results = retriever.retrieve("incident handling", top_k=3, lexical_query="what happened with INC-4521")
+
+        outage = next(r for r in results if r["id"] == "outage")
+        assert outage["ranks"] == {"lexical": 1}
+        assert outage["matched_text"] == "Summary: Post-mortem of incident INC-4521 in the payment gateway"
+        assert retriever.last_stats["lexical_candidates"] == 1
+        retriever.close()
+
+    def test_results_are_unique_per_meeting(self, history):
+        history_dir, catalog = history
+        searcher = FakeSearcher(["budget", "budget", "hiring", "budget"])
+        retriever = HybridRetriever(searcher, catalog, str(history_dir))
+
+        results = retriever.retrieve("budget forecast", top_k=5)
+
+        ids = [r["id"] for r in results]
+        assert ids[0] == "budget" and len(ids) == len(set(ids))
+        assert results[0]["ranks"] == {"dense": 1, "lexical": 1}
+        assert results[0]["matched_text"] == "dense text of budget"
+        retriever.close()
+
+    def test_dense_search_runs_off_the_calling_thread(self, history):
+        history_dir, catalog = history
+        searcher = FakeSearcher(["hiring"])
+        retriever = HybridRetriever(searcher, catalog, str(history_dir))
+
+        retriever.retrieve("hiring", top_k=1)
+
+        assert searcher.threads and searcher.threads[0] != threading.current_thread().name
+        retriever.close()
+
+    def test_failing_retriever_degrades_to_the_other(self, history):
+        history_dir, catalog = history
+
+        class Broken(FakeSearcher):
+            def semantic_search(self, *args, **kwargs):
+                raise RuntimeError("chroma down")
+
+        retriever = HybridRetriever(Broken([]), catalog, str(history_dir))
+        assert [r["id"] for r in retriever.retrieve("Nguyen Van An", top_k=2)] == ["budget"]
+        retriever.close()
+
+    def test_candidate_pool_bounds_each_retriever(self, history):
+        history_dir, catalog = history
+        retriever = HybridRetriever(FakeSearcher(["budget", "hiring", "outage"]), catalog, str(history_dir),
+                                    candidate_pool=1)
+
+        retriever.retrieve("plan", top_k=1)
+
+        assert retriever.last_stats["dense_candidates"] == 1
+        assert retriever.last_stats["lexical_candidates"] <= 1
+        retriever.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,197 @@
+"""
+Tests for the SQLite-backed background job queue.
+
+Run: pytest tests/test_job_queue.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.job_queue import JobQueue, DONE, FAILED, QUEUED, RUNNING
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+class TestJobQueue:
+
+    def test_runs_job_and_records_progress(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1)
+
+        def handler(params, report):
+            report("transcribing", 10, {"transcript": "hello"})
+            report("analyzing", 50, {"summary": "short"})
+            return {"echo": params["x"]}
+
+        jobs.register("echo", handler)
+        job_id = jobs.submit("echo", {"x": 42})
+        job = wait_for(jobs, job_id)
+
+        assert job["status"] == DONE
+        assert job["progress"] == 100
+        assert job["result"] == {"echo": 42}
+        assert job["partial"] == {"transcript": "hello", "summary": "short"}
+
+    def test_failure_is_reported(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1)
+
+        def handler(params, report):
+            raise RuntimeError("❌ Transcription failed")
+
+        jobs.register("boom", handler)
+        job = wait_for(jobs, jobs.submit("boom", {}))
+
+        assert job["status"] == FAILED
+        assert "Transcription failed" in job["error"]
+
+    def test_unknown_kind_rejected(self, db_path):
+        with pytest.raises(ValueError):
+            JobQueue(db_path).submit("missing", {})
+
+    def test_worker_pool_is_bounded(self, db_path):
+        jobs = JobQueue(db_path, max_workers=2)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def handler(params, report):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+
+        jobs.register("slow", handler)
+        ids = [jobs.submit("slow", {}) for _ in range(5)]
+        for job_id in ids:
+            wait_for(jobs, job_id)
+
+        assert state["peak"] == 2
+
+    def test_subscribers_receive_updates(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1)
+        gate = threading.Event()
+
+        def handler(params, report):
+            gate.wait(2)
+            report("analyzing", 50)
+            return {}
+
+        jobs.register("gated", handler)
+        job_id = jobs.submit("gated", {})
+        updates = jobs.subscribe(job_id)
+        gate.set()
+        wait_for(jobs, job_id)
+
+        stages = []
+        while not updates.empty():
+            stages.append(updates.get()["stage"])
+        assert "analyzing" in stages
+        assert stages[-1] == DONE
+
+    def test_resume_after_restart(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1)
+        jobs.register("noop", lambda params, report: {"ok": True})
+        # Simulate jobs left behind by a crashed process
+        now = time.time()
+        with jobs.conn:
+            jobs.conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, attempts, created_at, updated_at) VALUES "
+                "('queued1', 'noop', ?, '{}', 0, ?, ?), "
+                "('running1', 'noop', ?, '{}', 1, ?, ?), "
+                "('exhausted', 'noop', ?, '{}', 2, ?, ?)",
+                (QUEUED, now, now, RUNNING, now, now, RUNNING, now, now)
+            )
+
+        restarted = JobQueue(db_path, max_workers=1, max_attempts=2)
+        restarted.register("noop", lambda params, report: {"ok": True})
+        assert restarted.resume_pending() == 2
+
+        assert wait_for(restarted, "queued1")["status"] == DONE
+        assert wait_for(restarted, "running1")["status"] == DONE
+        exhausted = restarted.get("exhausted")
+        assert exhausted["status"] == FAILED
+        assert "restart" in exhausted["error"]
+
+
+    def test_each_job_runs_in_one_process_only(self, db_path):
+        runs = []
+        first = JobQueue(db_path, max_workers=1)
+        second = JobQueue(db_path, max_workers=1)
+        for jobs in (first, second):
+            jobs.register("count", lambda params, report: runs.append(1) or {})
+        now = time.time()
+        with first.conn:
+            first.conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, attempts, created_at, updated_at) "
+                "VALUES ('shared', 'count', ?, '{}', 0, ?, ?)",
+                (QUEUED, now, now)
+            )
+
+        # Every worker process calls resume_pending on startup
+        first.resume_pending()
+        second.resume_pending()
+        assert wait_for(first, "shared")["status"] == DONE
+        first.shutdown()
+        second.shutdown()
+
+        assert len(runs) == 1
+
+    def test_jobs_of_live_processes_are_not_resumed(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1)
+        jobs.register("noop", lambda params, report: {})
+        now = time.time()
+        with jobs.conn:
+            jobs.conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, attempts, owner, created_at, updated_at) "
+                "VALUES ('busy', 'noop', ?, '{}', 1, ?, ?, ?)",
+                (RUNNING, jobs.owner, now, now)
+            )
+
+        assert jobs.resume_pending() == 0
+        assert jobs.get("busy")["status"] == RUNNING
+
+    def test_progress_updates_are_throttled(self, db_path):
+        jobs = JobQueue(db_path, max_workers=1, progress_interval=60)
+
+        def handler(params, report):
+            for i in range(100):
+                report("transcribing", 10, {"transcript": "word " * i})
+            report("analyzing", 40)
+            return {}
+
+        jobs.register("chatty", handler)
+        job_id = jobs.submit("chatty", {})
+        updates = jobs.subscribe(job_id)
+        job = wait_for(jobs, job_id)
+
+        stages = []
+        while not updates.empty():
+            stages.append(updates.get()["stage"])
+        assert stages.count("transcribing") <= 1
+        # Throttled partials are still persisted with the next stage
+        assert job["partial"]["transcript"] == "word " * 99
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,133 @@
+"""
+Tests for the process-wide model registry.
+
+Run: pytest tests/test_model_registry.py -v
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.model_registry import ModelRegistry
+
+
+class CountingLoader:
+
+    def __init__(self, delay=0.0):
+        self.loads = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self.lock:
+            self.loads += 1
+            return object()
+
+
+class TestModelRegistry:
+
+    def test_loads_once_under_concurrency(self):
+        registry = ModelRegistry()
+        loader = CountingLoader(delay=0.05)
+        registry.register("whisper", loader)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("whisper"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert loader.loads == 1
+        assert len({id(model) for model in results}) == 1
+
+    def test_register_is_idempotent(self):
+        registry = ModelRegistry()
+        first, second = CountingLoader(), CountingLoader()
+
+        assert registry.register("m", first) is True
+        assert registry.register("m", second) is False
+        registry.get("m")
+
+        assert (first.loads, second.loads) == (1, 0)
+
+    def test_unknown_model_raises(self):
+        with pytest.raises(KeyError):
+            ModelRegistry().get("missing")
+
+    def test_idle_models_are_unloaded_but_not_while_in_use(self):
+        registry = ModelRegistry(idle_timeout=10)
+        loader = CountingLoader()
+        registry.register("in_use", loader)
+        registry.register("idle", loader)
+
+        registry.get("idle")
+        with registry.use("in_use"):
+            assert registry.unload_idle(now=time.time() + 60) == 1
+            assert registry.is_loaded("in_use")
+            assert not registry.is_loaded("idle")
+
+        assert registry.unload_idle(now=time.time() + 60) == 1
+        assert not registry.is_loaded("in_use")
+
+    def test_per_model_idle_timeout_can_disable_unload(self):
+        registry = ModelRegistry(idle_timeout=10)
+        registry.register("pinned", CountingLoader(), idle_timeout=0)
+        registry.get("pinned")
+
+        assert registry.unload_idle(now=time.time() + 3600) == 0
+
+    def test_memory_budget_evicts_least_recently_used_idle_model(self):
+        registry = ModelRegistry(max_resident_mb=1000)
+        for name in ("a", "b", "c"):
+            registry.register(name, CountingLoader(), size_mb=400)
+
+        registry.get("a")
+        time.sleep(0.01)
+        registry.get("b")
+        time.sleep(0.01)
+        registry.get("a")  # b is now least recently used
+        registry.get("c")
+
+        assert registry.is_loaded("a") and registry.is_loaded("c")
+        assert not registry.is_loaded("b")
+        assert registry.get_stats()["resident_mb"] == 800
+
+    def test_warm_up_loads_registered_models(self):
+        registry = ModelRegistry()
+        loader = CountingLoader()
+        registry.register("whisper", loader)
+
+        registry.warm_up(["whisper", "unknown"], background=False)
+
+        assert registry.is_loaded("whisper")
+        assert registry.get_stats()["models"]["whisper"]["loads"] == 1
+
+    def test_process_registry_needs_no_llm_settings(self):
+        # Search and retrieval create the registry; they must work without an LLM key
+        env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+        env["MODEL_IDLE_TIMEOUT"] = "60"
+        code = (
+            "import sys; from backend.utils.model_registry import get_model_registry; "
+            "r = get_model_registry(); print(r.idle_timeout, 'backend.config' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=project_root, env=env, capture_output=True, text=True, timeout=60
+        )
+
+        assert out.returncode == 0, out.stderr
+        assert out.stdout.splitlines()[-1].split() == ["60.0", "False"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Tests for incremental (online) speaker diarization.
+
+Run: pytest tests/test_online_diarization.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio.online_diarization import SAMPLE_RATE, OnlineDiarizer
+
+
+# Audio value encodes the speaker; the fake embedder maps it to a voice vector
+VOICES = {
+    1: np.array([1.0, 0.0, 0.0]),
+    2: np.array([0.0, 1.0, 0.0]),
+    3: np.array([0.9, 0.0, 0.44]),  # Close to voice 1
+}
+
+
+class FakeEmbedder:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, audio):
+        self.calls += 1
+        return VOICES[int(round(audio[0]))]
+
+
+def add(diarizer, speakers, start=0.0, seconds=2.0):
+    """Append one region per speaker and return the labels."""
+    regions = []
+    t = start
+    for speaker in speakers:
+        diarizer.add_audio(np.full(int(seconds * SAMPLE_RATE), speaker, dtype=np.float32))
+        regions.append({'start': t, 'end': t + seconds})
+        t += seconds
+    return [r['speaker'] for r in diarizer.add_regions(regions)], t
+
+
+class TestOnlineDiarizer:
+
+    def test_assigns_regions_to_running_speakers(self):
+        diarizer = OnlineDiarizer(FakeEmbedder(), recluster_every=1000)
+
+        labels, _ = add(diarizer, [1, 2, 1, 2])
+
+        assert labels == ["SPEAKER_00", "SPEAKER_01", "SPEAKER_00", "SPEAKER_01"]
+
+    def test_only_new_regions_are_embedded(self):
+        embedder = FakeEmbedder()
+        diarizer = OnlineDiarizer(embedder, recluster_every=1000)
+
+        _, t = add(diarizer, [1, 2])
+        add(diarizer, [1], start=t)
+
+        assert embedder.calls == 3
+        assert len(diarizer.segments()) == 3
+
+    def test_short_regions_inherit_previous_speaker(self):
+        embedder = FakeEmbedder()
+        diarizer = OnlineDiarizer(embedder, min_region_seconds=0.5, recluster_every=1000)
+
+        _, t = add(diarizer, [2])
+        labels, _ = add(diarizer, [1], start=t, seconds=0.2)
+
+        assert labels == ["SPEAKER_00"]
+        assert embedder.calls == 1
+
+    def test_recluster_merges_same_voice_and_keeps_labels_stable(self):
+        diarizer = OnlineDiarizer(FakeEmbedder(), threshold=0.95, merge_threshold=0.85, recluster_every=1000)
+
+        labels, _ = add(diarizer, [1, 1, 2, 3])
+        assert labels == ["SPEAKER_00", "SPEAKER_00", "SPEAKER_01", "SPEAKER_02"]
+
+        diarizer.recluster()
+
+        assert [s['speaker'] for s in diarizer.segments()] == ["SPEAKER_00", "SPEAKER_00", "SPEAKER_01", "SPEAKER_00"]
+        assert diarizer.version == 1
+
+    def test_recluster_runs_in_background(self):
+        diarizer = OnlineDiarizer(FakeEmbedder(), threshold=0.95, merge_threshold=0.85, recluster_every=4)
+
+        add(diarizer, [1, 1, 2, 3])
+        diarizer.recluster_thread.join(timeout=5)
+
+        assert diarizer.version == 1
+        assert diarizer.segments()[-1]['speaker'] == "SPEAKER_00"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
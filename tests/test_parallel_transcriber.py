@@ -0,0 +1,188 @@
+"""
+Tests for silence-based splitting and stitching of parallel transcription.
+
+Run: pytest tests/test_parallel_transcriber.py -v
+"""
+
+import random
+import subprocess
+import sys
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio import parallel_transcriber
+from backend.audio.parallel_transcriber import (
+    SAMPLE_RATE, ParallelTranscriber, find_cut_points, plan_segments, plan_workers, stitch_segments
+)
+
+
+def speech_with_pauses(seconds, pauses):
+    """Noise everywhere except silent 0.5 s gaps starting at ``pauses`` (seconds)."""
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, seconds * SAMPLE_RATE).astype(np.float32)
+    for pause in pauses:
+        audio[int(pause * SAMPLE_RATE):int((pause + 0.5) * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def fake_words(audio, offset_seconds):
+    """One 1-second "word" per second; the text is the absolute second."""
+    return [
+        {'start': float(i), 'end': float(i + 1), 'text': f"w{int(round(offset_seconds)) + i}"}
+        for i in range(int(len(audio) / SAMPLE_RATE))
+    ]
+
+
+class TestSplitting:
+
+    def test_cuts_land_in_silence_near_target(self):
+        audio = speech_with_pauses(100, pauses=[27, 58, 83])
+
+        cuts = find_cut_points(audio, segment_seconds=30, search_seconds=5)
+
+        assert cuts[0] == 0 and cuts[-1] == len(audio)
+        for cut, pause in zip(cuts[1:-1], [27, 58]):
+            assert pause <= cut / SAMPLE_RATE <= pause + 0.5
+
+    def test_short_audio_is_not_split(self):
+        audio = speech_with_pauses(40, pauses=[])
+        assert find_cut_points(audio, segment_seconds=30) == [0, len(audio)]
+
+    def test_plan_pads_with_overlap(self):
+        plan = plan_segments(100 * SAMPLE_RATE, [0, 50 * SAMPLE_RATE, 100 * SAMPLE_RATE], overlap_seconds=1.0)
+
+        assert plan[0] == {'core_start': 0, 'core_end': 50 * SAMPLE_RATE, 'start': 0, 'end': 51 * SAMPLE_RATE}
+        assert plan[1]['start'] == 49 * SAMPLE_RATE
+        assert plan[1]['end'] == 100 * SAMPLE_RATE
+
+
+class TestStitching:
+
+    def test_overlap_is_not_duplicated(self):
+        total = 10 * SAMPLE_RATE
+        plan = plan_segments(total, [0, 5 * SAMPLE_RATE, total], overlap_seconds=2.0)
+        results = [
+            fake_words(np.zeros(span['end'] - span['start']), span['start'] / SAMPLE_RATE)
+            for span in plan
+        ]
+
+        merged = stitch_segments(results, plan)
+
+        assert [seg['text'] for seg in merged] == [f"w{i}" for i in range(10)]
+        assert [seg['start'] for seg in merged] == [float(i) for i in range(10)]
+
+
+class TestParallelTranscriber:
+
+    @pytest.fixture
+    def transcriber(self, monkeypatch):
+        def fake_segment(audio, language):
+            # Every sample holds its absolute second; report one "word" per second
+            time.sleep(random.uniform(0, 0.01))  # Finish out of order
+            seconds, first = np.unique(audio, return_index=True)
+            last = len(audio) - np.unique(audio[::-1], return_index=True)[1]
+            return [
+                {'start': start / SAMPLE_RATE, 'end': end / SAMPLE_RATE, 'text': f"w{int(second)}"}
+                for second, start, end in zip(seconds, first, last)
+            ]
+
+        monkeypatch.setattr(parallel_transcriber, "_transcribe_segment", fake_segment)
+        transcriber = ParallelTranscriber.__new__(ParallelTranscriber)
+        transcriber.workers = 4
+        transcriber.pool = ThreadPoolExecutor(max_workers=4)
+        yield transcriber
+        transcriber.pool.shutdown()
+
+    def test_results_are_deterministic_and_ordered(self, transcriber):
+        audio = np.repeat(np.arange(300, dtype=np.float32), SAMPLE_RATE)
+
+        first = transcriber.transcribe(audio, segment_seconds=60, overlap_seconds=1.0)
+        second = transcriber.transcribe(audio, segment_seconds=60, overlap_seconds=1.0)
+
+        assert first == second
+        assert [seg['text'] for seg in first] == [f"w{i}" for i in range(300)]
+
+    def test_progress_reports_every_segment(self, transcriber):
+        audio = np.repeat(np.arange(200, dtype=np.float32), SAMPLE_RATE)
+        calls = []
+
+        transcriber.transcribe(audio, segment_seconds=50, on_progress=lambda done, total, text: calls.append((done, total)))
+
+        assert [done for done, _ in calls] == list(range(1, len(calls) + 1))
+        assert len(calls) > 1 and all(total == len(calls) for _, total in calls)
+
+
+    def test_worker_pool_uses_spawn(self, monkeypatch):
+        created = {}
+
+        class RecordingPool:
+            def __init__(self, **kwargs):
+                created.update(kwargs)
+
+        monkeypatch.setattr(parallel_transcriber, "ProcessPoolExecutor", RecordingPool)
+        ParallelTranscriber(workers=2)
+
+        assert created['mp_context'].get_start_method() == "spawn"
+        assert created['initargs'][0] == "large-v3"
+
+    def test_worker_count_fits_memory_budget(self):
+        # 16 cores but 5 GB: three large-v3 workers, not sixteen
+        assert plan_workers(0, "large-v3", memory_mb=5000, cores=16) == (3, 5)
+        assert plan_workers(8, "large-v3", memory_mb=5000, cores=16) == (3, 5)
+        assert plan_workers(0, "small", memory_mb=64000, cores=16) == (8, 2)
+        assert plan_workers(2, "small", memory_mb=64000, cores=16) == (2, 8)
+        # Never below one worker, even when the model does not fit
+        assert plan_workers(0, "large-v3", memory_mb=1000, cores=4) == (1, 4)
+
+    def test_workers_spawned_from_run_py_do_not_build_the_app(self, tmp_path):
+        # Stand-in model that reports which app modules its worker process has loaded
+        (tmp_path / "faster_whisper.py").write_text(textwrap.dedent("""
+            import sys
+            from types import SimpleNamespace
+
+            class WhisperModel:
+                def __init__(self, *args, **kwargs):
+                    pass
+
+                def transcribe(self, audio, **kwargs):
+                    loaded = [m for m in sys.modules if m == "app" or m.startswith("app.")]
+                    main = sys.modules["__mp_main__"].__file__
+                    text = f"{main} {','.join(sorted(loaded)) or 'no-app'}"
+                    return [SimpleNamespace(start=0.0, end=1.0, text=text)], None
+        """))
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path[:0] = [{project_root!r}, {str(tmp_path)!r}]
+            # What `python run.py` looks like to multiprocessing
+            sys.modules["__main__"].__file__ = {str(Path(project_root) / "run.py")!r}
+
+            import numpy as np
+            from backend.audio.parallel_transcriber import ParallelTranscriber
+
+            transcriber = ParallelTranscriber(workers=1, model_size="tiny")
+            try:
+                segments = transcriber.transcribe(np.zeros(16000 * 5, dtype=np.float32))
+            finally:
+                transcriber.pool.shutdown()
+            print(segments[0]["text"])
+        """)
+
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=120)
+
+        assert out.returncode == 0, out.stderr
+        main, loaded = out.stdout.splitlines()[-1].split()
+        assert main.endswith("run.py")
+        assert loaded == "no-app"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
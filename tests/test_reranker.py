@@ -0,0 +1,181 @@
+"""
+Tests for cross-encoder reranking (batching, score cache, latency budget).
+
+Run: pytest tests/test_reranker.py -v
+"""
+
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.rag.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the text contains."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(len(pairs))
+        time.sleep(self.delay)
+        return [sum(word in text.lower() for word in query.lower().split()) for query, text in pairs]
+
+
+def candidates():
+    """Retrieval output, bi-encoder order."""
+    return [
+        {"id": "a", "score": 0.9, "matched_text": "Budget overview",
+         "chunks": [{"id": "a::summary:0", "section": "summary", "text": "Budget overview"}]},
+        {"id": "b", "score": 0.8, "matched_text": "Hiring plan",
+         "chunks": [{"id": "b::summary:0", "section": "summary", "text": "Hiring plan"},
+                    {"id": "b::decisions:0", "section": "decisions", "text": "Decided the Q4 budget cut for hiring"}]},
+        {"id": "c", "score": 0.7, "matched_text": "Summary: lunch menu"}
+    ]
+
+
+def make_reranker(model, **kwargs):
+    # Unique model name: score caches are shared per model
+    return CrossEncoderReranker(model_name=f"fake-{uuid.uuid4().hex}", model=model, **kwargs)
+
+
+class TestCrossEncoderReranker:
+
+    def test_reorders_meetings_and_their_chunks(self):
+        reranker = make_reranker(FakeCrossEncoder())
+
+        results = reranker.rerank("q4 budget cut", candidates(), top_k=2)
+
+        assert [r["id"] for r in results] == ["b", "a"]
+        assert results[0]["rerank_score"] == 3
+        assert results[0]["chunks"][0]["section"] == "decisions"
+        assert results[0]["matched_text"] == "Decided the Q4 budget cut for hiring"
+        assert results[0]["score"] == 0.8
+        assert reranker.last_stats["fallback"] is None
+        reranker.close()
+
+    def test_pairs_are_batched_and_cached(self):
+        model = FakeCrossEncoder()
+        reranker = make_reranker(model, batch_size=2)
+
+        reranker.rerank("budget", candidates(), top_k=3)
+        assert model.calls == [2, 2]
+        assert reranker.last_stats["scored"] == 4
+
+        again = reranker.rerank("budget", candidates(), top_k=3)
+        assert model.calls == [2, 2]
+        assert reranker.last_stats["cached"] == 4
+        assert again[0]["id"] in ("a", "b")
+        reranker.close()
+
+    def test_budget_overrun_keeps_retrieval_order(self):
+        model = FakeCrossEncoder(delay=0.2)
+        reranker = make_reranker(model, budget_ms=20, batch_size=2)
+
+        start = time.perf_counter()
+        results = reranker.rerank("q4 budget cut", candidates(), top_k=2)
+
+        assert time.perf_counter() - start < 0.15
+        assert [r["id"] for r in results] == ["a", "b"]
+        assert "rerank_score" not in results[0]
+        assert reranker.last_stats["fallback"] == "budget"
+
+        # The batch in flight finishes in the background; the next batch is not started
+        time.sleep(0.3)
+        assert model.calls == [2]
+        reranker.close()
+
+    def test_query_after_budget_overrun_is_not_queued(self):
+        class SlowForLongQueries(FakeCrossEncoder):
+            def predict(self, pairs, batch_size=32):
+                time.sleep(0.4 if len(pairs[0][0]) > 20 else 0.0)
+                return super().predict(pairs, batch_size)
+
+        reranker = make_reranker(SlowForLongQueries(), budget_ms=150, batch_size=8)
+
+        reranker.rerank("a rather long and slow q4 budget question", candidates(), top_k=2)
+        assert reranker.last_stats["fallback"] == "budget"
+
+        # The first batch is still running; the next query gets the spare worker
+        results = reranker.rerank("q4 budget cut", candidates(), top_k=2)
+        assert reranker.last_stats["fallback"] is None
+        assert [r["id"] for r in results] == ["b", "a"]
+        reranker.close()
+
+    def test_all_workers_busy_falls_back_without_waiting(self):
+        reranker = make_reranker(FakeCrossEncoder(delay=0.5), budget_ms=50, batch_size=8)
+
+        reranker.rerank("first", candidates(), top_k=2)
+        reranker.rerank("second", candidates(), top_k=2)
+        assert reranker.last_stats["fallback"] == "budget"
+
+        start = time.perf_counter()
+        reranker.rerank("third", candidates(), top_k=2)
+
+        assert reranker.last_stats["fallback"] == "busy"
+        assert time.perf_counter() - start < 0.04
+        time.sleep(0.6)
+        reranker.rerank("third", candidates(), top_k=2)
+        assert reranker.last_stats["fallback"] == "budget"
+        reranker.close()
+
+    def test_failing_model_keeps_retrieval_order(self):
+        class Broken(FakeCrossEncoder):
+            def predict(self, pairs, batch_size=32):
+                raise RuntimeError("onnx error")
+
+        reranker = make_reranker(Broken())
+
+        assert [r["id"] for r in reranker.rerank("budget", candidates(), top_k=3)] == ["a", "b", "c"]
+        assert reranker.last_stats["fallback"] == "error"
+        reranker.close()
+
+    def test_scoring_runs_off_the_calling_thread(self):
+        threads = []
+
+        class Recording(FakeCrossEncoder):
+            def predict(self, pairs, batch_size=32):
+                threads.append(threading.current_thread().name)
+                return super().predict(pairs, batch_size)
+
+        reranker = make_reranker(Recording())
+        reranker.rerank("budget", candidates(), top_k=1)
+
+        assert threads and threads[0] != threading.current_thread().name
+        reranker.close()
+
+    def test_registry_model_is_held_while_scoring(self):
+        refs = []
+        reranker = make_reranker(FakeCrossEncoder())
+        registry = reranker.registry
+
+        class Recording(FakeCrossEncoder):
+            def predict(self, pairs, batch_size=32):
+                refs.append(registry.get_stats()["models"][reranker.model_key]["refs"])
+                return super().predict(pairs, batch_size)
+
+        # Served by the shared registry instead of a preloaded model
+        reranker.model = None
+        registry.register(reranker.model_key, Recording)
+        registry.get(reranker.model_key)
+
+        reranker.rerank("budget", candidates(), top_k=1)
+
+        assert refs == [1]
+        assert registry.get_stats()["models"][reranker.model_key]["refs"] == 0
+        registry.unload(reranker.model_key)
+        reranker.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
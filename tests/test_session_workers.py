@@ -0,0 +1,119 @@
+"""
+Tests for the per-session live worker pool (ordering, coalescing, metrics).
+
+Run: pytest tests/test_session_workers.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.utils.session_workers import SessionWorkerPool
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def pool():
+    pool = SessionWorkerPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestSessionWorkerPool:
+
+    def test_queued_work_is_coalesced(self, pool):
+        started, release = threading.Event(), threading.Event()
+        ran = []
+
+        def slow():
+            started.set()
+            release.wait(2)
+            ran.append("first")
+
+        pool.submit("s1", slow)
+        started.wait(2)
+        assert pool.submit("s1", lambda: ran.append("second")) is True
+        assert pool.submit("s1", lambda: ran.append("third")) is False
+        assert pool.submit("s1", lambda: ran.append("fourth")) is False
+
+        stats = pool.get_stats()
+        assert stats['queue_depth'] == 1 and stats['running'] == 1
+        release.set()
+
+        wait_until(lambda: pool.get_stats()['completed'] == 2)
+        assert ran == ["first", "fourth"]
+        assert pool.get_stats()['coalesced'] == 2
+
+    def test_slow_session_does_not_block_others(self, pool):
+        release = threading.Event()
+        done = threading.Event()
+
+        pool.submit("slow", lambda: release.wait(2))
+        pool.submit("fast", done.set)
+
+        assert done.wait(1)
+        release.set()
+
+    def test_session_tasks_never_overlap(self, pool):
+        active, overlaps, runs = [0], [], []
+        lock = threading.Lock()
+
+        def task():
+            with lock:
+                active[0] += 1
+                overlaps.append(active[0] > 1)
+            time.sleep(0.005)
+            with lock:
+                active[0] -= 1
+            runs.append(1)
+
+        for _ in range(30):
+            pool.submit("s1", task)
+            time.sleep(0.001)
+        wait_until(lambda: not pool.get_stats()['per_session']['s1']['running'])
+
+        assert runs and not any(overlaps)
+
+    def test_close_runs_last_and_forgets_session(self, pool):
+        started, release = threading.Event(), threading.Event()
+        order = []
+
+        pool.submit("s1", lambda: (started.set(), release.wait(2), order.append("work")))
+        started.wait(2)
+        pool.submit("s1", lambda: order.append("coalesced into close"))
+        pool.close("s1", lambda: order.append("close"))
+        pool.submit("s1", lambda: order.append("ignored"))
+        release.set()
+
+        wait_until(lambda: pool.get_stats()['sessions'] == 0)
+        assert order == ["work", "close"]
+
+    def test_lag_and_failures_are_reported(self, pool):
+        started, release = threading.Event(), threading.Event()
+        pool.submit("s1", lambda: (started.set(), release.wait(2)))
+        started.wait(2)
+        pool.submit("s1", lambda: 1 / 0)
+        time.sleep(0.05)
+
+        assert pool.get_stats()['per_session']['s1']['lag_seconds'] >= 0.05
+        release.set()
+
+        wait_until(lambda: pool.get_stats()['failed'] == 1)
+        assert pool.get_stats()['per_session']['s1']['failed'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
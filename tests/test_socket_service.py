@@ -0,0 +1,85 @@
+"""
+Tests for live transcript updates sent over Socket.IO (incremental payloads).
+
+Run: pytest tests/test_socket_service.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.services import socket_service
+from backend.config import Settings
+
+
+def new_session():
+    return {'sid': 'test', 'chunks': 0, 'stream': None, 'segments': [], 'committed': [], 'speakers': []}
+
+
+def update(committed=(), tentative=(), speakers=()):
+    return {'committed': list(committed), 'tentative': list(tentative), 'speakers': list(speakers)}
+
+
+def seg(start, text):
+    return {'start': start, 'end': start + 1.0, 'text': text}
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    payloads = []
+    monkeypatch.setattr(socket_service, "_send", lambda session, event, payload: payloads.append(payload))
+    return payloads
+
+
+class TestTranscriptUpdates:
+
+    def test_payload_carries_only_new_turns_and_tail(self, sent):
+        session = new_session()
+        speakers = [{'start': 0.0, 'end': 2.0, 'speaker': 'A'}] + [
+            {'start': float(i), 'end': i + 1.0, 'speaker': 'B' if i % 2 else 'A'} for i in range(2, 40)
+        ]
+        for i in range(40):
+            socket_service._emit_update(
+                session, update([seg(float(i), f"t{i}")], [seg(i + 1.0, "...")], speakers[i:i + 1]), i, False
+            )
+
+        last = sent[-1]
+        assert 'segments' not in last
+        assert last['committed_from'] == len(session['segments']) - 1
+        assert len(last['committed']) == 1
+        assert [t['text'] for t in last['tentative']] == ["..."]
+
+    def test_client_rebuilds_full_transcript_from_deltas(self, sent):
+        session = new_session()
+        client = []
+        steps = [
+            update([seg(0, "xin chào")], [seg(1, "hôm")], [{'start': 0, 'end': 1, 'speaker': 'A'}]),
+            update([seg(1, "hôm nay")], [], [{'start': 1, 'end': 2, 'speaker': 'A'}]),
+            update([seg(2, "ok")], [seg(3, "vậy")], [{'start': 2, 'end': 3, 'speaker': 'B'}]),
+            update([seg(3, "vậy thì")], [], [{'start': 3, 'end': 4, 'speaker': 'A'}]),
+        ]
+        for i, step in enumerate(steps):
+            socket_service._emit_update(session, step, i, False)
+            payload = sent[-1]
+            client[payload['committed_from']:] = payload['committed']
+
+        assert client == session['segments']
+        assert [t['speaker'] for t in client] == ['A', 'B', 'A']
+        assert client[0]['text'] == "xin chào hôm nay"
+
+    def test_full_segments_behind_legacy_flag(self, sent, monkeypatch):
+        monkeypatch.setattr(Settings, "LIVE_FULL_SEGMENTS", True)
+        session = new_session()
+
+        socket_service._emit_update(session, update([seg(0, "a")], [seg(1, "b")]), 1, False)
+
+        assert [t['text'] for t in sent[-1]['segments']] == ["a", "b"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+Tests for transcription with speakers (Whisper and pyannote run concurrently).
+
+Run: pytest tests/test_speaker_diarization.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio import speaker_diarization
+from backend.audio.decoded_audio import DecodedAudio
+from backend.audio.models import DIARIZATION, WHISPER_LARGE
+from backend.utils.model_registry import ModelRegistry
+
+
+class FakeDiarization:
+
+    def __init__(self, turns):
+        self.turns = turns
+
+    def itertracks(self, yield_label=False):
+        for start, end, speaker in self.turns:
+            yield SimpleNamespace(start=start, end=end), None, speaker
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Fake Whisper and pyannote that only finish if they run at the same time."""
+    both_running = threading.Barrier(2, timeout=5)
+
+    def whisper(inputs, generate_kwargs, return_timestamps):
+        both_running.wait()
+        return {"chunks": [
+            {"timestamp": (0.0, 2.0), "text": "xin chào"},
+            {"timestamp": (2.0, 4.0), "text": "chào bạn"},
+        ]}
+
+    def diarization(inputs, hook=None):
+        if hook:
+            hook("segmentation", None)
+            hook("segmentation", None, completed=1, total=2)
+        both_running.wait()
+        if hook:
+            hook("embeddings", None)
+        return FakeDiarization([(0.0, 2.1, "SPEAKER_00"), (2.1, 4.0, "SPEAKER_01")])
+
+    registry = ModelRegistry()
+    registry.register(WHISPER_LARGE, lambda: whisper)
+    registry.register(DIARIZATION, lambda: diarization)
+    monkeypatch.setattr(speaker_diarization, "register_audio_models", lambda hf_token=None: registry)
+    # pyannote input needs torch; the fake pipeline only needs to receive something
+    monkeypatch.setattr(DecodedAudio, "pyannote_input", lambda self: {"sample_rate": self.sample_rate})
+    return registry
+
+
+@pytest.fixture
+def audio():
+    with DecodedAudio.from_array(np.zeros(4 * 16000, dtype=np.float32)) as decoded:
+        yield decoded
+
+
+class TestTranscribeWithSpeakers:
+
+    def test_passes_run_concurrently_and_merge(self, models, audio):
+        messages = list(speaker_diarization.transcribe_with_speakers("meeting.wav", "vi", audio=audio))
+
+        final = messages[-1]
+        assert "❌" not in final
+        assert "**Guest-00**: xin chào" in final
+        assert "**Guest-01**: chào bạn" in final
+
+    def test_progress_streams_from_both_passes(self, models, audio):
+        messages = list(speaker_diarization.transcribe_with_speakers("meeting.wav", "vi", audio=audio))
+
+        assert any(m.startswith("✅ Transcription complete (2 chunks") for m in messages)
+        assert any(m.startswith("✅ Detected 2 speaker(s)") for m in messages)
+        # Each pyannote step is reported once
+        assert [m for m in messages if m.startswith("🎤")] == [
+            "🎤 Diarization: segmentation...",
+            "🎤 Diarization: embeddings...",
+        ]
+
+    def test_failure_in_one_pass_is_reported(self, models, audio):
+        def broken(*args, **kwargs):
+            raise RuntimeError("pyannote exploded")
+
+        models.register(DIARIZATION, lambda: broken, replace=True)
+        # Whisper waits for a partner that never arrives; do not block on it
+        models.register(WHISPER_LARGE, lambda: lambda *a, **k: {"chunks": []}, replace=True)
+
+        messages = list(speaker_diarization.transcribe_with_speakers("meeting.wav", "vi", audio=audio))
+
+        assert messages[-1] == "❌ Error: pyannote exploded"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
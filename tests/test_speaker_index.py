@@ -0,0 +1,115 @@
+"""
+Tests for interval-index speaker assignment.
+
+Run: pytest tests/test_speaker_index.py -v
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio.speaker_index import SpeakerIndex
+
+
+def brute_force_overlap(start, end, segments, default=None):
+    overlap = {}
+    for seg in sorted(segments, key=lambda s: (s["start"], s["end"])):
+        shared = min(end, seg["end"]) - max(start, seg["start"])
+        if shared > 0:
+            overlap[seg["speaker"]] = overlap.get(seg["speaker"], 0.0) + shared
+    if overlap:
+        return max(overlap, key=overlap.get)
+    middle = (start + end) / 2
+    for seg in sorted(segments, key=lambda s: (s["start"], s["end"])):
+        if seg["start"] <= middle <= seg["end"]:
+            return seg["speaker"]
+    return default
+
+
+class TestSpeakerIndex:
+
+    def test_largest_overlap_wins_over_midpoint(self):
+        index = SpeakerIndex([
+            {"start": 0.0, "end": 4.0, "speaker": "A"},
+            {"start": 4.0, "end": 10.0, "speaker": "B"},
+        ])
+        # Midpoint 4.0 is on A's boundary, but B speaks for 4 of the 5 seconds
+        assert index.speaker_at(3.0, 8.0) == "B"
+
+    def test_overlap_is_summed_per_speaker(self):
+        index = SpeakerIndex([
+            {"start": 0.0, "end": 2.0, "speaker": "A"},
+            {"start": 2.0, "end": 5.0, "speaker": "B"},
+            {"start": 5.0, "end": 7.0, "speaker": "A"},
+        ])
+        assert index.speaker_at(0.0, 7.0) == "A"
+
+    def test_gaps_and_zero_length_spans(self):
+        index = SpeakerIndex([
+            {"start": 0.0, "end": 2.0, "speaker": "A"},
+            {"start": 5.0, "end": 6.0, "speaker": "B"},
+        ])
+        assert index.speaker_at(3.0, 4.0, "Unknown") == "Unknown"
+        assert index.speaker_at(1.0, 1.0) == "A"
+        assert index.speaker_at(5.0, 5.0) == "B"
+
+    def test_empty_index_returns_default(self):
+        assert SpeakerIndex([]).speaker_at(0.0, 1.0, "Guest-1") == "Guest-1"
+
+    def test_unsorted_and_overlapping_segments(self):
+        index = SpeakerIndex([
+            {"start": 10.0, "end": 12.0, "speaker": "C"},
+            {"start": 0.0, "end": 30.0, "speaker": "LONG"},
+            {"start": 11.0, "end": 13.0, "speaker": "D"},
+        ])
+        assert index.speaker_at(10.5, 12.5) == "LONG"
+        assert index.speaker_at(40.0, 41.0, "none") == "none"
+
+    def test_matches_brute_force_on_random_meetings(self):
+        rng = random.Random(7)
+        segments, t = [], 0.0
+        while t < 3600:
+            length = rng.uniform(0.5, 15.0)
+            start = max(0.0, t - rng.uniform(0, 2)) if rng.random() < 0.2 else t
+            segments.append({"start": start, "end": t + length, "speaker": f"S{rng.randrange(5)}"})
+            t += length + rng.uniform(0, 1)
+        rng.shuffle(segments)
+        index = SpeakerIndex(segments)
+
+        for _ in range(500):
+            start = rng.uniform(0, 3700)
+            end = start + rng.choice([0.0, rng.uniform(0.1, 10.0)])
+            assert index.speaker_at(start, end, "none") == brute_force_overlap(start, end, segments, "none")
+
+    def test_assign_labels_each_span(self):
+        index = SpeakerIndex([
+            {"start": 0.0, "end": 5.0, "speaker": "A"},
+            {"start": 5.0, "end": 9.0, "speaker": "B"},
+        ])
+        spans = [{"start": 0.0, "end": 3.0}, {"start": 6.0, "end": 8.0}, {"start": 20.0, "end": 21.0}]
+        assert index.assign(spans, "?") == ["A", "B", "?"]
+
+
+    def test_long_segment_does_not_widen_every_lookup(self):
+        # One speaker talks over the whole meeting while short turns overlap it
+        segments = [{"start": 0.0, "end": 36000.0, "speaker": "LONG"}]
+        segments += [
+            {"start": t * 2.0, "end": t * 2.0 + 2.5, "speaker": f"S{t % 4}"}
+            for t in range(18000)
+        ]
+        index = SpeakerIndex(segments)
+
+        for start in (100.0, 17999.0, 35000.0):
+            # The long segment plus the two or three short turns around the span
+            assert len(index._candidates(start, start + 1.0)) <= 4
+            assert index.speaker_at(start, start + 1.0) == brute_force_overlap(start, start + 1.0, segments)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
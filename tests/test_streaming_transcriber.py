@@ -0,0 +1,140 @@
+"""
+Tests for incremental live transcription (committed/tentative window).
+
+Run: pytest tests/test_streaming_transcriber.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.audio.streaming_transcriber import SAMPLE_RATE, StreamingSession, StreamingTranscriber
+
+
+class FakeWhisper:
+    """Emits one 1-second "word" segment per full second of audio it is given."""
+
+    def __init__(self):
+        self.window_lengths = []
+        self.prompts = []
+
+    def __call__(self, audio, initial_prompt):
+        seconds = len(audio) / SAMPLE_RATE
+        self.window_lengths.append(seconds)
+        self.prompts.append(initial_prompt)
+        # Audio value encodes the absolute second it was recorded in
+        return [
+            {'start': i, 'end': i + 1, 'text': f"w{int(audio[i * SAMPLE_RATE])}"}
+            for i in range(int(seconds))
+        ]
+
+
+class FakeDecoder:
+    """Turns fed bytes (one per second) into that many seconds of samples."""
+
+    def __init__(self):
+        self.decoded = []
+        self.second = 0
+
+    def feed(self, data):
+        for _ in data:
+            self.decoded.append(np.full(SAMPLE_RATE, self.second, dtype=np.float32))
+            self.second += 1
+
+    def read(self):
+        samples = np.concatenate(self.decoded) if self.decoded else np.zeros(0, dtype=np.float32)
+        self.decoded = []
+        return samples
+
+    def close(self):
+        return self.read()
+
+    def kill(self):
+        pass
+
+
+def seconds(start, count):
+    return np.concatenate([np.full(SAMPLE_RATE, s, dtype=np.float32) for s in range(start, start + count)])
+
+
+class TestStreamingTranscriber:
+
+    def test_commits_segments_behind_live_edge(self):
+        stt = StreamingTranscriber(FakeWhisper(), tentative_seconds=2.0)
+
+        update = stt.push(seconds(0, 5))
+
+        assert [s['text'] for s in update['committed']] == ["w0", "w1", "w2"]
+        assert [s['text'] for s in update['tentative']] == ["w3", "w4"]
+        assert stt.offset == 3.0
+
+    def test_committed_segments_are_reported_once_with_stream_times(self):
+        stt = StreamingTranscriber(FakeWhisper(), tentative_seconds=2.0)
+        stt.push(seconds(0, 5))
+
+        update = stt.push(seconds(5, 2))
+
+        assert [(s['text'], s['start']) for s in update['committed']] == [("w3", 3.0), ("w4", 4.0)]
+        assert [s['text'] for s in stt.committed] == ["w0", "w1", "w2", "w3", "w4"]
+
+    def test_waits_for_min_new_audio(self):
+        whisper = FakeWhisper()
+        stt = StreamingTranscriber(whisper, min_new_seconds=2.0)
+
+        assert stt.push(seconds(0, 1)) is None
+        assert stt.push(seconds(1, 1)) is not None
+        assert len(whisper.window_lengths) == 1
+
+    def test_window_stays_bounded_on_long_recordings(self):
+        whisper = FakeWhisper()
+        stt = StreamingTranscriber(whisper, window_seconds=10.0, tentative_seconds=2.0)
+
+        for start in range(0, 1800, 2):  # 30 minutes in 2-second chunks
+            stt.push(seconds(start, 2))
+
+        assert max(whisper.window_lengths) <= 10.0 + 2.0
+        assert len(stt.committed) + len(stt.tentative) == 1800
+
+    def test_committed_text_is_used_as_prompt(self):
+        whisper = FakeWhisper()
+        stt = StreamingTranscriber(whisper, tentative_seconds=2.0, context_chars=5)
+        stt.push(seconds(0, 5))
+        stt.push(seconds(5, 1))
+
+        assert whisper.prompts[0] is None
+        assert whisper.prompts[1] == "w1 w2"
+
+    def test_flush_commits_everything(self):
+        stt = StreamingTranscriber(FakeWhisper(), tentative_seconds=2.0)
+        stt.push(seconds(0, 5))
+
+        update = stt.flush(seconds(5, 1))
+
+        assert [s['text'] for s in update['committed']] == ["w3", "w4", "w5"]
+        assert update['tentative'] == []
+
+
+class TestStreamingSession:
+
+    def test_feed_decodes_only_new_bytes(self):
+        whisper = FakeWhisper()
+        session = StreamingSession(whisper, decoder=FakeDecoder(), tentative_seconds=1.0)
+
+        first = session.feed(b"ab")
+        second = session.feed(b"c")
+        final = session.close()
+
+        assert [s['text'] for s in first['committed']] == ["w0"]
+        assert [s['text'] for s in second['committed']] == ["w1"]
+        assert [s['text'] for s in final['committed']] == ["w2"]
+        assert whisper.window_lengths == [2.0, 2.0, 1.0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""Measure /api/chat/ask latency: per-request ChromaManager vs shared instance.
+
+Usage:
+    python tools/benchmark_chat_ask.py                      # in-process comparison
+    python tools/benchmark_chat_ask.py --skip-llm           # setup + retrieval only (no LLM cost)
+    python tools/benchmark_chat_ask.py --skip-llm --fake-embeddings   # no Azure credentials / model download
+    python tools/benchmark_chat_ask.py --url http://localhost:5000 -n 20
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def summarize(label, samples_ms):
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    print(f"{label:<28} n={len(samples_ms):<3} p50={statistics.median(samples_ms):8.1f} ms  "
+          f"p95={p95:8.1f} ms  mean={statistics.mean(samples_ms):8.1f} ms")
+
+
+class HashEmbedder:
+    """Deterministic stand-in for the SentenceTransformer (bag of hashed words)."""
+
+    def __init__(self, model_name, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        import numpy as np
+
+        single = isinstance(texts, str)
+        vectors = np.zeros((1 if single else len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate([texts] if single else texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dim] += 1.0
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+        return vectors[0] if single else vectors
+
+
+def use_fake_embeddings():
+    """Hash embeddings in a throwaway store, so the real chunk store is never touched.
+
+    Everything else (Chroma, LangChain, the Azure client object, the graph)
+    is the real code; only the embedding model and the data are stand-ins.
+    """
+    from backend.rag import retrieval_service
+
+    store_dir = tempfile.mkdtemp(prefix="bench_chat_ask_")
+    os.environ["VECTOR_STORE_DIR"] = store_dir
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    # Opening the legacy store (to migrate it) would write to it
+    retrieval_service.LEGACY_CHUNK_STORE = (os.path.join(store_dir, "no-legacy-store"), "")
+    # Constructing the client needs no network; --skip-llm keeps it from being called
+    os.environ.setdefault("AZURE_OPENAI_LLM_ENDPOINT", "https://example.invalid")
+    os.environ.setdefault("AZURE_OPENAI_LLM_API_KEY", "benchmark")
+    retrieval_service.SentenceTransformer = HashEmbedder
+
+    from backend.rag.chroma_manager import get_chroma_manager
+    manager = get_chroma_manager()
+    for i in range(50):
+        manager.store(
+            f"Meeting {i}. The team reviewed the Q{i % 4 + 1} budget and decided to "
+            f"move the release of project {i} to next sprint. Action: Lan updates ticket TASK-{i}."
+        )
+
+
+def run_in_process(question, n, skip_llm):
+    from backend.rag.chroma_manager import ChromaManager, get_chroma_manager
+
+    def ask(manager):
+        if skip_llm:
+            return manager.retriever.invoke(question)
+        return manager.retrieve(question)
+
+    before = []
+    for _ in range(n):
+        start = time.perf_counter()
+        ask(ChromaManager())
+        before.append((time.perf_counter() - start) * 1000)
+
+    get_chroma_manager()  # warm-up: the first request pays initialization once
+    after = []
+    for _ in range(n):
+        start = time.perf_counter()
+        ask(get_chroma_manager())
+        after.append((time.perf_counter() - start) * 1000)
+
+    summarize("before (per-request init)", before)
+    summarize("after (shared instance)", after)
+    print(f"speedup (p50): {statistics.median(before) / statistics.median(after):.1f}x")
+
+
+def run_http(url, question, n):
+    import requests
+
+    endpoint = f"{url.rstrip('/')}/api/chat/ask"
+    wall, server = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        res = requests.post(endpoint, json={"message": question}, timeout=120)
+        wall.append((time.perf_counter() - start) * 1000)
+        if res.ok and "latency_ms" in res.json():
+            server.append(res.json()["latency_ms"])
+        else:
+            print(f"⚠️ {res.status_code}: {res.text[:200]}")
+
+    summarize("client wall time", wall)
+    if server:
+        summarize("server latency_ms", server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=10, help="requests per variant")
+    parser.add_argument("-q", "--question", default="What decisions were made in the last meeting?")
+    parser.add_argument("--url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--skip-llm", action="store_true", help="in-process only: time setup + retrieval")
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="in-process only: hash embeddings and sample data in a temporary store")
+    args = parser.parse_args()
+
+    if args.fake_embeddings:
+        if args.url or not args.skip_llm:
+            parser.error("--fake-embeddings needs --skip-llm and no --url")
+        use_fake_embeddings()
+
+    if args.url:
+        run_http(args.url, args.question, args.n)
+    else:
+        run_in_process(args.question, args.n, args.skip_llm)
+
+
+if __name__ == "__main__":
+    main()
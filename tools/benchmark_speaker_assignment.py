@@ -0,0 +1,98 @@
+"""Measure speaker assignment: linear midpoint scan vs SpeakerIndex.
+
+Generates synthetic meetings (speaker turns with occasional overlapping
+speech, transcript chunks of a few seconds) and times labelling every
+chunk with both approaches.
+
+Usage:
+    python tools/benchmark_speaker_assignment.py                 # one 3-hour meeting
+    python tools/benchmark_speaker_assignment.py --hours 3 -n 5 --speakers 8
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.audio.speaker_index import SpeakerIndex
+
+
+def synthetic_meeting(hours, speakers, seed):
+    """Diarization turns and transcript chunks covering ``hours`` of audio."""
+    rng = random.Random(seed)
+    total = hours * 3600
+    turns, t = [], 0.0
+    while t < total:
+        length = rng.uniform(1.0, 20.0)
+        speaker = f"SPEAKER_{rng.randrange(speakers):02d}"
+        # ~10% of turns start before the previous one ends (overlapping speech)
+        start = max(0.0, t - rng.uniform(0.2, 1.5)) if rng.random() < 0.1 else t
+        turns.append({"start": start, "end": min(total, t + length), "speaker": speaker})
+        t += length + rng.uniform(0.0, 0.8)
+
+    chunks, t = [], 0.0
+    while t < total:
+        length = rng.uniform(2.0, 8.0)
+        chunks.append({"start": t, "end": min(total, t + length)})
+        t += length
+    rng.shuffle(turns)  # Diarization output order should not matter
+    return turns, chunks
+
+
+def linear_midpoint(chunks, turns, default="Unknown"):
+    """The previous approach: first turn containing the chunk midpoint."""
+    labels = []
+    for chunk in chunks:
+        middle = (chunk["start"] + chunk["end"]) / 2
+        speaker = default
+        for turn in turns:
+            if turn["start"] <= middle <= turn["end"]:
+                speaker = turn["speaker"]
+                break
+        labels.append(speaker)
+    return labels
+
+
+def indexed(chunks, turns, default="Unknown"):
+    return SpeakerIndex(turns).assign(chunks, default)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=3.0, help="meeting length")
+    parser.add_argument("--speakers", type=int, default=6)
+    parser.add_argument("-n", type=int, default=3, help="meetings to generate")
+    args = parser.parse_args()
+
+    linear_ms, index_ms, agreement = [], [], []
+    for seed in range(args.n):
+        turns, chunks = synthetic_meeting(args.hours, args.speakers, seed)
+        before, old = timed(linear_midpoint, chunks, turns)
+        after, new = timed(indexed, chunks, turns)
+        linear_ms.append(before)
+        index_ms.append(after)
+        agreement.append(sum(a == b for a, b in zip(old, new)) / len(chunks))
+        print(f"meeting {seed}: {len(chunks)} chunks x {len(turns)} turns  "
+              f"linear={before:8.1f} ms  index={after:6.1f} ms")
+
+    print(f"\nlinear scan   p50={statistics.median(linear_ms):8.1f} ms")
+    print(f"SpeakerIndex  p50={statistics.median(index_ms):8.1f} ms (includes building the index)")
+    print(f"speedup (p50): {statistics.median(linear_ms) / statistics.median(index_ms):.0f}x")
+    print(f"same label as midpoint rule: {statistics.mean(agreement) * 100:.1f}% "
+          f"(differences are chunks spanning a speaker change)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Offline evaluation of history retrieval: keyword vs dense vs hybrid (RRF).
+
+Builds a throwaway history (temporary directory, own Chroma store) from the
+synthetic generator in tests/generate_massive_data.py and scores each
+retriever on two query sets with known answers:
+
+- entity: "What was discussed in <meeting title #n>?" - one relevant meeting
+  (names/numbers only appear in the file name)
+- topic: a topic description - every meeting with that topic is relevant
+
+Reports recall@k (hits / min(k, relevant)) and p50/p95 latency per mode.
+Dense and hybrid modes need chromadb and sentence-transformers; without
+them only keyword search is evaluated.
+
+Usage:
+    python tools/eval_hybrid_retrieval.py
+    python tools/eval_hybrid_retrieval.py --per-category 200 --queries 100 -k 1 5 10
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root (and tests/ for the generator) to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "tests"))
+
+from backend.data.history_catalog import CATALOG_FILE, HistoryCatalog
+from backend.rag.hybrid_retriever import HybridRetriever
+from generate_massive_data import TEMPLATES, generate_meeting
+
+
+def build_corpus(history_dir, per_category, seed):
+    """Write synthetic meetings; return them."""
+    random.seed(seed)
+    meetings = []
+    for category in TEMPLATES:
+        for index in range(per_category):
+            meeting = generate_meeting(category, index)
+            meeting["id"] = f"{category}_{index}"
+            with open(history_dir / f"{meeting['id']}.json", "w", encoding="utf-8") as f:
+                json.dump(meeting, f, ensure_ascii=False)
+            meetings.append(meeting)
+    return meetings
+
+
+def build_queries(meetings, n_entity, seed):
+    """(kind, query, relevant ids) triples."""
+    rng = random.Random(seed)
+    queries = []
+    for meeting in rng.sample(meetings, min(n_entity, len(meetings))):
+        title = Path(meeting["original_file"]).stem.replace("_", " ")
+        queries.append(("entity", f"What was discussed in {title}?", {meeting["id"]}))
+
+    by_topic = {}
+    for meeting in meetings:
+        for topic in meeting["topics"]:
+            by_topic.setdefault(topic["description"], set()).add(meeting["id"])
+    for description, relevant in sorted(by_topic.items()):
+        queries.append(("topic", description, relevant))
+    return queries
+
+
+def dense_searcher(history_dir, store_dir):
+    """HistorySearcher on an isolated store, indexed; None if unavailable."""
+    try:
+        os.environ["VECTOR_STORE_DIR"] = str(store_dir)
+        from backend.data.history_searcher import HistorySearcher
+        from backend.rag.retrieval_service import reset_retrieval_service
+        reset_retrieval_service()
+        HistorySearcher._instance = None
+        searcher = HistorySearcher(history_dir=str(history_dir), collection_name="eval_history")
+        searcher.index_all_meetings(force_reindex=True)
+        return searcher
+    except Exception as e:
+        print(f"[WARN] Dense search unavailable ({e}); evaluating keyword search only")
+        return None
+
+
+def evaluate(name, search, queries, ks):
+    """Run every query; print recall@k per query kind and latency."""
+    latencies, recalls = [], {}
+    for kind, query, relevant in queries:
+        start = time.perf_counter()
+        ids = search(query, max(ks))
+        latencies.append((time.perf_counter() - start) * 1000)
+        for k in ks:
+            hits = len(relevant & set(ids[:k]))
+            recalls.setdefault((kind, k), []).append(hits / min(k, len(relevant)))
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    cells = "  ".join(
+        f"{kind}@{k}={statistics.mean(recalls[(kind, k)]):.3f}"
+        for kind in ("entity", "topic") for k in ks if (kind, k) in recalls
+    )
+    print(f"{name:8s} {cells}  p50={statistics.median(latencies):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-category", type=int, default=20, help="meetings per generator category")
+    parser.add_argument("--queries", type=int, default=50, help="entity queries to sample")
+    parser.add_argument("-k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--pool", type=int, default=20, help="candidates per retriever before fusion")
+    parser.add_argument("--rrf-k", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="eval_retrieval_"))
+    try:
+        history_dir = work_dir / "history"
+        history_dir.mkdir()
+        meetings = build_corpus(history_dir, args.per_category, args.seed)
+        queries = build_queries(meetings, args.queries, args.seed)
+        print(f"Corpus: {len(meetings)} meetings, {len(queries)} queries "
+              f"(pool={args.pool}, rrf_k={args.rrf_k})\n")
+
+        catalog = HistoryCatalog(str(history_dir / CATALOG_FILE))
+        catalog.rebuild(str(history_dir))
+        searcher = dense_searcher(history_dir, work_dir / "chroma")
+
+        lexical = HybridRetriever(None, catalog, str(history_dir), args.pool, args.rrf_k)
+        evaluate("keyword", lambda q, k: [r["id"] for r in lexical.retrieve(q, top_k=k)], queries, args.k)
+
+        if searcher is not None:
+            evaluate("dense", lambda q, k: [r["id"] for r in searcher.semantic_search(q, top_k=k)], queries, args.k)
+            hybrid = HybridRetriever(searcher, catalog, str(history_dir), args.pool, args.rrf_k)
+            evaluate("hybrid", lambda q, k: [r["id"] for r in hybrid.retrieve(q, top_k=k)], queries, args.k)
+            hybrid.close()
+        lexical.close()
+        catalog.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
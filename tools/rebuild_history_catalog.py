@@ -0,0 +1,36 @@
+"""Rebuild the SQLite history catalog from the JSON files on disk.
+
+Run after adding or removing history files outside the app (generator
+scripts, manual copies, restored backups).
+
+Usage:
+    python tools/rebuild_history_catalog.py
+    python tools/rebuild_history_catalog.py --history-dir data/history
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.data.history_catalog import CATALOG_FILE, HistoryCatalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history-dir", default="data/history", help="directory with history JSON files")
+    args = parser.parse_args()
+
+    catalog = HistoryCatalog(str(Path(args.history_dir) / CATALOG_FILE))
+    start = time.perf_counter()
+    count = catalog.rebuild(args.history_dir)
+    catalog.close()
+    print(f"Cataloged {count} analyses from {args.history_dir} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import backend.utils.ffmpeg_helper # Auto-setup ffmpeg path (MUST BE FIRST)
+import logging
+
+from app import create_app
+
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+logging.getLogger('socketio').setLevel(logging.ERROR)
+logging.getLogger('engineio').setLevel(logging.ERROR)
+
+# Gunicorn entry point (Procfile). Kept out of run.py so that spawned
+# transcription workers never build the app.
+app = create_app('development')